@@ -15,6 +15,10 @@ class AeroPoint(Group):
     def initialize(self):
         self.options.declare('surfaces', types=list)
         self.options.declare('user_specified_Sref', types=bool, default=False)
+        self.options.declare('aic_chunk_size', default=None, types=int, allow_none=True)
+        self.options.declare('single_pass_aic', default=False, types=bool)
+        self.options.declare('aic_solver', default='lu', values=['lu', 'gmres', 'hmatrix'])
+        self.options.declare('cache_rings', default=False, types=bool)
 
     def setup(self):
         surfaces = self.options['surfaces']
@@ -53,7 +57,11 @@ class AeroPoint(Group):
         # While other components only depends on a single surface,
         # this component requires information from all surfaces because
         # each surface interacts with the others.
-        aero_states = VLMStates(surfaces=surfaces)
+        aero_states = VLMStates(surfaces=surfaces,
+            aic_chunk_size=self.options['aic_chunk_size'],
+            single_pass_aic=self.options['single_pass_aic'],
+            aic_solver=self.options['aic_solver'],
+            cache_rings=self.options['cache_rings'])
         aero_states.linear_solver = LinearRunOnce()
 
         self.add_subsystem('aero_states',
@@ -3,6 +3,44 @@ import numpy as np
 
 from openmdao.api import ExplicitComponent
 
+from openaerostruct.utils.caching import sparsity_cache
+
+
+def _get_collocation_points_sparsity(shapes):
+    """
+    Get the rows and cols of the sparse partials of the evaluation points
+    wrt the mesh of each surface, for surfaces with meshes of the given
+    (nx, ny) shapes. The rows and cols are the same for the collocation
+    points, force points, and bound vectors.
+    """
+    num_eval_points = sum((nx - 1) * (ny - 1) for nx, ny in shapes)
+    eval_indices = np.arange(num_eval_points * 3).reshape((num_eval_points, 3))
+
+    patterns = []
+
+    ind_eval_points_1 = 0
+    ind_eval_points_2 = 0
+    for nx, ny in shapes:
+        # Keep track of how many evaluation points come from this surface.
+        ind_eval_points_2 += (nx - 1) * (ny - 1)
+
+        mesh_indices = np.arange(nx * ny * 3).reshape(
+            (nx, ny, 3))
+
+        # Each point depends on the four corners of its panel
+        rows = np.tile(eval_indices[ind_eval_points_1:ind_eval_points_2, :].flatten(), 4)
+        cols = np.concatenate([
+            mesh_indices[0:-1, 0:-1, :].flatten(),
+            mesh_indices[1:  , 0:-1, :].flatten(),
+            mesh_indices[0:-1, 1:  , :].flatten(),
+            mesh_indices[1:  , 1:  , :].flatten(),
+        ])
+        patterns.extend([rows, cols])
+
+        ind_eval_points_1 += (nx - 1) * (ny - 1)
+
+    return patterns
+
 
 class CollocationPoints(ExplicitComponent):
     """
@@ -58,35 +96,22 @@ class CollocationPoints(ExplicitComponent):
         self.add_output('force_pts', shape=(num_eval_points, 3), units='m')
         self.add_output('bound_vecs', shape=(num_eval_points, 3), units='m')
 
-        eval_indices = np.arange(num_eval_points * 3).reshape((num_eval_points, 3))
+        shapes = tuple(surface['mesh'].shape[:2] for surface in self.options['surfaces'])
+        patterns = sparsity_cache.get(self, shapes, lambda: _get_collocation_points_sparsity(shapes))
 
-        ind_eval_points_1 = 0
-        ind_eval_points_2 = 0
-        for surface in self.options['surfaces']:
+        for i_surf, surface in enumerate(self.options['surfaces']):
             mesh = surface['mesh']
             nx = mesh.shape[0]
             ny = mesh.shape[1]
             name = surface['name']
 
-            # Keep track of how many evaluation points come from this surface.
-            ind_eval_points_2 += (nx - 1) * (ny - 1)
-
             # Take in a deformed mesh for each surface.
             mesh_name = name + '_def_mesh'
             self.add_input(mesh_name, shape=(nx, ny, 3), units='m')
 
-            mesh_indices = np.arange(nx * ny * 3).reshape(
-                (nx, ny, 3))
-
             # Compute the Jacobian for `coll_pts` wrt the meshes.
             # These do not change; the Jacobian is linear.
-            rows = np.tile(eval_indices[ind_eval_points_1:ind_eval_points_2, :].flatten(), 4)
-            cols = np.concatenate([
-                mesh_indices[0:-1, 0:-1, :].flatten(),
-                mesh_indices[1:  , 0:-1, :].flatten(),
-                mesh_indices[0:-1, 1:  , :].flatten(),
-                mesh_indices[1:  , 1:  , :].flatten(),
-            ])
+            rows, cols = patterns[2 * i_surf:2 * i_surf + 2]
             data = np.concatenate([
                 0.25 * 0.5 * np.ones((nx - 1) * (ny - 1) * 3),  # FR
                 0.75 * 0.5 * np.ones((nx - 1) * (ny - 1) * 3),  # BR
@@ -115,8 +140,6 @@ class CollocationPoints(ExplicitComponent):
             ])
             self.declare_partials('bound_vecs', mesh_name, val=data, rows=rows, cols=cols)
 
-            ind_eval_points_1 += (nx - 1) * (ny - 1)
-
     def compute(self, inputs, outputs):
         ind_eval_points_1 = 0
         ind_eval_points_2 = 0
@@ -3,10 +3,9 @@ import numpy as np
 
 from openmdao.api import ExplicitComponent
 
-from openaerostruct.utils.vector_algebra import add_ones_axis
-from openaerostruct.utils.vector_algebra import compute_dot, compute_dot_deriv
-from openaerostruct.utils.vector_algebra import compute_cross, compute_cross_deriv1, compute_cross_deriv2
-from openaerostruct.utils.vector_algebra import compute_norm, compute_norm_deriv
+from openaerostruct.utils.caching import array_fingerprint, sparsity_cache
+from openaerostruct.utils.vector_algebra import compute_dot, compute_cross, compute_norm, \
+    compute_skew
 
 
 tol = 1e-10
@@ -29,74 +28,542 @@ def _compute_finite_vortex(r1, r2):
     result[np.abs(den) < tol] = 0.
     return result
 
-def _compute_finite_vortex_deriv1(r1, r2, r1_deriv):
-    r1_norm = add_ones_axis(compute_norm(r1))
-    r2_norm = add_ones_axis(compute_norm(r2))
-    r1_norm_deriv = compute_norm_deriv(r1, r1_deriv)
+def _compute_semi_infinite_vortex(u, r):
+    r_norm = compute_norm(r)
+    u_x_r = compute_cross(u, r)
+    u_d_r = compute_dot(u, r)
 
-    r1_x_r2 = add_ones_axis(compute_cross(r1, r2))
-    r1_d_r2 = add_ones_axis(compute_dot(r1, r2))
-    r1_x_r2_deriv = compute_cross_deriv1(r1_deriv, r2)
-    r1_d_r2_deriv = compute_dot_deriv(r2, r1_deriv)
+    num = u_x_r
+    den = r_norm * (r_norm - u_d_r)
+    return num / den / 4 / np.pi
 
-    num = (1. / r1_norm + 1. / r2_norm) * r1_x_r2
-    num_deriv = (-r1_norm_deriv / r1_norm ** 2) * r1_x_r2 \
-        + (1. / r1_norm + 1. / r2_norm) * r1_x_r2_deriv
+def _compute_finite_vortex_derivs(r1, r2):
+    """
+    Compute the finite vortex filament influence along with its derivatives
+    with respect to both r1 and r2 in a single pass, so the norms, cross and
+    dot products are only computed once and shared between the three.
+    The derivatives are stored as [..., output, input].
+    """
+    r1_norm = np.sqrt(np.sum(r1 ** 2, axis=-1))
+    r2_norm = np.sqrt(np.sum(r2 ** 2, axis=-1))
 
-    den = r1_norm * r2_norm + r1_d_r2
-    den_deriv = r1_norm_deriv * r2_norm + r1_d_r2_deriv
+    r1_x_r2 = compute_cross(r1, r2)
+    r1_d_r2 = np.sum(r1 * r2, axis=-1)
 
-    result = (num_deriv * den - num * den_deriv) / den ** 2 / 4 / np.pi
-    result[np.abs(den) < tol] = 0.
-    return result
+    norm_sum = 1. / r1_norm + 1. / r2_norm
 
-def _compute_finite_vortex_deriv2(r1, r2, r2_deriv):
-    r1_norm = add_ones_axis(compute_norm(r1))
-    r2_norm = add_ones_axis(compute_norm(r2))
-    r2_norm_deriv = compute_norm_deriv(r2, r2_deriv)
+    num = norm_sum[..., np.newaxis] * r1_x_r2
+    den = r1_norm * r2_norm + r1_d_r2
 
-    r1_x_r2 = add_ones_axis(compute_cross(r1, r2))
-    r1_d_r2 = add_ones_axis(compute_dot(r1, r2))
-    r1_x_r2_deriv = compute_cross_deriv2(r1, r2_deriv)
-    r1_d_r2_deriv = compute_dot_deriv(r1, r2_deriv)
+    scale = 1. / den / 4 / np.pi
+    result = num * scale[..., np.newaxis]
 
-    num = (1. / r1_norm + 1. / r2_norm) * r1_x_r2
-    num_deriv = (-r2_norm_deriv / r2_norm ** 2) * r1_x_r2 \
-        + (1. / r1_norm + 1. / r2_norm) * r1_x_r2_deriv
+    # The quotient rule gives (num_deriv - num * den_deriv / den) * scale,
+    # where we use d(r1 x r2)/dr1 = -[r2]_x and d(r1 x r2)/dr2 = [r1]_x.
+    num_den = num / den[..., np.newaxis]
 
-    den = r1_norm * r2_norm + r1_d_r2
-    den_deriv = r1_norm * r2_norm_deriv + r1_d_r2_deriv
+    num_deriv1 = -np.einsum('...i,...j->...ij', r1_x_r2, r1 / r1_norm[..., np.newaxis] ** 3) \
+        - norm_sum[..., np.newaxis, np.newaxis] * compute_skew(r2)
+    den_deriv1 = (r2_norm / r1_norm)[..., np.newaxis] * r1 + r2
+    deriv1 = (num_deriv1 - np.einsum('...i,...j->...ij', num_den, den_deriv1)) \
+        * scale[..., np.newaxis, np.newaxis]
 
-    result = (num_deriv * den - num * den_deriv) / den ** 2 / 4 / np.pi
-    result[np.abs(den) < tol] = 0.
-    return result
+    num_deriv2 = -np.einsum('...i,...j->...ij', r1_x_r2, r2 / r2_norm[..., np.newaxis] ** 3) \
+        + norm_sum[..., np.newaxis, np.newaxis] * compute_skew(r1)
+    den_deriv2 = (r1_norm / r2_norm)[..., np.newaxis] * r2 + r1
+    deriv2 = (num_deriv2 - np.einsum('...i,...j->...ij', num_den, den_deriv2)) \
+        * scale[..., np.newaxis, np.newaxis]
 
-def _compute_semi_infinite_vortex(u, r):
-    r_norm = compute_norm(r)
+    mask = np.abs(den) < tol
+    result[mask] = 0.
+    deriv1[mask] = 0.
+    deriv2[mask] = 0.
+    return result, deriv1, deriv2
+
+def _compute_semi_infinite_vortex_derivs(u, r, u_deriv):
+    """
+    Compute the semi-infinite vortex filament influence along with its
+    derivatives with respect to r and alpha in a single pass, where u_deriv
+    is the derivative of the filament direction u with respect to alpha.
+    The derivatives wrt r are stored as [..., output, input].
+    """
+    r_norm = np.sqrt(np.sum(r ** 2, axis=-1))
     u_x_r = compute_cross(u, r)
-    u_d_r = compute_dot(u, r)
+    u_d_r = np.sum(u * r, axis=-1)
 
-    num = u_x_r
     den = r_norm * (r_norm - u_d_r)
-    return num / den / 4 / np.pi
 
-def _compute_semi_infinite_vortex_deriv(u, r, r_deriv):
-    r_norm = add_ones_axis(compute_norm(r))
-    r_norm_deriv = compute_norm_deriv(r, r_deriv)
+    scale = 1. / den / 4 / np.pi
+    result = u_x_r * scale[..., np.newaxis]
 
-    u_x_r = add_ones_axis(compute_cross(u, r))
-    u_x_r_deriv = compute_cross_deriv2(u, r_deriv)
+    den_deriv = (2. - u_d_r / r_norm)[..., np.newaxis] * r - r_norm[..., np.newaxis] * u
+    deriv = (compute_skew(u) - np.einsum('...i,...j->...ij', u_x_r / den[..., np.newaxis], den_deriv)) \
+        * scale[..., np.newaxis, np.newaxis]
 
-    u_d_r = add_ones_axis(compute_dot(u, r))
-    u_d_r_deriv = compute_dot_deriv(u, r_deriv)
+    # Only u depends on alpha, and the derivative of den wrt u is -r_norm * r
+    u_deriv_d_r = np.sum(u_deriv * r, axis=-1)
+    alpha_deriv = (compute_cross(u_deriv, r) + (r_norm * u_deriv_d_r / den)[..., np.newaxis] * u_x_r) \
+        * scale[..., np.newaxis]
 
-    num = u_x_r
-    num_deriv = u_x_r_deriv
+    return result, deriv, alpha_deriv
 
-    den = r_norm * (r_norm - u_d_r)
-    den_deriv = r_norm_deriv * (r_norm - u_d_r) + r_norm * (r_norm_deriv - u_d_r_deriv)
+def _get_vel_mtx_sparsity(nx, ny, num_eval_points, symmetry):
+    """
+    Get the rows and cols of the sparse Jacobian of a single surface's
+    vel_mtx with respect to its vectors array.
+
+    Each vel_mtx entry only depends on the four vectors at the corners of
+    its vortex ring, so the Jacobian is made up of four blocks of 3x3
+    matrices, one per corner. In the symmetric case, the corners shared by
+    the actual and the "ghost" surface at the symmetry plane would appear
+    twice, so those duplicate entries are removed.
+    """
+    if symmetry:
+        # Get an array of indices representing the number of entries
+        # in the vectors array.
+        vectors_indices = np.arange(num_eval_points * nx * (2*ny-1) * 3).reshape(
+            (num_eval_points, nx, (2*ny-1), 3))
+
+        # Set up blocks to mannipulate into rows for the sparse indices
+        base = np.tile(np.repeat(np.arange(3), 3), ny-1)
+        block1 = base + np.repeat(3*np.arange(ny-1), 9)
+        block2 = base + np.flip(np.repeat(3*np.arange(ny-1), 9), axis=0)
+        block3 = np.concatenate([block1, block2])
+        block4 = np.tile(block3, nx-1)
+        block5 = block4 + np.repeat(3*(ny-1)*np.arange(nx-1), len(block3))
+        block6 = np.tile(block5, num_eval_points)
+        row = block6 + np.repeat(3*(ny-1)*(nx-1)*np.arange(num_eval_points), len(block5))
+
+        rows = np.tile(row, 4)
+
+        # Create the columns for each of the tiled out rows based on the
+        # previously-assembled vectors_indices.
+        cols = np.concatenate([
+            np.einsum('ijkm,l->ijklm', vectors_indices[:, 0:-1, 0:-1, :], np.ones(3, int)).flatten(),
+            np.einsum('ijkm,l->ijklm', vectors_indices[:, 1:  , 0:-1, :], np.ones(3, int)).flatten(),
+            np.einsum('ijkm,l->ijklm', vectors_indices[:, 0:-1, 1:  , :], np.ones(3, int)).flatten(),
+            np.einsum('ijkm,l->ijklm', vectors_indices[:, 1:  , 1:  , :], np.ones(3, int)).flatten(),
+        ])
+
+        # Layout logic includes some duplicate entries due to symmetry. Find and remove them.
+        nn = len(rows) // 2
+
+        # Determine the repeated indices and store them in an array
+        inds = np.arange(nn).reshape((-1, 9))
+        to_remove = inds[(ny-1)::2*(ny-1)].flatten()
+
+        # Actually remove the duplicate entries
+        rows = np.delete(rows, to_remove)
+        cols = np.delete(cols, to_remove)
+
+    # In the nonsymmetric case, the derivative sparsity patterns are
+    # much more straightforward.
+    else:
+        vectors_indices = np.arange(num_eval_points * nx * ny * 3).reshape(
+            (num_eval_points, nx, ny, 3))
+        vel_mtx_indices = np.arange(num_eval_points * (nx - 1) * (ny - 1) * 3).reshape(
+            (num_eval_points, nx - 1, ny - 1, 3))
+
+        rows = np.tile(np.einsum('ijkl,m->ijklm', vel_mtx_indices, np.ones(3, int)).flatten(), 4)
+
+        cols = np.concatenate([
+            np.einsum('ijkm,l->ijklm', vectors_indices[:, 0:-1, 0:-1, :], np.ones(3, int)).flatten(),
+            np.einsum('ijkm,l->ijklm', vectors_indices[:, 1:  , 0:-1, :], np.ones(3, int)).flatten(),
+            np.einsum('ijkm,l->ijklm', vectors_indices[:, 0:-1, 1:  , :], np.ones(3, int)).flatten(),
+            np.einsum('ijkm,l->ijklm', vectors_indices[:, 1:  , 1:  , :], np.ones(3, int)).flatten(),
+        ])
+
+    return rows, cols
+
+def _fold_vel_mtx(result, ny, symmetry):
+    """
+    Fold the influence of the "ghost" surface onto the actual one if the
+    surface is symmetric.
+    """
+    if symmetry:
+        res = result[:, :, :ny-1, :]
+        res += result[:, :, ny-1:, :][:, :, ::-1, :]
+        return res
+    else:
+        return result
+
+def _assemble_vel_mtx(ring_results, trailing_results, ny, symmetry):
+    """
+    Sum the influences of the four filaments of each vortex ring and of the
+    trailing filaments into a single surface's vel_mtx, folding the "ghost"
+    surface onto the actual one if the surface is symmetric.
+    """
+    vel_mtx = sum(_fold_vel_mtx(result, ny, symmetry) for result in ring_results)
+
+    _add_trailing_vel_mtx(vel_mtx, trailing_results, ny, symmetry)
+
+    return vel_mtx
+
+def _add_trailing_vel_mtx(vel_mtx, trailing_results, ny, symmetry):
+    """
+    Add the influence of the trailing filaments to the last row of vel_mtx.
+    The finite trailing filament cancels out the rear filament of the
+    last row of rings, which is replaced by the two semi-infinite legs.
+    """
+    result1, result2, result3 = trailing_results
+    vel_mtx[:, -1:, :, :] += _fold_vel_mtx(result1, ny, symmetry) \
+        - _fold_vel_mtx(result2, ny, symmetry) + _fold_vel_mtx(result3, ny, symmetry)
+
+def _get_freestream_direction(alpha):
+    cosa = np.cos(alpha * np.pi / 180.)
+    sina = np.sin(alpha * np.pi / 180.)
+    return np.array([cosa, 0, sina])
+
+def _get_freestream_direction_deriv(alpha):
+    """
+    Get the derivative of the freestream direction wrt alpha in degrees.
+    """
+    cosa = np.cos(alpha * np.pi / 180.)
+    sina = np.sin(alpha * np.pi / 180.)
+    return np.array([-sina, 0, cosa]) * np.pi / 180.
+
+def _compute_vel_mtx(vectors, alpha, nx, ny, symmetry):
+    """
+    Compute a single surface's vel_mtx from its vectors array, which may
+    contain any number of evaluation points.
+    """
+    vel_mtx = _compute_ring_vel_mtx(vectors, ny, symmetry)
+    _add_trailing_vel_mtx(vel_mtx, _compute_trailing_vortices(vectors, alpha), ny, symmetry)
+    return vel_mtx
+
+def _compute_ring_vel_mtx(vectors, ny, symmetry):
+    """
+    Compute the influence of the vortex rings on a single surface's vel_mtx.
+    This is the bulk of the work, and it does not depend on alpha since
+    only the trailing filaments are aligned with the freestream.
+    """
+    # Here, we loop through each of the vectors and compute the AIC
+    # terms from the four filaments that make up a ring around a single
+    # panel. Thus, we are using vortex rings to construct the AIC
+    # matrix. Later, we will convert these to horseshoe vortices
+    # to compute the panel forces.
+
+    # front vortex
+    r1 = vectors[:, 0:-1, 1:  , :]
+    r2 = vectors[:, 0:-1, 0:-1, :]
+    result1 = _compute_finite_vortex(r1, r2)
+
+    # right vortex
+    r1 = vectors[:, 0:-1, 0:-1, :]
+    r2 = vectors[:, 1:  , 0:-1, :]
+    result2 = _compute_finite_vortex(r1, r2)
+
+    # rear vortex
+    r1 = vectors[:, 1:  , 0:-1, :]
+    r2 = vectors[:, 1:  , 1:  , :]
+    result3 = _compute_finite_vortex(r1, r2)
+
+    # left vortex
+    r1 = vectors[:, 1:  , 1:  , :]
+    r2 = vectors[:, 0:-1, 1:  , :]
+    result4 = _compute_finite_vortex(r1, r2)
+
+    return sum(_fold_vel_mtx(result, ny, symmetry) for result in (result1, result2, result3, result4))
+
+def _compute_trailing_vortices(vectors, alpha):
+    """
+    Compute the influences of the trailing filaments behind the last row
+    of vortex rings, before they are folded and added to vel_mtx.
+    """
+    u = _get_freestream_direction(alpha)
+
+    r1 = vectors[:, -1:, 1:  , :]
+    r2 = vectors[:, -1:, 0:-1, :]
+    trailing1 = _compute_finite_vortex(r1, r2)
+    trailing2 = _compute_semi_infinite_vortex(u, r1)
+    trailing3 = _compute_semi_infinite_vortex(u, r2)
+
+    return trailing1, trailing2, trailing3
+
+def _compute_vel_mtx_derivs(vectors, alpha, nx, ny, symmetry):
+    """
+    Compute a single surface's vel_mtx along with the nonzero entries of its
+    Jacobian with respect to the vectors array, ordered to match the rows
+    and cols from `_get_vel_mtx_sparsity`, and its derivatives with respect
+    to alpha, which are only nonzero in the last row of vortex rings.
 
-    return (num_deriv * den - num * den_deriv) / den ** 2 / 4 / np.pi
+    Each vortex filament is only evaluated once, using the fused kernels that
+    give the filament influence and its derivatives wrt both ends together.
+    """
+    num_eval_points = vectors.shape[0]
+
+    u = _get_freestream_direction(alpha)
+    u_deriv = _get_freestream_direction_deriv(alpha)
+
+    # front vortex
+    r1 = vectors[:, 0:-1, 1:  , :]
+    r2 = vectors[:, 0:-1, 0:-1, :]
+    result1, front_d1, front_d2 = _compute_finite_vortex_derivs(r1, r2)
+
+    # right vortex
+    r1 = vectors[:, 0:-1, 0:-1, :]
+    r2 = vectors[:, 1:  , 0:-1, :]
+    result2, right_d1, right_d2 = _compute_finite_vortex_derivs(r1, r2)
+
+    # rear vortex
+    r1 = vectors[:, 1:  , 0:-1, :]
+    r2 = vectors[:, 1:  , 1:  , :]
+    result3, rear_d1, rear_d2 = _compute_finite_vortex_derivs(r1, r2)
+
+    # left vortex
+    r1 = vectors[:, 1:  , 1:  , :]
+    r2 = vectors[:, 0:-1, 1:  , :]
+    result4, left_d1, left_d2 = _compute_finite_vortex_derivs(r1, r2)
+
+    # ----------------- last row -----------------
+
+    r1 = vectors[:, -1:, 1:  , :]
+    r2 = vectors[:, -1:, 0:-1, :]
+    trailing1, trailing_d1, trailing_d2 = _compute_finite_vortex_derivs(r1, r2)
+    trailing2, trailing_d3, trailing_alpha2 = _compute_semi_infinite_vortex_derivs(u, r1, u_deriv)
+    trailing3, trailing_d4, trailing_alpha3 = _compute_semi_infinite_vortex_derivs(u, r2, u_deriv)
+
+    vel_mtx = _assemble_vel_mtx((result1, result2, result3, result4),
+        (trailing1, trailing2, trailing3), ny, symmetry)
+
+    # Only the semi-infinite legs follow the freestream
+    alpha_derivs = (_fold_vel_mtx(trailing_alpha3, ny, symmetry)
+        - _fold_vel_mtx(trailing_alpha2, ny, symmetry)).flatten()
+
+    # Now we scatter the filament derivatives into the four blocks of the
+    # Jacobian, one per corner of the vortex rings.
+    if symmetry:
+
+        derivs0 = np.zeros((num_eval_points, nx - 1, 2*(ny - 1) - 1, 3, 3), dtype=vel_mtx.dtype)
+        derivs1 = np.zeros((num_eval_points, nx - 1, 2*(ny - 1) - 1, 3, 3), dtype=vel_mtx.dtype)
+        derivs2 = np.zeros((num_eval_points, nx - 1, 2*(ny - 1), 3, 3), dtype=vel_mtx.dtype)
+        derivs3 = np.zeros((num_eval_points, nx - 1, 2*(ny - 1), 3, 3), dtype=vel_mtx.dtype)
+
+        # front vortex
+        d1, d2 = front_d1, front_d2
+        derivs2[:, :, :ny-1, :, :] += d1[:, :, :ny-1, :, :]
+        derivs0[:, :, :ny-1, :, :] += d2[:, :, :ny-1, :, :]
+        derivs2[:, :, ny-1:, :, :] += d1[:, :, ny-1:, :, :]
+        derivs0[:, :, ny-1:, :, :] += d2[:, :, ny:, :, :]
+
+        # Formerly duplicated location
+        derivs2[:, :, ny-2, :, :] += d2[:, :, ny-1, :, :]
+
+        # right vortex
+        d1, d2 = right_d1, right_d2
+        derivs0[:, :, :ny-1, :, :] += d1[:, :, :ny-1, :, :]
+        derivs1[:, :, :ny-1, :, :] += d2[:, :, :ny-1, :, :]
+        derivs0[:, :, ny-1:, :, :] += d1[:, :, ny:, :, :]
+        derivs1[:, :, ny-1:, :] += d2[:, :, ny:, :, :]
+
+        # Formerly duplicated location
+        derivs2[:, :, ny-2, :, :] += d1[:, :, ny-1, :, :]
+        derivs3[:, :, ny-2, :, :] += d2[:, :, ny-1, :, :]
+
+        # rear vortex
+        d1, d2 = rear_d1, rear_d2
+        derivs1[:, :, :ny-1, :, :] += d1[:, :, :ny-1, :, :]
+        derivs3[:, :, :ny-1, :, :] += d2[:, :, :ny-1, :, :]
+        derivs1[:, :, ny-1:, :] += d1[:, :, ny:, :, :]
+        derivs3[:, :, ny-1:, :] += d2[:, :, ny-1:, :, :]
+
+        # Formerly duplicated location
+        derivs3[:, :, ny-2, :, :] += d1[:, :, ny-1, :, :]
+
+        # left vortex
+        d1, d2 = left_d1, left_d2
+        derivs3[:, :, :ny-1, :, :] += d1[:, :, :ny-1, :, :]
+        derivs2[:, :, :ny-1, :, :] += d2[:, :, :ny-1, :, :]
+        derivs3[:, :, ny-1:, :] += d1[:, :, ny-1:, :, :]
+        derivs2[:, :, ny-1:, :] += d2[:, :, ny-1:, :, :]
+
+        #----------------- last row -----------------
+
+        d1, d2, d3, d4 = trailing_d1, trailing_d2, trailing_d3, trailing_d4
+        derivs3[:, -1:, :ny-1, :] += d1[:, :, :ny-1, :, :]
+        derivs1[:, -1:, :ny-1, :] += d2[:, :, :ny-1, :, :]
+        derivs3[:, -1:, :ny-1, :] -= d3[:, :, :ny-1, :, :]
+        derivs1[:, -1:, :ny-1, :] += d4[:, :, :ny-1, :, :]
+        derivs3[:, -1:, ny-1:, :] += d1[:, :, ny-1:, :, :]
+        derivs1[:, -1:, ny-1:, :] += d2[:, :, ny:, :, :]
+        derivs3[:, -1:, ny-1:, :] -= d3[:, :, ny-1:, :, :]
+        derivs1[:, -1:, ny-1:, :] += d4[:, :, ny:, :, :]
+
+        # Formerly duplicated location
+        derivs3[:, -1:, ny-2, :, :] += d2[:, :, ny-1, :, :]
+        derivs3[:, -1:, ny-2, :, :] += d4[:, :, ny-1, :, :]
+
+        derivs = np.concatenate([
+            derivs0.flatten(),
+            derivs1.flatten(),
+            derivs2.flatten(),
+            derivs3.flatten(),
+        ])
+
+    else:
+        derivs = np.zeros((4, num_eval_points, nx - 1, ny - 1, 3, 3), dtype=vel_mtx.dtype)
+
+        # front vortex
+        derivs[2, :, :, :, :] += front_d1
+        derivs[0, :, :, :, :] += front_d2
+
+        # right vortex
+        derivs[0, :, :, :, :] += right_d1
+        derivs[1, :, :, :, :] += right_d2
+
+        # rear vortex
+        derivs[1, :, :, :, :] += rear_d1
+        derivs[3, :, :, :, :] += rear_d2
+
+        # left vortex
+        derivs[3, :, :, :, :] += left_d1
+        derivs[2, :, :, :, :] += left_d2
+
+        # ----------------- last row -----------------
+
+        derivs[3, :, -1:, :, :] += trailing_d1
+        derivs[1, :, -1:, :, :] += trailing_d2
+        derivs[3, :, -1:, :, :] -= trailing_d3
+        derivs[1, :, -1:, :, :] += trailing_d4
+
+        derivs = derivs.flatten()
+
+    return vel_mtx, derivs, alpha_derivs
+
+
+def _get_vel_mtx_alpha_rows(nx, ny, num_eval_points):
+    """
+    Get the rows of the nonzero entries of a single surface's vel_mtx
+    Jacobian with respect to alpha, which are those of the last row of
+    vortex rings.
+    """
+    vel_mtx_indices = np.arange(num_eval_points * (nx - 1) * (ny - 1) * 3).reshape(
+        (num_eval_points, nx - 1, ny - 1, 3))
+    return vel_mtx_indices[:, -1, :, :].flatten()
+
+def _get_ring_corners(vortex_mesh, i, j):
+    """
+    Get the four corners of the vortex rings with the given front left
+    corners, as an array of shape (num_rings, 2, 2, 3).
+    """
+    return np.stack([
+        np.stack([vortex_mesh[i, j], vortex_mesh[i, j + 1]], axis=1),
+        np.stack([vortex_mesh[i + 1, j], vortex_mesh[i + 1, j + 1]], axis=1),
+    ], axis=1)
+
+def _compute_ring_influences(points, corners, trailing, alpha):
+    """
+    Compute the velocities induced at the points by unit circulations around
+    the vortex rings with the given corners, including the trailing
+    filaments of the rings in the last row.
+    """
+    num_points = len(points)
+    num_rings = len(corners)
+
+    # Each ring is treated as a single-panel surface, which is evaluated
+    # with the same kernels as the full vel_mtx
+    vectors = points[:, np.newaxis, np.newaxis, np.newaxis, :] - corners[np.newaxis]
+
+    vel = np.zeros((num_points, num_rings, 3),
+        dtype=np.result_type(vectors.dtype, np.asarray(alpha).dtype))
+    vel[:, ~trailing] = _compute_ring_vel_mtx(
+        vectors[:, ~trailing].reshape((-1, 2, 2, 3)), 2, False).reshape((num_points, -1, 3))
+    vel[:, trailing] = _compute_vel_mtx(
+        vectors[:, trailing].reshape((-1, 2, 2, 3)), alpha, 2, 2, False).reshape((num_points, -1, 3))
+
+    return vel
+
+
+class AICBlocks(object):
+    """
+    Evaluate blocks of the AIC matrix assembled by `VLMMtxRHSComp` straight
+    from the vortex meshes, without computing the vectors arrays, vel_mtx,
+    or the rest of the matrix.
+
+    Each column of the AIC matrix is the normal velocity induced at the
+    collocation points by the vortex ring of one panel, plus the ring of
+    its "ghost" panel if the surface is symmetric and the trailing
+    filaments if the panel is in the last row. Evaluating a block therefore
+    only costs one filament evaluation per ring, entry, and filament. This
+    lets `HMatrix` compress the AIC matrix in O(n log n) memory by only
+    sampling its near-field blocks and the rows and columns that ACA
+    pivots on.
+
+    Parameters
+    ----------
+    surfaces : list
+        The lifting surfaces, in the order of the AIC matrix.
+    vortex_meshes : list of numpy arrays
+        The vortex mesh of each surface, as computed by `VortexMesh`, which
+        includes the "ghost" surface if the surface is symmetric.
+    coll_pts[system_size, 3] : numpy array
+        The collocation points of all the panels.
+    normals[system_size, 3] : numpy array
+        The normal vectors of all the panels.
+    alpha : float
+        The angle of attack in degrees.
+    """
+
+    def __init__(self, surfaces, vortex_meshes, coll_pts, normals, alpha):
+        self.coll_pts = coll_pts
+        self.normals = normals
+        self.alpha = alpha
+
+        # Corners of the vortex ring of each panel, followed by those of the
+        # ghost panels, and whether each ring has trailing filaments
+        corners = []
+        ghost_corners = []
+        trailing = []
+        ghost_trailing = []
+
+        # Index of the ghost ring of each panel, or -1 if there is none
+        ghost_rings = []
+
+        system_size = len(coll_pts)
+        num_ghosts = 0
+
+        for surface, vortex_mesh in zip(surfaces, vortex_meshes):
+            nx = surface['mesh'].shape[0]
+            ny = surface['mesh'].shape[1]
+
+            # Indices of the chordwise and spanwise mesh points at the
+            # front left corner of each panel, in the order of the AIC matrix
+            i, j = np.meshgrid(np.arange(nx - 1), np.arange(ny - 1), indexing='ij')
+            i = i.flatten()
+            j = j.flatten()
+            is_last_row = i == nx - 2
+
+            corners.append(_get_ring_corners(vortex_mesh, i, j))
+            trailing.append(is_last_row)
+
+            if surface['symmetry']:
+                # The ghost panels are folded onto the actual ones in reverse
+                ghost_corners.append(_get_ring_corners(vortex_mesh, i, 2 * ny - 3 - j))
+                ghost_trailing.append(is_last_row)
+                ghost_rings.append(system_size + num_ghosts + np.arange(len(i)))
+                num_ghosts += len(i)
+            else:
+                ghost_rings.append(-np.ones(len(i), int))
+
+        self.corners = np.concatenate(corners + ghost_corners)
+        self.trailing = np.concatenate(trailing + ghost_trailing)
+        self.ghost_rings = np.concatenate(ghost_rings)
+
+    def __call__(self, rows, cols):
+        """
+        Get the block of the AIC matrix with the given row and col indices.
+        """
+        has_ghost = self.ghost_rings[cols] >= 0
+        rings = np.concatenate([cols, self.ghost_rings[cols][has_ghost]])
+
+        vel = _compute_ring_influences(self.coll_pts[rows], self.corners[rings],
+            self.trailing[rings], self.alpha)
+
+        # Fold the ghost rings onto their panels
+        vel_cols = vel[:, :len(cols)]
+        vel_cols[:, has_ghost] += vel[:, len(cols):]
+
+        return np.einsum('ijk,ik->ij', vel_cols, self.normals[rows])
 
 
 class EvalVelMtx(ExplicitComponent):
@@ -144,12 +611,31 @@ class EvalVelMtx(ExplicitComponent):
         This has some sparsity pattern, but it is more dense than the FEM matrix
         and the entries have a wide range of magnitudes. One exists for each
         combination of surface name and evaluation points name.
+
+    If `cache_partials` is True, `compute` evaluates the filament influences
+    and their derivatives together and caches the derivatives, which
+    `compute_partials` then reuses as long as the inputs have not changed.
+    This suits Newton solvers and optimizers, which linearize at every point
+    they evaluate, but wastes work for solvers that call `compute` many times
+    between linearizations, such as NonlinearBlockGS.
+
+    Otherwise, if `cache_rings` is True, `compute` caches the part of
+    vel_mtx due to the vortex rings, which only depends on the vectors. Only
+    the trailing filaments follow the freestream, so sweeping alpha over a
+    fixed geometry (e.g. for a drag polar) only recomputes the last row of
+    each vel_mtx. The cache costs a fingerprint of the vectors at each
+    compute and a copy of each vel_mtx, so it is off by default; when the
+    geometry changes between computes, as in an optimization or an
+    aerostructural analysis, it never hits. The `ring_cache_hits` and
+    `ring_cache_misses` attributes count its hits and misses per surface.
     """
 
     def initialize(self):
         self.options.declare('surfaces', types=list)
         self.options.declare('eval_name', types=str)
         self.options.declare('num_eval_points', types=int)
+        self.options.declare('cache_partials', default=False, types=bool)
+        self.options.declare('cache_rings', default=False, types=bool)
 
     def setup(self):
         surfaces = self.options['surfaces']
@@ -169,172 +655,88 @@ class EvalVelMtx(ExplicitComponent):
             vectors_name = '{}_{}_vectors'.format(name, eval_name)
             vel_mtx_name = '{}_{}_vel_mtx'.format(name, eval_name)
 
-            # Here we set up the rows and cols for the sparse Jacobians.
-
-            # The logic differs if the surface is symmetric or not, due to the
-            # existence of the "ghost" surface; the reflection of the actual.
+            # The size of the vectors differs if the surface is symmetric or
+            # not, due to the existence of the "ghost" surface; the
+            # reflection of the actual.
             if surface['symmetry']:
                 self.add_input(vectors_name, shape=(num_eval_points, nx, 2*ny-1, 3), units='m')
-
-                # Get an array of indices representing the number of entries
-                # in the vectors array.
-                vectors_indices = np.arange(num_eval_points * nx * (2*ny-1) * 3).reshape(
-                    (num_eval_points, nx, (2*ny-1), 3))
-
-                # Set up blocks to mannipulate into rows for the sparse indices
-                base = np.tile(np.repeat(np.arange(3), 3), ny-1)
-                block1 = base + np.repeat(3*np.arange(ny-1), 9)
-                block2 = base + np.flip(np.repeat(3*np.arange(ny-1), 9), axis=0)
-                block3 = np.concatenate([block1, block2])
-                block4 = np.tile(block3, nx-1)
-                block5 = block4 + np.repeat(3*(ny-1)*np.arange(nx-1), len(block3))
-                block6 = np.tile(block5, num_eval_points)
-                row = block6 + np.repeat(3*(ny-1)*(nx-1)*np.arange(num_eval_points), len(block5))
-
-                rows = np.tile(row, 4)
-
-                # Create the columns for each of the tiled out rows based on the
-                # previously-assembled vectors_indices.
-                cols = np.concatenate([
-                    np.einsum('ijkm,l->ijklm', vectors_indices[:, 0:-1, 0:-1, :], np.ones(3, int)).flatten(),
-                    np.einsum('ijkm,l->ijklm', vectors_indices[:, 1:  , 0:-1, :], np.ones(3, int)).flatten(),
-                    np.einsum('ijkm,l->ijklm', vectors_indices[:, 0:-1, 1:  , :], np.ones(3, int)).flatten(),
-                    np.einsum('ijkm,l->ijklm', vectors_indices[:, 1:  , 1:  , :], np.ones(3, int)).flatten(),
-                ])
-
-                # Layout logic includes some duplicate entries due to symmetry. Find and remove them.
-                nn = len(rows) // 2
-
-                # Determine the repeated indices and store them in an array
-                inds = np.arange(nn).reshape((-1, 9))
-                to_remove = inds[(ny-1)::2*(ny-1)].flatten()
-
-                # Actually remove the duplicate entries
-                rows = np.delete(rows, to_remove)
-                cols = np.delete(cols, to_remove)
-
-            # In the nonsymmetric case, the derivative sparsity patterns are
-            # much more straightforward.
             else:
                 self.add_input(vectors_name, shape=(num_eval_points, nx, ny, 3), units='m')
 
-                vectors_indices = np.arange(num_eval_points * nx * ny * 3).reshape(
-                    (num_eval_points, nx, ny, 3))
-                vel_mtx_indices = np.arange(num_eval_points * (nx - 1) * (ny - 1) * 3).reshape(
-                    (num_eval_points, nx - 1, ny - 1, 3))
-
-                rows = np.tile(np.einsum('ijkl,m->ijklm', vel_mtx_indices, np.ones(3, int)).flatten(), 4)
-
-                cols = np.concatenate([
-                    np.einsum('ijkm,l->ijklm', vectors_indices[:, 0:-1, 0:-1, :], np.ones(3, int)).flatten(),
-                    np.einsum('ijkm,l->ijklm', vectors_indices[:, 1:  , 0:-1, :], np.ones(3, int)).flatten(),
-                    np.einsum('ijkm,l->ijklm', vectors_indices[:, 0:-1, 1:  , :], np.ones(3, int)).flatten(),
-                    np.einsum('ijkm,l->ijklm', vectors_indices[:, 1:  , 1:  , :], np.ones(3, int)).flatten(),
-                ])
-
             self.add_output(vel_mtx_name, shape=(num_eval_points, nx - 1, ny - 1, 3), units='1/m')
 
+            # Here we set up the rows and cols for the sparse Jacobians.
+            symmetry = surface['symmetry']
+            rows, cols = sparsity_cache.get(self, (nx, ny, symmetry, num_eval_points),
+                lambda: _get_vel_mtx_sparsity(nx, ny, num_eval_points, symmetry))
+
             self.declare_partials(vel_mtx_name, vectors_name, rows=rows, cols=cols)
 
-            # It's worth the cs cost here because alpha is just a scalar
-            self.declare_partials(vel_mtx_name, 'alpha', method='cs')
+            alpha_rows = _get_vel_mtx_alpha_rows(nx, ny, num_eval_points)
+            self.declare_partials(vel_mtx_name, 'alpha',
+                rows=alpha_rows, cols=np.zeros(len(alpha_rows), int))
 
             self.set_check_partial_options(wrt='*', method='cs')
 
+        # Cached partials for each surface, stored as (fingerprint, derivs,
+        # alpha_derivs)
+        self.derivs_cache = {}
+
+        # Cached vortex ring part of vel_mtx for each surface, stored as
+        # (fingerprint, vel_mtx), and the number of computes of each surface
+        # that reused or recomputed it
+        self.ring_cache = {}
+        self.ring_cache_hits = 0
+        self.ring_cache_misses = 0
+
     def compute(self, inputs, outputs):
         surfaces = self.options['surfaces']
         eval_name = self.options['eval_name']
-        num_eval_points = self.options['num_eval_points']
+
+        alpha = inputs['alpha'][0]
 
         for surface in surfaces:
             nx = surface['mesh'].shape[0]
             ny = surface['mesh'].shape[1]
             name = surface['name']
 
-            alpha = inputs['alpha'][0]
-            cosa = np.cos(alpha * np.pi / 180.)
-            sina = np.sin(alpha * np.pi / 180.)
-
-            if surface['symmetry']:
-                u = np.einsum('ijk,l->ijkl',
-                    np.ones((num_eval_points, 1, 2*(ny - 1))),
-                    np.array([cosa, 0, sina]))
-            else:
-                u = np.einsum('ijk,l->ijkl',
-                    np.ones((num_eval_points, 1, ny - 1)),
-                    np.array([cosa, 0, sina]))
-
             vectors_name = '{}_{}_vectors'.format(name, eval_name)
             vel_mtx_name = '{}_{}_vel_mtx'.format(name, eval_name)
 
-            outputs[vel_mtx_name] = 0.
-
-            # Here, we loop through each of the vectors and compute the AIC
-            # terms from the four filaments that make up a ring around a single
-            # panel. Thus, we are using vortex rings to construct the AIC
-            # matrix. Later, we will convert these to horseshoe vortices
-            # to compute the panel forces.
-
-            # front vortex
-            r1 = inputs[vectors_name][:, 0:-1, 1:  , :]
-            r2 = inputs[vectors_name][:, 0:-1, 0:-1, :]
-            result1 = _compute_finite_vortex(r1, r2)
-
-            # right vortex
-            r1 = inputs[vectors_name][:, 0:-1, 0:-1, :]
-            r2 = inputs[vectors_name][:, 1:  , 0:-1, :]
-            result2 = _compute_finite_vortex(r1, r2)
-
-            # rear vortex
-            r1 = inputs[vectors_name][:, 1:  , 0:-1, :]
-            r2 = inputs[vectors_name][:, 1:  , 1:  , :]
-            result3 = _compute_finite_vortex(r1, r2)
-
-            # left vortex
-            r1 = inputs[vectors_name][:, 1:  , 1:  , :]
-            r2 = inputs[vectors_name][:, 0:-1, 1:  , :]
-            result4 = _compute_finite_vortex(r1, r2)
-
-            # If the surface is symmetric, mirror the results and add them
-            # to the vel_mtx.
-            if surface['symmetry']:
-                res1 = result1[:, :, :ny-1, :]
-                res1 += result1[:, :, ny-1:, :][:, :, ::-1, :]
-                res2 = result2[:, :, :ny-1, :]
-                res2 += result2[:, :, ny-1:, :][:, :, ::-1, :]
-                res3 = result3[:, :, :ny-1, :]
-                res3 += result3[:, :, ny-1:, :][:, :, ::-1, :]
-                res4 = result4[:, :, :ny-1, :]
-                res4 += result4[:, :, ny-1:, :][:, :, ::-1, :]
-                outputs[vel_mtx_name] += res1 + res2 + res3 + res4
+            vectors = inputs[vectors_name]
+
+            # We don't cache anything computed while complex stepping
+            caching = not np.iscomplexobj(vectors)
+
+            if caching and self.options['cache_partials']:
+                outputs[vel_mtx_name], derivs, alpha_derivs = _compute_vel_mtx_derivs(vectors,
+                    alpha, nx, ny, surface['symmetry'])
+                self.derivs_cache[name] = (array_fingerprint(vectors, alpha), derivs,
+                    alpha_derivs)
+            elif caching and self.options['cache_rings']:
+                # The vortex rings do not depend on alpha, so only the
+                # trailing filaments are recomputed when only alpha changes.
+                fingerprint = array_fingerprint(vectors)
+                if name in self.ring_cache and self.ring_cache[name][0] == fingerprint:
+                    self.ring_cache_hits += 1
+                else:
+                    self.ring_cache_misses += 1
+                    self.ring_cache[name] = (fingerprint,
+                        _compute_ring_vel_mtx(vectors, ny, surface['symmetry']))
+
+                vel_mtx = self.ring_cache[name][1].copy()
+                _add_trailing_vel_mtx(vel_mtx, _compute_trailing_vortices(vectors, alpha),
+                    ny, surface['symmetry'])
+                outputs[vel_mtx_name] = vel_mtx
             else:
-                outputs[vel_mtx_name] += result1 + result2 + result3 + result4
-
-            # ----------------- last row -----------------
-
-            r1 = inputs[vectors_name][:, -1:, 1:  , :]
-            r2 = inputs[vectors_name][:, -1:, 0:-1, :]
-            result1 = _compute_finite_vortex(r1, r2)
-            result2 = _compute_semi_infinite_vortex(u, r1)
-            result3 = _compute_semi_infinite_vortex(u, r2)
-
-            if surface['symmetry']:
-                res1 = result1[:, :, :ny-1, :]
-                res1 += result1[:, :, ny-1:, :][:, :, ::-1, :]
-                res2 = result2[:, :, :ny-1, :]
-                res2 += result2[:, :, ny-1:, :][:, :, ::-1, :]
-                res3 = result3[:, :, :ny-1, :]
-                res3 += result3[:, :, ny-1:, :][:, :, ::-1, :]
-                outputs[vel_mtx_name][:, -1:, :, :] += res1 - res2 + res3
-            else:
-                outputs[vel_mtx_name][:, -1:, :, :] += result1
-                outputs[vel_mtx_name][:, -1:, :, :] -= result2
-                outputs[vel_mtx_name][:, -1:, :, :] += result3
+                outputs[vel_mtx_name] = _compute_vel_mtx(vectors,
+                    alpha, nx, ny, surface['symmetry'])
 
     def compute_partials(self, inputs, partials):
         surfaces = self.options['surfaces']
         eval_name = self.options['eval_name']
-        num_eval_points = self.options['num_eval_points']
+
+        alpha = inputs['alpha'][0]
 
         for surface in surfaces:
             nx = surface['mesh'].shape[0]
@@ -344,151 +746,16 @@ class EvalVelMtx(ExplicitComponent):
             vectors_name = '{}_{}_vectors'.format(name, eval_name)
             vel_mtx_name = '{}_{}_vel_mtx'.format(name, eval_name)
 
-            alpha = inputs['alpha'][0]
-            cosa = np.cos(alpha * np.pi / 180.)
-            sina = np.sin(alpha * np.pi / 180.)
+            vectors = inputs[vectors_name]
 
-            if surface['symmetry']:
-
-                u = np.einsum('ijk,l->ijkl',
-                    np.ones((num_eval_points, 1, 2*(ny - 1))),
-                    np.array([cosa, 0, sina]))
-
-                deriv_array = np.einsum('...,ij->...ij',
-                    np.ones((num_eval_points, nx - 1, 2*(ny - 1))),
-                    np.eye(3))
-                trailing_array = np.einsum('...,ij->...ij',
-                    np.ones((num_eval_points, 1, 2*(ny - 1))),
-                    np.eye(3))
-
-                derivs0 = np.zeros((num_eval_points, nx - 1, 2*(ny - 1) - 1, 3, 3))
-                derivs1 = np.zeros((num_eval_points, nx - 1, 2*(ny - 1) - 1, 3, 3))
-                derivs2 = np.zeros((num_eval_points, nx - 1, 2*(ny - 1), 3, 3))
-                derivs3 = np.zeros((num_eval_points, nx - 1, 2*(ny - 1), 3, 3))
-
-                # front vortex
-                r1 = inputs[vectors_name][:, 0:-1, 1:  , :]
-                r2 = inputs[vectors_name][:, 0:-1, 0:-1, :]
-                d1 = _compute_finite_vortex_deriv1(r1, r2, deriv_array)
-                d2 = _compute_finite_vortex_deriv2(r1, r2, deriv_array)
-                derivs2[:, :, :ny-1, :, :] += d1[:, :, :ny-1, :, :]
-                derivs0[:, :, :ny-1, :, :] += d2[:, :, :ny-1, :, :]
-                derivs2[:, :, ny-1:, :, :] += d1[:, :, ny-1:, :, :]
-                derivs0[:, :, ny-1:, :, :] += d2[:, :, ny:, :, :]
-
-                # Formerly duplicated location
-                derivs2[:, :, ny-2, :, :] += d2[:, :, ny-1, :, :]
-
-                # right vortex
-                r1 = inputs[vectors_name][:, 0:-1, 0:-1, :]
-                r2 = inputs[vectors_name][:, 1:  , 0:-1, :]
-                d1 = _compute_finite_vortex_deriv1(r1, r2, deriv_array)
-                d2 = _compute_finite_vortex_deriv2(r1, r2, deriv_array)
-                derivs0[:, :, :ny-1, :, :] += d1[:, :, :ny-1, :, :]
-                derivs1[:, :, :ny-1, :, :] += d2[:, :, :ny-1, :, :]
-                derivs0[:, :, ny-1:, :, :] += d1[:, :, ny:, :, :]
-                derivs1[:, :, ny-1:, :] += d2[:, :, ny:, :, :]
-
-                # Formerly duplicated location
-                derivs2[:, :, ny-2, :, :] += d1[:, :, ny-1, :, :]
-                derivs3[:, :, ny-2, :, :] += d2[:, :, ny-1, :, :]
-
-                # rear vortex
-                r1 = inputs[vectors_name][:, 1:  , 0:-1, :]
-                r2 = inputs[vectors_name][:, 1:  , 1:  , :]
-                d1 = _compute_finite_vortex_deriv1(r1, r2, deriv_array)
-                d2 = _compute_finite_vortex_deriv2(r1, r2, deriv_array)
-                derivs1[:, :, :ny-1, :, :] += d1[:, :, :ny-1, :, :]
-                derivs3[:, :, :ny-1, :, :] += d2[:, :, :ny-1, :, :]
-                derivs1[:, :, ny-1:, :] += d1[:, :, ny:, :, :]
-                derivs3[:, :, ny-1:, :] += d2[:, :, ny-1:, :, :]
-
-                # Formerly duplicated location
-                derivs3[:, :, ny-2, :, :] += d1[:, :, ny-1, :, :]
-
-                # left vortex
-                r1 = inputs[vectors_name][:, 1:  , 1:  , :]
-                r2 = inputs[vectors_name][:, 0:-1, 1:  , :]
-                d1 = _compute_finite_vortex_deriv1(r1, r2, deriv_array)
-                d2 = _compute_finite_vortex_deriv2(r1, r2, deriv_array)
-                derivs3[:, :, :ny-1, :, :] += d1[:, :, :ny-1, :, :]
-                derivs2[:, :, :ny-1, :, :] += d2[:, :, :ny-1, :, :]
-                derivs3[:, :, ny-1:, :] += d1[:, :, ny-1:, :, :]
-                derivs2[:, :, ny-1:, :] += d2[:, :, ny-1:, :, :]
-
-                #----------------- last row -----------------
-
-                r1 = inputs[vectors_name][:, -1:, 1:  , :]
-                r2 = inputs[vectors_name][:, -1:, 0:-1, :]
-                d1 = _compute_finite_vortex_deriv1(r1, r2, trailing_array)
-                d2 = _compute_finite_vortex_deriv2(r1, r2, trailing_array)
-                d3 = _compute_semi_infinite_vortex_deriv(u, r1, trailing_array)
-                d4 = _compute_semi_infinite_vortex_deriv(u, r2, trailing_array)
-                derivs3[:, -1:, :ny-1, :] += d1[:, :, :ny-1, :, :]
-                derivs1[:, -1:, :ny-1, :] += d2[:, :, :ny-1, :, :]
-                derivs3[:, -1:, :ny-1, :] -= d3[:, :, :ny-1, :, :]
-                derivs1[:, -1:, :ny-1, :] += d4[:, :, :ny-1, :, :]
-                derivs3[:, -1:, ny-1:, :] += d1[:, :, ny-1:, :, :]
-                derivs1[:, -1:, ny-1:, :] += d2[:, :, ny:, :, :]
-                derivs3[:, -1:, ny-1:, :] -= d3[:, :, ny-1:, :, :]
-                derivs1[:, -1:, ny-1:, :] += d4[:, :, ny:, :, :]
-
-                # Formerly duplicated location
-                derivs3[:, -1:, ny-2, :, :] += d2[:, :, ny-1, :, :]
-                derivs3[:, -1:, ny-2, :, :] += d4[:, :, ny-1, :, :]
-
-                partials[vel_mtx_name, vectors_name] = np.concatenate([
-                    derivs0.flatten(),
-                    derivs1.flatten(),
-                    derivs2.flatten(),
-                    derivs3.flatten(),
-                ])
+            # Reuse the partials from the last compute if they were cached
+            # at the same inputs.
+            if name in self.derivs_cache:
+                fingerprint, derivs, alpha_derivs = self.derivs_cache.pop(name)
+                if fingerprint == array_fingerprint(vectors, alpha):
+                    partials[vel_mtx_name, vectors_name] = derivs
+                    partials[vel_mtx_name, 'alpha'] = alpha_derivs
+                    continue
 
-            else:
-                u = np.einsum('ijk,l->ijkl',
-                    np.ones((num_eval_points, 1, ny - 1)),
-                    np.array([cosa, 0, sina]))
-
-                deriv_array = np.einsum('...,ij->...ij',
-                    np.ones((num_eval_points, nx - 1, ny - 1)),
-                    np.eye(3))
-                trailing_array = np.einsum('...,ij->...ij',
-                    np.ones((num_eval_points, 1, ny - 1)),
-                    np.eye(3))
-
-                derivs = np.zeros((4, num_eval_points, nx - 1, ny - 1, 3, 3))
-
-                # front vortex
-                r1 = inputs[vectors_name][:, 0:-1, 1:  , :]
-                r2 = inputs[vectors_name][:, 0:-1, 0:-1, :]
-                derivs[2, :, :, :, :] += _compute_finite_vortex_deriv1(r1, r2, deriv_array)
-                derivs[0, :, :, :, :] += _compute_finite_vortex_deriv2(r1, r2, deriv_array)
-
-                # right vortex
-                r1 = inputs[vectors_name][:, 0:-1, 0:-1, :]
-                r2 = inputs[vectors_name][:, 1:  , 0:-1, :]
-                derivs[0, :, :, :, :] += _compute_finite_vortex_deriv1(r1, r2, deriv_array)
-                derivs[1, :, :, :, :] += _compute_finite_vortex_deriv2(r1, r2, deriv_array)
-
-                # rear vortex
-                r1 = inputs[vectors_name][:, 1:  , 0:-1, :]
-                r2 = inputs[vectors_name][:, 1:  , 1:  , :]
-                derivs[1, :, :, :, :] += _compute_finite_vortex_deriv1(r1, r2, deriv_array)
-                derivs[3, :, :, :, :] += _compute_finite_vortex_deriv2(r1, r2, deriv_array)
-
-                # left vortex
-                r1 = inputs[vectors_name][:, 1:  , 1:  , :]
-                r2 = inputs[vectors_name][:, 0:-1, 1:  , :]
-                derivs[3, :, :, :, :] += _compute_finite_vortex_deriv1(r1, r2, deriv_array)
-                derivs[2, :, :, :, :] += _compute_finite_vortex_deriv2(r1, r2, deriv_array)
-
-                # ----------------- last row -----------------
-
-                r1 = inputs[vectors_name][:, -1:, 1:  , :]
-                r2 = inputs[vectors_name][:, -1:, 0:-1, :]
-                derivs[3, :, -1:, :, :] += _compute_finite_vortex_deriv1(r1, r2, trailing_array)
-                derivs[1, :, -1:, :, :] += _compute_finite_vortex_deriv2(r1, r2, trailing_array)
-                derivs[3, :, -1:, :, :] -= _compute_semi_infinite_vortex_deriv(u, r1, trailing_array)
-                derivs[1, :, -1:, :, :] += _compute_semi_infinite_vortex_deriv(u, r2, trailing_array)
-
-                partials[vel_mtx_name, vectors_name] = derivs.flatten()
+            _, partials[vel_mtx_name, vectors_name], partials[vel_mtx_name, 'alpha'] = \
+                _compute_vel_mtx_derivs(vectors, alpha, nx, ny, surface['symmetry'])
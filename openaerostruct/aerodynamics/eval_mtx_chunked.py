@@ -0,0 +1,270 @@
+from __future__ import print_function, division
+import numpy as np
+
+from openmdao.api import ExplicitComponent
+
+from openaerostruct.aerodynamics.eval_mtx import _get_vel_mtx_sparsity, \
+    _get_vel_mtx_alpha_rows, _compute_vel_mtx, _compute_vel_mtx_derivs
+from openaerostruct.utils.caching import sparsity_cache
+
+
+class EvalVelMtxChunked(ExplicitComponent):
+    """
+    Computes the aerodynamic influence coefficient (AIC) matrix for the VLM
+    analysis directly from the vortex mesh and the evaluation points.
+
+    This is a drop-in replacement for the `GetVectors` and `EvalVelMtx` pair
+    of components. Those two components materialize the full vectors array
+    going from every vortex mesh point to every evaluation point, which is
+    then used to build several same-sized intermediate arrays for each
+    vortex filament. For fine meshes, these arrays dominate the memory used
+    by the aerodynamic analysis.
+
+    Here, we instead loop through blocks of `chunk_size` evaluation points
+    and only form the vectors and filament intermediates for one block at a
+    time, so the peak memory of the intermediate calculations is bounded by
+    the chunk size rather than by the number of evaluation points.
+    The outputs and the analytic partials are the same as those obtained from
+    `GetVectors` followed by `EvalVelMtx`.
+
+    If `eval_name` is a list of names, the vel_mtx for each of those sets of
+    evaluation points is computed in the same pass over the vortex mesh,
+    with the sets stacked into a single array of evaluation points that is
+    then split into chunks. `VLMStates` uses this to get the collocation and
+    force point AIC matrices from one component.
+
+    Parameters
+    ----------
+    alpha : float
+        The angle of attack for the aircraft (all lifting surfaces) in degrees.
+    vortex_mesh[nx, ny, 3] : numpy array
+        The actual aerodynamic mesh used in VLM calculations. For the
+        symmetric case, the second dimension is length (2 * ny - 1).
+        There is one of these arrays for each lifting surface in the problem.
+    eval_name[num_eval_points, 3] : numpy array
+        These are the evaluation points, either collocation or force points.
+
+    Returns
+    -------
+    vel_mtx[num_eval_points, nx - 1, ny - 1, 3] : numpy array
+        The AIC matrix for the all lifting surfaces representing the aircraft.
+        One exists for each combination of surface name and evaluation
+        points name.
+    """
+
+    def initialize(self):
+        self.options.declare('surfaces', types=list)
+        self.options.declare('eval_name', types=(str, list),
+            desc='Name of the evaluation points, or a list of names to compute '
+            'the vel_mtx for several sets of evaluation points in one pass')
+        self.options.declare('num_eval_points', types=int)
+        self.options.declare('chunk_size', default=100, types=int, lower=1,
+            desc='Maximum number of evaluation points processed at once')
+
+    def setup(self):
+        surfaces = self.options['surfaces']
+        eval_names = self.options['eval_name']
+        num_eval_points = self.options['num_eval_points']
+        chunk_size = self.options['chunk_size']
+
+        if isinstance(eval_names, str):
+            eval_names = [eval_names]
+        self.eval_names = eval_names
+
+        self.add_input('alpha', val=1., units='deg')
+        for eval_name in eval_names:
+            self.add_input(eval_name, val=np.zeros((num_eval_points, 3)), units='m')
+
+        # Start and end indices of each block of evaluation points, where the
+        # sets of evaluation points are stacked one after the other, so a
+        # block may span two sets.
+        num_points = len(eval_names) * num_eval_points
+        starts = np.arange(0, num_points, chunk_size)
+        ends = np.minimum(starts + chunk_size, num_points)
+        self.chunks = list(zip(starts, ends))
+
+        self.chunk_patterns = {}
+        self.chunk_splits = {}
+
+        for surface in surfaces:
+            mesh = surface['mesh']
+            nx = mesh.shape[0]
+            ny = mesh.shape[1]
+            name = surface['name']
+
+            if surface['symmetry']:
+                actual_ny_size = ny * 2 - 1
+            else:
+                actual_ny_size = ny
+
+            vortex_mesh_name = '{}_vortex_mesh'.format(name)
+
+            self.add_input(vortex_mesh_name, val=np.zeros((nx, actual_ny_size, 3)), units='m')
+
+            mesh_size = nx * actual_ny_size * 3
+            vel_size = (nx - 1) * (ny - 1) * 3
+
+            # The sparsity pattern wrt the vectors only depends on the number
+            # of evaluation points, so we get it once for each distinct chunk
+            # length (at most two) and offset it for each chunk.
+            patterns = {}
+            for num_chunk_points in set(ends - starts):
+                symmetry = surface['symmetry']
+                vec_rows, vec_cols = sparsity_cache.get(self, (nx, ny, symmetry, num_chunk_points),
+                    lambda: _get_vel_mtx_sparsity(nx, ny, num_chunk_points, symmetry))
+
+                # Since vectors = eval_points - vortex_mesh, the entries wrt
+                # the vortex mesh are the same as those wrt the vectors,
+                # while the entries wrt the evaluation points are the sums
+                # over the corners of each vortex ring.
+                mesh_cols = vec_cols % mesh_size
+                eval_keys = 3 * vec_rows + vec_cols % 3
+
+                patterns[num_chunk_points] = (vec_rows, mesh_cols, eval_keys)
+
+            self.chunk_patterns[name] = patterns
+
+            # Split the entries of each chunk between the sets of evaluation
+            # points they belong to, stored as (set index, entry indices,
+            # row offset), where the entry indices are None for chunks that
+            # lie within a single set.
+            splits = []
+            rows = [[] for eval_name in eval_names]
+            cols = [[] for eval_name in eval_names]
+            for start, end in self.chunks:
+                vec_rows, mesh_cols, eval_keys = patterns[end - start]
+
+                first_set = start // num_eval_points
+                last_set = (end - 1) // num_eval_points
+
+                chunk_splits = []
+                if first_set == last_set:
+                    chunk_splits.append((first_set, None, start - first_set * num_eval_points))
+                else:
+                    entry_sets = (start + vec_rows // vel_size) // num_eval_points
+                    for ind_set in range(first_set, last_set + 1):
+                        chunk_splits.append((ind_set, np.where(entry_sets == ind_set)[0],
+                            start - ind_set * num_eval_points))
+
+                for ind_set, entries, offset in chunk_splits:
+                    if entries is None:
+                        rows[ind_set].append(vec_rows + offset * vel_size)
+                        cols[ind_set].append(mesh_cols)
+                    else:
+                        rows[ind_set].append(vec_rows[entries] + offset * vel_size)
+                        cols[ind_set].append(mesh_cols[entries])
+
+                splits.append(chunk_splits)
+
+            self.chunk_splits[name] = splits
+
+            vel_mtx_indices = np.arange(num_eval_points * vel_size).reshape(
+                (num_eval_points, vel_size))
+            eval_indices = np.arange(num_eval_points * 3).reshape((num_eval_points, 3))
+            alpha_rows = _get_vel_mtx_alpha_rows(nx, ny, num_eval_points)
+
+            for ind_set, eval_name in enumerate(eval_names):
+                vel_mtx_name = '{}_{}_vel_mtx'.format(name, eval_name)
+
+                self.add_output(vel_mtx_name, shape=(num_eval_points, nx - 1, ny - 1, 3),
+                    units='1/m')
+
+                self.declare_partials(vel_mtx_name, vortex_mesh_name,
+                    rows=np.concatenate(rows[ind_set]), cols=np.concatenate(cols[ind_set]))
+
+                self.declare_partials(vel_mtx_name, eval_name,
+                    rows=np.einsum('ij,k->ijk', vel_mtx_indices, np.ones(3, int)).flatten(),
+                    cols=np.einsum('ik,j->ijk', eval_indices, np.ones(vel_size, int)).flatten(),
+                )
+
+                self.declare_partials(vel_mtx_name, 'alpha',
+                    rows=alpha_rows, cols=np.zeros(len(alpha_rows), int))
+
+        self.set_check_partial_options(wrt='*', method='cs')
+
+    def compute(self, inputs, outputs):
+        surfaces = self.options['surfaces']
+        eval_names = self.eval_names
+        num_eval_points = self.options['num_eval_points']
+
+        alpha = inputs['alpha'][0]
+        eval_points = np.vstack([inputs[eval_name] for eval_name in eval_names])
+
+        for surface in surfaces:
+            nx = surface['mesh'].shape[0]
+            ny = surface['mesh'].shape[1]
+            name = surface['name']
+
+            vortex_mesh = inputs['{}_vortex_mesh'.format(name)]
+            vel_mtx_names = ['{}_{}_vel_mtx'.format(name, eval_name) for eval_name in eval_names]
+
+            for (start, end), chunk_splits in zip(self.chunks, self.chunk_splits[name]):
+                vectors = eval_points[start:end, np.newaxis, np.newaxis, :] - vortex_mesh
+
+                vel_mtx = _compute_vel_mtx(vectors, alpha, nx, ny, surface['symmetry'])
+
+                for ind_set, entries, offset in chunk_splits:
+                    # The points of the chunk that lie within this set
+                    set_start = max(offset, 0)
+                    set_end = min(offset + end - start, num_eval_points)
+                    outputs[vel_mtx_names[ind_set]][set_start:set_end] = \
+                        vel_mtx[set_start - offset:set_end - offset]
+
+    def compute_partials(self, inputs, partials):
+        surfaces = self.options['surfaces']
+        eval_names = self.eval_names
+        num_eval_points = self.options['num_eval_points']
+
+        alpha = inputs['alpha'][0]
+        eval_points = np.vstack([inputs[eval_name] for eval_name in eval_names])
+
+        for surface in surfaces:
+            nx = surface['mesh'].shape[0]
+            ny = surface['mesh'].shape[1]
+            name = surface['name']
+
+            vortex_mesh_name = '{}_vortex_mesh'.format(name)
+            vortex_mesh = inputs[vortex_mesh_name]
+
+            patterns = self.chunk_patterns[name]
+            vel_size = (nx - 1) * (ny - 1) * 3
+
+            # Number of nonzero alpha derivatives per evaluation point
+            alpha_size = (ny - 1) * 3
+
+            mesh_derivs = []
+            eval_derivs = []
+            alpha_derivs = []
+            for eval_name in eval_names:
+                vel_mtx_name = '{}_{}_vel_mtx'.format(name, eval_name)
+                mesh_derivs.append(partials[vel_mtx_name, vortex_mesh_name])
+                eval_derivs.append(partials[vel_mtx_name, eval_name])
+                alpha_derivs.append(partials[vel_mtx_name, 'alpha'])
+
+            inds = np.zeros(len(eval_names), int)
+            for (start, end), chunk_splits in zip(self.chunks, self.chunk_splits[name]):
+                vec_rows, mesh_cols, eval_keys = patterns[end - start]
+
+                vectors = eval_points[start:end, np.newaxis, np.newaxis, :] - vortex_mesh
+                _, derivs, alpha_chunk_derivs = _compute_vel_mtx_derivs(vectors, alpha, nx, ny,
+                    surface['symmetry'])
+
+                eval_chunk_derivs = np.bincount(eval_keys, weights=derivs,
+                    minlength=3 * (end - start) * vel_size)
+
+                for ind_set, entries, offset in chunk_splits:
+                    set_derivs = derivs if entries is None else derivs[entries]
+
+                    ind = inds[ind_set]
+                    mesh_derivs[ind_set][ind:ind + len(set_derivs)] = -set_derivs
+                    inds[ind_set] += len(set_derivs)
+
+                    # The points of the chunk that lie within this set
+                    set_start = max(offset, 0)
+                    set_end = min(offset + end - start, num_eval_points)
+                    eval_derivs[ind_set][3 * set_start * vel_size:3 * set_end * vel_size] = \
+                        eval_chunk_derivs[3 * (set_start - offset) * vel_size:
+                                          3 * (set_end - offset) * vel_size]
+                    alpha_derivs[ind_set][set_start * alpha_size:set_end * alpha_size] = \
+                        alpha_chunk_derivs[(set_start - offset) * alpha_size:
+                                           (set_end - offset) * alpha_size]
@@ -3,6 +3,43 @@ import numpy as np
 
 from openmdao.api import ExplicitComponent
 
+from openaerostruct.utils.caching import sparsity_cache
+
+
+def _get_eval_velocities_sparsity(num_eval_points, shapes):
+    """
+    Get the rows and cols of the sparse partials of the velocities wrt the
+    circulations, followed by those wrt the vel_mtx of each surface, for
+    surfaces with meshes of the given (nx, ny) shapes.
+    """
+    system_size = sum((nx - 1) * (ny - 1) for nx, ny in shapes)
+
+    circulations_indices = np.arange(system_size)
+    velocities_indices = np.arange(num_eval_points * 3).reshape((num_eval_points, 3))
+
+    patterns = [
+        np.einsum('ik,j->ijk',
+            velocities_indices, np.ones(system_size, int)).flatten(),
+        np.einsum('ik,j->ijk',
+            np.ones((num_eval_points, 3), int), circulations_indices).flatten(),
+    ]
+
+    # For each surface we need to correctly set up the sparsity pattern
+    # based on the vel_mtx. This is pretty hairy due to the highly
+    # dimensional nature of the vel_mtx.
+    for nx, ny in shapes:
+        num = (nx - 1) * (ny - 1)
+
+        vel_mtx_indices = np.arange(num_eval_points * num * 3).reshape(
+            (num_eval_points, num, 3))
+
+        patterns.extend([
+            np.einsum('ik,j->ijk', velocities_indices, np.ones(num, int)).flatten(),
+            vel_mtx_indices.flatten(),
+        ])
+
+    return patterns
+
 
 class EvalVelocities(ExplicitComponent):
     """
@@ -67,15 +104,12 @@ class EvalVelocities(ExplicitComponent):
         self.add_output(velocities_name, shape=(num_eval_points, 3), units='m/s')
 
         # Set up indices to create the sparsity pattern for the derivatives.
-        circulations_indices = np.arange(system_size)
-        velocities_indices = np.arange(num_eval_points * 3).reshape((num_eval_points, 3))
+        shapes = tuple(surface['mesh'].shape[:2] for surface in surfaces)
+        patterns = sparsity_cache.get(self, (num_eval_points,) + shapes,
+            lambda: _get_eval_velocities_sparsity(num_eval_points, shapes))
 
         self.declare_partials(velocities_name, 'circulations',
-            rows=np.einsum('ik,j->ijk',
-                velocities_indices, np.ones(system_size, int)).flatten(),
-            cols=np.einsum('ik,j->ijk',
-                np.ones((num_eval_points, 3), int), circulations_indices).flatten(),
-        )
+            rows=patterns[0], cols=patterns[1])
 
         # These derivatives are linear and don't change so we set the val here
         self.declare_partials(velocities_name, 'freestream_velocities', val=1.,
@@ -83,34 +117,19 @@ class EvalVelocities(ExplicitComponent):
             cols=np.arange(3 * num_eval_points),
         )
 
-        # For each surface we need to correctly set up the sparsity pattern
-        # based on the vel_mtx. This is pretty hairy due to the highly
-        # dimensional nature of the vel_mtx.
-        ind_1 = 0
-        ind_2 = 0
-        for surface in surfaces:
+        for i_surf, surface in enumerate(surfaces):
             mesh = surface['mesh']
             nx = mesh.shape[0]
             ny = mesh.shape[1]
             name = surface['name']
-            num = (nx - 1) * (ny - 1)
-
-            ind_2 += num
 
             vel_mtx_name = '{}_{}_vel_mtx'.format(name, eval_name)
 
             self.add_input(vel_mtx_name,
                 shape=(num_eval_points, nx - 1, ny - 1, 3), units='1/m')
 
-            vel_mtx_indices = np.arange(num_eval_points * num * 3).reshape(
-                (num_eval_points, num, 3))
-
             self.declare_partials(velocities_name, vel_mtx_name,
-                rows=np.einsum('ik,j->ijk', velocities_indices, np.ones(num, int)).flatten(),
-                cols=vel_mtx_indices.flatten(),
-            )
-
-            ind_1 += num
+                rows=patterns[2 + 2 * i_surf], cols=patterns[3 + 2 * i_surf])
 
     def compute(self, inputs, outputs):
         surfaces = self.options['surfaces']
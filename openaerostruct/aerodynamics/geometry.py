@@ -112,9 +112,14 @@ class VLMGeometry(ExplicitComponent):
         ])
         self.declare_partials('normals', 'def_mesh', rows=rows, cols=cols)
 
-        # And here actually all parts of the mesh influence the area, so it's
-        # fully dense
-        self.declare_partials('S_ref', 'def_mesh')
+        # S_ref
+        # All parts of the mesh influence the wetted area, but the projected
+        # area does not depend on the z-coordinates of the mesh
+        cols = np.arange(nx*ny*3)
+        if surface['S_ref_type'] == 'projected':
+            cols = cols.reshape((nx*ny, 3))[:, :2].flatten()
+        self.S_ref_cols = cols
+        self.declare_partials('S_ref', 'def_mesh', rows=np.zeros(len(cols), int), cols=cols)
 
     def compute(self, inputs, outputs):
         mesh = inputs['def_mesh']
@@ -303,15 +308,17 @@ class VLMGeometry(ExplicitComponent):
         partials['normals', 'def_mesh'][3*nn:4*nn] = -dfdb_flat
 
         # At this point, same calculation for wetted and projected surface.
-        dsda_flat = 0.5*dsda.flatten()
-        dsdb_flat = 0.5*dsdb.flatten()
-        idx = np.arange((nx-1)*(ny-1)*3) + np.repeat(3*np.arange(nx-1), 3*(ny-1))
-        partials['S_ref', 'def_mesh'][:] = 0.0
-        partials['S_ref', 'def_mesh'][:, idx+3] += dsda_flat
-        partials['S_ref', 'def_mesh'][:, idx+ny*3] -= dsda_flat
-        partials['S_ref', 'def_mesh'][:, idx] += dsdb_flat
-        partials['S_ref', 'def_mesh'][:, idx+(ny+1)*3] -= dsdb_flat
+        # Each panel's area depends on its four corner points, which are
+        # accumulated on the mesh before picking out the declared entries.
+        dS_dmesh = np.zeros((nx, ny, 3), dtype=dsda.dtype)
+        dS_dmesh[:-1, 1:] += dsda
+        dS_dmesh[1:, :-1] -= dsda
+        dS_dmesh[:-1, :-1] += dsdb
+        dS_dmesh[1:, 1:] -= dsdb
+        dS_dmesh *= 0.5
 
         # Multiply the surface area by 2 if symmetric to get consistent area measures
         if self.surface['symmetry']:
-            partials['S_ref', 'def_mesh'] *= 2.0
+            dS_dmesh *= 2.0
+
+        partials['S_ref', 'def_mesh'] = dS_dmesh.flatten()[self.S_ref_cols]
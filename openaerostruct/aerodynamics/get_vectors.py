@@ -3,6 +3,27 @@ import numpy as np
 
 from openmdao.api import ExplicitComponent
 
+from openaerostruct.utils.caching import sparsity_cache
+
+
+def _get_vectors_sparsity(nx, ny, num_eval_points):
+    """
+    Get the indices of the vectors array and the corresponding indices of
+    the vortex mesh and evaluation points arrays, for a mesh with ny
+    spanwise points (including the ghost surface, if symmetric).
+    """
+    vector_indices = np.arange(num_eval_points * nx * ny * 3)
+    mesh_indices = np.outer(
+        np.ones(num_eval_points, int),
+        np.arange(nx * ny * 3),
+    ).flatten()
+    eval_indices = np.einsum('il,jk->ijkl',
+        np.arange(num_eval_points * 3).reshape((num_eval_points, 3)),
+        np.ones((nx, ny), int),
+    ).flatten()
+
+    return vector_indices, mesh_indices, eval_indices
+
 
 class GetVectors(ExplicitComponent):
     """
@@ -61,15 +82,9 @@ class GetVectors(ExplicitComponent):
             self.add_output(vectors_name, val=np.ones((num_eval_points, nx, actual_ny_size, 3)), units='m')
 
             # Set up indices so we can get the rows and cols for the delcare
-            vector_indices = np.arange(num_eval_points * nx * actual_ny_size * 3)
-            mesh_indices = np.outer(
-                np.ones(num_eval_points, int),
-                np.arange(nx * actual_ny_size * 3),
-            ).flatten()
-            eval_indices = np.einsum('il,jk->ijkl',
-                np.arange(num_eval_points * 3).reshape((num_eval_points, 3)),
-                np.ones((nx, actual_ny_size), int),
-            ).flatten()
+            vector_indices, mesh_indices, eval_indices = sparsity_cache.get(
+                self, (nx, ny, surface['symmetry'], num_eval_points),
+                lambda: _get_vectors_sparsity(nx, actual_ny_size, num_eval_points))
 
             self.declare_partials(vectors_name, name + '_vortex_mesh', val=-1., rows=vector_indices, cols=mesh_indices)
             self.declare_partials(vectors_name, eval_name, val= 1., rows=vector_indices, cols=eval_indices)
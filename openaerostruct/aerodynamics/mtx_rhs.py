@@ -3,6 +3,60 @@ import numpy as np
 
 from openmdao.api import ExplicitComponent
 
+from openaerostruct.utils.caching import sparsity_cache
+
+
+def _get_mtx_rhs_sparsity(shapes):
+    """
+    Get the rows and cols of the sparse partials of the AIC matrix and the
+    right-hand side, for surfaces with meshes of the given (nx, ny) shapes.
+
+    Returns the rows and cols of rhs wrt the freestream velocities, followed
+    by those of mtx wrt the vel_mtx, mtx wrt the normals, and rhs wrt the
+    normals for each surface in turn.
+    """
+    system_size = sum((nx - 1) * (ny - 1) for nx, ny in shapes)
+
+    vel_indices = np.arange(system_size * 3).reshape((system_size, 3))
+    mtx_indices = np.arange(system_size * system_size).reshape((system_size, system_size))
+    rhs_indices = np.arange(system_size)
+
+    patterns = [
+        np.einsum('i,j->ij', rhs_indices, np.ones(3, int)).flatten(),
+        vel_indices.flatten(),
+    ]
+
+    ind_1 = 0
+    ind_2 = 0
+
+    # We keep track of the surface's indices within the total system's
+    # indices to access the matrix in the correct locations for the derivs.
+    # This is because the AIC linear system has information for all surfaces
+    # together.
+    for nx, ny in shapes:
+        num = (nx - 1) * (ny - 1)
+
+        ind_2 += num
+
+        velocities_indices = np.arange(system_size * num * 3).reshape(
+            (system_size, nx - 1, ny - 1, 3)
+        )
+        normals_indices = np.arange(num * 3).reshape((num, 3))
+
+        # Get each set of partials based on the indices, ind_1 and ind_2
+        patterns.extend([
+            np.einsum('ij,k->ijk', mtx_indices[:, ind_1:ind_2], np.ones(3, int)).flatten(),
+            velocities_indices.flatten(),
+            np.einsum('ij,k->ijk', mtx_indices[ind_1:ind_2, :], np.ones(3, int)).flatten(),
+            np.einsum('ik,j->ijk', normals_indices, np.ones(system_size, int)).flatten(),
+            np.outer(rhs_indices[ind_1:ind_2], np.ones(3, int)).flatten(),
+            normals_indices.flatten(),
+        ])
+
+        ind_1 += num
+
+    return patterns
+
 
 class VLMMtxRHSComp(ExplicitComponent):
     """
@@ -60,31 +114,18 @@ class VLMMtxRHSComp(ExplicitComponent):
         self.add_output('rhs', shape=system_size, units='m/s')
 
         # Set up indicies arrays for sparse Jacobians
-        vel_indices = np.arange(system_size * 3).reshape((system_size, 3))
-        mtx_indices = np.arange(system_size * system_size).reshape((system_size, system_size))
-        rhs_indices = np.arange(system_size)
+        shapes = tuple(surface['mesh'].shape[:2] for surface in surfaces)
+        patterns = sparsity_cache.get(self, shapes, lambda: _get_mtx_rhs_sparsity(shapes))
 
         self.declare_partials('rhs', 'freestream_velocities',
-            rows=np.einsum('i,j->ij', rhs_indices, np.ones(3, int)).flatten(),
-            cols=vel_indices.flatten()
-        )
-
-        ind_1 = 0
-        ind_2 = 0
+            rows=patterns[0], cols=patterns[1])
 
         # Loop through each surface to add inputs and set up derivatives.
-        # We keep track of the surface's indices within the total system's
-        # indices to access the matrix in the correct locations for the derivs.
-        # This is because the AIC linear system has information for all surfaces
-        # together.
-        for surface in surfaces:
+        for i_surf, surface in enumerate(surfaces):
             mesh=surface['mesh']
             nx = mesh.shape[0]
             ny = mesh.shape[1]
             name = surface['name']
-            num = (nx - 1) * (ny - 1)
-
-            ind_2 += num
 
             # Get the correct names for each vel_mtx and normals, then
             # add them to the component
@@ -95,26 +136,15 @@ class VLMMtxRHSComp(ExplicitComponent):
                 shape=(system_size, nx - 1, ny - 1, 3), units='1/m')
             self.add_input(normals_name, shape=(nx - 1, ny - 1, 3))
 
-            velocities_indices = np.arange(system_size * num * 3).reshape(
-                (system_size, nx - 1, ny - 1, 3)
-            )
-            normals_indices = np.arange(num * 3).reshape((num, 3))
+            mtx_vel_rows, mtx_vel_cols, mtx_normals_rows, mtx_normals_cols, \
+                rhs_normals_rows, rhs_normals_cols = patterns[2 + 6 * i_surf:8 + 6 * i_surf]
 
-            # Declare each set of partials based on the indices, ind_1 and ind_2
             self.declare_partials('mtx', vel_mtx_name,
-                rows=np.einsum('ij,k->ijk', mtx_indices[:, ind_1:ind_2], np.ones(3, int)).flatten(),
-                cols=velocities_indices.flatten(),
-            )
+                rows=mtx_vel_rows, cols=mtx_vel_cols)
             self.declare_partials('mtx', normals_name,
-                rows=np.einsum('ij,k->ijk', mtx_indices[ind_1:ind_2, :], np.ones(3, int)).flatten(),
-                cols=np.einsum('ik,j->ijk', normals_indices, np.ones(system_size, int)).flatten(),
-            )
+                rows=mtx_normals_rows, cols=mtx_normals_cols)
             self.declare_partials('rhs', normals_name,
-                rows=np.outer(rhs_indices[ind_1:ind_2], np.ones(3, int)).flatten(),
-                cols=normals_indices.flatten(),
-            )
-
-            ind_1 += num
+                rows=rhs_normals_rows, cols=rhs_normals_cols)
 
         self.mtx_n_n_3 = np.zeros((system_size, system_size, 3))
         self.normals_n_3 = np.zeros((system_size, 3))
@@ -0,0 +1,275 @@
+from __future__ import print_function, division
+import multiprocessing
+import traceback
+
+import numpy as np
+
+from openaerostruct.aerodynamics.eval_mtx import EvalVelMtx
+
+
+def _sort_conditions(conditions):
+    """
+    Broadcast the condition arrays and get the order to run them in, with
+    equal angles of attack consecutive.
+    """
+    # Put alpha first so it is the primary sort key
+    names = sorted(conditions, key=lambda name: name.split('.')[-1] != 'alpha')
+    values = np.broadcast_arrays(*[np.atleast_1d(conditions[name]) for name in names])
+
+    # np.lexsort uses the last key as the primary one
+    order = np.lexsort(values[::-1])
+
+    return names, values, order
+
+
+def run_aero_conditions(prob, conditions, point_name='aero'):
+    """
+    Run an aerodynamic analysis point at a batch of flight conditions and
+    return the total CL, CD, and CM at each of them.
+
+    The problem is only set up once and the conditions are run in an order
+    where equal angles of attack are consecutive. The AIC matrix only depends
+    on the geometry and alpha, so conditions that only differ in the Mach
+    number, velocity, Reynolds number, or density solve their right-hand
+    sides with the LU factorization cached by `SolveMatrix`, while conditions
+    that differ in alpha reuse the vortex ring part of the AIC matrix cached
+    by `EvalVelMtx`. That cache is turned on for the duration of the run if
+    the point was built without it.
+
+    Parameters
+    ----------
+    prob : Problem
+        Problem that has been set up and contains the `AeroPoint` group.
+    conditions : dict
+        Maps the names of the flight condition variables, as used with
+        `prob[name]` (e.g. 'alpha', 'M', 'v', 're', 'rho'), to arrays of
+        their values at each condition. Scalars are used for all conditions.
+    point_name : str
+        Name of the `AeroPoint` group within the problem.
+
+    Returns
+    -------
+    results : dict
+        Arrays of the total 'CL' and 'CD' with one entry per condition, in
+        the order the conditions were given, and of the total 'CM' with shape
+        (num_conditions, 3).
+    """
+    names, values, order = _sort_conditions(conditions)
+    num_conditions = len(values[0])
+
+    results = {
+        'CL' : np.zeros(num_conditions),
+        'CD' : np.zeros(num_conditions),
+        'CM' : np.zeros((num_conditions, 3)),
+    }
+
+    ring_comps = [comp for comp in prob.model.system_iter(recurse=True, typ=EvalVelMtx)
+                  if not comp.options['cache_rings']]
+    for comp in ring_comps:
+        comp.options['cache_rings'] = True
+
+    try:
+        for ind in order:
+            for name, value in zip(names, values):
+                prob[name] = value[ind]
+
+            prob.run_model()
+
+            results['CL'][ind] = prob[point_name + '.CL'][0]
+            results['CD'][ind] = prob[point_name + '.CD'][0]
+            results['CM'][ind] = prob[point_name + '.CM']
+    finally:
+        # Free the cached rings of the points that do not keep them
+        for comp in ring_comps:
+            comp.options['cache_rings'] = False
+            comp.ring_cache.clear()
+
+    return results
+
+
+def condition_grid(conditions):
+    """
+    Get the conditions of a full factorial grid, e.g. for a flight envelope,
+    in the form taken by `run_aero_conditions` and `sweep_aero_conditions`.
+
+    Parameters
+    ----------
+    conditions : dict
+        Maps the names of the flight condition variables to 1-D arrays of
+        their values along each axis of the grid.
+
+    Returns
+    -------
+    conditions : dict
+        Maps the same names to flat arrays with one entry per point of the
+        grid, with the last name varying fastest in sorted order of names.
+    """
+    names = sorted(conditions)
+    axes = np.meshgrid(*[np.atleast_1d(conditions[name]) for name in names], indexing='ij')
+
+    return dict((name, axis.flatten()) for name, axis in zip(names, axes))
+
+
+# The problem of each process of a sweep, built once by the initializer of
+# the pool and kept for all the chunks that process runs
+_sweep_problem = None
+
+
+def _init_sweep_worker(problem_factory):
+    global _sweep_problem
+    try:
+        _sweep_problem = problem_factory()
+    except Exception:
+        # A pool restarts a process whose initializer fails over and over,
+        # so report the error with the first chunk instead
+        _sweep_problem = traceback.format_exc()
+
+
+def _run_sweep_chunk(args):
+    indices, conditions, point_name = args
+    if isinstance(_sweep_problem, str):
+        raise RuntimeError('Creating the problem of a sweep process failed:\n' + _sweep_problem)
+    return indices, run_aero_conditions(_sweep_problem, conditions, point_name)
+
+
+def iter_aero_conditions(problem_factory, conditions, point_name='aero', num_procs=None,
+                         chunk_size=None):
+    """
+    Run an aerodynamic analysis point at a batch of flight conditions in a
+    pool of local processes, yielding the results of each chunk of
+    conditions as soon as it is done.
+
+    Each process calls `problem_factory` once and runs every chunk it is
+    given on that problem with `run_aero_conditions`. The conditions are
+    sorted with equal angles of attack consecutive before they are split
+    into chunks, so each chunk keeps the reuse of the AIC matrix between
+    its conditions.
+
+    Parameters
+    ----------
+    problem_factory : callable
+        Function with no arguments that returns a problem that has been set
+        up and contains the `AeroPoint` group.
+    conditions : dict
+        Maps the names of the flight condition variables, as used with
+        `prob[name]`, to arrays of their values at each condition. Scalars
+        are used for all conditions.
+    point_name : str
+        Name of the `AeroPoint` group within the problems.
+    num_procs : int or None
+        Number of processes; defaults to the number of cores. With one
+        process, the conditions are run in this process instead.
+    chunk_size : int or None
+        Number of conditions sent to a process at a time; defaults to
+        splitting the conditions into four chunks per process.
+
+    Yields
+    ------
+    indices : ndarray
+        Indices of the conditions of the chunk, in the order they were given.
+    results : dict
+        Results of `run_aero_conditions` for the conditions of the chunk.
+    """
+    names, values, order = _sort_conditions(conditions)
+    num_conditions = len(values[0])
+
+    if num_procs is None:
+        num_procs = multiprocessing.cpu_count()
+    if chunk_size is None:
+        chunk_size = max(1, int(np.ceil(num_conditions / (4 * num_procs))))
+
+    chunks = []
+    for start in range(0, num_conditions, chunk_size):
+        indices = order[start:start + chunk_size]
+        chunk_conditions = dict((name, value[indices]) for name, value in zip(names, values))
+        chunks.append((indices, chunk_conditions, point_name))
+
+    if num_procs == 1:
+        prob = problem_factory()
+        for indices, chunk_conditions, point_name in chunks:
+            yield indices, run_aero_conditions(prob, chunk_conditions, point_name)
+        return
+
+    pool = multiprocessing.Pool(min(num_procs, len(chunks)), initializer=_init_sweep_worker,
+                                initargs=(problem_factory,))
+    try:
+        for indices, results in pool.imap_unordered(_run_sweep_chunk, chunks):
+            yield indices, results
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def sweep_aero_conditions(problem_factory, conditions, point_name='aero', num_procs=None,
+                          chunk_size=None, filename=None, callback=None):
+    """
+    Run an aerodynamic analysis point at a batch of flight conditions, such
+    as a drag polar or a flight envelope from `condition_grid`, in a pool of
+    local processes, and gather the total CL, CD, and CM at each of them.
+
+    Parameters
+    ----------
+    problem_factory : callable
+        Function with no arguments that returns a problem that has been set
+        up and contains the `AeroPoint` group. It is called once in each
+        process.
+    conditions : dict
+        Maps the names of the flight condition variables, as used with
+        `prob[name]`, to arrays of their values at each condition. Scalars
+        are used for all conditions.
+    point_name : str
+        Name of the `AeroPoint` group within the problems.
+    num_procs : int or None
+        Number of processes; defaults to the number of cores.
+    chunk_size : int or None
+        Number of conditions sent to a process at a time.
+    filename : str or None
+        If given, the results are written to this text file as they come
+        in, one row per condition with a column for each condition variable
+        followed by CL, CD, CMx, CMy, and CMz. The rows are in the order
+        the chunks finish, not the order the conditions were given.
+    callback : callable or None
+        Called with the indices and results of each chunk as it finishes,
+        as yielded by `iter_aero_conditions`.
+
+    Returns
+    -------
+    results : dict
+        Arrays of the total 'CL' and 'CD' with one entry per condition, in
+        the order the conditions were given, and of the total 'CM' with shape
+        (num_conditions, 3).
+    """
+    names, values, order = _sort_conditions(conditions)
+    num_conditions = len(values[0])
+
+    results = {
+        'CL' : np.zeros(num_conditions),
+        'CD' : np.zeros(num_conditions),
+        'CM' : np.zeros((num_conditions, 3)),
+    }
+
+    f = None
+    if filename is not None:
+        f = open(filename, 'w')
+        header = [name.split('.')[-1] for name in names] + ['CL', 'CD', 'CMx', 'CMy', 'CMz']
+        f.write('# ' + ' '.join(header) + '\n')
+
+    try:
+        for indices, chunk_results in iter_aero_conditions(problem_factory, conditions,
+                point_name, num_procs, chunk_size):
+            for key in results:
+                results[key][indices] = chunk_results[key]
+
+            if f is not None:
+                rows = np.column_stack([value[indices] for value in values] +
+                    [chunk_results['CL'], chunk_results['CD'], chunk_results['CM']])
+                np.savetxt(f, rows)
+                f.flush()
+
+            if callback is not None:
+                callback(indices, chunk_results)
+    finally:
+        if f is not None:
+            f.close()
+
+    return results
@@ -1,8 +1,12 @@
 from __future__ import print_function
 import numpy as np
 from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import LinearOperator, gmres
 
-from openmdao.api import ImplicitComponent
+from openmdao.api import ImplicitComponent, AnalysisError
+
+from openaerostruct.utils.caching import FactorizationCache
+from openaerostruct.utils.hmatrix import HMatrix
 
 
 class SolveMatrix(ImplicitComponent):
@@ -17,33 +21,111 @@ class SolveMatrix(ImplicitComponent):
     rhs[system_size] : numpy array
         Right-hand side of the AIC linear system, constructed from the
         freestream velocities and panel normals.
+    coll_pts[system_size, 3] : numpy array
+        The collocation points of all the panels, only used to cluster the
+        panels if `solver` is 'hmatrix'.
 
     Returns
     -------
     circulations[system_size] : numpy array
         The vortex ring circulations obtained by solving the AIC linear system.
 
+    The LU factorization of the AIC matrix is cached, so linearizing at the
+    point just solved reuses it. The `lu_cache` attribute counts the hits and
+    misses of the cache.
+
+    If `solver` is 'gmres', the circulations and the linear solves for the
+    derivatives are obtained with GMRES instead, warm started from the
+    previous solution. It is preconditioned with an LU factorization of
+    the whole AIC matrix, or of the diagonal block of each surface if
+    `preconditioner` is 'block_lu', which is kept as the matrix changes
+    and is only refactored once a solve takes more than `max_precon_iter`
+    iterations. In optimizations, where the AIC matrix changes little
+    between iterations, most iterations then avoid the O(n^3)
+    factorization. The `precon_factorizations` attribute counts the
+    factorizations.
+
+    If `solver` is 'hmatrix', the AIC matrix is instead compressed into a
+    hierarchical matrix, where the interactions between well-separated
+    clusters of panels (e.g. between surfaces, or between the root and tip
+    of a wing) are stored as low-rank blocks, and both the circulations and
+    the linear solves for the derivatives are obtained with GMRES,
+    preconditioned with the LU factorizations of the diagonal blocks of
+    nearby panels. This avoids the O(n^3) cost of the full factorization
+    for large models. The compressed matrix is cached in `hmatrix_cache`
+    in the same way.
+
+    Note that this does not remove the O(n^2) memory and assembly cost of
+    the AIC matrix: within the model, `mtx` is still assembled densely by
+    `VLMMtxRHSComp`, and its partials here are dense. Only the solves are
+    cheaper. Outside of the model, an `HMatrix` can instead be built
+    straight from the vortex meshes with `AICBlocks`, which only evaluates
+    the AIC entries that the compression samples.
+
+    For both iterative solvers, the number of iterations of each solve is
+    appended to the `gmres_iterations` attribute as a (solve, iterations)
+    tuple, where solve is 'nonlinear', 'fwd', or 'rev', and is printed if
+    `iprint` is positive.
     """
 
     def initialize(self):
         self.options.declare('surfaces', types=list)
+        self.options.declare('solver', default='lu', values=['lu', 'gmres', 'hmatrix'],
+            desc='Direct LU solve of the dense AIC matrix, GMRES with the dense '
+            'AIC matrix, or GMRES with a hierarchical matrix approximation of it')
+        self.options.declare('preconditioner', default='lu', values=['lu', 'block_lu'],
+            desc='LU factorization of the whole AIC matrix or of the diagonal '
+            'block of each surface used by the gmres solver')
+        self.options.declare('max_precon_iter', default=10, types=int, lower=1,
+            desc='Number of GMRES iterations above which the gmres solver '
+            'refactors its preconditioner')
+        self.options.declare('hmatrix_leaf_size', default=32, types=int, lower=1,
+            desc='Maximum number of panels in the smallest clusters of the '
+            'hierarchical matrix')
+        self.options.declare('hmatrix_tol', default=1e-8, types=float,
+            desc='Relative tolerance of the low-rank blocks of the hierarchical matrix')
+        self.options.declare('iterative_tol', default=1e-10, types=float,
+            desc='Relative residual tolerance of the GMRES solves')
+        self.options.declare('iprint', default=0, types=int,
+            desc='Print the number of iterations of each GMRES solve if positive')
 
     def setup(self):
         surfaces = self.options['surfaces']
 
         system_size = 0
 
+        # Indices of the panels of each surface, for the block_lu preconditioner
+        self.surface_slices = []
+
         for surface in self.options['surfaces']:
             mesh = surface['mesh']
             nx = mesh.shape[0]
             ny = mesh.shape[1]
 
-            system_size += (nx - 1) * (ny - 1)
+            num = (nx - 1) * (ny - 1)
+            self.surface_slices.append(slice(system_size, system_size + num))
+            system_size += num
 
         self.system_size = system_size
 
+        self.lu_cache = FactorizationCache(lu_factor)
+        self.hmatrix_cache = FactorizationCache(self._build_hmatrix)
+
+        # The gmres solver's preconditioner, stored as a list of (indices,
+        # LU factorization) pairs, and whether it must be refactored
+        self.precon = None
+        self.refactor_precon = True
+        self.precon_factorizations = 0
+
+        self.gmres_iterations = []
+
+        # Last solutions of the linear systems, to warm start GMRES
+        self.linear_guesses = {}
+
         self.add_input('mtx', shape=(system_size, system_size), units='1/m')
         self.add_input('rhs', shape=system_size, units='m/s')
+        if self.options['solver'] == 'hmatrix':
+            self.add_input('coll_pts', shape=(system_size, 3), units='m')
         self.add_output('circulations', shape=system_size, units='m**2/s')
 
         self.declare_partials('circulations', 'circulations',
@@ -62,21 +144,129 @@ class SolveMatrix(ImplicitComponent):
     def apply_nonlinear(self, inputs, outputs, residuals):
         residuals['circulations'] = inputs['mtx'].dot(outputs['circulations']) - inputs['rhs']
 
+    def _build_hmatrix(self, mtx, coll_pts):
+        return HMatrix(mtx, coll_pts, leaf_size=self.options['hmatrix_leaf_size'],
+            tol=self.options['hmatrix_tol'])
+
+    def _factor_precon(self):
+        mtx = self.mtx
+
+        if self.options['preconditioner'] == 'lu':
+            self.precon = [(slice(None), lu_factor(mtx))]
+        else:
+            self.precon = [(inds, lu_factor(mtx[inds, inds])) for inds in self.surface_slices]
+
+        self.precon_factorizations += 1
+        self.refactor_precon = False
+        self.precon_is_current = True
+
+    def _factor(self, inputs):
+        solver = self.options['solver']
+
+        if solver == 'lu':
+            self.lu = self.lu_cache.factor(inputs['mtx'])
+        elif solver == 'gmres':
+            self.mtx = inputs['mtx']
+            self.precon_is_current = False
+            if self.refactor_precon:
+                self._factor_precon()
+        else:
+            self.hmatrix = self.hmatrix_cache.factor(inputs['mtx'], inputs['coll_pts'])
+
+    def _dot(self, vec, trans):
+        if self.options['solver'] == 'hmatrix':
+            if trans == 0:
+                return self.hmatrix.dot(vec)
+            return self.hmatrix.tdot(vec)
+
+        if trans == 0:
+            return self.mtx.dot(vec)
+        return self.mtx.T.dot(vec)
+
+    def _precondition(self, vec, trans):
+        if self.options['solver'] == 'hmatrix':
+            return self.hmatrix.precondition(vec, trans)
+
+        result = np.zeros(vec.shape, dtype=np.result_type(self.mtx.dtype, vec.dtype))
+        for inds, lu in self.precon:
+            result[inds] = lu_solve(lu, vec[inds], trans=trans)
+        return result
+
+    def _solve_iterative(self, rhs, guess, solve, trans=0):
+        """
+        Solve the linear system, or its transpose if trans is 1, using
+        preconditioned GMRES warm started from guess.
+        """
+        if self.options['solver'] == 'hmatrix':
+            dtype = np.result_type(self.hmatrix.dtype, rhs.dtype)
+        else:
+            dtype = np.result_type(self.mtx.dtype, rhs.dtype)
+        shape = (self.system_size, self.system_size)
+
+        mtx = LinearOperator(shape, matvec=lambda vec: self._dot(vec, trans), dtype=dtype)
+        precon = LinearOperator(shape, matvec=lambda vec: self._precondition(vec, trans),
+            dtype=dtype)
+
+        # Only warm start if the guess is closer to the solution than zero
+        if guess is not None and \
+                np.linalg.norm(rhs - mtx.matvec(guess)) >= np.linalg.norm(rhs):
+            guess = None
+
+        residuals = []
+        sol, info = gmres(mtx, rhs, x0=guess, tol=self.options['iterative_tol'], atol=0.,
+            restart=50, maxiter=self.system_size, M=precon, callback=residuals.append)
+
+        if self.options['solver'] == 'gmres':
+            # Try again with the preconditioner factored at the current matrix
+            if info != 0 and not self.precon_is_current:
+                self._factor_precon()
+                residuals = []
+                sol, info = gmres(mtx, rhs, tol=self.options['iterative_tol'], atol=0.,
+                    restart=50, maxiter=self.system_size, M=precon, callback=residuals.append)
+
+            if len(residuals) > self.options['max_precon_iter']:
+                self.refactor_precon = True
+
+        self.gmres_iterations.append((solve, len(residuals)))
+        if self.options['iprint'] > 0:
+            print('{}: {} GMRES solve in {} iterations'.format(
+                self.pathname, solve, len(residuals)))
+
+        if info != 0:
+            raise AnalysisError('GMRES failed to solve for the circulations in {} '
+                '(info = {}).'.format(self.pathname, info))
+
+        return sol
+
     def solve_nonlinear(self, inputs, outputs):
-        self.lu = lu_factor(inputs['mtx'])
+        self._factor(inputs)
 
-        outputs['circulations'] = lu_solve(self.lu, inputs['rhs'])
+        if self.options['solver'] == 'lu':
+            outputs['circulations'] = lu_solve(self.lu, inputs['rhs'])
+        else:
+            outputs['circulations'] = self._solve_iterative(inputs['rhs'],
+                outputs['circulations'].copy(), 'nonlinear')
 
     def linearize(self, inputs, outputs, partials):
         system_size = self.system_size
-        self.lu = lu_factor(inputs['mtx'])
+        self._factor(inputs)
 
         partials['circulations', 'circulations'] = inputs['mtx'].flatten()
         partials['circulations', 'mtx'] = \
             np.outer(np.ones(system_size), outputs['circulations']).flatten()
 
     def solve_linear(self, d_outputs, d_residuals, mode):
-        if mode == 'fwd':
+        if self.options['solver'] != 'lu':
+            if mode == 'fwd':
+                sol = self._solve_iterative(d_residuals['circulations'],
+                    self.linear_guesses.get(mode), mode)
+                d_outputs['circulations'] = sol
+            else:
+                sol = self._solve_iterative(d_outputs['circulations'],
+                    self.linear_guesses.get(mode), mode, trans=1)
+                d_residuals['circulations'] = sol
+            self.linear_guesses[mode] = sol
+        elif mode == 'fwd':
             d_outputs['circulations'] = lu_solve(self.lu, d_residuals['circulations'], trans=0)
         else:
             d_residuals['circulations'] = lu_solve(self.lu, d_outputs['circulations'], trans=1)
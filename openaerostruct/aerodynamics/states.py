@@ -2,6 +2,7 @@ from openmdao.api import Group
 from openaerostruct.aerodynamics.get_vectors import GetVectors
 from openaerostruct.aerodynamics.collocation_points import CollocationPoints
 from openaerostruct.aerodynamics.eval_mtx import EvalVelMtx
+from openaerostruct.aerodynamics.eval_mtx_chunked import EvalVelMtxChunked
 from openaerostruct.aerodynamics.convert_velocity import ConvertVelocity
 from openaerostruct.aerodynamics.mtx_rhs import VLMMtxRHSComp
 from openaerostruct.aerodynamics.solve_matrix import SolveMatrix
@@ -15,13 +16,44 @@ from openaerostruct.aerodynamics.vortex_mesh import VortexMesh
 class VLMStates(Group):
     """
     Group that houses all components to compute the aerodynamic states.
+
+    If `aic_chunk_size` is given, the AIC matrices are assembled directly from
+    the vortex mesh in blocks of that many evaluation points instead of
+    first computing the full vectors arrays, which bounds the memory used
+    by the intermediate calculations for fine meshes.
+
+    If `single_pass_aic` is True, the AIC matrices for both the collocation
+    and force points are assembled by a single component in one pass over
+    the vortex mesh, again without the full vectors arrays, so the vortex
+    mesh and sparsity setup are shared between them. In that case the
+    evaluation points are processed in blocks of `aic_chunk_size`, or of the
+    default chunk size of `EvalVelMtxChunked` if it is None.
+
+    `aic_solver` selects how `SolveMatrix` solves the AIC linear system,
+    either with a dense LU factorization ('lu'), with GMRES on the dense
+    AIC matrix preconditioned with a reused LU factorization ('gmres'), or
+    with GMRES on a hierarchical matrix approximation of the AIC matrix
+    ('hmatrix'). The dense AIC matrix is still assembled in every case, so
+    'hmatrix' only reduces the cost of the solves, not the O(n^2) memory.
+
+    If `cache_rings` is True, `EvalVelMtx` caches the vortex ring part of
+    the AIC matrices, so runs that only change alpha over a fixed geometry
+    skip most of their assembly. It has no effect with `aic_chunk_size` or
+    `single_pass_aic`.
     """
 
     def initialize(self):
         self.options.declare('surfaces', types=list)
+        self.options.declare('aic_chunk_size', default=None, types=int, allow_none=True)
+        self.options.declare('single_pass_aic', default=False, types=bool)
+        self.options.declare('aic_solver', default='lu', values=['lu', 'gmres', 'hmatrix'])
+        self.options.declare('cache_rings', default=False, types=bool)
 
     def setup(self):
         surfaces = self.options['surfaces']
+        aic_chunk_size = self.options['aic_chunk_size']
+        single_pass_aic = self.options['single_pass_aic']
+        cache_rings = self.options['cache_rings']
 
         num_collocation_points = 0
         for surface in surfaces:
@@ -44,19 +76,40 @@ class VLMStates(Group):
             promotes_inputs=['*'],
             promotes_outputs=['*'])
 
-        # Get vectors from mesh points to collocation points
-        self.add_subsystem('get_vectors',
-             GetVectors(surfaces=surfaces, num_eval_points=num_collocation_points,
-                eval_name='coll_pts'),
-             promotes_inputs=['*'],
-             promotes_outputs=['*'])
-
-        # Construct matrix based on rings, not horseshoes
-        self.add_subsystem('mtx_assy',
-             EvalVelMtx(surfaces=surfaces, num_eval_points=num_collocation_points,
-                eval_name='coll_pts'),
-             promotes_inputs=['*'],
-             promotes_outputs=['*'])
+        if single_pass_aic:
+            # Construct the matrices based on rings for both the collocation
+            # and force points at once, directly from the vortex mesh
+            mtx_assy = EvalVelMtxChunked(surfaces=surfaces, num_eval_points=num_collocation_points,
+                eval_name=['coll_pts', 'force_pts'])
+            if aic_chunk_size is not None:
+                mtx_assy.options['chunk_size'] = aic_chunk_size
+
+            self.add_subsystem('mtx_assy',
+                 mtx_assy,
+                 promotes_inputs=['*'],
+                 promotes_outputs=['*'])
+        elif aic_chunk_size is None:
+            # Get vectors from mesh points to collocation points
+            self.add_subsystem('get_vectors',
+                 GetVectors(surfaces=surfaces, num_eval_points=num_collocation_points,
+                    eval_name='coll_pts'),
+                 promotes_inputs=['*'],
+                 promotes_outputs=['*'])
+
+            # Construct matrix based on rings, not horseshoes
+            self.add_subsystem('mtx_assy',
+                 EvalVelMtx(surfaces=surfaces, num_eval_points=num_collocation_points,
+                    eval_name='coll_pts', cache_rings=cache_rings),
+                 promotes_inputs=['*'],
+                 promotes_outputs=['*'])
+        else:
+            # Construct matrix based on rings, not horseshoes, directly from
+            # the vortex mesh and collocation points
+            self.add_subsystem('mtx_assy',
+                 EvalVelMtxChunked(surfaces=surfaces, num_eval_points=num_collocation_points,
+                    eval_name='coll_pts', chunk_size=aic_chunk_size),
+                 promotes_inputs=['*'],
+                 promotes_outputs=['*'])
 
         # Convert freestream velocity to array of velocities
         self.add_subsystem('convert_velocity',
@@ -72,7 +125,7 @@ class VLMStates(Group):
 
         # Solve Mtx RHS to get ring circs
         self.add_subsystem('solve_matrix',
-             SolveMatrix(surfaces=surfaces),
+             SolveMatrix(surfaces=surfaces, solver=self.options['aic_solver']),
              promotes_inputs=['*'],
              promotes_outputs=['*'])
 
@@ -82,19 +135,31 @@ class VLMStates(Group):
              promotes_inputs=['*'],
              promotes_outputs=['*'])
 
-        # Eval force vectors
-        self.add_subsystem('get_vectors_force',
-             GetVectors(surfaces=surfaces, num_eval_points=num_force_points,
-                eval_name='force_pts'),
-             promotes_inputs=['*'],
-             promotes_outputs=['*'])
-
-        # Set up force mtx
-        self.add_subsystem('mtx_assy_forces',
-             EvalVelMtx(surfaces=surfaces, num_eval_points=num_force_points,
-                eval_name='force_pts'),
-             promotes_inputs=['*'],
-             promotes_outputs=['*'])
+        if single_pass_aic:
+            # The force point matrices were already computed with the
+            # collocation point matrices
+            pass
+        elif aic_chunk_size is None:
+            # Eval force vectors
+            self.add_subsystem('get_vectors_force',
+                 GetVectors(surfaces=surfaces, num_eval_points=num_force_points,
+                    eval_name='force_pts'),
+                 promotes_inputs=['*'],
+                 promotes_outputs=['*'])
+
+            # Set up force mtx
+            self.add_subsystem('mtx_assy_forces',
+                 EvalVelMtx(surfaces=surfaces, num_eval_points=num_force_points,
+                    eval_name='force_pts', cache_rings=cache_rings),
+                 promotes_inputs=['*'],
+                 promotes_outputs=['*'])
+        else:
+            # Set up force mtx directly from the vortex mesh and force points
+            self.add_subsystem('mtx_assy_forces',
+                 EvalVelMtxChunked(surfaces=surfaces, num_eval_points=num_force_points,
+                    eval_name='force_pts', chunk_size=aic_chunk_size),
+                 promotes_inputs=['*'],
+                 promotes_outputs=['*'])
 
         # Multiply by horseshoe circs to get velocities
         self.add_subsystem('eval_velocities',
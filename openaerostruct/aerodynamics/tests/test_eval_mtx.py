@@ -1,9 +1,12 @@
 import unittest
+import numpy as np
 from openmdao.api import Problem
-from openmdao.utils.assert_utils import assert_check_partials
+from openmdao.utils.assert_utils import assert_check_partials, assert_rel_error
 
-from openaerostruct.aerodynamics.eval_mtx import EvalVelMtx
-from openaerostruct.utils.testing import run_test, get_default_surfaces
+from openaerostruct.aerodynamics.eval_mtx import EvalVelMtx, AICBlocks, _compute_vel_mtx
+from openaerostruct.utils.hmatrix import HMatrix
+from openaerostruct.utils.testing import run_test, get_default_surfaces, \
+    run_wing_tail_aero_point
 
 
 class Test(unittest.TestCase):
@@ -15,6 +18,14 @@ class Test(unittest.TestCase):
 
         run_test(self, comp, complex_flag=True)
 
+    def test_cache_partials(self):
+        surfaces = get_default_surfaces()
+
+        comp = EvalVelMtx(surfaces=surfaces, num_eval_points=2, eval_name='test_name',
+            cache_partials=True)
+
+        run_test(self, comp, complex_flag=True)
+
     def test_assembled_jac(self):
         surfaces = get_default_surfaces()
 
@@ -34,5 +45,66 @@ class Test(unittest.TestCase):
         data = prob.check_partials(compact_print=True, out_stream=None, method='cs', step=1e-40)
         assert_check_partials(data, atol=1e20, rtol=1e-6)
 
+    def test_ring_cache(self):
+        surfaces = get_default_surfaces()
+
+        comp = EvalVelMtx(surfaces=surfaces, num_eval_points=2, eval_name='test_name',
+            cache_rings=True)
+
+        prob = Problem()
+        prob.model.add_subsystem('comp', comp)
+        prob.setup()
+
+        np.random.seed(314)
+        for surface in surfaces:
+            vectors_name = 'comp.{}_test_name_vectors'.format(surface['name'])
+            prob[vectors_name] = np.random.random_sample(prob[vectors_name].shape)
+
+        # Sweeping alpha reuses the cached vortex rings, which are only
+        # computed for the first alpha
+        for i, alpha in enumerate([2., 5.]):
+            prob['comp.alpha'] = alpha
+            prob.run_model()
+
+            self.assertEqual(comp.ring_cache_misses, len(surfaces))
+            self.assertEqual(comp.ring_cache_hits, i * len(surfaces))
+
+            for surface in surfaces:
+                nx, ny = surface['mesh'].shape[:2]
+                name = surface['name']
+                vel_mtx = _compute_vel_mtx(prob['comp.{}_test_name_vectors'.format(name)],
+                    alpha, nx, ny, surface['symmetry'])
+                assert_rel_error(self, prob['comp.{}_test_name_vel_mtx'.format(name)],
+                    vel_mtx, 1e-12)
+
+        self.assertEqual(sorted(comp.ring_cache), sorted(s['name'] for s in surfaces))
+
+    def test_aic_blocks(self):
+        prob = run_wing_tail_aero_point()
+        surfaces = prob.model.aero_point.options['surfaces']
+
+        vortex_meshes = [prob['aero_point.aero_states.{}_vortex_mesh'.format(s['name'])]
+            for s in surfaces]
+        normals = np.concatenate([
+            prob['aero_point.aero_states.{}_normals'.format(s['name'])].reshape((-1, 3))
+            for s in surfaces])
+        coll_pts = prob['aero_point.aero_states.coll_pts']
+        mtx = prob['aero_point.aero_states.mtx']
+
+        aic_blocks = AICBlocks(surfaces, vortex_meshes, coll_pts, normals, prob['alpha'][0])
+
+        # Any block matches the assembled AIC matrix
+        rows = np.array([0, 7, 150, 179])
+        cols = np.array([3, 100, 130, 178, 5])
+        assert_rel_error(self, aic_blocks(rows, cols), mtx[np.ix_(rows, cols)], 1e-12)
+
+        # The hierarchical matrix can be built without assembling the AIC matrix
+        hmatrix = HMatrix(aic_blocks, coll_pts)
+        self.assertGreater(len(hmatrix.low_rank_blocks), 0)
+
+        np.random.seed(314)
+        x = np.random.random_sample(len(mtx))
+        assert_rel_error(self, hmatrix.dot(x), mtx.dot(x), 1e-8)
+
 if __name__ == '__main__':
     unittest.main()
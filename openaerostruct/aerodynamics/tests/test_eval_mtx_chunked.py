@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem, Group, IndepVarComp
+from openmdao.utils.assert_utils import assert_rel_error
+
+from openaerostruct.aerodynamics.get_vectors import GetVectors
+from openaerostruct.aerodynamics.eval_mtx import EvalVelMtx
+from openaerostruct.aerodynamics.eval_mtx_chunked import EvalVelMtxChunked
+from openaerostruct.utils.testing import run_test, get_default_surfaces
+
+
+class Test(unittest.TestCase):
+
+    def test(self):
+        surfaces = get_default_surfaces()
+
+        comp = EvalVelMtxChunked(surfaces=surfaces, num_eval_points=5,
+            eval_name='test_name', chunk_size=2)
+
+        run_test(self, comp, complex_flag=True, method='cs')
+
+    def test_multiple_eval_names(self):
+        surfaces = get_default_surfaces()
+
+        # The second chunk spans both sets of evaluation points
+        comp = EvalVelMtxChunked(surfaces=surfaces, num_eval_points=5,
+            eval_name=['coll_pts', 'force_pts'], chunk_size=3)
+
+        run_test(self, comp, complex_flag=True, method='cs')
+
+    def test_matches_vectors(self):
+        surfaces = get_default_surfaces()
+
+        num_eval_points = 7
+        np.random.seed(314)
+        eval_points = np.random.random_sample((num_eval_points, 3))
+
+        indep_var_comp = IndepVarComp()
+        indep_var_comp.add_output('alpha', val=3.2, units='deg')
+        indep_var_comp.add_output('pts', val=eval_points, units='m')
+        for surface in surfaces:
+            nx, ny = surface['mesh'].shape[:2]
+            if surface['symmetry']:
+                ny = 2 * ny - 1
+            indep_var_comp.add_output(surface['name'] + '_vortex_mesh',
+                val=np.random.random_sample((nx, ny, 3)), units='m')
+
+        group = Group()
+        group.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
+        group.add_subsystem('get_vectors',
+            GetVectors(surfaces=surfaces, num_eval_points=num_eval_points, eval_name='pts'),
+            promotes=['*'])
+        group.add_subsystem('vel_mtx',
+            EvalVelMtx(surfaces=surfaces, num_eval_points=num_eval_points, eval_name='pts'),
+            promotes_inputs=['*'])
+        group.add_subsystem('vel_mtx_chunked',
+            EvalVelMtxChunked(surfaces=surfaces, num_eval_points=num_eval_points,
+                eval_name='pts', chunk_size=3),
+            promotes_inputs=['*'])
+
+        prob = Problem(group)
+        prob.setup()
+        prob.run_model()
+
+        for surface in surfaces:
+            vel_mtx_name = '{}_pts_vel_mtx'.format(surface['name'])
+            assert_rel_error(self, prob['vel_mtx_chunked.' + vel_mtx_name],
+                prob['vel_mtx.' + vel_mtx_name], 1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
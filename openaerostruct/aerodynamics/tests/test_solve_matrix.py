@@ -1,10 +1,12 @@
 import unittest
 import numpy as np
 
-from openmdao.api import Group, IndepVarComp
+from openmdao.api import Group, IndepVarComp, Problem
+from openmdao.utils.assert_utils import assert_rel_error
 
 from openaerostruct.aerodynamics.solve_matrix import SolveMatrix
-from openaerostruct.utils.testing import run_test, get_default_surfaces
+from openaerostruct.utils.testing import run_test, get_default_surfaces, \
+    run_wing_tail_aero_point
 
 
 class Test(unittest.TestCase):
@@ -33,6 +35,100 @@ class Test(unittest.TestCase):
 
         run_test(self, group)
 
+    def test_lu_cache(self):
+        surfaces = get_default_surfaces()
+
+        comp = SolveMatrix(surfaces=surfaces)
+
+        prob = run_test(self, comp)
+
+        # The factorization from solve_nonlinear is reused when linearizing
+        lu_cache = prob.model.comp.lu_cache
+        self.assertEqual(lu_cache.misses, 1)
+        self.assertGreaterEqual(lu_cache.hits, 1)
+
+    def test_hmatrix(self):
+        # Use the AIC matrix of a wing and tail, whose far-field blocks can
+        # actually be compressed
+        aero_prob = run_wing_tail_aero_point()
+        surfaces = aero_prob.model.aero_point.options['surfaces']
+
+        mtx = aero_prob['aero_point.aero_states.mtx']
+        rhs = aero_prob['aero_point.aero_states.rhs']
+
+        indep_var_comp = IndepVarComp()
+        indep_var_comp.add_output('rhs', val=rhs, units='m/s')
+        indep_var_comp.add_output('mtx', val=mtx, units='1/m')
+        indep_var_comp.add_output('coll_pts', val=aero_prob['aero_point.aero_states.coll_pts'],
+            units='m')
+
+        prob = Problem()
+        prob.model.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
+        prob.model.add_subsystem('solve_matrix',
+            SolveMatrix(surfaces=surfaces, solver='hmatrix'),
+            promotes=['*'])
+
+        prob.setup()
+        prob.run_model()
+
+        comp = prob.model.solve_matrix
+        self.assertGreater(len(comp.hmatrix.low_rank_blocks), 0)
+        self.assertLess(comp.hmatrix.nbytes, mtx.nbytes)
+
+        assert_rel_error(self, prob['circulations'], np.linalg.solve(mtx, rhs), 1e-8)
+        assert_rel_error(self, prob['circulations'],
+            aero_prob['aero_point.circulations'], 1e-8)
+
+        # The adjoint solves go through the same hierarchical matrix
+        totals = prob.compute_totals(of=['circulations'], wrt=['rhs'])
+        assert_rel_error(self, totals['circulations', 'rhs'], np.linalg.inv(mtx), 1e-8)
+
+        self.assertEqual(comp.hmatrix_cache.misses, 1)
+        self.assertGreaterEqual(comp.hmatrix_cache.hits, 1)
+
+    def test_gmres(self):
+        surfaces = get_default_surfaces()
+
+        system_size = 0
+        for surface in surfaces:
+            nx = surface['mesh'].shape[0]
+            ny = surface['mesh'].shape[1]
+            system_size += (nx - 1) * (ny - 1)
+
+        np.random.seed(314)
+        mtx = np.random.random_sample((system_size, system_size)) + system_size * np.identity(system_size)
+        rhs = np.random.random_sample(system_size)
+
+        for preconditioner in ['lu', 'block_lu']:
+            indep_var_comp = IndepVarComp()
+            indep_var_comp.add_output('rhs', val=rhs, units='m/s')
+            indep_var_comp.add_output('mtx', val=mtx, units='1/m')
+
+            group = Group()
+            group.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
+            group.add_subsystem('solve_matrix',
+                SolveMatrix(surfaces=surfaces, solver='gmres', preconditioner=preconditioner),
+                promotes=['*'])
+
+            prob = run_test(self, group)
+
+            assert_rel_error(self, prob['comp.circulations'], np.linalg.solve(mtx, rhs), 1e-10)
+
+            # The preconditioner is reused for a slightly different matrix, and
+            # the solve is warm started from the previous circulations
+            comp = prob.model.comp.solve_matrix
+            num_factorizations = comp.precon_factorizations
+            del comp.gmres_iterations[:]
+
+            prob['comp.mtx'] = mtx * (1. + 1.e-4)
+            prob.run_model()
+
+            assert_rel_error(self, prob['comp.circulations'],
+                np.linalg.solve(mtx * (1. + 1.e-4), rhs), 1e-10)
+            self.assertEqual(comp.precon_factorizations, num_factorizations)
+            self.assertEqual(comp.gmres_iterations[0][0], 'nonlinear')
+            self.assertLessEqual(comp.gmres_iterations[0][1], comp.options['max_precon_iter'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -38,5 +38,13 @@ class Test(unittest.TestCase):
 
         run_test(self, group, complex_flag=True)
 
+    def test_no_wave(self):
+        surface = get_default_surfaces()[0]
+        surface['with_wave'] = False
+
+        comp = WaveDrag(surface=surface)
+
+        run_test(self, comp, complex_flag=True)
+
 if __name__ == '__main__':
     unittest.main()
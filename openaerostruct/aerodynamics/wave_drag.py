@@ -53,8 +53,10 @@ class WaveDrag(ExplicitComponent):
         self.add_input('t_over_c', val=np.arange((ny-1)))
         self.add_output('CDw', val=0.)
 
-        self.declare_partials('CDw', '*')
-        self.set_check_partial_options(wrt='*', method='cs', step=1e-50)
+        # Without wave drag CDw is always 0, so it has no nonzero partials
+        if self.with_wave:
+            self.declare_partials('CDw', '*')
+            self.set_check_partial_options(wrt='*', method='cs', step=1e-50)
 
     def compute(self, inputs, outputs):
         if self.with_wave:
@@ -133,11 +135,14 @@ class WaveDrag(ExplicitComponent):
                                            + dCDwdMDD * dMDDdtoc * np.matmul(dtocdc, dcdchords)
                 partials['CDw', 't_over_c'] = dCDwdMDD * dMDDdtoc * dtocavgdtoc
 
+                if self.surface['symmetry']:
+                    partials['CDw', 'CL'][0, :] *=  2
+                    partials['CDw', 'widths'][0, :] *= 2
+                    partials['CDw', 'cos_sweep'][0, :] *=  2
+                    partials['CDw', 'M'][0, :] *=  2
+                    partials['CDw', 'chords'][0, :] *=  2
+                    partials['CDw', 't_over_c'][0, :] *=  2
 
-        if self.surface['symmetry']:
-            partials['CDw', 'CL'][0, :] *=  2
-            partials['CDw', 'widths'][0, :] *= 2
-            partials['CDw', 'cos_sweep'][0, :] *=  2
-            partials['CDw', 'M'][0, :] *=  2
-            partials['CDw', 'chords'][0, :] *=  2
-            partials['CDw', 't_over_c'][0, :] *=  2
+            else:
+                for name in ['M', 'CL', 'widths', 'cos_sweep', 'chords', 't_over_c']:
+                    partials['CDw', name] = 0.
@@ -0,0 +1,94 @@
+"""
+Time the assembly of the element and global stiffness matrices, along
+with their partials, for a range of spanwise mesh sizes.
+
+Run this file directly to print a table of the timings, for example:
+
+    python benchmark_stiffness_assembly.py 11 51 101 201
+"""
+from __future__ import print_function, division
+import sys
+import timeit
+
+import numpy as np
+
+from openmdao.api import Problem, IndepVarComp
+
+from openaerostruct.geometry.utils import generate_mesh
+from openaerostruct.structures.local_stiff import LocalStiff
+from openaerostruct.structures.global_stiff import GlobalStiff
+
+
+def get_surface(ny, sparse_fem=False):
+    """
+    Get a minimal structural surface with ny spanwise nodes.
+    """
+    mesh = generate_mesh({'num_y' : 2 * ny - 1,
+                          'num_x' : 2,
+                          'wing_type' : 'rect',
+                          'symmetry' : True})
+
+    return {'name' : 'wing',
+            'mesh' : mesh,
+            'E' : 70.e9,
+            'G' : 30.e9,
+            'sparse_fem' : sparse_fem,
+            }
+
+
+def time_component(comp, inputs, num_repeats=10):
+    """
+    Get the setup time of a component along with the average time of its
+    compute and compute_partials calls.
+    """
+    indep_var_comp = IndepVarComp()
+    for name, val in inputs.items():
+        indep_var_comp.add_output(name, val=val)
+
+    prob = Problem()
+    prob.model.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
+    prob.model.add_subsystem('comp', comp, promotes=['*'])
+
+    setup_time = timeit.timeit(prob.setup, number=1)
+    prob.final_setup()
+
+    run_time = timeit.timeit(prob.model.comp.run_solve_nonlinear, number=num_repeats) / num_repeats
+    linearize_time = timeit.timeit(prob.model.comp.run_linearize, number=num_repeats) / num_repeats
+
+    return setup_time, run_time, linearize_time
+
+
+def run_benchmark(ny_list=(11, 21, 51, 101, 201), num_repeats=10):
+    """
+    Print the timings of LocalStiff and GlobalStiff (dense and sparse K)
+    for each number of spanwise nodes in ny_list.
+    """
+    print('{:>16} {:>5} {:>11} {:>11} {:>11}'.format(
+        'component', 'ny', 'setup [s]', 'run [s]', 'linearize [s]'))
+
+    np.random.seed(314)
+    for ny in ny_list:
+        props = {name : np.random.random_sample(ny - 1) + 0.5
+            for name in ['A', 'J', 'Iy', 'Iz', 'element_lengths']}
+        cases = [
+            ('LocalStiff', LocalStiff(surface=get_surface(ny)), props),
+        ]
+
+        stiff = {
+            'nodes' : np.random.random_sample((ny, 3)),
+            'local_stiff_transformed' : np.random.random_sample((ny - 1, 12, 12)),
+        }
+        for sparse_fem in [False, True]:
+            label = 'GlobalStiff' + (' (sp)' if sparse_fem else '')
+            cases.append((label, GlobalStiff(surface=get_surface(ny, sparse_fem)), stiff))
+
+        for label, comp, inputs in cases:
+            timings = time_component(comp, inputs, num_repeats)
+            print('{:>16} {:>5} {:>11.2e} {:>11.2e} {:>11.2e}'.format(label, ny, *timings))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run_benchmark([int(arg) for arg in sys.argv[1:]])
+    else:
+        run_benchmark()
@@ -0,0 +1,154 @@
+"""
+Time the linearization of the wingbox components with their analytic
+partials against approximating the same partials with the complex-step
+or finite-difference methods they used before, for a range of spanwise
+mesh sizes.
+
+The approximated versions use the current (vectorized) compute methods,
+so their timings are a lower bound on those of the original components.
+
+Run this file directly to print a table of the timings, for example:
+
+    python benchmark_wingbox_partials.py 11 51 101
+"""
+from __future__ import print_function, division
+import sys
+import timeit
+
+import numpy as np
+
+from openmdao.api import Problem, IndepVarComp
+
+from openaerostruct.geometry.utils import generate_mesh
+from openaerostruct.structures.wingbox_geometry import WingboxGeometry
+from openaerostruct.structures.section_properties_wingbox import SectionPropertiesWingbox
+from openaerostruct.structures.vonmises_wingbox import VonMisesWingbox
+from openaerostruct.structures.fuel_vol import WingboxFuelVol
+from openaerostruct.structures.fuel_loads import FuelLoads
+from openaerostruct.structures.wingbox_fuel_vol_delta import WingboxFuelVolDelta
+from openaerostruct.structures.spar_within_wing import SparWithinWing
+
+
+def get_surface(ny):
+    """
+    Get a wingbox surface with ny spanwise nodes and a NACA 0012 section
+    between 10% and 60% of the chord.
+    """
+    mesh = generate_mesh({'num_y' : 2 * ny - 1,
+                          'num_x' : 2,
+                          'wing_type' : 'rect',
+                          'symmetry' : True})
+
+    # Twist the wing so the twist angles are away from their kink at zero
+    mesh[-1, :, 2] -= np.linspace(0.05, 0.1, ny)
+
+    x = np.linspace(0.1, 0.6, 51)
+    y = 0.6 * (0.2969 * np.sqrt(x) - 0.126 * x - 0.3516 * x**2 + 0.2843 * x**3 - 0.1015 * x**4)
+
+    return {'name' : 'wing',
+            'mesh' : mesh,
+            'symmetry' : True,
+            'data_x_upper' : x.astype(complex),
+            'data_x_lower' : x.astype(complex),
+            'data_y_upper' : y.astype(complex),
+            'data_y_lower' : -y.astype(complex),
+            'original_wingbox_airfoil_t_over_c' : 0.12,
+            'strength_factor_for_upper_skin' : 1.,
+            'E' : 73.1e9,
+            'G' : 73.1e9 / 2 / 1.33,
+            'fuel_density' : 803.,
+            'Wf_reserve' : 15000.,
+            }
+
+
+def get_approximated(comp_class, method):
+    """
+    Get a subclass of comp_class that approximates all of its partials
+    with the given method instead of computing them.
+    """
+    class Approximated(comp_class):
+
+        def setup(self):
+            super(Approximated, self).setup()
+            self.declare_partials('*', '*', method=method)
+
+        def compute_partials(self, inputs, partials):
+            pass
+
+    return Approximated
+
+
+def time_component(comp, inputs, num_repeats=10):
+    """
+    Get the average time of the compute and linearize calls of a component.
+    """
+    indep_var_comp = IndepVarComp()
+    for name, val in inputs.items():
+        indep_var_comp.add_output(name, val=val)
+
+    prob = Problem()
+    prob.model.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
+    prob.model.add_subsystem('comp', comp, promotes=['*'])
+
+    prob.setup(force_alloc_complex=True)
+    prob.final_setup()
+
+    run_time = timeit.timeit(prob.model.comp.run_solve_nonlinear, number=num_repeats) / num_repeats
+    linearize_time = timeit.timeit(prob.model.comp.run_linearize, number=num_repeats) / num_repeats
+
+    return run_time, linearize_time
+
+
+def run_benchmark(ny_list=(11, 21, 51, 101), num_repeats=10):
+    """
+    Print the timings of each wingbox component with analytic and
+    approximated partials for each number of spanwise nodes in ny_list.
+    """
+    print('{:>30} {:>5} {:>11} {:>13} {:>13} {:>8}'.format(
+        'component', 'ny', 'run [s]', 'lin. old [s]', 'lin. new [s]', 'speedup'))
+
+    np.random.seed(314)
+    for ny in ny_list:
+        surface = get_surface(ny)
+        mesh = surface['mesh']
+
+        elem = lambda: np.random.random_sample(ny - 1)
+        nodes = 0.35 * mesh[0] + 0.65 * mesh[-1]
+
+        cases = [
+            (WingboxGeometry, 'fd', {'mesh' : mesh}),
+            (SectionPropertiesWingbox, 'cs', {
+                'streamwise_chords' : elem() + 1., 'fem_chords' : elem() + 1.,
+                'fem_twists' : elem(), 'spar_thickness' : 0.01 * (elem() + 1.),
+                'skin_thickness' : 0.01 * (elem() + 1.), 't_over_c' : 0.1 * (elem() + 1.)}),
+            (VonMisesWingbox, 'cs', {
+                'nodes' : nodes, 'disp' : 0.01 * np.random.random_sample((ny, 6)),
+                'Qz' : 0.01 * (elem() + 1.), 'Iz' : 0.01 * (elem() + 1.),
+                'J' : 0.01 * (elem() + 1.), 'A_enc' : elem() + 1.,
+                'spar_thickness' : 0.01 * (elem() + 1.), 'skin_thickness' : 0.01 * (elem() + 1.),
+                'htop' : 0.1 * (elem() + 1.), 'hbottom' : 0.1 * (elem() + 1.),
+                'hfront' : 0.1 * (elem() + 1.), 'hrear' : 0.1 * (elem() + 1.)}),
+            (WingboxFuelVol, 'cs', {'nodes' : nodes, 'A_int' : elem() + 1.}),
+            (FuelLoads, 'cs', {
+                'fuel_vols' : elem() + 1., 'nodes' : nodes,
+                'fuel_mass' : 1.e4, 'load_factor' : 2.5}),
+            (WingboxFuelVolDelta, 'cs', {'fuelburn' : 1.e4, 'fuel_vols' : elem() + 1.}),
+            (SparWithinWing, 'cs', {
+                'mesh' : mesh, 'radius' : 0.1 * elem(), 't_over_c' : 0.1 * (elem() + 1.)}),
+        ]
+
+        for comp_class, method, inputs in cases:
+            run_time, new_time = time_component(comp_class(surface=surface), inputs, num_repeats)
+            _, old_time = time_component(get_approximated(comp_class, method)(surface=surface),
+                inputs, num_repeats)
+
+            label = '{} ({})'.format(comp_class.__name__, method)
+            print('{:>30} {:>5} {:>11.2e} {:>13.2e} {:>13.2e} {:>8.1f}'.format(
+                label, ny, run_time, old_time, new_time, old_time / new_time))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run_benchmark([int(arg) for arg in sys.argv[1:]])
+    else:
+        run_benchmark()
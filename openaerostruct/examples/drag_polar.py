@@ -1,6 +1,8 @@
 
 from __future__ import division, print_function
 
+from functools import partial
+
 import numpy as np
 import matplotlib.pylab as plt
 
@@ -11,9 +13,11 @@ from openmdao.api import IndepVarComp, Problem, Group, NewtonSolver, BroydenSolv
 from openaerostruct.geometry.utils import generate_mesh
 from openaerostruct.geometry.geometry_group import Geometry
 from openaerostruct.aerodynamics.aero_groups import AeroPoint
+from openaerostruct.aerodynamics.multi_condition import sweep_aero_conditions
+from openaerostruct.integration.cached_point import CachedPoint
 
 
-def compute_drag_polar(Mach, alphas, surfaces, trimmed=False):
+def get_drag_polar_problem(Mach, surfaces, trimmed=False, cache_tol=None):
 
     if isinstance(surfaces, dict):
         surfaces = [surfaces,]
@@ -35,6 +39,11 @@ def compute_drag_polar(Mach, alphas, surfaces, trimmed=False):
         promotes=['*'])
 
 
+    # With a cache tolerance, the aero point is wrapped in a component that
+    # memoizes its results, whose inputs are named with ':' instead of '.'
+    sep = '.' if cache_tol is None else ':'
+    mesh_names = []
+
     for surface in surfaces:
         name = surface['name']
         # Create and add a group that handles the geometry for the
@@ -43,15 +52,22 @@ def compute_drag_polar(Mach, alphas, surfaces, trimmed=False):
         prob.model.add_subsystem(name, geom_group)
 
         # Connect the mesh from the geometry component to the analysis point
-        prob.model.connect(name + '.mesh', 'aero.' + name + '.def_mesh')
+        prob.model.connect(name + '.mesh', 'aero.' + name + sep + 'def_mesh')
         # Perform the connections with the modified names within the
         # 'aero_states' group.
-        prob.model.connect(name + '.mesh', 'aero.aero_states.' + name + '_def_mesh')
+        prob.model.connect(name + '.mesh', 'aero.aero_states' + sep + name + '_def_mesh')
+        mesh_names += [name + '.def_mesh', 'aero_states.' + name + '_def_mesh']
 
     # Create the aero point group, which contains the actual aerodynamic
-    # analyses
+    # analyses. The geometry is fixed over the polar, so the vortex rings of
+    # the AIC matrices are cached between the angles of attack.
     point_name = 'aero'
-    aero_group = AeroPoint(surfaces=surfaces)
+    if cache_tol is None:
+        aero_group = AeroPoint(surfaces=surfaces, cache_rings=True)
+    else:
+        aero_group = CachedPoint(point_factory=partial(AeroPoint, surfaces=surfaces,
+            cache_rings=True),
+            input_names=['v', 'alpha', 'M', 're', 'rho', 'cg'] + mesh_names, tol=cache_tol)
     prob.model.add_subsystem(point_name, aero_group,
         promotes_inputs=['v', 'alpha', 'M', 're', 'rho', 'cg'])
 
@@ -83,23 +99,27 @@ def compute_drag_polar(Mach, alphas, surfaces, trimmed=False):
 
     #prob['tail_rotation'] = -0.75
 
-    prob.run_model()
-    #prob.check_partials(compact_print = True)
-    #prob.model.list_outputs(prom_name = True)
+    return prob
+
 
-    prob.model.list_outputs(residuals = True)
+def compute_drag_polar(Mach, alphas, surfaces, trimmed=False, num_procs=None, cache_tol=None,
+                       filename=None):
+
+    if isinstance(surfaces, dict):
+        surfaces = [surfaces,]
 
-    CLs = []
-    CDs = []
-    CMs = []
+    # Run the angles of attack in a pool of processes, each with its own
+    # copy of the problem, in batches that reuse the parts of the analysis
+    # that do not change between them. The results are also written to
+    # filename, if given.
+    problem_factory = partial(get_drag_polar_problem, Mach, surfaces, trimmed,
+        cache_tol)
+    results = sweep_aero_conditions(problem_factory, {'alpha' : alphas}, 'aero',
+        num_procs=num_procs, filename=filename)
 
-    for a in alphas:
-        prob['alpha'] =  a
-        prob.run_model()
-        CLs.append(prob['aero.CL'][0])
-        CDs.append(prob['aero.CD'][0])
-        CMs.append(prob['aero.CM'][1]) # Take only the longitudinal CM
-        #print(a, prob['aero.CL'], prob['aero.CD'], prob['aero.CM'][1])
+    CLs = results['CL']
+    CDs = results['CD']
+    CMs = results['CM'][:, 1] # Take only the longitudinal CM
 
     # Plot CL vs alpha and drag polar
     fig,axes =  plt.subplots(nrows=3)
@@ -150,6 +170,7 @@ if __name__=='__main__':
                 'c_max_t' : .303,       # chordwise location of maximum (NACA0015)
                                         # thickness
                 'with_viscous' : True,  # if true, compute viscous drag
+                'with_wave' : False,     # if true, compute wave drag
                 }
 
     # Create a dictionary to store options about the tail surface
@@ -191,6 +212,7 @@ if __name__=='__main__':
                 'c_max_t' : .303,       # chordwise location of maximum (NACA0015)
                                         # thickness
                 'with_viscous' : True,  # if true, compute viscous drag
+                'with_wave' : False,     # if true, compute wave drag
                 }
 
     surfaces = [wing_surface, tail_surface]
@@ -199,4 +221,5 @@ if __name__=='__main__':
     alphas = np.linspace(-10, 15, 25)
     #alphas = [0.]
 
-    CL, CD, CM = compute_drag_polar(Mach, alphas, surfaces, trimmed = True)
+    CL, CD, CM = compute_drag_polar(Mach, alphas, surfaces, trimmed = True, cache_tol = 0.,
+        filename = 'drag_polar.dat')
@@ -13,6 +13,9 @@
 # directory as 'python plot_wing_wb_mpt.py aerostruct.db' to vizualize the results.
 # This script is based on the plot_wing.py script. It's still a bit hacky and will
 # probably not work as it is for other types of cases for now.
+# For long optimizations, run 'export_history aerostruct.db' first and view the
+# 'aerostruct_history' directory it writes with 'plot_wingbox aerostruct_history',
+# so the recorded cases are not decoded again each time.
 #
 # Also note that there will be some slight differences between the results from
 # this script and the results in the paper because those results were from an
@@ -3,6 +3,8 @@ import numpy as np
 
 from openmdao.api import ExplicitComponent
 
+from openaerostruct.utils.vector_algebra import skew_rows, skew_cols, skew_comps, skew_signs
+
 
 class MomentCoefficient(ExplicitComponent):
     """
@@ -40,17 +42,49 @@ class MomentCoefficient(ExplicitComponent):
         self.options.declare('surfaces', types=list)
 
     def setup(self):
-        for surface in self.options['surfaces']:
+        surfaces = self.options['surfaces']
+
+        # The panels of all the surfaces are stacked so the moment arms and
+        # cross products are computed in one pass. panel_offsets marks where
+        # each surface's panels start in the stacked arrays.
+        num_panels = [(surface['mesh'].shape[0] - 1) * (surface['mesh'].shape[1] - 1)
+                      for surface in surfaces]
+        self.panel_offsets = np.concatenate(([0], np.cumsum(num_panels)))
+
+        # Symmetric surfaces only contribute twice their y-direction moment
+        self.sym_factors = np.ones((len(surfaces), 3))
+        self.cross_masks = []
+
+        for j, surface in enumerate(surfaces):
             name = surface['name']
             nx = surface['mesh'].shape[0]
             ny = surface['mesh'].shape[1]
 
+            if surface['symmetry']:
+                self.sym_factors[j] = [0., 2., 0.]
+
             self.add_input(name + '_b_pts', val=np.ones((nx-1, ny, 3)), units='m')
             self.add_input(name + '_widths', val=np.ones((ny-1)), units='m')
             self.add_input(name + '_chords', val=np.ones((ny)), units='m')
             self.add_input(name + '_S_ref', val=1., units='m**2')
             self.add_input(name + '_sec_forces', val=np.ones((nx-1, ny-1, 3)), units='N')
 
+            # Each component of a force or moment arm only enters the other
+            # two components of the moment, and the x- and z-direction
+            # moments of symmetric surfaces are zero.
+            mask = self.sym_factors[j, skew_rows] != 0.
+            self.cross_masks.append(mask)
+
+            for var, num_pts in [('_sec_forces', (nx-1) * (ny-1)),
+                                 ('_b_pts', (nx-1) * ny)]:
+                rows = np.tile(skew_rows[mask], num_pts)
+                cols = np.add.outer(3 * np.arange(num_pts), skew_cols[mask]).flatten()
+                self.declare_partials('CM', name + var, rows=rows, cols=cols)
+
+            self.declare_partials('CM', name + '_widths')
+            self.declare_partials('CM', name + '_chords')
+            self.declare_partials('CM', name + '_S_ref')
+
         self.add_input('cg', val=np.ones((3)), units='m')
         self.add_input('v', val=10., units='m/s')
         self.add_input('rho', val=3., units='kg/m**3')
@@ -58,61 +92,64 @@ class MomentCoefficient(ExplicitComponent):
 
         self.add_output('CM', val=np.ones((3)))
 
-        self.declare_partials(of='*', wrt='*')
+        self.declare_partials('CM', 'cg', rows=skew_rows, cols=skew_cols)
+        self.declare_partials('CM', ['v', 'rho', 'S_ref_total'])
 
-    def compute(self, inputs, outputs):
-        cg = inputs['cg']
+    def _stack_surfaces(self, inputs):
+        """
+        Gather the moment arms and section forces of all the panels, along
+        with the mean aerodynamic chord (MAC) of each surface.
+        """
+        surfaces = self.options['surfaces']
 
-        M = np.zeros((3))
+        pts = []
+        forces = []
+        MACs = np.empty(len(surfaces), dtype=inputs['cg'].dtype)
 
-        # Loop through each surface and find its contributions to the moment
-        # of the aircraft based on the section forces and their location
-        for j, surface in enumerate(self.options['surfaces']):
+        for j, surface in enumerate(surfaces):
             name = surface['name']
-            nx = surface['mesh'].shape[0]
-            ny = surface['mesh'].shape[1]
 
             b_pts = inputs[name + '_b_pts']
             widths = inputs[name + '_widths']
             chords = inputs[name + '_chords']
             S_ref = inputs[name + '_S_ref']
-            sec_forces = inputs[name + '_sec_forces']
 
             # Compute the average chord for each panel and then the
             # mean aerodynamic chord (MAC) based on these chords and the
             # computed area
             panel_chords = (chords[1:] + chords[:-1]) * 0.5
-            MAC = 1. / S_ref * np.sum(panel_chords**2 * widths)
+            MACs[j] = 1. / S_ref * np.sum(panel_chords**2 * widths)
 
             # If the surface is symmetric, then the previously computed MAC
             # is half what it should be
             if surface['symmetry']:
-                MAC *= 2.0
+                MACs[j] *= 2.0
 
-            # Get the moment arm acting on each panel, relative to the cg
-            pts = (b_pts[:, 1:, :] + b_pts[:, :-1, :]) * 0.5
-            diff = (pts - cg)
+            # Get the location of each panel, where the force acts
+            pts.append(((b_pts[:, 1:, :] + b_pts[:, :-1, :]) * 0.5).reshape(-1, 3))
+            forces.append(inputs[name + '_sec_forces'].reshape(-1, 3))
 
-            # Compute the moment based on the previously computed moment
-            # arm and the section forces
-            moment = np.sum(np.cross(diff, sec_forces, axis=2), axis=0)
+        # Get the moment arm acting on each panel, relative to the cg
+        diff = np.concatenate(pts) - inputs['cg']
+        forces = np.concatenate(forces)
 
-            # If the surface is symmetric, set the x- and z-direction moments
-            # to 0 and double the y-direction moment
-            if surface['symmetry']:
-                moment[:, 0] = 0.
-                moment[:, 1] *= 2.0
-                moment[:, 2] = 0.
+        return diff, forces, MACs
 
-            # Note: a scalar can be factored from a cross product, so I moved the division by MAC
-            # down here for efficiency of calc and derivs.
-            M = M + np.sum(moment, axis=0) / MAC
+    def compute(self, inputs, outputs):
+        diff, forces, MACs = self._stack_surfaces(inputs)
 
-            # For the first (main) lifting surface, we save the MAC to correctly
-            # normalize CM
-            if j == 0:
-                self.MAC_wing = MAC
+        # Compute the moment of each surface based on the moment arms and
+        # the section forces of its panels
+        moments = np.add.reduceat(np.cross(diff, forces), self.panel_offsets[:-1], axis=0)
+        moments *= self.sym_factors
 
+        # Note: a scalar can be factored from a cross product, so I moved the division by MAC
+        # down here for efficiency of calc and derivs.
+        M = np.sum(moments / MACs[:, np.newaxis], axis=0)
+
+        # For the first (main) lifting surface, we save the MAC to correctly
+        # normalize CM
+        self.MAC_wing = MACs[0]
         self.M = M
 
         # Compute the normalized CM
@@ -120,14 +157,16 @@ class MomentCoefficient(ExplicitComponent):
         outputs['CM'] = M / (0.5 * rho * inputs['v']**2 * inputs['S_ref_total'] * self.MAC_wing)
 
     def compute_partials(self, inputs, partials):
-        cg = inputs['cg']
         rho = inputs['rho']
         S_ref_total = inputs['S_ref_total']
         v = inputs['v']
 
-        # Cached values
-        M = self.M
-        MAC_wing = self.MAC_wing
+        diff, forces, MACs = self._stack_surfaces(inputs)
+
+        moments = np.add.reduceat(np.cross(diff, forces), self.panel_offsets[:-1], axis=0)
+        moments *= self.sym_factors
+        M = np.sum(moments / MACs[:, np.newaxis], axis=0)
+        MAC_wing = MACs[0]
 
         fact = 1.0 / (0.5 * rho * v**2 * S_ref_total * MAC_wing)
 
@@ -135,7 +174,12 @@ class MomentCoefficient(ExplicitComponent):
         partials['CM', 'v'] = -M * fact**2 * rho * v * S_ref_total * MAC_wing
         partials['CM', 'S_ref_total'] = -M * fact**2 * 0.5 * rho * v**2 * MAC_wing
 
-        partials['CM', 'cg'][:] = 0.0
+        # The moment arms depend on the cg through the summed section forces
+        # of each surface
+        force_sums = np.add.reduceat(forces, self.panel_offsets[:-1], axis=0)
+        partials['CM', 'cg'] = fact * np.sum(
+            self.sym_factors[:, skew_rows] / MACs[:, np.newaxis] *
+            skew_signs * force_sums[:, skew_comps], axis=0)
 
         # Loop through each surface.
         for j, surface in enumerate(self.options['surfaces']):
@@ -143,86 +187,46 @@ class MomentCoefficient(ExplicitComponent):
             nx = surface['mesh'].shape[0]
             ny = surface['mesh'].shape[1]
 
-            partials['CM', name + '_sec_forces'][:] = 0.0
-            partials['CM', name + '_b_pts'][:] = 0.0
-
-            b_pts = inputs[name + '_b_pts']
             widths = inputs[name + '_widths']
             chords = inputs[name + '_chords']
             S_ref = inputs[name + '_S_ref']
-            sec_forces = inputs[name + '_sec_forces']
+
+            MAC = MACs[j]
+            mask = self.cross_masks[j]
+            start, end = self.panel_offsets[j:j+2]
+
+            # The derivatives of a x b are the skew matrix of a wrt b and
+            # minus the skew matrix of b wrt a
+            scale = self.sym_factors[j, skew_rows[mask]] * skew_signs[mask] * fact / MAC
+            comps = skew_comps[mask]
+
+            partials['CM', name + '_sec_forces'] = (diff[start:end, comps] * scale).flatten()
+
+            # Each bound point is shared by the panels on either side of it,
+            # so it sees half of the force of both
+            sec_forces = forces[start:end].reshape(nx-1, ny-1, 3)
+            node_forces = np.zeros((nx-1, ny, 3), dtype=sec_forces.dtype)
+            node_forces[:, :-1, :] += 0.5 * sec_forces
+            node_forces[:, 1:, :] += 0.5 * sec_forces
+
+            partials['CM', name + '_b_pts'] = -(node_forces.reshape(-1, 3)[:, comps] * scale).flatten()
 
             # MAC derivs
             panel_chords = (chords[1:] + chords[:-1]) * 0.5
-            MAC = 1. / S_ref * np.sum(panel_chords**2 * widths)
 
-            # This transformation is used for multiple derivatives
-            dpc_dc = np.zeros((ny-1, ny))
-            idx = np.arange(ny-1)
-            dpc_dc[idx, idx] = 0.5
-            dpc_dc[idx, idx+1] = 0.5
-
-            dMAC_dc = (2.0 / S_ref) * np.einsum('i,ij', panel_chords * widths, dpc_dc)
+            dMAC_dc = np.zeros(ny, dtype=panel_chords.dtype)
+            dMAC_dc[:-1] += (1.0 / S_ref) * panel_chords * widths
+            dMAC_dc[1:] += (1.0 / S_ref) * panel_chords * widths
             dMAC_dw = (1.0 / S_ref) * panel_chords**2
             dMAC_dS = -MAC / S_ref
 
-            # If the surface is symmetric, then the previously computed MAC
-            # is half what it should be
+            # If the surface is symmetric, then MAC is already doubled, so
+            # dMAC_dS is too
             if surface['symmetry']:
-                MAC *= 2.0
                 dMAC_dc *= 2.0
                 dMAC_dw *= 2.0
-                dMAC_dS *= 2.0
-
-            # diff derivs
-            pts = (b_pts[:, 1:, :] + b_pts[:, :-1, :]) * 0.5
-            diff = (pts - cg)
-
-            c = np.cross(diff, sec_forces, axis=2)
-            moment = np.sum(c, axis=0)
-
-            dcda = np.zeros((3, nx-1, ny-1, 3))
-            dcda[0, :, :, 1] = sec_forces[:, :, 2]
-            dcda[0, :, :, 2] = -sec_forces[:, :, 1]
-            dcda[1, :, :, 0] = -sec_forces[:, :, 2]
-            dcda[1, :, :, 2] = sec_forces[:, :, 0]
-            dcda[2, :, :, 0] = sec_forces[:, :, 1]
-            dcda[2, :, :, 1] = -sec_forces[:, :, 0]
-
-            dcdb = np.zeros((3, nx-1, ny-1, 3))
-            dcdb[0, :, :, 1] = -diff[:, :, 2]
-            dcdb[0, :, :, 2] = diff[:, :, 1]
-            dcdb[1, :, :, 0] = diff[:, :, 2]
-            dcdb[1, :, :, 2] = -diff[:, :, 0]
-            dcdb[2, :, :, 0] = -diff[:, :, 1]
-            dcdb[2, :, :, 1] = diff[:, :, 0]
 
-            partials['CM', name + '_sec_forces'] += dcdb.reshape((3, 3*(nx-1)*(ny-1))) * fact / MAC
-
-            dc_dchord = np.einsum('ijkl,km->ijml', dcda, dpc_dc)
-            partials['CM', name + '_b_pts'] += dc_dchord.reshape((3, 3*(nx-1)*ny)) * fact / MAC
-
-            dcda = np.einsum('ijkl->il', dcda)
-
-            # If the surface is symmetric, set the x- and z-direction moments
-            # to 0 and double the y-direction moment
-            if surface['symmetry']:
-                moment[:, 0] = 0.
-                moment[:, 1] *= 2.0
-                moment[:, 2] = 0.
-                partials['CM', name + '_sec_forces'][0, :] = 0.
-                partials['CM', name + '_sec_forces'][1, :] *= 2.0
-                partials['CM', name + '_sec_forces'][2, :] = 0.
-                partials['CM', name + '_b_pts'][0, :] = 0.
-                partials['CM', name + '_b_pts'][1, :] *= 2.0
-                partials['CM', name + '_b_pts'][2, :] = 0.
-                dcda[0, :] = 0.
-                dcda[1, :] *= 2.0
-                dcda[2, :] = 0.
-
-            partials['CM', 'cg'] -= dcda * fact / MAC
-
-            M_j = np.sum(moment, axis=0)
+            M_j = moments[j]
             term = fact / MAC**2
             partials['CM', name + '_chords'] = -np.outer(M_j * term, dMAC_dc)
             partials['CM', name + '_widths'] = -np.outer(M_j * term, dMAC_dw)
@@ -24,6 +24,21 @@ class Test(unittest.TestCase):
 
         run_test(self, comp)
 
+    def test_sparsity(self):
+        # The declared sparsity has to hold whichever surfaces are symmetric
+        wing_dict = {'name' : 'wing',
+                     'mesh': np.zeros((3,7)),
+                     'symmetry' : False}
+        tail_dict = {'name' : 'tail',
+                     'mesh': np.zeros((2,5)),
+                     'symmetry' : True}
+
+        surfaces = [wing_dict, tail_dict]
+
+        comp = MomentCoefficient(surfaces=surfaces)
+
+        run_test(self, comp, complex_flag=True, method='cs')
+
     # This is known to have some issues for sufficiently small values of S_ref_total
     # There is probably a derivative bug somewhere in the moment_coefficient.py calcs
     def test2(self):
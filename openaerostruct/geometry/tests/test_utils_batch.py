@@ -0,0 +1,80 @@
+from __future__ import print_function, division
+import unittest
+
+import numpy as np
+
+from openaerostruct.geometry.utils import generate_mesh, gen_crm_mesh, transform_meshes, \
+    taper, scale_x, sweep, shear_x, stretch, shear_y, dihedral, shear_z, rotate
+
+
+class Test(unittest.TestCase):
+
+    def test_transform_meshes(self):
+        np.random.seed(314)
+        num_meshes = 4
+
+        for symmetry in [True, False]:
+            mesh, _ = generate_mesh({'num_y' : 7, 'num_x' : 3, 'wing_type' : 'CRM',
+                                     'symmetry' : symmetry, 'num_twist_cp' : 5})
+            ny = mesh.shape[1]
+
+            design = {
+                'taper_ratio' : np.random.random(num_meshes) * 0.5 + 0.3,
+                'chord' : np.random.random((num_meshes, ny)) + 0.5,
+                'sweep_angle' : np.random.random(num_meshes) * 30.,
+                'xshear' : np.random.random((num_meshes, ny)),
+                'span' : np.random.random(num_meshes) * 20. + 50.,
+                'yshear' : np.random.random((num_meshes, ny)) * 0.1,
+                'dihedral_angle' : np.random.random(num_meshes) * 5.,
+                'zshear' : np.random.random((num_meshes, ny)),
+                'twist' : np.random.random((num_meshes, ny)) * 5.,
+            }
+
+            meshes = transform_meshes(mesh, symmetry, **design)
+            self.assertEqual(meshes.shape, (num_meshes,) + mesh.shape)
+
+            # Compare against transforming each mesh on its own
+            for i in range(num_meshes):
+                ref_mesh = mesh.copy()
+                taper(ref_mesh, design['taper_ratio'][i], symmetry)
+                scale_x(ref_mesh, design['chord'][i])
+                sweep(ref_mesh, design['sweep_angle'][i], symmetry)
+                shear_x(ref_mesh, design['xshear'][i])
+                stretch(ref_mesh, design['span'][i], symmetry)
+                shear_y(ref_mesh, design['yshear'][i])
+                dihedral(ref_mesh, design['dihedral_angle'][i], symmetry)
+                shear_z(ref_mesh, design['zshear'][i])
+                rotate(ref_mesh, design['twist'][i], symmetry)
+
+                np.testing.assert_allclose(meshes[i], ref_mesh, rtol=1e-12, atol=1e-12)
+
+    def test_single_mesh_array_values(self):
+        # OpenMDAO gives scalar design variables as arrays of shape (1,)
+        for symmetry in [True, False]:
+            mesh, _ = generate_mesh({'num_y' : 7, 'num_x' : 3, 'wing_type' : 'CRM',
+                                     'symmetry' : symmetry, 'num_twist_cp' : 5})
+
+            for func, value in [(taper, 0.4), (sweep, 20.), (stretch, 60.), (dihedral, 3.)]:
+                ref_mesh = mesh.copy()
+                func(ref_mesh, value, symmetry)
+
+                array_mesh = mesh.copy()
+                func(array_mesh, np.array([value]), symmetry)
+
+                self.assertEqual(array_mesh.shape, mesh.shape)
+                np.testing.assert_allclose(array_mesh, ref_mesh, rtol=1e-12, atol=1e-12)
+
+    def test_gen_crm_mesh(self):
+        span_cos_spacing = np.array([0., 0.5, 1.])
+        chord_cos_spacing = np.array([0., 0.7, 0.2])
+
+        meshes, _, _ = gen_crm_mesh(5, 11, span_cos_spacing, chord_cos_spacing)
+        self.assertEqual(meshes.shape, (3, 5, 11, 3))
+
+        for i in range(3):
+            mesh, _, _ = gen_crm_mesh(5, 11, span_cos_spacing[i], chord_cos_spacing[i])
+            np.testing.assert_allclose(meshes[i], mesh, rtol=1e-12, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
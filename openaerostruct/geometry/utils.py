@@ -10,6 +10,10 @@ def rotate(mesh, theta_y, symmetry, rotate_x=True):
     """
     Compute rotation matrices given mesh and rotation angles in degrees.
 
+    Like the other mesh transformations here, this also works on a stack of
+    meshes, mesh[batch, nx, ny, 3], with a stack of design values, here
+    theta_y[batch, ny], transforming them all at once.
+
     Parameters
     ----------
     mesh[nx, ny, 3] : numpy array
@@ -28,55 +32,87 @@ def rotate(mesh, theta_y, symmetry, rotate_x=True):
         Nodal mesh defining the twisted aerodynamic surface.
 
     """
-    te = mesh[-1]
-    le = mesh[ 0]
+    te = mesh[..., -1, :, :]
+    le = mesh[..., 0, :, :]
     quarter_chord = 0.25 * te + 0.75 * le
 
-    nx, ny, _ = mesh.shape
+    nx, ny, _ = mesh.shape[-3:]
 
     if rotate_x:
         # Compute spanwise z displacements along quarter chord
         if symmetry:
-            dz_qc = quarter_chord[:-1,2] - quarter_chord[1:,2]
-            dy_qc = quarter_chord[:-1,1] - quarter_chord[1:,1]
+            dz_qc = quarter_chord[..., :-1, 2] - quarter_chord[..., 1:, 2]
+            dy_qc = quarter_chord[..., :-1, 1] - quarter_chord[..., 1:, 1]
             theta_x = np.arctan(dz_qc/dy_qc)
 
             # Prepend with 0 so that root is not rotated
-            rad_theta_x = np.append(theta_x, 0.0)
+            rad_theta_x = np.concatenate((theta_x, np.zeros(theta_x.shape[:-1] + (1,))),
+                                         axis=-1)
         else:
             root_index = int((ny - 1) / 2)
-            dz_qc_left = quarter_chord[:root_index,2] - quarter_chord[1:root_index+1,2]
-            dy_qc_left = quarter_chord[:root_index,1] - quarter_chord[1:root_index+1,1]
+            dz_qc_left = quarter_chord[..., :root_index, 2] - \
+                quarter_chord[..., 1:root_index+1, 2]
+            dy_qc_left = quarter_chord[..., :root_index, 1] - \
+                quarter_chord[..., 1:root_index+1, 1]
             theta_x_left = np.arctan(dz_qc_left/dy_qc_left)
-            dz_qc_right = quarter_chord[root_index+1:,2] - quarter_chord[root_index:-1,2]
-            dy_qc_right = quarter_chord[root_index+1:,1] - quarter_chord[root_index:-1,1]
+            dz_qc_right = quarter_chord[..., root_index+1:, 2] - \
+                quarter_chord[..., root_index:-1, 2]
+            dy_qc_right = quarter_chord[..., root_index+1:, 1] - \
+                quarter_chord[..., root_index:-1, 1]
             theta_x_right = np.arctan(dz_qc_right/dy_qc_right)
 
             # Concatenate thetas
-            rad_theta_x = np.concatenate((theta_x_left, np.zeros(1), theta_x_right))
+            rad_theta_x = np.concatenate((theta_x_left,
+                np.zeros(theta_x_left.shape[:-1] + (1,)), theta_x_right), axis=-1)
 
     else:
         rad_theta_x = 0.0
 
-    rad_theta_y = theta_y * np.pi / 180.
+    rad_theta_y = np.asarray(theta_y) * np.pi / 180.
 
-    mats = np.zeros((ny, 3, 3), dtype=type(rad_theta_y[0]))
+    batch_shape = np.broadcast(mesh[..., 0, :, 0], rad_theta_y).shape[:-1]
+    mats = np.zeros(batch_shape + (ny, 3, 3), dtype=rad_theta_y.dtype)
 
     cos_rtx = cos(rad_theta_x)
     cos_rty = cos(rad_theta_y)
     sin_rtx = sin(rad_theta_x)
     sin_rty = sin(rad_theta_y)
 
-    mats[:, 0, 0] = cos_rty
-    mats[:, 0, 2] = sin_rty
-    mats[:, 1, 0] = sin_rtx * sin_rty
-    mats[:, 1, 1] = cos_rtx
-    mats[:, 1, 2] = -sin_rtx * cos_rty
-    mats[:, 2, 0] = -cos_rtx * sin_rty
-    mats[:, 2, 1] = sin_rtx
-    mats[:, 2, 2] = cos_rtx*cos_rty
+    mats[..., 0, 0] = cos_rty
+    mats[..., 0, 2] = sin_rty
+    mats[..., 1, 0] = sin_rtx * sin_rty
+    mats[..., 1, 1] = cos_rtx
+    mats[..., 1, 2] = -sin_rtx * cos_rty
+    mats[..., 2, 0] = -cos_rtx * sin_rty
+    mats[..., 2, 1] = sin_rtx
+    mats[..., 2, 2] = cos_rtx*cos_rty
+
+    quarter_chord = quarter_chord[..., np.newaxis, :, :]
+    mesh[:] = np.einsum("...ikj, ...mij -> ...mik", mats, mesh - quarter_chord) + quarter_chord
+
 
-    mesh[:] = np.einsum("ikj, mij -> mik", mats, mesh - quarter_chord) + quarter_chord
+def _spanwise(values):
+    """
+    Get an array of spanwise design values, values[ny] or values[batch, ny],
+    in a shape that broadcasts against one coordinate of the mesh.
+    """
+    values = np.asarray(values)
+    if values.ndim == 0:
+        return values
+    return values[..., np.newaxis, :]
+
+
+def _per_mesh(values, mesh):
+    """
+    Get an array of scalar design values in a shape that broadcasts against
+    the spanwise arrays of the mesh. For a single mesh[nx, ny, 3], this is a
+    scalar or a size-1 array, as given by an OpenMDAO input; for a stack of
+    meshes, it is values[batch].
+    """
+    values = np.asarray(values)
+    if mesh.ndim == 3:
+        return values.reshape(())
+    return values[..., np.newaxis]
 
 
 def scale_x(mesh, chord_dist):
@@ -95,15 +131,12 @@ def scale_x(mesh, chord_dist):
     mesh[nx, ny, 3] : numpy array
         Nodal mesh with the new chord lengths.
     """
-    te = mesh[-1]
-    le = mesh[ 0]
+    te = mesh[..., -1, :, :]
+    le = mesh[..., 0, :, :]
     quarter_chord = 0.25 * te + 0.75 * le
+    qc_x = quarter_chord[..., np.newaxis, :, 0]
 
-    ny = mesh.shape[1]
-
-    for i in range(ny):
-        mesh[:, i, 0] = (mesh[:, i, 0] - quarter_chord[i, 0]) * chord_dist[i] + \
-            quarter_chord[i, 0]
+    mesh[..., 0] = (mesh[..., 0] - qc_x) * _spanwise(chord_dist) + qc_x
 
 def shear_x(mesh, xshear):
     """
@@ -121,7 +154,7 @@ def shear_x(mesh, xshear):
     mesh[nx, ny, 3] : numpy array
         Nodal mesh with the new chord lengths.
     """
-    mesh[:, :, 0] += xshear
+    mesh[..., 0] += _spanwise(xshear)
 
 def shear_y(mesh, yshear):
     """ Shear the wing in the y direction (distributed span).
@@ -138,7 +171,7 @@ def shear_y(mesh, yshear):
     mesh[nx, ny, 3] : numpy array
         Nodal mesh with the new span widths.
     """
-    mesh[:, :, 1] += yshear
+    mesh[..., 1] += _spanwise(yshear)
 
 def shear_z(mesh, zshear):
     """
@@ -156,7 +189,7 @@ def shear_z(mesh, zshear):
     mesh[nx, ny, 3] : numpy array
         Nodal mesh with the new chord lengths.
     """
-    mesh[:, :, 2] += zshear
+    mesh[..., 2] += _spanwise(zshear)
 
 def sweep(mesh, sweep_angle, symmetry):
     """
@@ -179,28 +212,28 @@ def sweep(mesh, sweep_angle, symmetry):
     """
 
     # Get the mesh parameters and desired sweep angle
-    num_x, num_y, _ = mesh.shape
-    le = mesh[0]
+    num_x, num_y, _ = mesh.shape[-3:]
+    le = mesh[..., 0, :, :]
     p180 = np.pi / 180
-    tan_theta = tan(p180*sweep_angle)
+    tan_theta = _per_mesh(tan(p180*np.asarray(sweep_angle)), mesh)
 
     # If symmetric, simply vary the x-coord based on the distance from the
     # center of the wing
     if symmetry:
-        y0 = le[-1, 1]
-        dx = -(le[:, 1] - y0) * tan_theta
+        y0 = le[..., -1, 1:2]
+        dx = -(le[..., 1] - y0) * tan_theta
 
     # Else, vary the x-coord on either side of the wing
     else:
         ny2 = (num_y - 1) // 2
-        y0 = le[ny2, 1]
+        y0 = le[..., ny2, 1:2]
 
-        dx_right = (le[ny2:, 1] - y0) * tan_theta
-        dx_left = -(le[:ny2, 1] - y0) * tan_theta
-        dx = np.hstack((dx_left, dx_right))
+        dx_right = (le[..., ny2:, 1] - y0) * tan_theta
+        dx_left = -(le[..., :ny2, 1] - y0) * tan_theta
+        dx = np.concatenate((dx_left, dx_right), axis=-1)
 
     # dx added spanwise.
-    mesh[:, :, 0] += dx
+    mesh[..., 0] += dx[..., np.newaxis, :]
 
 def dihedral(mesh, dihedral_angle, symmetry):
     """
@@ -223,26 +256,26 @@ def dihedral(mesh, dihedral_angle, symmetry):
     """
 
     # Get the mesh parameters and desired sweep angle
-    num_x, num_y, _ = mesh.shape
-    le = mesh[0]
+    num_x, num_y, _ = mesh.shape[-3:]
+    le = mesh[..., 0, :, :]
     p180 = np.pi / 180
-    tan_theta = tan(p180*dihedral_angle)
+    tan_theta = _per_mesh(tan(p180*np.asarray(dihedral_angle)), mesh)
 
     # If symmetric, simply vary the z-coord based on the distance from the
     # center of the wing
     if symmetry:
-        y0 = le[-1, 1]
-        dz = -(le[:, 1] - y0) * tan_theta
+        y0 = le[..., -1, 1:2]
+        dz = -(le[..., 1] - y0) * tan_theta
 
     else:
         ny2 = (num_y-1) // 2
-        y0 = le[ny2, 1]
-        dz_right = (le[ny2:, 1] - y0) * tan_theta
-        dz_left = -(le[:ny2, 1] - y0) * tan_theta
-        dz = np.hstack((dz_left, dz_right))
+        y0 = le[..., ny2, 1:2]
+        dz_right = (le[..., ny2:, 1] - y0) * tan_theta
+        dz_left = -(le[..., :ny2, 1] - y0) * tan_theta
+        dz = np.concatenate((dz_left, dz_right), axis=-1)
 
     # dz added spanwise.
-    mesh[:, :, 2] += dz
+    mesh[..., 2] += dz[..., np.newaxis, :]
 
 
 def stretch(mesh, span, symmetry):
@@ -266,20 +299,20 @@ def stretch(mesh, span, symmetry):
     """
 
     # Set the span along the quarter-chord line
-    le = mesh[0]
-    te = mesh[-1]
+    le = mesh[..., 0, :, :]
+    te = mesh[..., -1, :, :]
     quarter_chord = 0.25 * te + 0.75 * le
 
     # The user always deals with the full span, so if they input a specific
     # span value and have symmetry enabled, we divide this value by 2.
     if symmetry:
-        span /= 2.
+        span = span / 2.
 
     # Compute the previous span and determine the scalar needed to reach the
     # desired span
-    prev_span = quarter_chord[-1, 1] - quarter_chord[0, 1]
-    s = quarter_chord[:,1] / prev_span
-    mesh[:, :, 1] = s * span
+    prev_span = quarter_chord[..., -1, 1:2] - quarter_chord[..., 0, 1:2]
+    s = quarter_chord[..., 1] / prev_span
+    mesh[..., 1] = (s * _per_mesh(span, mesh))[..., np.newaxis, :]
 
 def taper(mesh, taper_ratio, symmetry):
     """
@@ -303,29 +336,91 @@ def taper(mesh, taper_ratio, symmetry):
     """
 
     # Get mesh parameters and the quarter-chord
-    le = mesh[0]
-    te = mesh[-1]
-    num_x, num_y, _ = mesh.shape
+    le = mesh[..., 0, :, :]
+    te = mesh[..., -1, :, :]
+    num_x, num_y, _ = mesh.shape[-3:]
     quarter_chord = 0.25 * te + 0.75 * le
-    x = quarter_chord[:, 1]
-    span = x[-1] - x[0]
+    x = quarter_chord[..., 1].real
+    span = x[..., -1:] - x[..., :1]
+    taper_ratio = _per_mesh(taper_ratio, mesh).real
 
     # If symmetric, solve for the correct taper ratio, which is a linear
-    # interpolation problem
+    # interpolation between the tip at -span and the root at 0, held
+    # constant outside of them like np.interp
     if symmetry:
-        xp = np.array([-span, 0.])
-        fp = np.array([taper_ratio, 1.])
+        taper = 1. + (1. - taper_ratio) * np.clip(x, -span, 0.) / span
 
     # Otherwise, we set up an interpolation problem for the entire wing, which
     # consists of two linear segments
     else:
-        xp = np.array([-span/2, 0., span/2])
-        fp = np.array([taper_ratio, 1., taper_ratio])
-
-    taper = np.interp(x.real, xp.real, fp.real)
+        taper = 1. - (1. - taper_ratio) * np.abs(np.clip(x, -span/2, span/2)) / (span/2)
 
     # Modify the mesh based on the taper amount computed per spanwise section
-    mesh[:] = np.einsum('ijk, j->ijk', mesh - quarter_chord, taper) + quarter_chord
+    quarter_chord = quarter_chord[..., np.newaxis, :, :]
+    mesh[:] = (mesh - quarter_chord) * taper[..., np.newaxis, :, np.newaxis] + quarter_chord
+
+
+def transform_meshes(mesh, symmetry, taper_ratio=None, chord=None, sweep_angle=None,
+                     xshear=None, span=None, yshear=None, dihedral_angle=None, zshear=None,
+                     twist=None, rotate_x=True):
+    """
+    Apply a stack of design vectors to a mesh and get the stack of
+    transformed meshes, e.g. for design-of-experiments studies.
+
+    The transformations are applied to all the meshes at once, in the order
+    used by `GeometryMesh`: taper, chord scaling, sweep, x shear, stretch,
+    y shear, dihedral, z shear, and twist. Transformations whose values are
+    None are skipped.
+
+    Parameters
+    ----------
+    mesh[nx, ny, 3] : numpy array
+        Nodal mesh defining the initial aerodynamic surface.
+    symmetry : boolean
+        Flag set to true if surface is reflected about y=0 plane.
+    taper_ratio, sweep_angle, span, dihedral_angle : numpy array or None
+        Scalar design variables, each an array with one value per mesh,
+        values[batch], or a scalar for all of them.
+    chord, xshear, yshear, zshear, twist : numpy array or None
+        Spanwise design variables, values[batch, ny], or values[ny] for all
+        the meshes.
+    rotate_x : boolean
+        Flag set to True if the twist is applied perpendicular to the wing.
+
+    Returns
+    -------
+    meshes[batch, nx, ny, 3] : numpy array
+        Transformed nodal meshes.
+    """
+    # Each transformation with its values, whether they are spanwise, and
+    # the rest of its arguments
+    transforms = [
+        (taper, taper_ratio, False, (symmetry,)),
+        (scale_x, chord, True, ()),
+        (sweep, sweep_angle, False, (symmetry,)),
+        (shear_x, xshear, True, ()),
+        (stretch, span, False, (symmetry,)),
+        (shear_y, yshear, True, ()),
+        (dihedral, dihedral_angle, False, (symmetry,)),
+        (shear_z, zshear, True, ()),
+        (rotate, twist, True, (symmetry, rotate_x)),
+    ]
+    transforms = [transform for transform in transforms if transform[1] is not None]
+
+    # Get the number of meshes from the leading dimensions of the values
+    batch_shape = ()
+    for func, values, spanwise, args in transforms:
+        shape = np.shape(values)[:-1] if spanwise else np.shape(values)
+        batch_shape = np.broadcast(np.empty(batch_shape), np.empty(shape)).shape
+    if len(batch_shape) > 1:
+        raise ValueError('The design values must have at most one batch dimension.')
+
+    meshes = np.array(np.broadcast_to(mesh, batch_shape + mesh.shape))
+
+    for func, values, spanwise, args in transforms:
+        func(meshes, values, *args)
+
+    return meshes
 
 
 def gen_rect_mesh(num_x, num_y, span, chord, span_cos_spacing=0., chord_cos_spacing=0.):
@@ -398,9 +493,8 @@ def gen_rect_mesh(num_x, num_y, span, chord, span_cos_spacing=0., chord_cos_spac
     if num_x <= 2:
         full_wing_x = np.array([0., chord])
 
-    for ind_x in range(num_x):
-        for ind_y in range(num_y):
-            mesh[ind_x, ind_y, :] = [full_wing_x[ind_x], full_wing[ind_y], 0]
+    mesh[:, :, 0] = full_wing_x[:, np.newaxis]
+    mesh[:, :, 1] = full_wing
 
     return mesh
 
@@ -419,16 +513,18 @@ def gen_crm_mesh(num_x, num_y, span_cos_spacing=0., chord_cos_spacing=0., wing_t
         Total wingspan.
     chord : float
         Root chord.
-    span_cos_spacing : float (optional)
+    span_cos_spacing : float or numpy array (optional)
         Blending ratio of uniform and cosine spacing in the spanwise direction.
         A value of 0. corresponds to uniform spacing and a value of 1.
         corresponds to regular cosine spacing. This increases the number of
-        spanwise node points near the wingtips.
-    chord_cos_spacing : float (optional)
+        spanwise node points near the wingtips. Given an array of ratios,
+        span_cos_spacing[batch], a stack of meshes is generated.
+    chord_cos_spacing : float or numpy array (optional)
         Blending ratio of uniform and cosine spacing in the chordwise direction.
         A value of 0. corresponds to uniform spacing and a value of 1.
         corresponds to regular cosine spacing. This increases the number of
-        chordwise node points near the wingtips.
+        chordwise node points near the wingtips. It may also be an array,
+        chord_cos_spacing[batch].
     wing_type : string (optional)
         Describes the desired CRM shape. Current options are:
         "CRM:jig" (undeformed jig shape),
@@ -438,7 +534,7 @@ def gen_crm_mesh(num_x, num_y, span_cos_spacing=0., chord_cos_spacing=0., wing_t
     -------
     mesh[nx, ny, 3] : numpy array
         Rectangular nodal mesh defining the final aerodynamic surface with the
-        specified parameters.
+        specified parameters, or mesh[batch, nx, ny, 3] for arrays of spacings.
     eta : numpy array
         Spanwise locations of the airfoil slices. Later used in the
         interpolation function to obtain correct twist values at
@@ -501,14 +597,18 @@ def gen_crm_mesh(num_x, num_y, span_cos_spacing=0., chord_cos_spacing=0., wing_t
 
     # Combine the two distrubtions using span_cos_spacing as the weighting factor.
     # span_cos_spacing == 1. is for fully cosine, 0. for uniform
+    span_cos_spacing = np.asarray(span_cos_spacing)[..., np.newaxis]
     lins = cosine * span_cos_spacing + (1 - span_cos_spacing) * uniform
 
     # Populate a mesh object with the desired num_y dimension based on
-    # interpolated values from the raw CRM points.
-    mesh = np.empty((2, ny2, 3))
-    for j in range(2):
-        for i in range(3):
-            mesh[j, :, i] = np.interp(lins[::-1], eta, raw_mesh[j, :, i].real)
+    # interpolated values from the raw CRM points. All the coordinates of
+    # both edges are interpolated at once with the weights of np.interp.
+    eta_new = lins[..., ::-1]
+    ind = np.clip(np.searchsorted(eta, eta_new, side='right') - 1, 0, len(eta) - 2)
+    w = np.clip((eta_new - eta[ind]) / (eta[ind + 1] - eta[ind]), 0., 1.)
+    w = w[..., np.newaxis, np.newaxis]
+    raw_points = raw_mesh.real.transpose(1, 0, 2)
+    mesh = np.swapaxes((1 - w) * raw_points[ind] + w * raw_points[ind + 1], -3, -2)
 
     # That is just one half of the mesh and we later expect the full mesh,
     # even if we're using symmetry == True.
@@ -530,25 +630,28 @@ def add_chordwise_panels(mesh, num_x, chord_cos_spacing):
     ----------
     mesh[nx, ny, 3] : numpy array
         Nodal mesh defining the initial aerodynamic surface with only
-        the leading and trailing edges defined.
+        the leading and trailing edges defined, or a stack of them,
+        mesh[batch, nx, ny, 3].
     num_x : float
         Desired number of chordwise node points for the final mesh.
-    chord_cos_spacing : float
+    chord_cos_spacing : float or numpy array
         Blending ratio of uniform and cosine spacing in the chordwise direction.
         A value of 0. corresponds to uniform spacing and a value of 1.
         corresponds to regular cosine spacing. This increases the number of
-        chordwise node points near the wingtips.
+        chordwise node points near the wingtips. It may be given for each
+        mesh of a stack, chord_cos_spacing[batch].
 
     Returns
     -------
     new_mesh[nx, ny, 3] : numpy array
         Nodal mesh defining the final aerodynamic surface with the
-        specified number of chordwise node points.
+        specified number of chordwise node points, with the same leading
+        batch dimension as mesh if it has one.
 
     """
 
     # Obtain mesh and num properties
-    num_y = mesh.shape[1]
+    num_y = mesh.shape[-2]
     ny2 = (num_y + 1) // 2
     nx2 = (num_x + 1) // 2
 
@@ -559,28 +662,28 @@ def add_chordwise_panels(mesh, num_x, chord_cos_spacing):
     cosine = .5 * np.cos(beta)  # cosine spacing
     uniform = np.linspace(0, .5, nx2)[::-1]  # uniform spacing
 
-    # Create half of the wing in the chordwise direction
-    half_wing = cosine * chord_cos_spacing + (1 - chord_cos_spacing) * uniform
+    chord_cos_spacing = np.asarray(chord_cos_spacing)[..., np.newaxis]
 
-    if chord_cos_spacing == 0.:
+    if np.all(chord_cos_spacing == 0.):
         full_wing_x = np.linspace(0, 1., num_x)
 
     else:
+        # Create half of the wing in the chordwise direction
+        half_wing = cosine * chord_cos_spacing + (1 - chord_cos_spacing) * uniform
+
         # Mirror this half wing into a full wing; offset by 0.5 so it goes 0 to 1
-        full_wing_x = np.hstack((-half_wing[:-1], half_wing[::-1])) + .5
+        full_wing_x = np.concatenate((-half_wing[..., :-1], half_wing[..., ::-1]), axis=-1) + .5
 
     # Obtain the leading and trailing edges
-    le = mesh[ 0, :, :]
-    te = mesh[-1, :, :]
-
-    # Create a new mesh with the desired num_x and set the leading and trailing edge values
-    new_mesh = np.zeros((num_x, num_y, 3))
-    new_mesh[ 0, :, :] = le
-    new_mesh[-1, :, :] = te
+    le = mesh[..., 0:1, :, :]
+    te = mesh[..., -1:, :, :]
 
-    for i in range(1, num_x-1):
-        w = full_wing_x[i]
-        new_mesh[i, :, :] = (1 - w) * le + w * te
+    # Create a new mesh with the desired num_x, interpolating between the
+    # leading and trailing edges, and set their values exactly
+    w = full_wing_x[..., np.newaxis, np.newaxis]
+    new_mesh = (1 - w) * le + w * te
+    new_mesh[..., 0, :, :] = le[..., 0, :, :]
+    new_mesh[..., -1, :, :] = te[..., 0, :, :]
 
     return new_mesh
 
@@ -861,7 +964,7 @@ def getFullMesh(left_mesh=None, right_mesh=None):
     Parameters
     ----------
     left_mesh[nx,ny,3] or right_mesh : numpy array
-        The half mesh to be mirrored.
+        The half mesh to be mirrored, or a stack of them, [batch,nx,ny,3].
 
     Returns
     -------
@@ -873,10 +976,10 @@ def getFullMesh(left_mesh=None, right_mesh=None):
     elif left_mesh is not None and right_mesh is not None:
         raise ValueError("Please only provide either left or right mesh, not both.")
     elif left_mesh is not None:
-        right_mesh = np.flip(left_mesh,axis=1).copy()
-        right_mesh[:,:,1] *= -1
+        right_mesh = np.flip(left_mesh,axis=-2).copy()
+        right_mesh[...,1] *= -1
     else:
-        left_mesh = np.flip(right_mesh,axis=1).copy()
-        left_mesh[:,:,1] *= -1
-    full_mesh = np.concatenate((left_mesh,right_mesh[:,1:,:]),axis=1)
+        left_mesh = np.flip(right_mesh,axis=-2).copy()
+        left_mesh[...,1] *= -1
+    full_mesh = np.concatenate((left_mesh,right_mesh[...,1:,:]),axis=-2)
     return full_mesh
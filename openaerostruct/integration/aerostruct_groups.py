@@ -12,8 +12,10 @@ from openaerostruct.transfer.load_transfer import LoadTransfer
 from openaerostruct.aerodynamics.states import VLMStates
 from openaerostruct.structures.tube_group import TubeGroup
 from openaerostruct.structures.wingbox_group import WingboxGroup
+from openaerostruct.integration.warm_start import WarmStartNonlinearBlockGS, WarmStartNewtonSolver
+from openaerostruct.integration.block_precon import BlockGSPreconditioner
 
-from openmdao.api import IndepVarComp, Problem, Group, NewtonSolver, ScipyIterativeSolver, LinearBlockGS, NonlinearBlockGS, DirectSolver, LinearBlockGS, LinearRunOnce, ExplicitComponent, PetscKSP
+from openmdao.api import IndepVarComp, Problem, Group, NewtonSolver, ScipyIterativeSolver, LinearBlockGS, NonlinearBlockGS, DirectSolver, LinearBlockGS, LinearRunOnce, ExplicitComponent, PetscKSP, ScipyKrylov
 
 
 class AerostructGeometry(Group):
@@ -135,6 +137,16 @@ class AerostructPoint(Group):
         self.options.declare('surfaces', types=list)
         self.options.declare('user_specified_Sref', types=bool, default=False)
         self.options.declare('internally_connect_fuelburn', types=bool, default=True)
+        self.options.declare('aic_chunk_size', default=None, types=int, allow_none=True)
+        self.options.declare('single_pass_aic', default=False, types=bool)
+        self.options.declare('aic_solver', default='lu', values=['lu', 'gmres', 'hmatrix'])
+        self.options.declare('warm_start', default=False, types=bool,
+            desc='Start each coupled solve from the stored converged state of the '
+            'nearest previously solved inputs')
+        self.options.declare('coupled_solver', default='nlbgs', values=['nlbgs', 'newton'],
+            desc='Solver preset for the coupled group: nonlinear block Gauss-Seidel '
+            'with a direct solver on the assembled Jacobian, or Newton with GMRES '
+            'preconditioned by the aerodynamic and structural solves')
 
     def setup(self):
         surfaces = self.options['surfaces']
@@ -198,7 +210,9 @@ class AerostructPoint(Group):
         # Add a single 'aero_states' component for the whole system within the
         # coupled group.
         coupled.add_subsystem('aero_states',
-            VLMStates(surfaces=surfaces),
+            VLMStates(surfaces=surfaces, aic_chunk_size=self.options['aic_chunk_size'],
+                single_pass_aic=self.options['single_pass_aic'],
+                aic_solver=self.options['aic_solver']),
             promotes_inputs=['v', 'alpha', 'rho'])
 
         # Explicitly connect parameters from each surface's group and the common
@@ -217,18 +231,43 @@ class AerostructPoint(Group):
         # coupled.linear_solver = ScipyIterativeSolver()
         # coupled.linear_solver.precon = LinearRunOnce()
 
-        coupled.nonlinear_solver = NonlinearBlockGS(use_aitken=True)
-        coupled.nonlinear_solver.options['maxiter'] = 50
-        coupled.nonlinear_solver.options['atol'] = 5e-6
-        coupled.nonlinear_solver.options['rtol'] = 1e-12
+        if self.options['coupled_solver'] == 'nlbgs':
+            if self.options['warm_start']:
+                coupled.nonlinear_solver = WarmStartNonlinearBlockGS(use_aitken=True)
+            else:
+                coupled.nonlinear_solver = NonlinearBlockGS(use_aitken=True)
+            coupled.nonlinear_solver.options['maxiter'] = 50
+            coupled.nonlinear_solver.options['atol'] = 5e-6
+            coupled.nonlinear_solver.options['rtol'] = 1e-12
+
+            # coupled.linear_solver = DirectSolver()
 
-        # coupled.linear_solver = DirectSolver()
+            coupled.linear_solver = DirectSolver(assemble_jac=True)
+            coupled.options['assembled_jac_type'] = 'csc'
 
-        coupled.linear_solver = DirectSolver(assemble_jac=True)
-        coupled.options['assembled_jac_type'] = 'csc'
+        else:
+            # Newton-Krylov: the coupled Jacobian is only applied through the
+            # components' partials and is never assembled. One block
+            # Gauss-Seidel pass, in which each discipline solves with its own
+            # factorization (the AIC LU in SolveMatrix and the stiffness LU in
+            # the FEM), preconditions GMRES.
+            if self.options['warm_start']:
+                coupled.nonlinear_solver = WarmStartNewtonSolver(solve_subsystems=True)
+            else:
+                coupled.nonlinear_solver = NewtonSolver(solve_subsystems=True)
+            coupled.nonlinear_solver.options['maxiter'] = 20
+            coupled.nonlinear_solver.options['atol'] = 5e-6
+            coupled.nonlinear_solver.options['rtol'] = 1e-12
+
+            # The tolerance is relative to the norm of the right-hand side. The
+            # residuals of the stiffness equations and of the meshes differ by
+            # orders of magnitude, so round-off keeps tighter tolerances from
+            # being reached.
+            coupled.linear_solver = ScipyKrylov()
+            coupled.linear_solver.options['atol'] = 1e-8
+            coupled.linear_solver.options['maxiter'] = 100
+            coupled.linear_solver.precon = BlockGSPreconditioner()
 
-        # coupled.nonlinear_solver = NewtonSolver(solve_subsystems=True)
-        # coupled.nonlinear_solver.options['maxiter'] = 50
         coupled.nonlinear_solver.options['iprint'] = 0
 
         """
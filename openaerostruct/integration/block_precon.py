@@ -0,0 +1,31 @@
+from __future__ import print_function, division
+
+from openmdao.api import LinearBlockGS
+
+
+class BlockGSPreconditioner(LinearBlockGS):
+    """
+    Linear block Gauss-Seidel solver for use as the preconditioner of a
+    Krylov solver, which applies one sweep over the subsystems, each solving
+    its own block with its own linear solver (e.g. the LU factorizations of
+    the AIC matrix and of the stiffness matrix).
+
+    The Krylov solvers leave the previous solution in the vector the
+    preconditioner writes to, and in fwd mode a plain LinearBlockGS starts
+    its sweep from it. The preconditioner then changes between
+    applications, which stalls GMRES. Here the sweep always starts from
+    zero, so the preconditioner is a fixed linear operator.
+    """
+
+    def _declare_options(self):
+        super(BlockGSPreconditioner, self)._declare_options()
+
+        self.options['maxiter'] = 1
+        self.options['iprint'] = -1
+
+    def _iter_initialize(self):
+        if self._mode == 'fwd':
+            for vec_name in self._vec_names:
+                self._system._vectors['output'][vec_name].set_const(0.0)
+
+        return super(BlockGSPreconditioner, self)._iter_initialize()
@@ -0,0 +1,200 @@
+from __future__ import print_function, division
+
+import numpy as np
+
+from openmdao.api import ExplicitComponent
+
+from openaerostruct.integration.multipoint import get_point_metadata, build_point_problem
+from openaerostruct.integration.warm_start import WarmStartStore
+
+
+class CachedPoint(ExplicitComponent):
+    """
+    Analysis point, such as an `AeroPoint` group, wrapped as a single
+    component that memoizes its outputs and their derivatives.
+
+    The point is run in its own problem, built with `point_factory`. Each
+    evaluation is keyed by the values of the inputs of the point, i.e. the
+    design variables and flight condition, and looked up in an LRU cache
+    before the point is run. Trim and mission loops, line searches, and
+    optimizers often evaluate the same inputs again, and those evaluations
+    then skip the whole VLM analysis.
+
+    With a nonzero `tol`, the nearest stored evaluation whose derivatives
+    are known is also used if each input is within that distance of the
+    stored one, relative to the norm of that input. Its outputs are then
+    extrapolated to the inputs with its derivatives, so the cache acts as a
+    local linear response surface. Any other evaluation runs the full point.
+
+    The variables are named by the promoted names of the inputs and outputs
+    within the point, with any '.' replaced by ':', e.g. 'alpha',
+    'wing:def_mesh', or 'aero_states:wing_def_mesh'. Complex step through
+    this component is not supported.
+
+    Attributes
+    ----------
+    cache : WarmStartStore
+        Stored evaluations, with the counts of the hits, near hits, and
+        misses.
+    num_runs : int
+        Number of times the point was run.
+    num_linearizations : int
+        Number of times the total derivatives of the point were computed.
+    """
+
+    def initialize(self):
+        self.options.declare('point_factory',
+            desc='Callable with no arguments that returns a new point group')
+        self.options.declare('input_names', types=list,
+            desc='Promoted names of the connected inputs of the point')
+        self.options.declare('output_names', default=['CL', 'CD', 'CM'], types=list,
+            desc='Promoted names of the outputs of the point')
+        self.options.declare('cache_size', default=100, types=int, lower=1,
+            desc='Maximum number of stored evaluations')
+        self.options.declare('tol', default=0., types=float, lower=0.,
+            desc='Maximum distance between each input and that of a stored '
+            'evaluation, relative to the norm of the input, for the evaluation '
+            'to be used')
+
+    def setup(self):
+        input_names = self.options['input_names']
+        output_names = self.options['output_names']
+
+        self.point_metadata = get_point_metadata(self.options['point_factory'], input_names,
+            output_names)
+
+        for name in input_names:
+            shape, units = self.point_metadata[name]
+            self.add_input(name.replace('.', ':'), val=np.ones(shape), units=units)
+
+        for name in output_names:
+            shape, units = self.point_metadata[name]
+            self.add_output(name.replace('.', ':'), val=np.ones(shape), units=units)
+
+        self.declare_partials('*', '*')
+
+        # The sizes of the flattened inputs and outputs
+        self._input_sizes = [int(np.prod(self.point_metadata[name][0])) for name in input_names]
+        self._output_sizes = [int(np.prod(self.point_metadata[name][0]))
+                              for name in output_names]
+
+        self.cache = WarmStartStore(self.options['cache_size'], self.options['tol'],
+            self._input_sizes)
+        self.num_runs = 0
+        self.num_linearizations = 0
+
+        self._prob = None
+        self._prob_key = None
+        self._entry = None
+        self._entry_key = None
+
+    @property
+    def hit_ratio(self):
+        """
+        Fraction of the evaluations served by the cache, including near hits.
+        """
+        cache = self.cache
+        num_lookups = cache.hits + cache.near_hits + cache.misses
+        if num_lookups == 0:
+            return 0.
+        return (cache.hits + cache.near_hits) / num_lookups
+
+    def _lookup(self, key):
+        # Only evaluations with derivatives can be extrapolated to other inputs
+        return self.cache.lookup(key, accept_near=lambda entry: entry['jac'] is not None)
+
+    def _get_key(self, inputs):
+        return np.concatenate([np.array(inputs[name.replace('.', ':')]).flatten()
+                               for name in self.options['input_names']])
+
+    def _run_point(self, key):
+        """
+        Run the point at the inputs given by key, unless it was last run there.
+        """
+        input_names = self.options['input_names']
+
+        if self._prob is None:
+            self._prob = build_point_problem(self.options['point_factory'], input_names,
+                self.options['output_names'], self.point_metadata)
+
+        if self._prob_key is None or not np.array_equal(key, self._prob_key):
+            start = 0
+            for k, (name, size) in enumerate(zip(input_names, self._input_sizes)):
+                shape = self.point_metadata[name][0]
+                self._prob['inputs.x{}'.format(k)] = key[start:start + size].reshape(shape)
+                start += size
+
+            self._prob.run_model()
+            self._prob_key = key.copy()
+            self.num_runs += 1
+
+    def _evaluate(self, key):
+        """
+        Run the point at the inputs given by key and store the evaluation.
+        """
+        self._run_point(key)
+
+        entry = {
+            'inputs' : key.copy(),
+            'outputs' : np.concatenate([self._prob['point.' + name].flatten()
+                                        for name in self.options['output_names']]),
+            'jac' : None,
+        }
+        self.cache.store(key, entry)
+        return entry
+
+    def compute(self, inputs, outputs):
+        key = self._get_key(inputs)
+
+        entry = self._lookup(key)
+        if entry is None:
+            entry = self._evaluate(key)
+
+        values = entry['outputs']
+        if entry['jac'] is not None and not np.array_equal(key, entry['inputs']):
+            values = values + entry['jac'].dot(key - entry['inputs'])
+
+        start = 0
+        for name, size in zip(self.options['output_names'], self._output_sizes):
+            outputs[name.replace('.', ':')] = values[start:start + size].reshape(
+                self.point_metadata[name][0])
+            start += size
+
+        self._entry = entry
+        self._entry_key = key
+
+    def compute_partials(self, inputs, partials):
+        input_names = self.options['input_names']
+        output_names = self.options['output_names']
+
+        key = self._get_key(inputs)
+
+        # The partials are usually requested at the inputs just computed
+        if self._entry_key is not None and np.array_equal(key, self._entry_key):
+            entry = self._entry
+        else:
+            entry = self._lookup(key)
+
+        if entry is None or entry['jac'] is None:
+            if entry is None:
+                entry = self._evaluate(key)
+            self._run_point(key)
+
+            of = ['point.' + name for name in output_names]
+            wrt = ['inputs.x{}'.format(k) for k in range(len(input_names))]
+            entry['jac'] = self._prob.compute_totals(of=of, wrt=wrt, return_format='array')
+            self.num_linearizations += 1
+
+            # Store the entry again, since the store keeps its own copy
+            self.cache.store(key, entry)
+            self._entry = entry
+            self._entry_key = key
+
+        row = 0
+        for name, output_size in zip(output_names, self._output_sizes):
+            col = 0
+            for input_name, input_size in zip(input_names, self._input_sizes):
+                partials[name.replace('.', ':'), input_name.replace('.', ':')] = \
+                    entry['jac'][row:row + output_size, col:col + input_size]
+                col += input_size
+            row += output_size
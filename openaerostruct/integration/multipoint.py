@@ -0,0 +1,367 @@
+from __future__ import print_function, division
+import multiprocessing
+import traceback
+
+import numpy as np
+
+from openmdao.api import Problem, ParallelGroup, IndepVarComp, ExplicitComponent, \
+    AnalysisError
+from openmdao.utils.mpi import MPI
+
+
+def get_point_metadata(point_factory, input_names, output_names):
+    """
+    Set up a single point on its own to get the shapes and units of its
+    inputs and outputs, given by their promoted names within the point.
+    """
+    prob = Problem()
+    prob.model.add_subsystem('point', point_factory())
+    prob.setup()
+
+    model = prob.model
+    metadata = {}
+    for typ, names in [('input', input_names), ('output', output_names)]:
+        prom2abs = model._var_allprocs_prom2abs_list[typ]
+        for name in names:
+            prom_name = 'point.' + name
+            if prom_name not in prom2abs:
+                raise NameError("'{}' is not an {} of the point.".format(name, typ))
+
+            meta = model._var_allprocs_abs2meta[prom2abs[prom_name][0]]
+            metadata[name] = (meta['shape'], meta['units'])
+
+    return metadata
+
+
+def build_point_problem(point_factory, input_names, output_names, metadata):
+    """
+    Build a problem that runs a single point on its own, as in a pool worker
+    or a `CachedPoint`, with an independent variable for each input of the
+    point that is connected in the model.
+    """
+    prob = Problem()
+
+    indep_var_comp = IndepVarComp()
+    for k, name in enumerate(input_names):
+        shape, units = metadata[name]
+        indep_var_comp.add_output('x{}'.format(k), val=np.ones(shape), units=units)
+
+    prob.model.add_subsystem('inputs', indep_var_comp)
+    prob.model.add_subsystem('point', point_factory())
+
+    for k, name in enumerate(input_names):
+        prob.model.connect('inputs.x{}'.format(k), 'point.' + name)
+
+    # There are usually far fewer gathered outputs than inputs, which
+    # include the meshes
+    prob.setup(mode='rev')
+    return prob
+
+
+def _pool_worker(conn, point_factory, point_inputs, output_names, metadata):
+    """
+    Run the points assigned to one pool process as the main process
+    requests it, keeping the problem of each point (and so its converged
+    state) between requests.
+    """
+    problems = {}
+    last_values = {}
+
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+
+        command, args = request
+        try:
+            results = {}
+            for i, values in args.items():
+                if i not in problems:
+                    problems[i] = build_point_problem(point_factory, point_inputs[i],
+                        output_names, metadata)
+                prob = problems[i]
+
+                # Only rerun the point if its inputs changed, since the
+                # totals are usually requested at the inputs just run
+                if i not in last_values or not all(np.array_equal(value, last_value)
+                        for value, last_value in zip(values, last_values[i])):
+                    for k, value in enumerate(values):
+                        prob['inputs.x{}'.format(k)] = value
+                    prob.run_model()
+                    last_values[i] = [np.array(value) for value in values]
+
+                if command == 'run':
+                    results[i] = [prob['point.' + name].copy() for name in output_names]
+                else:
+                    of = ['point.' + name for name in output_names]
+                    wrt = ['inputs.x{}'.format(k) for k in range(len(point_inputs[i]))]
+                    totals = prob.compute_totals(of=of, wrt=wrt)
+                    results[i] = [[totals[of_name, wrt_name] for wrt_name in wrt]
+                        for of_name in of]
+
+            conn.send(('ok', results))
+        except Exception as err:
+            conn.send((type(err).__name__, traceback.format_exc()))
+
+
+class MultipointPool(ExplicitComponent):
+    """
+    Run independent analysis points concurrently in a pool of local
+    processes, as a single component.
+
+    Each process builds its own problem for each of the points assigned to
+    it, using `point_factory`, and keeps it between runs so the points
+    start from their previous states. The component sends the values of
+    the inputs of the points to the processes, and gathers the outputs and
+    their total derivatives wrt the inputs.
+
+    The variables of point i are named '<point_name>:<name>', where name
+    is the promoted name of the variable within the point with any '.'
+    replaced by ':'.
+    """
+
+    def initialize(self):
+        self.options.declare('point_factory',
+            desc='Callable with no arguments that returns a new point group')
+        self.options.declare('num_points', types=int, lower=1)
+        self.options.declare('point_names', types=list,
+            desc='Names of the points')
+        self.options.declare('point_inputs', types=list,
+            desc='List of the names of the connected inputs of each point')
+        self.options.declare('output_names', types=list,
+            desc='Names of the outputs of the points to gather')
+        self.options.declare('num_procs', default=None, types=int, allow_none=True,
+            desc='Number of processes; defaults to the smaller of the number of '
+            'points and the number of cores')
+
+    def setup(self):
+        point_names = self.options['point_names']
+        point_inputs = self.options['point_inputs']
+        output_names = self.options['output_names']
+
+        input_names = sorted(set(name for names in point_inputs for name in names))
+        self.point_metadata = get_point_metadata(self.options['point_factory'], input_names,
+            output_names)
+
+        for point_name, names in zip(point_names, point_inputs):
+            for name in names:
+                shape, units = self.point_metadata[name]
+                self.add_input(self._get_name(point_name, name), val=np.ones(shape), units=units)
+
+            for name in output_names:
+                shape, units = self.point_metadata[name]
+                self.add_output(self._get_name(point_name, name), val=np.ones(shape), units=units)
+
+                for input_name in names:
+                    self.declare_partials(self._get_name(point_name, name),
+                        self._get_name(point_name, input_name))
+
+        # Start new processes if setup is called again
+        self.close()
+
+    @staticmethod
+    def _get_name(point_name, name):
+        return '{}:{}'.format(point_name, name.replace('.', ':'))
+
+    def _start(self):
+        num_points = self.options['num_points']
+        num_procs = self.options['num_procs']
+        if num_procs is None:
+            num_procs = multiprocessing.cpu_count()
+        num_procs = min(num_procs, num_points)
+
+        # Points are assigned to the processes in turn
+        self._assignments = [list(range(num_points))[j::num_procs] for j in range(num_procs)]
+
+        self._conns = []
+        self._procs = []
+        for j in range(num_procs):
+            conn, child_conn = multiprocessing.Pipe()
+            proc = multiprocessing.Process(target=_pool_worker, args=(child_conn,
+                self.options['point_factory'], self.options['point_inputs'],
+                self.options['output_names'], self.point_metadata))
+            proc.daemon = True
+            proc.start()
+
+            self._conns.append(conn)
+            self._procs.append(proc)
+
+    def close(self):
+        """
+        Stop the processes.
+        """
+        for conn in getattr(self, '_conns', []):
+            conn.send(None)
+        for proc in getattr(self, '_procs', []):
+            proc.join()
+
+        self._conns = []
+        self._procs = []
+
+    def _request(self, command, inputs):
+        if not self._procs:
+            self._start()
+
+        point_names = self.options['point_names']
+        point_inputs = self.options['point_inputs']
+
+        # Send the requests to all the processes before waiting for any
+        # of them, so they run concurrently
+        for conn, points in zip(self._conns, self._assignments):
+            args = {}
+            for i in points:
+                args[i] = [inputs[self._get_name(point_names[i], name)]
+                    for name in point_inputs[i]]
+            conn.send((command, args))
+
+        results = {}
+        errors = []
+        for conn in self._conns:
+            status, result = conn.recv()
+            if status == 'ok':
+                results.update(result)
+            else:
+                errors.append((status, result))
+
+        for status, result in errors:
+            if status == 'AnalysisError':
+                raise AnalysisError('A point failed in {}:\n{}'.format(self.pathname, result))
+            raise RuntimeError('A point failed in {}:\n{}'.format(self.pathname, result))
+
+        return results
+
+    def compute(self, inputs, outputs):
+        point_names = self.options['point_names']
+        output_names = self.options['output_names']
+
+        results = self._request('run', inputs)
+
+        for i, values in results.items():
+            for name, value in zip(output_names, values):
+                outputs[self._get_name(point_names[i], name)] = value
+
+    def compute_partials(self, inputs, partials):
+        point_names = self.options['point_names']
+        point_inputs = self.options['point_inputs']
+        output_names = self.options['output_names']
+
+        results = self._request('totals', inputs)
+
+        for i, jacs in results.items():
+            for name, row in zip(output_names, jacs):
+                for input_name, jac in zip(point_inputs[i], row):
+                    partials[self._get_name(point_names[i], name),
+                        self._get_name(point_names[i], input_name)] = jac
+
+
+class MultipointBuilder(object):
+    """
+    Add a set of independent analysis points, such as `AeroPoint` or
+    `AerostructPoint` groups for the conditions of a mission, to a model so
+    they run in parallel.
+
+    With mode 'parallel', the points are placed in a ParallelGroup, so under
+    MPI they are distributed over the processors (and run one after the
+    other otherwise). With mode 'pool', a `MultipointPool` component runs
+    them in a pool of local processes instead, which needs no MPI. Mode
+    'auto' uses 'parallel' when running under MPI on several processors and
+    'pool' otherwise.
+
+    In both cases, the shared inputs of the points, such as the geometry
+    outputs and design variables, are connected with `connect`, and the
+    paths of the variables of the points in the model are given by
+    `get_path`, since they differ between the modes.
+
+    Parameters
+    ----------
+    model : Group
+        Group to add the points to.
+    point_factory : callable
+        Function with no arguments that returns a new point group. In pool
+        mode, it is called in the processes of the pool.
+    num_points : int
+        Number of points.
+    outputs : list of str
+        Promoted names, within the points, of the outputs to gather from the
+        points in pool mode, such as 'CL', 'fuelburn', or 'wing_perf.failure'.
+        Other outputs passed to `get_path` are added to them.
+    mode : str
+        'auto', 'parallel', or 'pool'.
+    name : str
+        Name of the group or component containing the points.
+    point_name : str
+        Format of the names of the points.
+    num_procs : int or None
+        Number of processes of the pool; defaults to the smaller of the
+        number of points and the number of cores.
+    """
+
+    def __init__(self, model, point_factory, num_points, outputs=(), mode='auto',
+                 name='points', point_name='point_{}', num_procs=None):
+        if mode == 'auto':
+            if MPI and MPI.COMM_WORLD.size > 1:
+                mode = 'parallel'
+            else:
+                mode = 'pool'
+        elif mode not in ['parallel', 'pool']:
+            raise ValueError("The multipoint mode must be 'auto', 'parallel', or 'pool'.")
+
+        self.model = model
+        self.mode = mode
+        self.name = name
+        self.num_points = num_points
+        self.point_names = [point_name.format(i) for i in range(num_points)]
+
+        self.point_inputs = [[] for i in range(num_points)]
+        self.output_names = list(outputs)
+
+        if mode == 'parallel':
+            self.group = model.add_subsystem(name, ParallelGroup())
+            for point_name in self.point_names:
+                self.group.add_subsystem(point_name, point_factory())
+        else:
+            self.group = model.add_subsystem(name, MultipointPool(
+                point_factory=point_factory, num_points=num_points,
+                point_names=self.point_names, point_inputs=self.point_inputs,
+                output_names=self.output_names, num_procs=num_procs))
+
+    def get_path(self, i, name):
+        """
+        Get the path in the model of a variable of point i, given its
+        promoted name within the point. In pool mode, names that are not
+        connected inputs of the point are added to the gathered outputs.
+        """
+        if self.mode == 'parallel':
+            return '{}.{}.{}'.format(self.name, self.point_names[i], name)
+
+        if name not in self.point_inputs[i] and name not in self.output_names:
+            self.output_names.append(name)
+        return '{}.{}'.format(self.name, MultipointPool._get_name(self.point_names[i], name))
+
+    def connect(self, src_name, tgt_name, src_indices=None, points=None):
+        """
+        Connect an output of the model to an input of the points.
+
+        Parameters
+        ----------
+        src_name : str
+            Path of the output in the model.
+        tgt_name : str
+            Promoted name of the input within the points.
+        src_indices : array_like, callable, or None
+            Indices of the output to connect. If callable, it is called with
+            the index of each point to get the indices for that point, e.g.
+            `lambda i: [i]` for a vector of conditions.
+        points : list of int or None
+            Indices of the points to connect; all of them if None.
+        """
+        if points is None:
+            points = range(self.num_points)
+
+        for i in points:
+            indices = src_indices(i) if callable(src_indices) else src_indices
+
+            if self.mode == 'pool' and tgt_name not in self.point_inputs[i]:
+                self.point_inputs[i].append(tgt_name)
+
+            self.model.connect(src_name, self.get_path(i, tgt_name), src_indices=indices)
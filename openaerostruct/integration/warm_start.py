@@ -0,0 +1,294 @@
+from __future__ import print_function, division
+from collections import OrderedDict
+
+import numpy as np
+
+import openmdao
+from openmdao.api import NonlinearBlockGS, NewtonSolver
+
+from openaerostruct.utils.caching import array_fingerprint
+
+
+class WarmStartStore(object):
+    """
+    Store of converged states of a coupled system, keyed by the vector of
+    inputs the system receives from outside, such as the design variables
+    and flight conditions.
+
+    Parameters
+    ----------
+    max_size : int
+        Maximum number of stored states; the least recently used state is
+        dropped when it is exceeded.
+    tol : float or None
+        Maximum distance between two keys, relative to the norm of the key
+        looked up, for which a stored state is used. If None, the nearest
+        stored state is always used.
+    sizes : list of int or None
+        Sizes of the variables that are concatenated into the keys. If given,
+        the distance between two keys is the largest distance between their
+        values of each variable, relative to the norm of that variable in
+        the key looked up, so that large variables such as meshes do not
+        hide changes in small ones such as the angle of attack.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups that found a state stored for the same key.
+    near_hits : int
+        Number of lookups that used the state of the nearest stored key.
+    misses : int
+        Number of lookups that found no state within the tolerance.
+    iterations : list
+        Tuples of (seeded, iterations) for each solve, where seeded is True
+        if the solve was started from a stored state.
+    """
+
+    def __init__(self, max_size=20, tol=None, sizes=None):
+        self.max_size = max_size
+        self.tol = tol
+        self.sizes = sizes
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all the stored states and reset the counters.
+        """
+        self._states = OrderedDict()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.iterations = []
+
+    def __len__(self):
+        return len(self._states)
+
+    def lookup(self, key, accept_near=None):
+        """
+        Get the state stored for key, or for the nearest stored key, or None
+        if there is none within the tolerance.
+
+        If given, accept_near is a function of a stored state that returns
+        whether that state may be used for a key other than its own.
+        """
+        fingerprint = array_fingerprint(key)
+
+        if fingerprint in self._states:
+            self.hits += 1
+            return self._use(fingerprint)
+
+        nearest = None
+        min_distance = np.inf
+        for stored_fingerprint, (stored_key, state) in self._states.items():
+            if stored_key.shape == key.shape and (accept_near is None or accept_near(state)):
+                distance = self._get_distance(stored_key, key)
+                if nearest is None or distance < min_distance:
+                    nearest = stored_fingerprint
+                    min_distance = distance
+
+        if nearest is None or self.tol is not None and min_distance > self.tol:
+            self.misses += 1
+            return None
+
+        self.near_hits += 1
+        return self._use(nearest)
+
+    def _get_distance(self, stored_key, key):
+        """
+        Get the distance between a stored key and the key looked up, relative
+        to the norm of the key looked up or of each of its variables.
+        """
+        if self.sizes is None:
+            splits = [(stored_key - key, key)]
+        else:
+            indices = np.cumsum(self.sizes)[:-1]
+            splits = zip(np.split(stored_key - key, indices), np.split(key, indices))
+
+        distance = 0.
+        for diff, values in splits:
+            diff_norm = np.linalg.norm(diff)
+            if diff_norm > 0.:
+                norm = np.linalg.norm(values)
+                distance = max(distance, diff_norm / norm if norm > 0. else np.inf)
+        return distance
+
+    def _use(self, fingerprint):
+        # Move the entry to the end, so the entries are ordered from least to
+        # most recently used
+        entry = self._states.pop(fingerprint)
+        self._states[fingerprint] = entry
+        return entry[1]
+
+    def store(self, key, state):
+        """
+        Store a copy of the state for key.
+        """
+        fingerprint = array_fingerprint(key)
+
+        self._states.pop(fingerprint, None)
+        self._states[fingerprint] = (key.copy(), state.copy())
+
+        while len(self._states) > self.max_size:
+            self._states.popitem(last=False)
+
+    @property
+    def iterations_saved(self):
+        """
+        Estimate of the total number of iterations saved by the warm starts,
+        taking the average iterations of the solves that were not seeded as
+        the cost of a cold start.
+        """
+        cold = [num for seeded, num in self.iterations if not seeded]
+        warm = [num for seeded, num in self.iterations if seeded]
+
+        if not cold:
+            return 0.
+        return np.mean(cold) * len(warm) - np.sum(warm)
+
+
+def check_warm_start_support(solver, system):
+    """
+    Check that this version of OpenMDAO provides the solver hooks and the
+    connection data that `WarmStartMixin` relies on, which are not part of
+    its public API, and raise a RuntimeError naming the missing ones if not.
+    """
+    missing = [name for name in ['_iter_initialize', '_run_iterator', '_iter_count']
+               if not hasattr(solver, name)]
+    missing += [name for name in ['_conn_global_abs_in2out', '_inputs', '_outputs']
+                if not hasattr(system, name)]
+
+    if missing:
+        raise RuntimeError('The warm start solver of {} is not supported by OpenMDAO {}, '
+            'which lacks {}.'.format(system.pathname, openmdao.__version__,
+            ', '.join(missing)))
+
+
+class WarmStartMixin(object):
+    """
+    Mixin for nonlinear solvers that starts each solve from the converged
+    state of their system for the nearest previously solved inputs.
+
+    The key of each solve is the vector of the system's inputs that are not
+    connected to its own outputs, so it changes with the design variables
+    and flight conditions. The state is the system's whole output vector,
+    which includes the displacements, deformed meshes, circulations, and
+    loads of an aerostructural coupled group. This keeps optimizations that
+    revisit or backtrack to earlier designs, and sweeps over nearby flight
+    conditions, from starting from stale or unrelated states.
+
+    The inputs and outputs are read and set by name through the system's
+    vectors, but OpenMDAO has no public hooks around a nonlinear solve or
+    for the connections within a group, so `check_warm_start_support` is
+    called during setup to fail loudly on versions without them.
+
+    Solves under complex step are neither seeded nor stored. The `store`
+    attribute is a `WarmStartStore` holding the states and the metrics.
+    """
+
+    def __init__(self, **kwargs):
+        super(WarmStartMixin, self).__init__(**kwargs)
+
+        self.store = WarmStartStore()
+        self._key_names = None
+        self._state_names = None
+
+    def _declare_options(self):
+        super(WarmStartMixin, self)._declare_options()
+
+        self.options.declare('store_size', default=20, types=int, lower=1,
+                             desc='Maximum number of converged states to store')
+        self.options.declare('store_tol', default=None, types=float, allow_none=True,
+                             desc='Maximum distance between each input of a solve and '
+                             'that of a stored state, relative to the norm of the input, '
+                             'for the state to be used')
+
+    def _setup_solvers(self, system, depth):
+        super(WarmStartMixin, self)._setup_solvers(system, depth)
+
+        check_warm_start_support(self, system)
+
+        # The variables may have changed, so start over
+        self.store.max_size = self.options['store_size']
+        self.store.tol = self.options['store_tol']
+        self.store.clear()
+        self._key_names = None
+        self._state_names = None
+
+    def _get_names(self):
+        """
+        Get the names of the inputs that make up the key, and of the outputs
+        that make up the state, relative to the system.
+        """
+        system = self._system
+
+        if self._key_names is None:
+            prefix = system.pathname + '.' if system.pathname else ''
+            internal = system._conn_global_abs_in2out
+
+            self._key_names = [name for name in system._inputs.keys()
+                               if prefix + name not in internal]
+            self._state_names = list(system._outputs.keys())
+
+            self.store.sizes = [system._inputs[name].size for name in self._key_names]
+
+        return self._key_names, self._state_names
+
+    def _get_key(self):
+        inputs = self._system._inputs
+        key_names = self._get_names()[0]
+
+        if not key_names:
+            return np.zeros(0)
+        return np.concatenate([np.real(inputs[name]).flatten() for name in key_names])
+
+    def _get_state(self):
+        outputs = self._system._outputs
+        return np.concatenate([np.real(outputs[name]).flatten()
+                               for name in self._get_names()[1]])
+
+    def _set_state(self, state):
+        outputs = self._system._outputs
+
+        start = 0
+        for name in self._get_names()[1]:
+            shape = outputs[name].shape
+            size = outputs[name].size
+            outputs[name] = state[start:start + size].reshape(shape)
+            start += size
+
+    def _iter_initialize(self):
+        system = self._system
+
+        self._seeded = False
+        if not system.under_complex_step:
+            state = self.store.lookup(self._get_key())
+            if state is not None:
+                self._set_state(state)
+                self._seeded = True
+
+        return super(WarmStartMixin, self)._iter_initialize()
+
+    def _run_iterator(self):
+        fail, abs_err, rel_err = super(WarmStartMixin, self)._run_iterator()
+
+        system = self._system
+        if not system.under_complex_step:
+            self.store.iterations.append((self._seeded, self._iter_count))
+            if not fail:
+                self.store.store(self._get_key(), self._get_state())
+
+        return fail, abs_err, rel_err
+
+
+class WarmStartNonlinearBlockGS(WarmStartMixin, NonlinearBlockGS):
+    """
+    Nonlinear block Gauss-Seidel solver with warm starts.
+    """
+    pass
+
+
+class WarmStartNewtonSolver(WarmStartMixin, NewtonSolver):
+    """
+    Newton solver with warm starts.
+    """
+    pass
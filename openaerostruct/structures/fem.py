@@ -4,10 +4,13 @@ from __future__ import division, print_function
 from six.moves import range
 
 import numpy as np
-from scipy import linalg
+from scipy import linalg, sparse
+from scipy.sparse import linalg as splinalg
 
 from openmdao.core.implicitcomponent import ImplicitComponent
 
+from openaerostruct.utils.caching import FactorizationCache
+
 
 class FEM(ImplicitComponent):
     """
@@ -16,10 +19,20 @@ class FEM(ImplicitComponent):
     Designed to handle small and dense linear systems that can be
     efficiently solved with lu-decomposition
 
+    If the sparsity pattern of the matrix is given, K is instead the vector
+    of its nonzero entries, and the system is assembled in CSC format and
+    solved with a sparse LU decomposition. The partials are then sparse too,
+    so the cost and memory scale with the number of nonzeros rather than
+    with the square (or cube, for dK) of the size of the system.
+
     Attributes
     ----------
     _lup : object
-        matrix factorization returned from scipy.linag.lu_factor
+        matrix factorization returned from scipy.linag.lu_factor, or the
+        SuperLU object from scipy.sparse.linalg.splu in the sparse case
+    lu_cache : FactorizationCache
+        cache of the factorization of K, so linearizing at the point just
+        solved does not factor K again; also counts the hits and misses
     """
 
     def initialize(self):
@@ -27,6 +40,9 @@ class FEM(ImplicitComponent):
         Declare options.
         """
         self.options.declare('size', default=1, types=int, desc='the size of the linear system')
+        self.options.declare('sparsity', default=None, types=tuple, allow_none=True,
+            desc='(rows, cols) of the nonzero entries of K, in CSC order; '
+                 'if None, K is a dense matrix')
 
     def setup(self):
         """
@@ -34,16 +50,39 @@ class FEM(ImplicitComponent):
         """
         size = self.options['size']
 
+        sparsity = self.options['sparsity']
+
         self._lup = None
 
-        self.add_input('K', val=np.eye(size), units='N/m')
+        if sparsity is None:
+            self.lu_cache = FactorizationCache(linalg.lu_factor)
+
+            self.add_input('K', val=np.eye(size), units='N/m')
+        else:
+            rows, cols = sparsity
+            nnz = len(rows)
+
+            # Column pointers of the CSC matrix, given the entries are
+            # already sorted by column
+            self._indices = rows
+            self._indptr = np.concatenate([[0], np.cumsum(np.bincount(cols, minlength=size))])
+
+            self.lu_cache = FactorizationCache(
+                lambda data: splinalg.splu(self._get_sparse_K(data)))
+
+            # The pattern has no diagonal entries in the constraint rows, so
+            # the default is the identity with the first node constrained
+            K = np.logical_or(rows == cols, np.abs(rows - cols) == size - 6)
+            self.add_input('K', val=K.astype(float), units='N/m')
+
         self.add_input('forces', val=np.ones(size), units='N')
         self.add_output('disp_aug', shape=size, val=.1, units='m')
 
-        size = self.options['size']
-        row_col = np.arange(size, dtype="int")
-
-        self.declare_partials('*', '*')
+        if sparsity is None:
+            self.declare_partials('*', '*')
+        else:
+            self.declare_partials('disp_aug', 'disp_aug', rows=rows, cols=cols)
+            self.declare_partials('disp_aug', 'K', rows=rows, cols=np.arange(nnz))
 
         arange = np.arange(size)
         self.declare_partials('disp_aug', 'forces', val=-1., rows=arange, cols=arange)
@@ -61,7 +100,11 @@ class FEM(ImplicitComponent):
         residuals : Vector
             unscaled, dimensional residuals written to via residuals[key]
         """
-        residuals['disp_aug'] = inputs['K'].dot(outputs['disp_aug']) - inputs['forces']
+        if self.options['sparsity'] is None:
+            K = inputs['K']
+        else:
+            K = self._get_sparse_K(inputs['K'])
+        residuals['disp_aug'] = K.dot(outputs['disp_aug']) - inputs['forces']
 
     def solve_nonlinear(self, inputs, outputs):
         """
@@ -75,8 +118,8 @@ class FEM(ImplicitComponent):
             unscaled, dimensional output variables read via outputs[key]
         """
         # lu factorization for use with solve_linear
-        self._lup = linalg.lu_factor(inputs['K'])
-        outputs['disp_aug'] = linalg.lu_solve(self._lup, inputs['forces'])
+        self._lup = self.lu_cache.factor(inputs['K'])
+        outputs['disp_aug'] = self._solve(inputs['forces'])
 
     def linearize(self, inputs, outputs, J):
         """
@@ -84,11 +127,20 @@ class FEM(ImplicitComponent):
         """
         x = outputs['disp_aug']
         size = self.options['size']
+        sparsity = self.options['sparsity']
+
+        # Make sure solve_linear uses the factorization of the current K.
+        # This is only recomputed if K changed since the last solve.
+        self._lup = self.lu_cache.factor(inputs['K'])
 
-        dx_dA = np.zeros((size, size**2))
-        for i in range(size):
-            dx_dA[i, i * size:(i + 1) * size] = x
-        J['disp_aug', 'K'] = dx_dA
+        if sparsity is None:
+            dx_dA = np.zeros((size, size**2))
+            for i in range(size):
+                dx_dA[i, i * size:(i + 1) * size] = x
+            J['disp_aug', 'K'] = dx_dA
+        else:
+            rows, cols = sparsity
+            J['disp_aug', 'K'] = x[cols]
 
         J['disp_aug', 'disp_aug'] = inputs['K']
 
@@ -117,4 +169,21 @@ class FEM(ImplicitComponent):
             sol_vec, forces_vec = d_residuals, d_outputs
             t = 1
 
-        sol_vec['disp_aug'] = linalg.lu_solve(self._lup, forces_vec['disp_aug'], trans=t)
+        sol_vec['disp_aug'] = self._solve(forces_vec['disp_aug'], trans=t)
+
+    def _get_sparse_K(self, data):
+        """
+        Assemble the CSC matrix from the nonzero entries of K.
+        """
+        size = self.options['size']
+        return sparse.csc_matrix((data, self._indices, self._indptr), shape=(size, size))
+
+    def _solve(self, rhs, trans=0):
+        """
+        Solve the system, or its transpose if trans is 1, with the current
+        factorization of K.
+        """
+        if self.options['sparsity'] is None:
+            return linalg.lu_solve(self._lup, rhs, trans=trans)
+        else:
+            return self._lup.solve(rhs, trans='T' if trans else 'N')
@@ -4,9 +4,6 @@ import numpy as np
 from openmdao.api import ExplicitComponent
 
 
-def norm(vec):
-    return np.sqrt(np.sum(vec**2))
-
 class FuelLoads(ExplicitComponent):
     """
     Compute the nodal loads from the distributed fuel within the wing
@@ -33,24 +30,49 @@ class FuelLoads(ExplicitComponent):
         self.add_input('load_factor', val=1.)
         self.add_output('fuel_weight_loads', val=np.zeros((self.ny, 6)), units='N')
 
-        self.declare_partials('*', '*',  method='cs')
+        ny = self.ny
+        nodes = np.arange(ny)
 
-    def compute(self, inputs, outputs):
-        nodes = inputs['nodes']
+        # The z forces and moments at every node depend on all the fuel
+        # volumes through their sum
+        load_rows = (6 * nodes[:, np.newaxis] + np.arange(2, 5)).flatten()
+        self.declare_partials('fuel_weight_loads', 'fuel_vols',
+            rows=np.repeat(load_rows, ny - 1), cols=np.tile(np.arange(ny - 1), 3 * ny))
+        self.declare_partials('fuel_weight_loads', 'fuel_mass', rows=load_rows, cols=np.zeros(3 * ny, int))
+        self.declare_partials('fuel_weight_loads', 'load_factor', rows=load_rows, cols=np.zeros(3 * ny, int))
 
-        element_lengths = np.ones(self.ny - 1, dtype=complex)
-        for i in range(self.ny - 1):
-            element_lengths[i] = norm(nodes[i+1] - nodes[i])
+        # The moments at each node depend on the nodes of the neighboring
+        # elements, stored as [node, moment, neighbor, coordinate]
+        rows = np.zeros((ny, 2, 3, 3), int)
+        rows[:] = (6 * nodes[:, np.newaxis] + np.arange(3, 5))[:, :, np.newaxis, np.newaxis]
+        cols = np.zeros((ny, 2, 3, 3), int)
+        cols[:] = (3 * (nodes[:, np.newaxis] + np.arange(-1, 2))[:, :, np.newaxis] + np.arange(3))[:, np.newaxis]
 
-        # And we also need the deltas between consecutive nodes
-        deltas = nodes[1:, :] - nodes[:-1, :]
+        self.nodes_mask = np.ones((ny, 2, 3, 3), bool)
+        self.nodes_mask[0, :, 0] = False
+        self.nodes_mask[-1, :, 2] = False
 
-        # Fuel weight
+        self.declare_partials('fuel_weight_loads', 'nodes',
+            rows=rows[self.nodes_mask], cols=cols[self.nodes_mask])
+
+    def _get_fuel_weight(self, inputs):
         fuel_weight = (inputs['fuel_mass'] + self.surface['Wf_reserve']) * 9.81 * inputs['load_factor']
 
         if self.surface['symmetry']:
             fuel_weight /= 2.
 
+        return fuel_weight
+
+    def compute(self, inputs, outputs):
+        nodes = inputs['nodes']
+
+        # And we also need the deltas between consecutive nodes
+        deltas = nodes[1:, :] - nodes[:-1, :]
+        element_lengths = np.sqrt(np.sum(deltas**2, axis=1))
+
+        # Fuel weight
+        fuel_weight = self._get_fuel_weight(inputs)
+
         vols = inputs['fuel_vols']
         sum_vols = np.sum(vols)
 
@@ -60,9 +82,9 @@ class FuelLoads(ExplicitComponent):
 
         # Assume weight coincides with the elastic axis
         z_forces_for_each = z_weights / 2.
-        z_moments_for_each = z_weights * element_lengths / 12. * (deltas[:, 0]**2 + deltas[:,1]**2)**0.5 / element_lengths
+        z_moments_for_each = z_weights / 12. * (deltas[:, 0]**2 + deltas[:,1]**2)**0.5
 
-        loads = np.zeros((self.ny, 6), dtype=complex)
+        loads = np.zeros((self.ny, 6), dtype=z_moments_for_each.dtype)
 
         # Loads in z-direction
         loads[:-1, 2] = loads[:-1, 2] - z_forces_for_each
@@ -76,3 +98,65 @@ class FuelLoads(ExplicitComponent):
         loads[1:, 4] = loads[1:, 4] + z_moments_for_each * deltas[: , 0] / element_lengths
 
         outputs['fuel_weight_loads'] = loads
+
+    def compute_partials(self, inputs, partials):
+        ny = self.ny
+        nodes = inputs['nodes']
+
+        deltas = nodes[1:, :] - nodes[:-1, :]
+        element_lengths = np.sqrt(np.sum(deltas**2, axis=1))
+        planform_lengths = (deltas[:, 0]**2 + deltas[:,1]**2)**0.5
+
+        fuel_weight = self._get_fuel_weight(inputs)
+
+        vols = inputs['fuel_vols']
+        sum_vols = np.sum(vols)
+        z_weights = vols * fuel_weight / sum_vols
+
+        # Loads at each node per unit weight of each element, for the z
+        # force and the two moments: [node, load, element]
+        dloads_dz_weights = np.zeros((ny, 3, ny - 1))
+        elems = np.arange(ny - 1)
+        dloads_dz_weights[elems, 0, elems] = -0.5
+        dloads_dz_weights[elems + 1, 0, elems] = -0.5
+
+        moment_factors = planform_lengths / 12. / element_lengths * deltas[:, 1::-1].T
+        dloads_dz_weights[elems, 1:, elems] = -moment_factors.T
+        dloads_dz_weights[elems + 1, 1:, elems] = moment_factors.T
+
+        dz_weights_dvols = fuel_weight / sum_vols * (np.eye(ny - 1) - vols[:, np.newaxis] / sum_vols)
+        partials['fuel_weight_loads', 'fuel_vols'] = np.einsum('ike,ej->ikj',
+            dloads_dz_weights, dz_weights_dvols).flatten()
+
+        dloads_dfuel_weight = dloads_dz_weights.dot(vols / sum_vols).flatten()
+
+        dfuel_weight_dfuel_mass = 9.81 * inputs['load_factor']
+        dfuel_weight_dload_factor = (inputs['fuel_mass'] + self.surface['Wf_reserve']) * 9.81
+        if self.surface['symmetry']:
+            dfuel_weight_dfuel_mass /= 2.
+            dfuel_weight_dload_factor /= 2.
+
+        partials['fuel_weight_loads', 'fuel_mass'] = dloads_dfuel_weight * dfuel_weight_dfuel_mass
+        partials['fuel_weight_loads', 'load_factor'] = dloads_dfuel_weight * dfuel_weight_dload_factor
+
+        # Derivatives of the x and y moment of each element, which are
+        # z_weight / 12 * planform_length * (dy, dx) / element_length,
+        # wrt the element deltas
+        dmoments_ddeltas = np.zeros((ny - 1, 2, 3))
+        for ind, comp in enumerate([1, 0]):
+            dmoments_ddeltas[:, ind, :] = -(planform_lengths * deltas[:, comp] /
+                element_lengths**3)[:, np.newaxis] * deltas
+            dmoments_ddeltas[:, ind, :2] += (deltas[:, comp] / planform_lengths /
+                element_lengths)[:, np.newaxis] * deltas[:, :2]
+            dmoments_ddeltas[:, ind, comp] += planform_lengths / element_lengths
+        dmoments_ddeltas *= (z_weights / 12.)[:, np.newaxis, np.newaxis]
+
+        # The moments of element i are subtracted at node i and added at
+        # node i + 1, and element i depends on nodes i and i + 1
+        dloads_dnodes = np.zeros((ny, 2, 3, 3))
+        dloads_dnodes[:-1, :, 1] += dmoments_ddeltas
+        dloads_dnodes[:-1, :, 2] -= dmoments_ddeltas
+        dloads_dnodes[1:, :, 0] -= dmoments_ddeltas
+        dloads_dnodes[1:, :, 1] += dmoments_ddeltas
+
+        partials['fuel_weight_loads', 'nodes'] = dloads_dnodes[self.nodes_mask]
@@ -4,9 +4,6 @@ import numpy as np
 from openmdao.api import ExplicitComponent
 
 
-def norm(vec):
-    return np.sqrt(np.sum(vec**2))
-
 class WingboxFuelVol(ExplicitComponent):
     """
     Create a constraint to ensure the wingbox has enough internal volume to store the required fuel.
@@ -40,17 +37,32 @@ class WingboxFuelVol(ExplicitComponent):
         self.add_input('A_int', val=np.zeros((self.ny-1)), units='m**2')
         self.add_output('fuel_vols', val=np.zeros((self.ny-1)), units='m**3')
 
-        self.declare_partials('*', '*', method='cs')
+        arange = np.arange(self.ny - 1)
+
+        self.declare_partials('fuel_vols', 'A_int', rows=arange, cols=arange)
+
+        # Each volume depends on the two nodes of its element
+        self.declare_partials('fuel_vols', 'nodes',
+            rows=np.repeat(arange, 6),
+            cols=(3 * arange[:, np.newaxis] + np.arange(6)).flatten())
 
     def compute(self, inputs, outputs):
         nodes = inputs['nodes']
 
-        element_lengths = np.zeros(self.ny-1, dtype=type(nodes[0, 0]))
-
-        for i in range(self.ny - 1):
-            element_lengths[i] = norm(nodes[i+1] - nodes[i])
+        element_lengths = np.sqrt(np.sum((nodes[1:] - nodes[:-1])**2, axis=1))
 
         # Next we multiply the element lengths with the A_int for the internal volumes of the wingobox segments
         vols = element_lengths * inputs['A_int']
 
         outputs['fuel_vols'] = vols
+
+    def compute_partials(self, inputs, partials):
+        nodes = inputs['nodes']
+
+        deltas = nodes[1:] - nodes[:-1]
+        element_lengths = np.sqrt(np.sum(deltas**2, axis=1))
+
+        partials['fuel_vols', 'A_int'] = element_lengths
+
+        dvols_ddeltas = deltas * (inputs['A_int'] / element_lengths)[:, np.newaxis]
+        partials['fuel_vols', 'nodes'] = np.hstack([-dvols_ddeltas, dvols_ddeltas]).flatten()
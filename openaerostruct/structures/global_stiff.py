@@ -1,14 +1,25 @@
 from __future__ import print_function
 import numpy as np
+from scipy import sparse
 
 from openmdao.api import ExplicitComponent
 
+from openaerostruct.structures.utils import get_stiffness_sparsity
 from openaerostruct.utils.vector_algebra import add_ones_axis
 from openaerostruct.utils.vector_algebra import compute_norm, compute_norm_deriv
 from openaerostruct.utils.vector_algebra import compute_cross, compute_cross_deriv1, compute_cross_deriv2
 
 
 class GlobalStiff(ExplicitComponent):
+    """
+    Assemble the global stiffness matrix from the transformed element
+    stiffness matrices and add the constraint entries for the node closest
+    to the central point.
+
+    If the surface sets 'sparse_fem', K is output as the vector of its
+    nonzero entries, ordered as given by `get_stiffness_sparsity`, instead
+    of the full (6 * ny + 6) x (6 * ny + 6) matrix.
+    """
 
     def initialize(self):
         self.options.declare('surface', types=dict)
@@ -17,47 +28,69 @@ class GlobalStiff(ExplicitComponent):
         surface = self.options['surface']
 
         self.ny = ny = surface['mesh'].shape[1]
+        self.sparse = surface.get('sparse_fem', False)
 
         size = 6 * ny + 6
 
         self.add_input('nodes', shape=(ny, 3), units='m')
         self.add_input('local_stiff_transformed', shape=(ny - 1, 12, 12))
-        self.add_output('K', shape=(size, size), units='N/m')
 
-        arange = np.arange(ny - 1)
+        # Look up the position of an (i, j) entry of K within its nonzero
+        # entries through the sorted linear indices of the sparsity pattern
+        k_rows, k_cols = get_stiffness_sparsity(ny)
+        nnz = len(k_rows)
+        self.dense_indices = size * k_rows + k_cols
+        sorter = np.argsort(self.dense_indices)
+        sorted_keys = self.dense_indices[sorter]
+
+        def get_indices(mtx_i, mtx_j):
+            return sorter[np.searchsorted(sorted_keys, size * mtx_i + mtx_j)]
 
-        rows = np.empty((ny - 1, 12, 12), int)
-        for i in range(12):
-            for j in range(12):
-                mtx_i = 6 * arange + i
-                mtx_j = 6 * arange + j
-                rows[:, i, j] = size * mtx_i + mtx_j
-        rows = rows.flatten()
+        # Positions of the entries of each element stiffness matrix
+        arange = np.arange(ny - 1)
+        ij = np.arange(12)
+        mtx_i = 6 * arange[:, np.newaxis, np.newaxis] + ij[:, np.newaxis]
+        mtx_j = 6 * arange[:, np.newaxis, np.newaxis] + ij
+        rows = get_indices(*np.broadcast_arrays(mtx_i, mtx_j)).flatten()
         cols = np.arange(144 * (ny - 1))
+
+        # Sums the overlapping element entries into the nonzeros of K
+        self.assembly_mtx = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(nnz, len(cols)))
+
+        # Positions of the constraint entries for each node, since any of
+        # them could end up being the constrained one
+        node_dofs = 6 * np.arange(ny)[:, np.newaxis] + np.arange(6)
+        con_dofs = 6 * ny + np.tile(np.arange(6), (ny, 1))
+        self.con_indices = np.hstack([
+            get_indices(node_dofs, con_dofs),
+            get_indices(con_dofs, node_dofs),
+        ])
+
+        if self.sparse:
+            self.add_output('K', shape=nnz, units='N/m')
+        else:
+            self.add_output('K', shape=(size, size), units='N/m')
+            rows = self.dense_indices[rows]
+
         self.declare_partials('K', 'local_stiff_transformed', val=1., rows=rows, cols=cols)
 
     def compute(self, inputs, outputs):
-        surface = self.options['surface']
-
         ny = self.ny
 
         size = 6 * ny + 6
 
-        arange = np.arange(ny - 1)
-
-        outputs['K'] = 0.
-        for i in range(12):
-            for j in range(12):
-                outputs['K'][6 * arange + i, 6 * arange + j] += inputs['local_stiff_transformed'][:, i, j]
-
         # Find constrained nodes based on closeness to central point
         nodes = inputs['nodes']
         dist = nodes - np.array([5., 0, 0])
         idx = (np.linalg.norm(dist, axis=1)).argmin()
-        index = 6 * idx
-        num_dofs = 6 * ny
 
-        arange = np.arange(6)
+        data = self.assembly_mtx.dot(inputs['local_stiff_transformed'].flatten())
+        data[self.con_indices[idx]] = 1.e9
 
-        outputs['K'][index + arange, num_dofs + arange] = 1.e9
-        outputs['K'][num_dofs + arange, index + arange] = 1.e9
+        if self.sparse:
+            outputs['K'] = data
+        else:
+            K = np.zeros(size ** 2, dtype=data.dtype)
+            K[self.dense_indices] = data
+            outputs['K'] = K.reshape((size, size))
@@ -28,6 +28,48 @@ coeffs_z = np.array([
 ])
 
 
+def _get_stiffness_entries():
+    """
+    Get the nonzero entries of the 12 x 12 element stiffness matrix.
+
+    Each entry is a coefficient times one of the section properties (E * A,
+    G * J, E * Iy, or E * Iz) times a power of the element length.
+
+    Returns
+    -------
+    indices : numpy array
+        Flattened indices of the entries in the 12 x 12 matrix.
+    props : numpy array
+        Index of the section property of each entry, following the order
+        of the list above.
+    coeffs : numpy array
+        Constant coefficient of each entry.
+    powers : numpy array
+        Power of the element length in each entry.
+    """
+    indices, props, coeffs, powers = [], [], [], []
+
+    # Axial and torsional blocks
+    for prop, offset in [(0, 0), (1, 2)]:
+        i, j = np.meshgrid(np.arange(2), np.arange(2), indexing='ij')
+        indices.append(12 * (offset + i) + offset + j)
+        props.append(prop * np.ones((2, 2), int))
+        coeffs.append(coeffs_2)
+        powers.append(-np.ones((2, 2), int))
+
+    # Bending blocks; the rows and columns of the rotations (1 and 3) each
+    # bring an extra power of L
+    for prop, offset, coeffs_bending in [(2, 4, coeffs_y), (3, 8, coeffs_z)]:
+        i, j = np.meshgrid(np.arange(4), np.arange(4), indexing='ij')
+        indices.append(12 * (offset + i) + offset + j)
+        props.append(prop * np.ones((4, 4), int))
+        coeffs.append(coeffs_bending)
+        powers.append(-3 + i % 2 + j % 2)
+
+    return tuple(np.concatenate([array.flatten() for array in arrays])
+        for arrays in [indices, props, coeffs, powers])
+
+
 class LocalStiff(ExplicitComponent):
 
     def initialize(self):
@@ -46,108 +88,58 @@ class LocalStiff(ExplicitComponent):
 
         self.add_output('local_stiff', shape=(ny - 1, 12, 12))
 
-        rows = np.arange(144 * (ny - 1))
-        cols = np.outer(np.arange(ny - 1), np.ones(144, int)).flatten()
+        self.indices, self.props, self.coeffs, self.powers = _get_stiffness_entries()
 
-        self.declare_partials('local_stiff', 'A', rows=rows, cols=cols)
-        self.declare_partials('local_stiff', 'J', rows=rows, cols=cols)
-        self.declare_partials('local_stiff', 'Iy', rows=rows, cols=cols)
-        self.declare_partials('local_stiff', 'Iz', rows=rows, cols=cols)
+        # Each section property only appears in its own block of the matrix
+        # while the element lengths appear in all of the nonzero entries
+        arange = np.arange(ny - 1)
+        for prop, name in enumerate(['A', 'J', 'Iy', 'Iz']):
+            indices = self.indices[self.props == prop]
+            rows = (144 * arange[:, np.newaxis] + indices).flatten()
+            cols = np.repeat(arange, len(indices))
+            self.declare_partials('local_stiff', name, rows=rows, cols=cols)
+
+        rows = (144 * arange[:, np.newaxis] + self.indices).flatten()
+        cols = np.repeat(arange, len(self.indices))
         self.declare_partials('local_stiff', 'element_lengths', rows=rows, cols=cols)
 
-    def compute(self, inputs, outputs):
+    def _get_section_props(self, inputs):
         surface = self.options['surface']
-
-        ny = self.ny
         E = surface['E']
         G = surface['G']
 
-        A  = inputs['A']
-        Iy = inputs['Iy']
-        Iz = inputs['Iz']
-        J  = inputs['J']
-        L  = inputs['element_lengths']
-
-        outputs['local_stiff'] = 0.
-
-        for i in range(2):
-            for j in range(2):
-                outputs['local_stiff'][:, 0 + i, 0 + j] = E * A / L * coeffs_2[i, j]
-                outputs['local_stiff'][:, 2 + i, 2 + j] = G * J / L * coeffs_2[i, j]
-
-        for i in range(4):
-            for j in range(4):
-                outputs['local_stiff'][:, 4 + i, 4 + j] = E * Iy / L ** 3 * coeffs_y[i, j]
-                outputs['local_stiff'][:, 8 + i, 8 + j] = E * Iz / L ** 3 * coeffs_z[i, j]
-
-        for i in [1, 3]:
-            for j in range(4):
-                outputs['local_stiff'][:, 4 + i, 4 + j] *= L
-                outputs['local_stiff'][:, 8 + i, 8 + j] *= L
-        for i in range(4):
-            for j in [1, 3]:
-                outputs['local_stiff'][:, 4 + i, 4 + j] *= L
-                outputs['local_stiff'][:, 8 + i, 8 + j] *= L
+        return np.array([
+            E * inputs['A'],
+            G * inputs['J'],
+            E * inputs['Iy'],
+            E * inputs['Iz'],
+        ])
+
+    def compute(self, inputs, outputs):
+        ny = self.ny
+
+        section_props = self._get_section_props(inputs)
+        L = inputs['element_lengths']
+
+        values = section_props[self.props].T * self.coeffs * L[:, np.newaxis] ** self.powers
+
+        local_stiff = np.zeros((ny - 1, 144), dtype=values.dtype)
+        local_stiff[:, self.indices] = values
+        outputs['local_stiff'] = local_stiff.reshape((ny - 1, 12, 12))
 
     def compute_partials(self, inputs, partials):
         surface = self.options['surface']
-        ny = surface['mesh'].shape[1]
         E = surface['E']
         G = surface['G']
 
-        A  = inputs['A']
-        Iy = inputs['Iy']
-        Iz = inputs['Iz']
-        J  = inputs['J']
-        L  = inputs['element_lengths']
-
-        derivs_A = partials['local_stiff', 'A'].reshape((ny - 1, 12, 12))
-        derivs_Iy = partials['local_stiff', 'Iy'].reshape((ny - 1, 12, 12))
-        derivs_Iz = partials['local_stiff', 'Iz'].reshape((ny - 1, 12, 12))
-        derivs_J = partials['local_stiff', 'J'].reshape((ny - 1, 12, 12))
-        derivs_L = partials['local_stiff', 'element_lengths'].reshape((ny - 1, 12, 12))
-
-        derivs_A[:] = 0.
-        derivs_Iy[:] = 0.
-        derivs_Iz[:] = 0.
-        derivs_J[:] = 0.
-        derivs_L[:] = 0.
-
-        for i in range(2):
-            for j in range(2):
-                derivs_A[:, 0 + i, 0 + j] = E / L * coeffs_2[i, j]
-                derivs_L[:, 0 + i, 0 + j] = -E * A / L ** 2 * coeffs_2[i, j]
-
-                derivs_J[:, 2 + i, 2 + j] = G / L * coeffs_2[i, j]
-                derivs_L[:, 2 + i, 2 + j] = -G * J / L ** 2 * coeffs_2[i, j]
-
-        for i in range(4):
-            for j in range(4):
-                derivs_Iy[:, 4 + i, 4 + j] = E / L ** 3 * coeffs_y[i, j]
-                derivs_L [:, 4 + i, 4 + j] = -3 * E * Iy / L ** 4 * coeffs_y[i, j]
-
-                derivs_Iz[:, 8 + i, 8 + j] = E / L ** 3 * coeffs_z[i, j]
-                derivs_L [:, 8 + i, 8 + j] = -3 * E * Iz / L ** 4 * coeffs_z[i, j]
-
-        for i in [1, 3]:
-            for j in range(4):
-                derivs_Iy[:, 4 + i, 4 + j] = E / L ** 2 * coeffs_y[i, j]
-                derivs_L[:, 4 + i, 4 + j] = -2 * E * Iy / L ** 3 * coeffs_y[i, j]
-
-                derivs_Iz[:, 8 + i, 8 + j] = E / L ** 2 * coeffs_z[i, j]
-                derivs_L[:, 8 + i, 8 + j] = -2 * E * Iz / L ** 3 * coeffs_z[i, j]
-        for i in range(4):
-            for j in [1, 3]:
-                derivs_Iy[:, 4 + i, 4 + j] = E / L ** 2 * coeffs_y[i, j]
-                derivs_L[:, 4 + i, 4 + j] = -2 * E * Iy / L ** 3 * coeffs_y[i, j]
-
-                derivs_Iz[:, 8 + i, 8 + j] = E / L ** 2 * coeffs_z[i, j]
-                derivs_L[:, 8 + i, 8 + j] = -2 * E * Iz / L ** 3 * coeffs_z[i, j]
-
-        for i in [1, 3]:
-            for j in [1, 3]:
-                derivs_Iy[:, 4 + i, 4 + j] = E / L * coeffs_y[i, j]
-                derivs_L[:, 4 + i, 4 + j] = -E * Iy / L ** 2 * coeffs_y[i, j]
-
-                derivs_Iz[:, 8 + i, 8 + j] = E / L * coeffs_z[i, j]
-                derivs_L[:, 8 + i, 8 + j] = -E * Iz / L ** 2 * coeffs_z[i, j]
+        section_props = self._get_section_props(inputs)
+        L = inputs['element_lengths']
+
+        derivs = self.coeffs * L[:, np.newaxis] ** self.powers
+
+        for prop, (name, modulus) in enumerate([('A', E), ('J', G), ('Iy', E), ('Iz', E)]):
+            mask = self.props == prop
+            partials['local_stiff', name] = modulus * derivs[:, mask].flatten()
+
+        partials['local_stiff', 'element_lengths'] = (section_props[self.props].T * derivs
+            * self.powers / L[:, np.newaxis]).flatten()
@@ -10,10 +10,43 @@ class SectionPropertiesWingbox(ExplicitComponent):
 
     Parameters
     ----------
+    streamwise_chords[ny-1] : numpy array
+        Streamwise chord length of each element.
+    fem_chords[ny-1] : numpy array
+        Chord length of each element normal to the FEM element.
+    fem_twists[ny-1] : numpy array
+        Twist of the section normal to each FEM element.
+    spar_thickness[ny-1] : numpy array
+        Spar thickness of each element.
+    skin_thickness[ny-1] : numpy array
+        Skin thickness of each element.
+    t_over_c[ny-1] : numpy array
+        Streamwise thickness-to-chord ratio of each element.
 
     Returns
     -------
-
+    A[ny-1] : numpy array
+        Cross-sectional area of each wingbox element.
+    A_enc[ny-1] : numpy array
+        Cross-sectional enclosed area (measured using the material midlines) of each element.
+    A_int[ny-1] : numpy array
+        Cross-sectional internal area of each element, used for the fuel volume.
+    Iy[ny-1] : numpy array
+        Area moment of inertia about the y-axis of each element.
+    Qz[ny-1] : numpy array
+        First moment of area above the neutral axis of each element.
+    Iz[ny-1] : numpy array
+        Area moment of inertia about the z-axis of each element.
+    J[ny-1] : numpy array
+        Torsion constant of each element.
+    htop[ny-1] : numpy array
+        Distance to the top of the wingbox from the neutral axis of each element.
+    hbottom[ny-1] : numpy array
+        Distance to the bottom of the wingbox from the neutral axis of each element.
+    hfront[ny-1] : numpy array
+        Distance to the front of the wingbox from the neutral axis of each element.
+    hrear[ny-1] : numpy array
+        Distance to the rear of the wingbox from the neutral axis of each element.
     """
 
     def initialize(self):
@@ -51,9 +84,54 @@ class SectionPropertiesWingbox(ExplicitComponent):
         self.add_output('hfront', val=np.ones((self.ny - 1),  dtype = complex),units='m')
         self.add_output('hrear', val=np.ones((self.ny - 1),  dtype = complex),units='m')
 
-        self.declare_partials('*', '*', method='cs')
+        self.input_names = ['streamwise_chords', 'fem_chords', 'fem_twists',
+            'spar_thickness', 'skin_thickness', 't_over_c']
+        self.output_names = ['A', 'A_enc', 'A_int', 'Iy', 'Qz', 'Iz', 'J',
+            'htop', 'hbottom', 'hfront', 'hrear']
+
+        # Each element's properties only depend on that element's inputs.
+        # The enclosed and internal areas and the torsion constant are
+        # computed before the wingbox is rotated, so they do not depend on
+        # the twist.
+        arange = np.arange(self.ny - 1)
+        self.partial_names = set()
+        for of in self.output_names:
+            for wrt in self.input_names:
+                if wrt == 'fem_twists' and of in ['A_enc', 'A_int', 'J']:
+                    continue
+                self.declare_partials(of, wrt, rows=arange, cols=arange)
+                self.partial_names.add((of, wrt))
+
+        self.set_check_partial_options(wrt='*', method='cs')
 
     def compute(self, inputs, outputs):
+        self._compute_properties(inputs, outputs)
+
+    def compute_partials(self, inputs, partials):
+        # Since the Jacobians are diagonal, a single complex step that
+        # perturbs all the elements at once gives the derivatives of every
+        # element wrt one input, so we only need one evaluation per input.
+        step = 1e-40
+
+        values = {name : inputs[name].astype(complex) for name in self.input_names}
+        for wrt in self.input_names:
+            value = values[wrt]
+            values[wrt] = value + step * 1j
+
+            properties = {}
+            self._compute_properties(values, properties)
+
+            values[wrt] = value
+
+            for of in self.output_names:
+                if (of, wrt) in self.partial_names:
+                    partials[of, wrt] = properties[of].imag / step
+
+    def _compute_properties(self, inputs, outputs):
+        """
+        Compute the section properties from the inputs, which may be
+        complex, and store them in the outputs. Both can be dictionaries.
+        """
 
         chord = inputs['fem_chords']
         spar_thickness = inputs['spar_thickness']
@@ -46,13 +46,42 @@ class SparWithinWing(ExplicitComponent):
         self.add_input('t_over_c', val=np.zeros((self.ny-1)))
         self.add_output('spar_within_wing', val=np.zeros((self.ny-1)), units='m')
 
-        self.declare_partials('spar_within_wing', 'mesh', method='cs')
-
         arange = np.arange(self.ny - 1)
         self.declare_partials('spar_within_wing', 'radius', rows=arange, cols=arange, val=1.)
+        self.declare_partials('spar_within_wing', 't_over_c', rows=arange, cols=arange)
+
+        # Each element depends on the leading and trailing edge points at
+        # both of its ends
+        mesh_indices = np.arange(nx * self.ny * 3).reshape((nx, self.ny, 3))
+        cols = np.stack([
+            mesh_indices[0, :-1], mesh_indices[0, 1:],
+            mesh_indices[-1, :-1], mesh_indices[-1, 1:],
+        ], axis=1)
+        self.declare_partials('spar_within_wing', 'mesh',
+            rows=np.repeat(arange, 12), cols=cols.flatten())
 
     def compute(self, inputs, outputs):
         mesh = inputs['mesh']
         t_over_c = inputs['t_over_c']
         max_radius = radii(mesh, t_over_c)
         outputs['spar_within_wing'] = inputs['radius'] - max_radius
+
+    def compute_partials(self, inputs, partials):
+        mesh = inputs['mesh']
+        t_over_c = inputs['t_over_c']
+
+        vectors = mesh[-1, :, :] - mesh[0, :, :]
+        chords = np.sqrt(np.sum(vectors**2, axis=1))
+        mean_chords = 0.5 * chords[:-1] + 0.5 * chords[1:]
+
+        partials['spar_within_wing', 't_over_c'] = -mean_chords / 2.
+
+        # Derivatives of the max radius wrt the chord vectors at both ends
+        # of each element
+        dchords_dvectors = vectors / chords[:, np.newaxis]
+        dradius_dvectors = np.stack([
+            dchords_dvectors[:-1], dchords_dvectors[1:],
+        ], axis=1) * (t_over_c / 4.)[:, np.newaxis, np.newaxis]
+
+        partials['spar_within_wing', 'mesh'] = np.concatenate([
+            dradius_dvectors, -dradius_dvectors], axis=1).flatten()
@@ -5,6 +5,7 @@ from openaerostruct.structures.disp import Disp
 from openaerostruct.structures.wing_weight_loads import StructureWeightLoads
 from openaerostruct.structures.fuel_loads import FuelLoads
 from openaerostruct.structures.total_loads import TotalLoads
+from openaerostruct.structures.utils import get_stiffness_sparsity
 
 class SpatialBeamStates(Group):
     """ Group that contains the spatial beam states. """
@@ -18,6 +19,13 @@ class SpatialBeamStates(Group):
         ny = surface['mesh'].shape[1]
 
         size = int(6 * ny + 6)
+
+        # GlobalStiff outputs only the nonzero entries of K in this case
+        if surface.get('sparse_fem', False):
+            sparsity = get_stiffness_sparsity(ny)
+        else:
+            sparsity = None
+
         wingbox_promotes = []
         if surface['struct_weight_relief']:
             self.add_subsystem('struct_weight_loads',
@@ -42,7 +50,7 @@ class SpatialBeamStates(Group):
                  CreateRHS(surface=surface),
                  promotes_inputs=['total_loads'], promotes_outputs=['forces'])
         self.add_subsystem('fem',
-                 FEM(size=size),
+                 FEM(size=size, sparsity=sparsity),
                  promotes_inputs=['*'], promotes_outputs=['*'])
 
         self.add_subsystem('disp',
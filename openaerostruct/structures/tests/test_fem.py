@@ -1,6 +1,7 @@
 import unittest
 
 from openaerostruct.structures.fem import FEM
+from openaerostruct.structures.utils import get_stiffness_sparsity
 from openaerostruct.utils.testing import run_test, get_default_surfaces
 
 
@@ -14,6 +15,27 @@ class Test(unittest.TestCase):
 
         run_test(self, comp)
 
+    def test_lu_cache(self):
+        surface = get_default_surfaces()[0]
+
+        ny = surface['mesh'].shape[1]
+        comp = FEM(size= ny * 6)
+
+        prob = run_test(self, comp)
+
+        # The factorization from solve_nonlinear is reused when linearizing
+        lu_cache = prob.model.comp.lu_cache
+        self.assertEqual(lu_cache.misses, 1)
+        self.assertGreaterEqual(lu_cache.hits, 1)
+
+    def test_sparse(self):
+        surface = get_default_surfaces()[0]
+
+        ny = surface['mesh'].shape[1]
+        comp = FEM(size=6 * ny + 6, sparsity=get_stiffness_sparsity(ny))
+
+        run_test(self, comp)
+
 
 if __name__ == '__main__':
     unittest.main()
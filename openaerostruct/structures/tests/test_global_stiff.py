@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem, Group, IndepVarComp
+from openmdao.utils.assert_utils import assert_rel_error
+
+from openaerostruct.structures.global_stiff import GlobalStiff
+from openaerostruct.structures.utils import get_stiffness_sparsity
+from openaerostruct.utils.testing import run_test, get_default_surfaces
+
+
+class Test(unittest.TestCase):
+
+    def test_sparse(self):
+        surface = get_default_surfaces()[0]
+        surface['sparse_fem'] = True
+
+        comp = GlobalStiff(surface=surface)
+
+        run_test(self, comp, complex_flag=True, method='cs')
+
+    def test_sparse_matches_dense(self):
+        surface = get_default_surfaces()[0]
+        sparse_surface = dict(surface, sparse_fem=True)
+
+        ny = surface['mesh'].shape[1]
+
+        np.random.seed(314)
+        indep_var_comp = IndepVarComp()
+        indep_var_comp.add_output('nodes', val=np.random.random_sample((ny, 3)), units='m')
+        indep_var_comp.add_output('local_stiff_transformed',
+            val=np.random.random_sample((ny - 1, 12, 12)))
+
+        group = Group()
+        group.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
+        group.add_subsystem('dense', GlobalStiff(surface=surface), promotes_inputs=['*'])
+        group.add_subsystem('sparse', GlobalStiff(surface=sparse_surface), promotes_inputs=['*'])
+
+        prob = Problem(group)
+        prob.setup()
+        prob.run_model()
+
+        K = prob['dense.K']
+        rows, cols = get_stiffness_sparsity(ny)
+
+        assert_rel_error(self, prob['sparse.K'], K[rows, cols], 1e-12)
+
+        # All of the nonzero entries of the dense matrix are in the pattern
+        self.assertEqual(np.count_nonzero(K), np.count_nonzero(K[rows, cols]))
+
+
+if __name__ == '__main__':
+    unittest.main()
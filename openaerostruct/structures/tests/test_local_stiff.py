@@ -0,0 +1,22 @@
+import unittest
+
+from openaerostruct.structures.local_stiff import LocalStiff
+from openaerostruct.utils.testing import run_test, get_default_surfaces
+
+
+class Test(unittest.TestCase):
+
+    def test(self):
+        surface = get_default_surfaces()[0]
+
+        # turn down the moduli so the absolute deriv error isn't magnified
+        surface['E'] = 7.
+        surface['G'] = 3.
+
+        comp = LocalStiff(surface=surface)
+
+        run_test(self, comp, complex_flag=True, method='cs')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,18 @@ from openaerostruct.utils.testing import run_test, get_default_surfaces
 class Test(unittest.TestCase):
 
     def test(self):
+        self.run_partials_test(np.ones(3))
+
+    def test_zero_section_properties(self):
+        # The partials wrt J and Qz do not divide by them
+        prob = self.run_partials_test(np.array([0., 1., 0.]))
+
+        data = prob.check_partials(out_stream=None)
+        for wrt in ['J', 'Qz', 'A_enc']:
+            self.assertTrue(np.all(np.isfinite(
+                data['comp.vonmises_wingbox']['vonmises', wrt]['J_fwd'])))
+
+    def run_partials_test(self, section_vals):
         surface = get_default_surfaces()[0]
 
         # turn down some of these properties, so the absolute deriv error isn't magnified
@@ -32,9 +44,9 @@ class Test(unittest.TestCase):
 
         indep_var_comp.add_output('nodes', val=nodesval)
         indep_var_comp.add_output('disp', val=np.ones((ny, 6)))
-        indep_var_comp.add_output('Qz', val=np.ones((ny - 1)))
+        indep_var_comp.add_output('Qz', val=section_vals)
         indep_var_comp.add_output('Iz', val=np.ones((ny - 1)))
-        indep_var_comp.add_output('J', val=np.ones((ny - 1)))
+        indep_var_comp.add_output('J', val=section_vals)
         indep_var_comp.add_output('A_enc', val=np.ones((ny - 1)))
         indep_var_comp.add_output('spar_thickness', val=np.ones((ny - 1)))
         indep_var_comp.add_output('skin_thickness', val=np.ones((ny - 1)))
@@ -46,7 +58,7 @@ class Test(unittest.TestCase):
         group.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
         group.add_subsystem('vonmises_wingbox', comp, promotes=['*'])
 
-        run_test(self, group,  complex_flag=True, step=1e-8, atol=2e-5, compact_print=True)
+        return run_test(self, group,  complex_flag=True, step=1e-8, atol=2e-5, compact_print=True)
 
 
 if __name__ == '__main__':
@@ -23,7 +23,12 @@ class Test(unittest.TestCase):
 
         indep_var_comp = IndepVarComp()
 
-        indep_var_comp.add_output('mesh', val=surface['mesh'])
+        # Twist the mesh, since the twist angles are not differentiable
+        # at zero twist
+        mesh = surface['mesh'].copy()
+        mesh[-1, :, 2] += np.linspace(0.1, 0.3, mesh.shape[1])
+
+        indep_var_comp.add_output('mesh', val=mesh)
 
         group.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
         group.add_subsystem('wingbox_geometry', comp, promotes=['*'])
@@ -2,6 +2,8 @@ from __future__ import division, print_function
 import numpy as np
 from scipy.linalg import lu_factor, lu_solve
 
+from openaerostruct.utils.vector_algebra import compute_skew
+
 
 def norm(vec, axis=None):
     return np.sqrt(np.sum(vec**2, axis=axis))
@@ -60,3 +62,126 @@ def radii(mesh, t_c=0.15):
     chords = np.sqrt(np.sum(vectors**2, axis=1))
     mean_chords = 0.5 * chords[:-1] + 0.5 * chords[1:]
     return t_c * mean_chords / 2.
+
+
+def get_stiffness_sparsity(ny):
+    """
+    Get the sparsity pattern of the global stiffness matrix of a spatial
+    beam with ny nodes.
+
+    The element stiffness matrices only couple neighboring nodes, so the
+    6 x 6 node blocks are tridiagonal. The last 6 rows and columns hold the
+    constraint entries that pin the constrained node; since that node can
+    change with the design, we keep entries for every node and leave the
+    ones not in use as zeros.
+
+    Parameters
+    ----------
+    ny : int
+        Number of spanwise nodes of the beam.
+
+    Returns
+    -------
+    rows, cols : numpy arrays
+        The row and column indices of the nonzero entries of K, ordered by
+        column and then row (CSC order).
+    """
+    num_dofs = 6 * ny
+    arange = np.arange(ny)
+
+    # Node pairs of the diagonal, super-diagonal, and sub-diagonal blocks
+    node_i = np.concatenate([arange, arange[:-1], arange[1:]])
+    node_j = np.concatenate([arange, arange[1:], arange[:-1]])
+
+    dof = np.arange(6)
+    block_rows = 6 * node_i[:, np.newaxis, np.newaxis] + dof[np.newaxis, :, np.newaxis]
+    block_cols = 6 * node_j[:, np.newaxis, np.newaxis] + dof[np.newaxis, np.newaxis, :]
+    block_rows, block_cols = np.broadcast_arrays(block_rows, block_cols)
+
+    con_rows = np.arange(num_dofs)
+    con_cols = num_dofs + con_rows % 6
+
+    rows = np.concatenate([block_rows.flatten(), con_rows, con_cols])
+    cols = np.concatenate([block_cols.flatten(), con_cols, con_rows])
+
+    order = np.lexsort((rows, cols))
+    return rows[order], cols[order]
+
+
+def _unit_d(vec):
+    """
+    Get the derivatives of unit(vec) wrt vec for each vector in vec[n, 3].
+    """
+    vec_norm = norm(vec, axis=-1)[..., np.newaxis, np.newaxis]
+    vec_unit = vec / vec_norm[..., 0]
+    return (np.eye(3) - np.einsum('ni,nj->nij', vec_unit, vec_unit)) / vec_norm
+
+
+def compute_element_frames(nodes):
+    """
+    Compute the length and the local coordinate frame of each element of
+    a spatial beam, for all elements at once.
+
+    The local x axis goes from the first to the second node of the element,
+    and the global x axis is used as the reference to get the other two.
+
+    Parameters
+    ----------
+    nodes[ny, 3] : numpy array
+        Coordinates of the FEM nodes.
+
+    Returns
+    -------
+    L[ny-1] : numpy array
+        Length of each element.
+    T[ny-1, 3, 3] : numpy array
+        Transformation from the global to the local frame of each element;
+        the rows are the local x, y, and z axes.
+    """
+    x_gl = np.array([1., 0., 0.])
+
+    dP = nodes[1:] - nodes[:-1]
+    L = norm(dP, axis=1)
+
+    x_loc = dP / L[:, np.newaxis]
+    y_loc = np.cross(x_loc, x_gl)
+    y_loc /= norm(y_loc, axis=1)[:, np.newaxis]
+    z_loc = np.cross(x_loc, y_loc)
+    z_loc /= norm(z_loc, axis=1)[:, np.newaxis]
+
+    T = np.stack([x_loc, y_loc, z_loc], axis=1)
+
+    return L, T
+
+
+def compute_element_frames_deriv(nodes):
+    """
+    Compute the element lengths and frames as in `compute_element_frames`,
+    along with the derivatives of the frames wrt the element vectors
+    dP = nodes[1:] - nodes[:-1].
+
+    Returns
+    -------
+    L[ny-1] : numpy array
+        Length of each element. Its derivative wrt dP is T[:, 0, :].
+    T[ny-1, 3, 3] : numpy array
+        Transformation from the global to the local frame of each element.
+    dT_ddP[ny-1, 3, 3, 3] : numpy array
+        Derivatives of T[:, i, j] wrt dP[:, k], indexed [:, i, j, k].
+    """
+    x_gl = np.array([1., 0., 0.])
+
+    L, T = compute_element_frames(nodes)
+    dP = nodes[1:] - nodes[:-1]
+    x_loc, y_loc = T[:, 0], T[:, 1]
+
+    dx_ddP = _unit_d(dP)
+    dy_ddP = np.einsum('nij,jk,nkl->nil',
+        _unit_d(np.cross(x_loc, x_gl)), -compute_skew(x_gl), dx_ddP)
+    dz_ddP = np.einsum('nij,njl->nil', _unit_d(np.cross(x_loc, y_loc)),
+        np.einsum('nij,njl->nil', -compute_skew(y_loc), dx_ddP) +
+        np.einsum('nij,njl->nil', compute_skew(x_loc), dy_ddP))
+
+    dT_ddP = np.stack([dx_ddP, dy_ddP, dz_ddP], axis=1)
+
+    return L, T, dT_ddP
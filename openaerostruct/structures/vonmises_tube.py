@@ -3,7 +3,7 @@ import numpy as np
 
 from openmdao.api import ExplicitComponent
 
-from openaerostruct.structures.utils import norm, unit, norm_d, unit_d, cross_d
+from openaerostruct.structures.utils import compute_element_frames, compute_element_frames_deriv
 
 class VonMisesTube(ExplicitComponent):
     """ Compute the von Mises stress in each element.
@@ -41,235 +41,96 @@ class VonMisesTube(ExplicitComponent):
         self.E = surface['E']
         self.G = surface['G']
 
-        # TODO fix the sparsity declarations
-        self.declare_partials('*', '*')
+        num_elems = self.ny - 1
+        elems = np.arange(num_elems)
 
-    def compute(self, inputs, outputs):
-        dtype = float
-        if self.under_complex_step:
-            dtype = complex
+        # Each stress only depends on the two nodes of its element
+        rows = np.arange(2 * num_elems).reshape((num_elems, 2))
+
+        self.declare_partials('vonmises', 'radius',
+            rows=rows.flatten(), cols=np.repeat(elems, 2))
+        self.declare_partials('vonmises', 'disp',
+            rows=np.repeat(rows, 12).flatten(),
+            cols=np.tile(6 * elems[:, np.newaxis, np.newaxis] + np.arange(12), (1, 2, 1)).flatten())
+        self.declare_partials('vonmises', 'nodes',
+            rows=np.repeat(rows, 6).flatten(),
+            cols=np.tile(3 * elems[:, np.newaxis, np.newaxis] + np.arange(6), (1, 2, 1)).flatten())
 
-        self.T = np.zeros((3, 3),dtype=dtype)
-        self.x_gl = np.array([1, 0, 0],dtype=dtype)
+    def compute(self, inputs, outputs):
         radius = inputs['radius']
         disp = inputs['disp']
         nodes = inputs['nodes']
-        T = self.T
         E = self.E
         G = self.G
-        x_gl = self.x_gl
-
-        num_elems = self.ny - 1
-        for ielem in range(self.ny-1):
 
-            P0 = nodes[ielem, :]
-            P1 = nodes[ielem+1, :]
-            L = norm(P1 - P0)
+        L, T = compute_element_frames(nodes)
 
-            x_loc = unit(P1 - P0)
-            y_loc = unit(np.cross(x_loc, x_gl))
-            z_loc = unit(np.cross(x_loc, y_loc))
+        # Relative displacements and rotations of the second node of each
+        # element wrt the first one, in the local frame
+        du = np.einsum('nij,nj->ni', T, disp[1:, :3] - disp[:-1, :3])
+        dr = np.einsum('nij,nj->ni', T, disp[1:, 3:] - disp[:-1, 3:])
 
-            T[0, :] = x_loc
-            T[1, :] = y_loc
-            T[2, :] = z_loc
+        tmp = np.sqrt(dr[:, 1]**2 + dr[:, 2]**2)
+        sxx0 = E * du[:, 0] / L + E * radius / L * tmp
+        sxx1 = -E * du[:, 0] / L + E * radius / L * tmp
+        sxt = G * radius * dr[:, 0] / L
 
-            u0x, u0y, u0z = T.dot(disp[ielem, :3])
-            r0x, r0y, r0z = T.dot(disp[ielem, 3:])
-            u1x, u1y, u1z = T.dot(disp[ielem+1, :3])
-            r1x, r1y, r1z = T.dot(disp[ielem+1, 3:])
-
-            tmp = np.sqrt((r1y - r0y)**2 + (r1z - r0z)**2)
-            sxx0 = E * (u1x - u0x) / L + E * radius[ielem] / L * tmp
-            sxx1 = E * (u0x - u1x) / L + E * radius[ielem] / L * tmp
-            sxt = G * radius[ielem] * (r1x - r0x) / L
-
-            outputs['vonmises'][ielem, 0] = np.sqrt(sxx0**2 + 3 * sxt**2)
-            outputs['vonmises'][ielem, 1] = np.sqrt(sxx1**2 + 3 * sxt**2)
+        outputs['vonmises'][:, 0] = np.sqrt(sxx0**2 + 3 * sxt**2)
+        outputs['vonmises'][:, 1] = np.sqrt(sxx1**2 + 3 * sxt**2)
 
     def compute_partials(self, inputs, partials):
-
         radius = inputs['radius']
         disp = inputs['disp']
         nodes = inputs['nodes']
-        T = self.T
         E = self.E
         G = self.G
-        x_gl = self.x_gl
 
         num_elems = self.ny - 1
-        for ielem in range(num_elems):
-
-            # Compute the coordinate delta between the two element end points
-            P0 = nodes[ielem, :]
-            P1 = nodes[ielem+1, :]
-            dP = P1 - P0
-
-            # and its derivatives
-            ddPdP0 = -1.0*np.eye(3)
-            ddPdP1 = 1.0*np.eye(3)
-
-            # Compute the element length and its derivative
-            L = norm(dP)
-            dLddP = norm_d(dP)
-
-            # unit function converts a vector to a unit vector
-            # calculate the transormation to the local element frame.
-            # We use x_gl to provide a reference axis to reference
-            x_loc = unit(dP)
-            dxdP = unit_d(dP)
-
-            y_loc = unit(np.cross(x_loc, x_gl))
-            dtmpdx,dummy = cross_d(x_loc,x_gl)
-            dydtmp = unit_d(np.cross(x_loc, x_gl))
-            dydP = dydtmp.dot(dtmpdx).dot(dxdP)
-
-            z_loc = unit(np.cross(x_loc, y_loc))
-            dtmpdx,dtmpdy = cross_d(x_loc,y_loc)
-            dzdtmp = unit_d(np.cross(x_loc, y_loc))
-            dzdP = dzdtmp.dot(dtmpdx).dot(dxdP)+dzdtmp.dot(dtmpdy).dot(dydP)
-
-            T[0, :] = x_loc
-            T[1, :] = y_loc
-            T[2, :] = z_loc
-
-            #$$$$$$$$$$$$$$$$$$$$$$$$$$
-            # Original code
-            # $$$$$$$$$$$$
-            u0x, u0y, u0z = T.dot(disp[ielem, :3])
-            r0x, r0y, r0z = T.dot(disp[ielem, 3:])
-            u1x, u1y, u1z = T.dot(disp[ielem+1, :3])
-            r1x, r1y, r1z = T.dot(disp[ielem+1, 3:])
-
-            # #$$$$$$$$$$$$$$$$$$$$$$$$$$
-
-            # The derivatives of the above code wrt displacement all boil down to sections of the T matrix
-            dxddisp = T[0,:]
-            dyddisp = T[1,:]
-            dzddisp = T[2,:]
-
-            #The derivatives of the above code wrt T all boil down to sections of the #displacement vector
-            # du0dT = disp[ielem, :3]
-            # dr0dT = disp[ielem, 3:]
-            # du1dT = disp[ielem+1, :3]
-            # dr1dT = disp[ielem+1, 3:]
-
-            du0dloc = disp[ielem, :3]
-            dr0dloc = disp[ielem, 3:]
-            du1dloc = disp[ielem+1, :3]
-            dr1dloc = disp[ielem+1, 3:]
-
-            #$$$$$$$$$$$$$$$$$$$$$$$$$$
-            # Original code
-            # $$$$$$$$$$$$
-            tmp = np.sqrt((r1y - r0y)**2 + (r1z - r0z)**2) + 1e-50 #added eps to avoid 0 disp singularity
-            sxx0 = E * (u1x - u0x) / L + E * radius[ielem] / L * tmp
-            sxx1 = E * (u0x - u1x) / L + E * radius[ielem] / L * tmp
-            sxt = G * radius[ielem] * (r1x - r0x) / L
-            # $$$$$$$$$$$$$$$$$$$$$$$$$$$$$$
-
-            dtmpdr0y = 1/tmp * (r1y - r0y)*-1
-            dtmpdr1y = 1/tmp * (r1y - r0y)
-            dtmpdr0z = 1/tmp * (r1z - r0z)*-1
-            dtmpdr1z = 1/tmp * (r1z - r0z)
-
-            # Combine all of the derivtives for tmp
-            dtmpdDisp = np.zeros(2 * 6)
-            dr0xdDisp = np.zeros(2*6)
-            dr0ydDisp = np.zeros(2*6)
-            dr0zdDisp = np.zeros(2*6)
-            dr1xdDisp = np.zeros(2*6)
-            dr1ydDisp = np.zeros(2*6)
-            dr1zdDisp = np.zeros(2*6)
-
-            idx1 = 3
-            idx2 = 6 + 3
-            #r0 term
-            dr0xdDisp[idx1:idx1+3] = dxddisp
-            dr0ydDisp[idx1:idx1+3] = dyddisp
-            dr0zdDisp[idx1:idx1+3] = dzddisp
-            dr1xdDisp[idx2:idx2+3] = dxddisp
-            dr1ydDisp[idx2:idx2+3] = dyddisp
-            dr1zdDisp[idx2:idx2+3] = dzddisp
-            dtmpdDisp = (dtmpdr0y*dr0ydDisp+dtmpdr1y*dr1ydDisp+\
-                        dtmpdr0z*dr0zdDisp+dtmpdr1z*dr1zdDisp)
-
-            # x_loc, y_loc and z_loc terms
-            dtmpdx_loc = np.array([0,0,0])
-            dtmpdy_loc = dtmpdr0y*dr0dloc + dtmpdr1y*dr1dloc
-            dtmpdz_loc = dtmpdr0z*dr0dloc + dtmpdr1z*dr1dloc
-
-            dtmpdP = dtmpdx_loc.dot(dxdP) + dtmpdy_loc.dot(dydP) + dtmpdz_loc.dot(dzdP)
-
-            dsxx0dtmp = E * radius[ielem] / L
-            dsxx0du0x = -E / L
-            dsxx0du1x = E / L
-            dsxx0dL =  -E * (u1x - u0x) / (L*L) - E * radius[ielem] / (L*L) * tmp
-
-            dsxx1dtmp = E * radius[ielem] / L
-            dsxx1du0x = E / L
-            dsxx1du1x = -E / L
-            dsxx1dL = -E * (u0x - u1x) / (L*L) - E * radius[ielem] / (L*L) * tmp
-
-            dsxx0dP = dsxx0dtmp * dtmpdP + \
-                      dsxx0du0x*du0dloc.dot(dxdP) + dsxx0du1x*du1dloc.dot(dxdP)+\
-                      dsxx0dL*dLddP
-
-            dsxx1dP = dsxx1dtmp * dtmpdP + \
-                      dsxx1du0x*du0dloc.dot(dxdP)+dsxx1du1x*du1dloc.dot(dxdP)+\
-                      dsxx1dL*dLddP
-
-            # Combine sxx0 and sxx1 terms
-            idx1 = 0
-            idx2 = 6
-            # Start with the tmp term
-            dsxx0dDisp = dsxx0dtmp * dtmpdDisp
-            dsxx1dDisp = dsxx1dtmp * dtmpdDisp
-
-            # Now add the direct u dep
-            dsxx0dDisp[idx1:idx1+3] = dsxx0du0x * dxddisp
-            dsxx0dDisp[idx2:idx2+3] = dsxx0du1x * dxddisp
-
-            dsxx1dDisp[idx1:idx1+3] = dsxx1du0x * dxddisp
-            dsxx1dDisp[idx2:idx2+3] = dsxx1du1x * dxddisp
-
-            # Combine sxt term
-            dsxtdDisp = np.zeros(2 * 6)
-            idx1 = 3
-            idx2 = 6 + 3
-
-            dsxtdr0x = -G * radius[ielem] / L
-            dsxtdr1x = G * radius[ielem] / L
-            dsxtdL =  - G * radius[ielem] * (r1x - r0x) / (L*L)
-
-            dsxtdP = dsxtdr0x*(dr0dloc.dot(dxdP))+ dsxtdr1x*(dr1dloc.dot(dxdP))+\
-                     dsxtdL*dLddP
-            #disp
-            dsxtdDisp= dsxtdr0x * dr0xdDisp + dsxtdr1x * dr1xdDisp
-
-            #radius derivatives
-            dsxx0drad = E / L * tmp
-            dsxx1drad = E / L * tmp
-            dsxtdrad = G * (r1x - r0x)/L
-
-            dVm0dsxx0 = (sxx0)/(np.sqrt(sxx0**2 + 3 * sxt**2))
-            dVm0dsxt = (3*sxt)/(np.sqrt(sxx0**2 + 3 * sxt**2))
-            dVm1dsxx1 = (sxx1)/(np.sqrt(sxx1**2 + 3 * sxt**2))
-            dVm1dsxt = (3*sxt)/(np.sqrt(sxx1**2 + 3 * sxt**2))
-
-            idx = ielem*2
-            partials['vonmises','radius'][idx,ielem] = dVm0dsxx0*dsxx0drad+dVm0dsxt*dsxtdrad
-            partials['vonmises','radius'][idx+1,ielem] = dVm1dsxx1*dsxx1drad+dVm1dsxt*dsxtdrad
-
-            idx2 = ielem*6
-            partials['vonmises','disp'][idx,idx2:idx2+12] = (dVm0dsxx0*dsxx0dDisp+dVm0dsxt*dsxtdDisp )
-            partials['vonmises','disp'][idx+1,idx2:idx2+12] = (dVm1dsxx1*dsxx1dDisp+dVm1dsxt*dsxtdDisp )
-
-            # Compute terms for the nodes
-            idx3 = ielem*3
-
-            partials['vonmises','nodes'][idx,idx3:idx3+3] = dVm0dsxx0*dsxx0dP.dot(ddPdP0)+dVm0dsxt*dsxtdP.dot(ddPdP0)
-            partials['vonmises','nodes'][idx,idx3+3:idx3+6] = dVm0dsxx0*dsxx0dP.dot(ddPdP1)+dVm0dsxt*dsxtdP.dot(ddPdP1)
-
-            partials['vonmises','nodes'][idx+1,idx3:idx3+3] = dVm1dsxx1*dsxx1dP.dot(ddPdP0)+dVm1dsxt*dsxtdP.dot(ddPdP0)
-            partials['vonmises','nodes'][idx+1,idx3+3:idx3+6] = dVm1dsxx1*dsxx1dP.dot(ddPdP1)+dVm1dsxt*dsxtdP.dot(ddPdP1)
+
+        L, T, dT_ddP = compute_element_frames_deriv(nodes)
+
+        Du = disp[1:, :3] - disp[:-1, :3]
+        Dr = disp[1:, 3:] - disp[:-1, 3:]
+        du = np.einsum('nij,nj->ni', T, Du)
+        dr = np.einsum('nij,nj->ni', T, Dr)
+
+        tmp = np.sqrt(dr[:, 1]**2 + dr[:, 2]**2) + 1e-50 #added eps to avoid 0 disp singularity
+        sxx = np.empty((num_elems, 2))
+        sxx[:, 0] = E * du[:, 0] / L + E * radius / L * tmp
+        sxx[:, 1] = -E * du[:, 0] / L + E * radius / L * tmp
+        sxt = G * radius * dr[:, 0] / L
+
+        vonmises = np.sqrt(sxx**2 + 3 * sxt[:, np.newaxis]**2)
+        dvm_dsxx = sxx / vonmises
+        dvm_dsxt = 3 * sxt[:, np.newaxis] / vonmises
+
+        # Derivatives of the two stresses wrt the local relative
+        # displacements and rotations
+        dvm_ddu = np.zeros((num_elems, 2, 3))
+        dvm_ddu[:, 0, 0] = dvm_dsxx[:, 0] * E / L
+        dvm_ddu[:, 1, 0] = -dvm_dsxx[:, 1] * E / L
+
+        dtmp_ddr = np.zeros((num_elems, 3))
+        dtmp_ddr[:, 1:] = dr[:, 1:] / tmp[:, np.newaxis]
+
+        dvm_ddr = np.einsum('nk,ni->nki', dvm_dsxx * (E * radius / L)[:, np.newaxis], dtmp_ddr)
+        dvm_ddr[:, :, 0] += dvm_dsxt * (G * radius / L)[:, np.newaxis]
+
+        # The global relative displacements only enter through T
+        dvm_dDu = np.einsum('nki,nij->nkj', dvm_ddu, T)
+        dvm_dDr = np.einsum('nki,nij->nkj', dvm_ddr, T)
+
+        dvm_ddisp = np.concatenate([-dvm_dDu, -dvm_dDr, dvm_dDu, dvm_dDr], axis=2)
+        partials['vonmises', 'disp'] = dvm_ddisp.flatten()
+
+        # All of the stresses are inversely proportional to L, and L and T
+        # depend on the nodes through the element vector dP
+        dvm_ddP = -vonmises[:, :, np.newaxis] / L[:, np.newaxis, np.newaxis] * T[:, np.newaxis, 0, :]
+        dvm_ddP += np.einsum('nki,nijl,nj->nkl', dvm_ddu, dT_ddP, Du)
+        dvm_ddP += np.einsum('nki,nijl,nj->nkl', dvm_ddr, dT_ddP, Dr)
+
+        partials['vonmises', 'nodes'] = np.concatenate([-dvm_ddP, dvm_ddP], axis=2).flatten()
+
+        dvm_dradius = dvm_dsxx * (E * tmp / L)[:, np.newaxis] + \
+            dvm_dsxt * (G * dr[:, 0] / L)[:, np.newaxis]
+        partials['vonmises', 'radius'] = dvm_dradius.flatten()
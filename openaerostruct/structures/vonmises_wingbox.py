@@ -3,7 +3,7 @@ import numpy as np
 
 from openmdao.api import ExplicitComponent
 
-from openaerostruct.structures.utils import norm, unit
+from openaerostruct.structures.utils import compute_element_frames, compute_element_frames_deriv
 
 
 class VonMisesWingbox(ExplicitComponent):
@@ -57,7 +57,22 @@ class VonMisesWingbox(ExplicitComponent):
 
         self.tssf = top_skin_strength_factor = surface['strength_factor_for_upper_skin']
 
-        self.declare_partials('*', '*', method='cs')
+        num_elems = self.ny - 1
+        elems = np.arange(num_elems)
+
+        # Each stress only depends on the two nodes and the section
+        # properties of its element
+        rows = np.arange(4 * num_elems).reshape((num_elems, 4))
+
+        for name in ['Qz', 'J', 'A_enc', 'spar_thickness', 'htop', 'hbottom', 'hfront', 'hrear']:
+            self.declare_partials('vonmises', name,
+                rows=rows.flatten(), cols=np.repeat(elems, 4))
+        self.declare_partials('vonmises', 'disp',
+            rows=np.repeat(rows, 12).flatten(),
+            cols=np.tile(6 * elems[:, np.newaxis, np.newaxis] + np.arange(12), (1, 4, 1)).flatten())
+        self.declare_partials('vonmises', 'nodes',
+            rows=np.repeat(rows, 6).flatten(),
+            cols=np.tile(3 * elems[:, np.newaxis, np.newaxis] + np.arange(6), (1, 4, 1)).flatten())
 
     def compute(self, inputs, outputs):
         disp = inputs['disp']
@@ -74,53 +89,165 @@ class VonMisesWingbox(ExplicitComponent):
         skin_thickness = inputs['skin_thickness']
         vonmises = outputs['vonmises']
 
-        # Only use complex type for these arrays if we're using cs to check derivs
-        dtype = type(disp[0, 0])
-        T = np.zeros((3, 3), dtype=dtype)
-        x_gl = np.array([1, 0, 0], dtype=dtype)
+        E = self.E
+        G = self.G
+
+        L, T = compute_element_frames(nodes)
+
+        # Displacements and rotations of both nodes of each element in the
+        # element's local frame
+        u0 = np.einsum('nij,nj->in', T, disp[:-1, :3])
+        r0 = np.einsum('nij,nj->in', T, disp[:-1, 3:])
+        u1 = np.einsum('nij,nj->in', T, disp[1:, :3])
+        r1 = np.einsum('nij,nj->in', T, disp[1:, 3:])
+
+        u0x, u0y, u0z = u0
+        r0x, r0y, r0z = r0
+        u1x, u1y, u1z = u1
+        r1x, r1y, r1z = r1
+
+        axial_stress = E * (u1x - u0x) / L      # this is stress = modulus * strain; positive is tensile
+        torsion_stress = G * J / L * (r1x - r0x) / 2 / spar_thickness / A_enc   # this is Torque / (2 * thickness_min * Area_enclosed)
+        top_bending_stress = E / (L**2) * (6 * u0y + 2 * r0z * L - 6 * u1y + 4 * r1z * L ) * htop # this is moment * htop / I
+        bottom_bending_stress = - E / (L**2) * (6 * u0y + 2 * r0z * L - 6 * u1y + 4 * r1z * L ) * hbottom # this is moment * htop / I
+        front_bending_stress = - E / (L**2) * (-6 * u0z + 2 * r0y * L + 6 * u1z + 4 * r1y * L ) * hfront # this is moment * htop / I
+        rear_bending_stress = E / (L**2) * (-6 * u0z + 2 * r0y * L + 6 * u1z + 4 * r1y * L ) * hrear # this is moment * htop / I
+
+        vertical_shear =  E / (L**3) *(-12 * u0y - 6 * r0z * L + 12 * u1y - 6 * r1z * L ) * Qy / (2 * spar_thickness) # shear due to bending (VQ/It) note: the I used to get V cancels the other I
+
+        vonmises[:, 0] = np.sqrt((top_bending_stress + rear_bending_stress + axial_stress)**2 + 3*torsion_stress**2) / self.tssf
+        vonmises[:, 1] = np.sqrt((bottom_bending_stress + front_bending_stress + axial_stress)**2 + 3*torsion_stress**2)
+        vonmises[:, 2] = np.sqrt((front_bending_stress + axial_stress)**2 + 3*(torsion_stress-vertical_shear)**2)
+        vonmises[:, 3] = np.sqrt((rear_bending_stress + axial_stress)**2 + 3*(torsion_stress+vertical_shear)**2) / self.tssf
+
+    def compute_partials(self, inputs, partials):
+        disp = inputs['disp']
+        nodes = inputs['nodes']
+        A_enc = inputs['A_enc']
+        Qy = inputs['Qz']
+        J = inputs['J']
+        htop = inputs['htop']
+        hbottom = inputs['hbottom']
+        hfront = inputs['hfront']
+        hrear = inputs['hrear']
+        spar_thickness = inputs['spar_thickness']
 
         E = self.E
         G = self.G
 
         num_elems = self.ny - 1
-        for ielem in range(num_elems):
-
-            P0 = nodes[ielem, :]
-            P1 = nodes[ielem+1, :]
-            L = norm(P1 - P0)
-
-            x_loc = unit(P1 - P0)
-            y_loc = unit(np.cross(x_loc, x_gl))
-            z_loc = unit(np.cross(x_loc, y_loc))
-
-            T[0, :] = x_loc
-            T[1, :] = y_loc
-            T[2, :] = z_loc
-
-            u0x, u0y, u0z = T.dot(disp[ielem, :3])
-            r0x, r0y, r0z = T.dot(disp[ielem, 3:])
-            u1x, u1y, u1z = T.dot(disp[ielem+1, :3])
-            r1x, r1y, r1z = T.dot(disp[ielem+1, 3:])
-
-            axial_stress = E * (u1x - u0x) / L      # this is stress = modulus * strain; positive is tensile
-            torsion_stress = G * J[ielem] / L * (r1x - r0x) / 2 / spar_thickness[ielem] / A_enc[ielem]   # this is Torque / (2 * thickness_min * Area_enclosed)
-            top_bending_stress = E / (L**2) * (6 * u0y + 2 * r0z * L - 6 * u1y + 4 * r1z * L ) * htop[ielem] # this is moment * htop / I
-            bottom_bending_stress = - E / (L**2) * (6 * u0y + 2 * r0z * L - 6 * u1y + 4 * r1z * L ) * hbottom[ielem] # this is moment * htop / I
-            front_bending_stress = - E / (L**2) * (-6 * u0z + 2 * r0y * L + 6 * u1z + 4 * r1y * L ) * hfront[ielem] # this is moment * htop / I
-            rear_bending_stress = E / (L**2) * (-6 * u0z + 2 * r0y * L + 6 * u1z + 4 * r1y * L ) * hrear[ielem] # this is moment * htop / I
-
-            vertical_shear =  E / (L**3) *(-12 * u0y - 6 * r0z * L + 12 * u1y - 6 * r1z * L ) * Qy[ielem] / (2 * spar_thickness[ielem]) # shear due to bending (VQ/It) note: the I used to get V cancels the other I
-
-            # print("==========",ielem,"================")
-            # print("vertical_shear", vertical_shear)
-            # print("top",top_bending_stress)
-            # print("bottom",bottom_bending_stress)
-            # print("front",front_bending_stress)
-            # print("rear",rear_bending_stress)
-            # print("axial", axial_stress)
-            # print("torsion", torsion_stress)
-
-            vonmises[ielem, 0] = np.sqrt((top_bending_stress + rear_bending_stress + axial_stress)**2 + 3*torsion_stress**2) / self.tssf
-            vonmises[ielem, 1] = np.sqrt((bottom_bending_stress + front_bending_stress + axial_stress)**2 + 3*torsion_stress**2)
-            vonmises[ielem, 2] = np.sqrt((front_bending_stress + axial_stress)**2 + 3*(torsion_stress-vertical_shear)**2)
-            vonmises[ielem, 3] = np.sqrt((rear_bending_stress + axial_stress)**2 + 3*(torsion_stress+vertical_shear)**2) / self.tssf
+
+        L, T, dT_ddP = compute_element_frames_deriv(nodes)
+
+        # Displacements and rotations of both nodes of each element in the
+        # element's local frame, stored as [u0, r0, u1, r1]
+        disp_blocks = np.stack([disp[:-1, :3], disp[:-1, 3:], disp[1:, :3], disp[1:, 3:]], axis=1)
+        q = np.einsum('nij,nbj->nbi', T, disp_blocks).reshape((num_elems, 12))
+
+        # All of the stresses are linear in q. These are their coefficients
+        # for the axial, torsion, vertical and horizontal bending moment,
+        # and vertical shear stresses, along with the powers of L they scale
+        # with.
+        coeffs = np.zeros((num_elems, 5, 12))
+        powers = np.zeros((5, 12))
+
+        coeffs[:, 0, 0] = -E / L
+        coeffs[:, 0, 6] = E / L
+        powers[0, [0, 6]] = -1
+
+        torsion_factor = G * J / L / 2 / spar_thickness / A_enc
+        coeffs[:, 1, 3] = -torsion_factor
+        coeffs[:, 1, 9] = torsion_factor
+        powers[1, [3, 9]] = -1
+
+        coeffs[:, 2, 1] = 6 * E / L**2
+        coeffs[:, 2, 5] = 2 * E / L
+        coeffs[:, 2, 7] = -6 * E / L**2
+        coeffs[:, 2, 11] = 4 * E / L
+        powers[2, [1, 5, 7, 11]] = [-2, -1, -2, -1]
+
+        coeffs[:, 3, 2] = -6 * E / L**2
+        coeffs[:, 3, 4] = 2 * E / L
+        coeffs[:, 3, 8] = 6 * E / L**2
+        coeffs[:, 3, 10] = 4 * E / L
+        powers[3, [2, 4, 8, 10]] = [-2, -1, -2, -1]
+
+        shear_factor = Qy / (2 * spar_thickness)
+        coeffs[:, 4, 1] = -12 * E / L**3 * shear_factor
+        coeffs[:, 4, 5] = -6 * E / L**2 * shear_factor
+        coeffs[:, 4, 7] = 12 * E / L**3 * shear_factor
+        coeffs[:, 4, 11] = -6 * E / L**2 * shear_factor
+        powers[4, [1, 5, 7, 11]] = [-3, -2, -3, -2]
+
+        stresses = np.einsum('nmi,ni->nm', coeffs, q)
+        axial, torsion, moment_vert, moment_horiz, shear = stresses.T
+
+        # Each von Mises stress is sqrt(a**2 + 3 * b**2) / factor, where a is
+        # the normal stress and b the shear stress at one of the four corners
+        # of the wingbox, both linear combinations of the stresses above.
+        da_dstresses = np.zeros((num_elems, 4, 5))
+        da_dstresses[:, :, 0] = 1.
+        da_dstresses[:, 0, 2] = htop
+        da_dstresses[:, 0, 3] = hrear
+        da_dstresses[:, 1, 2] = -hbottom
+        da_dstresses[:, 1, 3] = -hfront
+        da_dstresses[:, 2, 3] = -hfront
+        da_dstresses[:, 3, 3] = hrear
+
+        db_dstresses = np.zeros((4, 5))
+        db_dstresses[:, 1] = 1.
+        db_dstresses[2, 4] = -1.
+        db_dstresses[3, 4] = 1.
+
+        a = np.einsum('nkm,nm->nk', da_dstresses, stresses)
+        b = stresses.dot(db_dstresses.T)
+
+        factors = np.array([self.tssf, 1., 1., self.tssf])
+        vonmises = np.sqrt(a**2 + 3 * b**2) / factors
+
+        # Avoid dividing by zero for unloaded elements, whose derivatives
+        # are zero anyway
+        vonmises[vonmises == 0.] = 1.
+        dvm_da = a / factors**2 / vonmises
+        dvm_db = 3 * b / factors**2 / vonmises
+
+        dvm_dstresses = dvm_da[:, :, np.newaxis] * da_dstresses + \
+            dvm_db[:, :, np.newaxis] * db_dstresses
+
+        # The global displacements only enter through T
+        dvm_dq = np.einsum('nkm,nmi->nki', dvm_dstresses, coeffs).reshape((num_elems, 4, 4, 3))
+        dvm_ddisp = np.einsum('nkbi,nij->nkbj', dvm_dq, T)
+        partials['vonmises', 'disp'] = dvm_ddisp.flatten()
+
+        # L and T depend on the nodes through the element vector dP
+        dstresses_dL = np.einsum('nmi,mi,ni->nm', coeffs, powers, q) / L[:, np.newaxis]
+        dvm_ddP = np.einsum('nkm,nm,nl->nkl', dvm_dstresses, dstresses_dL, T[:, 0, :])
+        dvm_ddP += np.einsum('nkbi,nijl,nbj->nkl', dvm_dq, dT_ddP, disp_blocks)
+
+        partials['vonmises', 'nodes'] = np.concatenate([-dvm_ddP, dvm_ddP], axis=2).flatten()
+
+        # Derivatives wrt the section properties, which only scale a few of
+        # the stresses. These are taken from the stress factors rather than
+        # by dividing the stresses by J, A_enc, or Qz, which may be zero.
+        twist = q[:, 9] - q[:, 3]
+        dtorsion_dJ = G / L / 2 / spar_thickness / A_enc * twist
+        dtorsion_dA_enc = -torsion_factor / A_enc * twist
+        dshear_dQz = E / L**3 * (-12 * q[:, 1] - 6 * q[:, 5] * L + 12 * q[:, 7] - 6 * q[:, 11] * L) \
+            / (2 * spar_thickness)
+
+        partials['vonmises', 'J'] = (dvm_dstresses[:, :, 1] * dtorsion_dJ[:, np.newaxis]).flatten()
+        partials['vonmises', 'A_enc'] = (dvm_dstresses[:, :, 1] * dtorsion_dA_enc[:, np.newaxis]).flatten()
+        partials['vonmises', 'Qz'] = (dvm_dstresses[:, :, 4] * dshear_dQz[:, np.newaxis]).flatten()
+        partials['vonmises', 'spar_thickness'] = (-(dvm_dstresses[:, :, 1] * torsion[:, np.newaxis] +
+            dvm_dstresses[:, :, 4] * shear[:, np.newaxis]) / spar_thickness[:, np.newaxis]).flatten()
+
+        dvm_dh = np.zeros((num_elems, 4, 4))
+        dvm_dh[:, 0, 0] = dvm_da[:, 0] * moment_vert
+        dvm_dh[:, 1, 1] = -dvm_da[:, 1] * moment_vert
+        dvm_dh[:, 1, 2] = -dvm_da[:, 1] * moment_horiz
+        dvm_dh[:, 2, 2] = -dvm_da[:, 2] * moment_horiz
+        dvm_dh[:, 0, 3] = dvm_da[:, 0] * moment_horiz
+        dvm_dh[:, 3, 3] = dvm_da[:, 3] * moment_horiz
+
+        for ind, name in enumerate(['htop', 'hbottom', 'hfront', 'hrear']):
+            partials['vonmises', name] = dvm_dh[:, :, ind].flatten()
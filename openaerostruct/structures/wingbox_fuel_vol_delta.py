@@ -40,7 +40,13 @@ class WingboxFuelVolDelta(ExplicitComponent):
         self.add_input('fuel_vols', val=np.zeros((self.ny-1)), units='m**3')
         self.add_output('fuel_vol_delta', val=0., units='m**3')
 
-        self.declare_partials('*', '*', method='cs')
+        self.declare_partials('fuel_vol_delta', 'fuel_vols', val=1.)
+
+        dfuel_vol_delta_dfuelburn = -1. / surface['fuel_density']
+        if surface['symmetry']:
+            dfuel_vol_delta_dfuelburn /= 2.
+
+        self.declare_partials('fuel_vol_delta', 'fuelburn', val=dfuel_vol_delta_dfuelburn)
 
     def compute(self, inputs, outputs):
         fuel_weight = inputs['fuelburn']
@@ -49,8 +55,8 @@ class WingboxFuelVolDelta(ExplicitComponent):
         vols = inputs['fuel_vols']
 
         if self.surface['symmetry'] == True:
-             fuel_weight /= 2.
-             reserves /= 2.
+             fuel_weight = fuel_weight / 2.
+             reserves = reserves / 2.
 
         sum_vols = np.sum(vols)
 
@@ -2,7 +2,6 @@ from __future__ import division, print_function
 import numpy as np
 
 from openmdao.api import ExplicitComponent
-from openaerostruct.structures.utils import norm
 
 class WingboxGeometry(ExplicitComponent):
     """
@@ -49,20 +48,19 @@ class WingboxGeometry(ExplicitComponent):
         self.add_output('fem_chords', val=np.ones((ny - 1)),units='m')
         self.add_output('fem_twists', val=np.ones((ny - 1)),units='deg')
 
-        self.declare_partials('*', '*', method='fd')
+        # Each element depends on the leading and trailing edge points at
+        # both of its ends
+        arange = np.arange(ny - 1)
+        mesh_indices = np.arange(nx * ny * 3).reshape((nx, ny, 3))
+        cols = np.stack([
+            mesh_indices[0, :-1], mesh_indices[0, 1:],
+            mesh_indices[-1, :-1], mesh_indices[-1, 1:],
+        ], axis=1).flatten()
 
-    def compute(self, inputs, outputs):
-        mesh = inputs['mesh']
-        vectors = mesh[-1, :, :] - mesh[0, :, :]
-        streamwise_chords = np.sqrt(np.sum(vectors**2, axis=1))
-        streamwise_chords = 0.5 * streamwise_chords[:-1] + 0.5 * streamwise_chords[1:]
-
-        # Chord lengths for the panel strips at the panel midpoint
-        outputs['streamwise_chords'] = streamwise_chords.copy()
-
-        fem_twists = np.zeros(streamwise_chords.shape, dtype=type(mesh[0, 0, 0]))
-        fem_chords = streamwise_chords.copy()
+        for name in ['streamwise_chords', 'fem_chords', 'fem_twists']:
+            self.declare_partials(name, 'mesh', rows=np.repeat(arange, 12), cols=cols)
 
+    def _get_shear_center_ratio(self):
         surface = self.surface
 
         # Gets the shear center by looking at the four corners.
@@ -71,55 +69,103 @@ class WingboxGeometry(ExplicitComponent):
         surface['data_x_upper'][-1]*(surface['data_y_upper'][-1]-surface['data_y_lower'][-1])) / \
         ( (surface['data_y_upper'][0]-surface['data_y_lower'][0]) + (surface['data_y_upper'][-1]-surface['data_y_lower'][-1]))
 
-        # TODO: perhaps replace this or link with existing nodes computation
-        nodes = (1-w) * mesh[0, :, :] + w * mesh[-1, :, :]
-
-        mesh_vectors = mesh[-1, :, :] - mesh[0, :, :]
+        return w
 
-        # Loop over spanwise elements
-        for ielem in range(mesh.shape[1] - 1):
+    def compute(self, inputs, outputs):
+        mesh = inputs['mesh']
+        vectors = mesh[-1, :, :] - mesh[0, :, :]
+        streamwise_chords = np.sqrt(np.sum(vectors**2, axis=1))
+        streamwise_chords = 0.5 * streamwise_chords[:-1] + 0.5 * streamwise_chords[1:]
 
-            # Obtain the element nodes
-            P0 = nodes[ielem, :]
-            P1 = nodes[ielem+1, :]
+        # Chord lengths for the panel strips at the panel midpoint
+        outputs['streamwise_chords'] = streamwise_chords.copy()
 
-            elem_vec = (P1 - P0) # vector along element
-            temp_vec = elem_vec.copy()
-            temp_vec[0] = 0. # vector along element without x component
+        w = self._get_shear_center_ratio()
 
-            # This is used to get chord length normal to FEM element.
-            # To be clear, this 3D angle sweep measure.
-            # This is the projection to the wing orthogonal to the FEM direction.
-            cos_theta_fe_sweep = norm(temp_vec) / norm(elem_vec)
-            fem_chords[ielem] = fem_chords[ielem] * cos_theta_fe_sweep
+        # TODO: perhaps replace this or link with existing nodes computation
+        nodes = (1-w) * mesh[0, :, :] + w * mesh[-1, :, :]
 
-        outputs['fem_chords'] = fem_chords
+        # Vectors along the elements
+        elem_vec = nodes[1:] - nodes[:-1]
 
-        # Loop over spanwise elements
-        for ielem in range(mesh.shape[1] - 1):
+        # This is used to get chord length normal to FEM element.
+        # To be clear, this 3D angle sweep measure.
+        # This is the projection to the wing orthogonal to the FEM direction,
+        # using the vector along each element without its x component.
+        cos_theta_fe_sweep = np.sqrt(np.sum(elem_vec[:, 1:]**2, axis=1)) / \
+            np.sqrt(np.sum(elem_vec**2, axis=1))
+        fem_chords = streamwise_chords * cos_theta_fe_sweep
 
-            # The following is used to approximate the twist angle for the section normal to the FEM element
-            mesh_vec_0 = mesh_vectors[ielem]
-            temp_mesh_vectors_0 = mesh_vec_0.copy()
-            temp_mesh_vectors_0[2] = 0.
+        outputs['fem_chords'] = fem_chords
 
-            cos_twist_0 = norm(temp_mesh_vectors_0) / norm(mesh_vec_0)
+        # The following is used to approximate the twist angle for the
+        # section normal to the FEM element, using the chord vectors without
+        # their z component
+        cos_twist = np.sqrt(np.sum(vectors[:, :2]**2, axis=1)) / \
+            np.sqrt(np.sum(vectors**2, axis=1))
 
-            if cos_twist_0 > 1.:
-                theta_0 = 0. # to prevent nan in case value for arccos is greater than 1 due to machine precision
-            else:
-                theta_0 = np.arccos(cos_twist_0)
+        # to prevent nan in case value for arccos is greater than 1 due to machine precision
+        theta = np.arccos(np.where(cos_twist > 1., 1., cos_twist))
 
-            mesh_vec_1 = mesh_vectors[ielem + 1]
-            temp_mesh_vectors_1 = mesh_vec_1.copy()
-            temp_mesh_vectors_1[2] = 0.
+        outputs['fem_twists'] = (theta[:-1] + theta[1:]) / 2 * streamwise_chords / fem_chords
 
-            cos_twist_1 = norm(temp_mesh_vectors_1) / norm(mesh_vec_1)
+    def compute_partials(self, inputs, partials):
+        mesh = inputs['mesh']
+        vectors = mesh[-1, :, :] - mesh[0, :, :]
+        chords = np.sqrt(np.sum(vectors**2, axis=1))
+        streamwise_chords = 0.5 * chords[:-1] + 0.5 * chords[1:]
 
-            if cos_twist_1 > 1.:
-                theta_1 = 0. # to prevent nan in case value for arccos is greater than 1 due to machine precision
-            else:
-                theta_1 = np.arccos(cos_twist_1)
+        w = self._get_shear_center_ratio().real
 
-            fem_twists[ielem] = (theta_0 + theta_1) / 2 * streamwise_chords[ielem] / fem_chords[ielem]
-        outputs['fem_twists'] = fem_twists
+        nodes = (1-w) * mesh[0, :, :] + w * mesh[-1, :, :]
+        elem_vec = nodes[1:] - nodes[:-1]
+
+        yz_norm = np.sqrt(np.sum(elem_vec[:, 1:]**2, axis=1))
+        elem_norm = np.sqrt(np.sum(elem_vec**2, axis=1))
+        cos_theta_fe_sweep = yz_norm / elem_norm
+
+        dcos_delem_vec = -(yz_norm / elem_norm**3)[:, np.newaxis] * elem_vec
+        dcos_delem_vec[:, 1:] += elem_vec[:, 1:] / (yz_norm * elem_norm)[:, np.newaxis]
+
+        # The twist angle of each chord is the angle between the chord and
+        # its projection onto the xy plane, so we use its sine, |vz| / chord,
+        # for the derivatives, which stays well-defined for small angles.
+        # The angle has a kink at zero twist, where we take the derivative
+        # wrt vz to be zero.
+        xy_norm = np.sqrt(np.sum(vectors[:, :2]**2, axis=1))
+        cos_twist = xy_norm / chords
+        theta = np.arccos(np.where(cos_twist > 1., 1., cos_twist))
+
+        dtheta_dvectors = np.zeros(vectors.shape)
+        dtheta_dvectors[:, :2] = -(np.abs(vectors[:, 2]) / xy_norm / chords**2)[:, np.newaxis] * vectors[:, :2]
+        dtheta_dvectors[:, 2] = np.sign(vectors[:, 2]) * xy_norm / chords**2
+
+        # Derivatives of each output wrt the chord vectors at both ends of
+        # its element and wrt the element vector
+        dchords_dvectors = 0.5 * vectors / chords[:, np.newaxis]
+        dsc_dv = np.stack([dchords_dvectors[:-1], dchords_dvectors[1:]], axis=1)
+        dsc_de = np.zeros(elem_vec.shape)
+
+        dfc_dv = dsc_dv * cos_theta_fe_sweep[:, np.newaxis, np.newaxis]
+        dfc_de = dcos_delem_vec * streamwise_chords[:, np.newaxis]
+
+        # Since fem_chords = streamwise_chords * cos_theta_fe_sweep, the
+        # fem_twists are the mean twists divided by cos_theta_fe_sweep
+        mean_theta = (theta[:-1] + theta[1:]) / 2
+        dft_dv = np.stack([dtheta_dvectors[:-1], dtheta_dvectors[1:]], axis=1) / \
+            (2 * cos_theta_fe_sweep)[:, np.newaxis, np.newaxis]
+        dft_de = -dcos_delem_vec * (mean_theta / cos_theta_fe_sweep**2)[:, np.newaxis]
+
+        for name, dout_dv, dout_de in [
+                ('streamwise_chords', dsc_dv, dsc_de),
+                ('fem_chords', dfc_dv, dfc_de),
+                ('fem_twists', dft_dv, dft_de)]:
+
+            # The chord vectors go from the leading to the trailing edge, and
+            # the element vectors between the weighted nodes at both ends
+            partials[name, 'mesh'] = np.stack([
+                -dout_dv[:, 0] - (1 - w) * dout_de,
+                -dout_dv[:, 1] + (1 - w) * dout_de,
+                dout_dv[:, 0] - w * dout_de,
+                dout_dv[:, 1] + w * dout_de,
+            ], axis=1).flatten()
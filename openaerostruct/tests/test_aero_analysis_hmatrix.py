@@ -0,0 +1,133 @@
+from __future__ import division, print_function
+from openmdao.utils.assert_utils import assert_rel_error
+import unittest
+import numpy as np
+
+from openaerostruct.geometry.utils import generate_mesh
+from openaerostruct.geometry.geometry_group import Geometry
+from openaerostruct.aerodynamics.aero_groups import AeroPoint
+
+from openmdao.api import IndepVarComp, Problem
+
+
+class Test(unittest.TestCase):
+
+    def test(self):
+
+        # Create a dictionary to store options about the surface
+        mesh_dict = {'num_y' : 61,
+                     'num_x' : 5,
+                     'wing_type' : 'CRM',
+                     'symmetry' : True,
+                     'num_twist_cp' : 5}
+
+        mesh, twist_cp = generate_mesh(mesh_dict)
+
+        surf_dict = {
+                    # Wing definition
+                    'name' : 'wing',        # name of the surface
+                    'symmetry' : True,     # if true, model one half of wing
+                                            # reflected across the plane y = 0
+                    'S_ref_type' : 'wetted', # how we compute the wing area,
+                                             # can be 'wetted' or 'projected'
+                    'fem_model_type' : 'tube',
+
+                    'twist_cp' : twist_cp,
+                    'mesh' : mesh,
+
+                    'CL0' : 0.0,            # CL of the surface at alpha=0
+                    'CD0' : 0.015,            # CD of the surface at alpha=0
+
+                    # Airfoil properties for viscous drag calculation
+                    'k_lam' : 0.05,         # percentage of chord with laminar
+                                            # flow, used for viscous drag
+                    't_over_c_cp' : np.array([0.15]),      # thickness over chord ratio (NACA0015)
+                    'c_max_t' : .303,       # chordwise location of maximum (NACA0015)
+                                            # thickness
+                    'with_viscous' : True,  # if true, compute viscous drag
+                    'with_wave' : False,     # if true, compute wave drag
+                    }
+
+        # Create a dictionary to store options about the tail surface
+        mesh_dict = {'num_y' : 31,
+                     'num_x' : 5,
+                     'wing_type' : 'rect',
+                     'symmetry' : True,
+                     'span' : 20.,
+                     'root_chord' : 5.}
+
+        mesh = generate_mesh(mesh_dict)
+        mesh[:, :, 0] += 50.
+        mesh[:, :, 2] += 3.
+
+        tail_dict = dict(surf_dict, name='tail', mesh=mesh, twist_cp=np.zeros(2))
+
+        surfaces = [surf_dict, tail_dict]
+
+        # Create the problem and the model group
+        prob = Problem()
+
+        indep_var_comp = IndepVarComp()
+        indep_var_comp.add_output('v', val=248.136, units='m/s')
+        indep_var_comp.add_output('alpha', val=5., units='deg')
+        indep_var_comp.add_output('M', val=0.84)
+        indep_var_comp.add_output('re', val=1.e6, units='1/m')
+        indep_var_comp.add_output('rho', val=0.38, units='kg/m**3')
+        indep_var_comp.add_output('cg', val=np.zeros((3)), units='m')
+
+        prob.model.add_subsystem('prob_vars',
+            indep_var_comp,
+            promotes=['*'])
+
+        for surface in surfaces:
+            prob.model.add_subsystem(surface['name'], Geometry(surface=surface))
+
+        # Compare the iterative solvers to the default LU solver
+        for i, aic_solver in enumerate(['hmatrix', 'lu', 'gmres']):
+
+            point_name = 'aero_point_{}'.format(i)
+            prob.model.add_subsystem(point_name, AeroPoint(surfaces=surfaces, aic_solver=aic_solver),
+                promotes_inputs=['v', 'alpha', 'M', 're', 'rho', 'cg'])
+
+            for surface in surfaces:
+                name = surface['name']
+
+                prob.model.connect(name + '.mesh', point_name + '.' + name + '.def_mesh')
+                prob.model.connect(name + '.mesh', point_name + '.aero_states.' + name + '_def_mesh')
+                prob.model.connect(name + '.t_over_c', point_name + '.' + name + '_perf.' + 't_over_c')
+
+        prob.setup()
+
+        prob.run_model()
+
+        # The far-field interactions were compressed
+        hmatrix = prob.model.aero_point_0.aero_states.solve_matrix.hmatrix
+        self.assertGreater(len(hmatrix.low_rank_blocks), 0)
+
+        for point_name in ['aero_point_0', 'aero_point_2']:
+            for name in ['CL', 'CD']:
+                assert_rel_error(self, prob[point_name + '.' + name], prob['aero_point_1.' + name], 1e-8)
+            assert_rel_error(self, prob[point_name + '.CM'], prob['aero_point_1.CM'], 1e-8)
+
+        of = ['aero_point_{}.{}'.format(i, name) for name in ['CL', 'CD'] for i in range(3)]
+        totals = prob.compute_totals(of=of, wrt=['alpha', 'wing.twist_cp'])
+
+        for wrt in ['alpha', 'wing.twist_cp']:
+            for i in [0, 3]:
+                assert_rel_error(self, totals[of[i], wrt], totals[of[i + 1], wrt], 1e-8)
+                assert_rel_error(self, totals[of[i + 2], wrt], totals[of[i + 1], wrt], 1e-8)
+
+        # The gmres solver reuses its preconditioner when the angle of attack
+        # changes slightly
+        solve_matrix = prob.model.aero_point_2.aero_states.solve_matrix
+        num_factorizations = solve_matrix.precon_factorizations
+
+        prob['alpha'] = 5.1
+        prob.run_model()
+
+        self.assertEqual(solve_matrix.precon_factorizations, num_factorizations)
+        assert_rel_error(self, prob['aero_point_2.CL'], prob['aero_point_1.CL'], 1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
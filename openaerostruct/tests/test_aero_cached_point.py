@@ -0,0 +1,162 @@
+from __future__ import division, print_function
+from openmdao.utils.assert_utils import assert_rel_error
+import unittest
+from functools import partial
+import numpy as np
+
+from openaerostruct.geometry.utils import generate_mesh
+from openaerostruct.geometry.geometry_group import Geometry
+from openaerostruct.aerodynamics.aero_groups import AeroPoint
+from openaerostruct.integration.cached_point import CachedPoint
+
+from openmdao.api import IndepVarComp, Problem, BalanceComp, BroydenSolver, DirectSolver
+
+
+def get_problem(cached, tol=0.):
+    mesh_dict = {'num_y' : 7,
+                 'num_x' : 2,
+                 'wing_type' : 'CRM',
+                 'symmetry' : True,
+                 'num_twist_cp' : 5}
+
+    mesh, twist_cp = generate_mesh(mesh_dict)
+
+    surface = {
+                # Wing definition
+                'name' : 'wing',        # name of the surface
+                'symmetry' : True,     # if true, model one half of wing
+                                        # reflected across the plane y = 0
+                'S_ref_type' : 'wetted', # how we compute the wing area,
+                                         # can be 'wetted' or 'projected'
+                'fem_model_type' : 'tube',
+
+                'twist_cp' : twist_cp,
+                'mesh' : mesh,
+
+                'CL0' : 0.0,            # CL of the surface at alpha=0
+                'CD0' : 0.015,            # CD of the surface at alpha=0
+
+                # Airfoil properties for viscous drag calculation
+                'k_lam' : 0.05,         # percentage of chord with laminar
+                                        # flow, used for viscous drag
+                't_over_c_cp' : np.array([0.15]),      # thickness over chord ratio (NACA0015)
+                'c_max_t' : .303,       # chordwise location of maximum (NACA0015)
+                                        # thickness
+                'with_viscous' : True,  # if true, compute viscous drag
+                'with_wave' : False,     # if true, compute wave drag
+                }
+
+    prob = Problem()
+
+    indep_var_comp = IndepVarComp()
+    indep_var_comp.add_output('v', val=248.136, units='m/s')
+    indep_var_comp.add_output('M', val=0.84)
+    indep_var_comp.add_output('re', val=1.e6, units='1/m')
+    indep_var_comp.add_output('rho', val=0.38, units='kg/m**3')
+    indep_var_comp.add_output('cg', val=np.zeros((3)), units='m')
+
+    prob.model.add_subsystem('prob_vars',
+        indep_var_comp,
+        promotes=['*'])
+
+    prob.model.add_subsystem('wing', Geometry(surface=surface))
+
+    flow_names = ['v', 'alpha', 'M', 're', 'rho', 'cg']
+    if cached:
+        # The mesh inputs of the point are named with ':' on the component
+        point = CachedPoint(point_factory=partial(AeroPoint, surfaces=[surface]),
+            input_names=flow_names + ['wing.def_mesh', 'aero_states.wing_def_mesh',
+                'wing_perf.t_over_c'], tol=tol)
+        sep = ':'
+    else:
+        point = AeroPoint(surfaces=[surface])
+        sep = '.'
+
+    prob.model.add_subsystem('aero', point, promotes_inputs=flow_names)
+
+    prob.model.connect('wing.mesh', 'aero.wing{}def_mesh'.format(sep))
+    prob.model.connect('wing.mesh', 'aero.aero_states{}wing_def_mesh'.format(sep))
+    prob.model.connect('wing.t_over_c', 'aero.wing_perf{}t_over_c'.format(sep))
+
+    # Trim alpha for a target CL
+    bal = BalanceComp()
+    bal.add_balance(name='alpha', rhs_val=0.5, units='deg', val=4.)
+    prob.model.add_subsystem('balance', bal, promotes_outputs=['alpha'])
+    prob.model.connect('aero.CL', 'balance.lhs:alpha')
+
+    prob.model.nonlinear_solver = BroydenSolver()
+    prob.model.nonlinear_solver.options['state_vars'] = ['alpha']
+    prob.model.nonlinear_solver.options['iprint'] = -1
+    prob.model.nonlinear_solver.options['maxiter'] = 20
+    prob.model.linear_solver = DirectSolver()
+
+    prob.setup()
+
+    return prob
+
+
+class Test(unittest.TestCase):
+
+    def test(self):
+        ref_prob = get_problem(cached=False)
+        ref_prob.run_model()
+
+        prob = get_problem(cached=True)
+        prob.run_model()
+
+        for name in ['alpha', 'aero.CL', 'aero.CD', 'aero.CM']:
+            assert_rel_error(self, prob[name], ref_prob[name], 1e-8)
+
+        of = ['aero.CL', 'aero.CD', 'alpha']
+        wrt = ['wing.twist_cp', 'M']
+        ref_totals = ref_prob.compute_totals(of=of, wrt=wrt)
+        totals = prob.compute_totals(of=of, wrt=wrt)
+        for key in ref_totals:
+            assert_rel_error(self, totals[key], ref_totals[key], 1e-6)
+
+        point = prob.model.aero
+        num_runs = point.num_runs
+        num_linearizations = point.num_linearizations
+
+        # Running the same design again is served by the cache
+        prob.run_model()
+        prob.compute_totals(of=of, wrt=wrt)
+
+        self.assertEqual(point.num_runs, num_runs)
+        self.assertEqual(point.num_linearizations, num_linearizations)
+        self.assertTrue(point.cache.hits > 0)
+        self.assertTrue(0. < point.hit_ratio < 1.)
+
+        # A new design runs the point again
+        prob['wing.twist_cp'] += 0.5
+        prob.run_model()
+
+        self.assertTrue(point.num_runs > num_runs)
+        self.assertEqual(point.cache.near_hits, 0)
+
+    def test_tol(self):
+        ref_prob = get_problem(cached=False)
+        ref_prob.run_model()
+
+        prob = get_problem(cached=True, tol=0.2)
+        prob.run_model()
+
+        # The near hits extrapolate with the stored derivatives, so the trim
+        # is close to the exact one
+        point = prob.model.aero
+        self.assertTrue(point.cache.near_hits > 0)
+        assert_rel_error(self, prob['alpha'], ref_prob['alpha'], 1e-3)
+        assert_rel_error(self, prob['aero.CL'], 0.5, 1e-8)
+
+        # Each input is compared against its own norm, so a change in the
+        # Mach number is not hidden by the much larger meshes
+        num_runs = point.num_runs
+        prob['M'] = 0.6
+        prob.run_model()
+
+        self.assertTrue(point.num_runs > num_runs)
+        assert_rel_error(self, prob['aero.CL'], 0.5, 1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
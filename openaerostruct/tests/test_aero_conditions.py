@@ -0,0 +1,155 @@
+from __future__ import division, print_function
+from openmdao.utils.assert_utils import assert_rel_error
+import unittest
+import os
+import tempfile
+import numpy as np
+
+from openaerostruct.geometry.utils import generate_mesh
+from openaerostruct.geometry.geometry_group import Geometry
+from openaerostruct.aerodynamics.aero_groups import AeroPoint
+from openaerostruct.aerodynamics.multi_condition import run_aero_conditions, \
+    sweep_aero_conditions, condition_grid
+
+from openmdao.api import IndepVarComp, Problem
+
+
+def get_problem():
+    mesh_dict = {'num_y' : 7,
+                 'num_x' : 3,
+                 'wing_type' : 'CRM',
+                 'symmetry' : True,
+                 'num_twist_cp' : 5}
+
+    mesh, twist_cp = generate_mesh(mesh_dict)
+
+    surface = {
+                # Wing definition
+                'name' : 'wing',        # name of the surface
+                'type' : 'aero',
+                'symmetry' : True,     # if true, model one half of wing
+                                        # reflected across the plane y = 0
+                'S_ref_type' : 'wetted', # how we compute the wing area,
+                                         # can be 'wetted' or 'projected'
+                'fem_model_type' : 'tube',
+
+                'twist_cp' : twist_cp,
+                'mesh' : mesh,
+
+                'CL0' : 0.0,            # CL of the surface at alpha=0
+                'CD0' : 0.015,            # CD of the surface at alpha=0
+
+                # Airfoil properties for viscous drag calculation
+                'k_lam' : 0.05,         # percentage of chord with laminar
+                                        # flow, used for viscous drag
+                't_over_c_cp' : np.array([0.15]),      # thickness over chord ratio (NACA0015)
+                'c_max_t' : .303,       # chordwise location of maximum (NACA0015)
+                                        # thickness
+                'with_viscous' : True,  # if true, compute viscous drag
+                'with_wave' : True,     # if true, compute wave drag
+                }
+
+    prob = Problem()
+
+    indep_var_comp = IndepVarComp()
+    indep_var_comp.add_output('v', val=248.136, units='m/s')
+    indep_var_comp.add_output('alpha', val=5., units='deg')
+    indep_var_comp.add_output('M', val=0.84)
+    indep_var_comp.add_output('re', val=1.e6, units='1/m')
+    indep_var_comp.add_output('rho', val=0.38, units='kg/m**3')
+    indep_var_comp.add_output('cg', val=np.zeros((3)), units='m')
+
+    prob.model.add_subsystem('prob_vars',
+        indep_var_comp,
+        promotes=['*'])
+
+    prob.model.add_subsystem('wing', Geometry(surface=surface))
+
+    prob.model.add_subsystem('aero', AeroPoint(surfaces=[surface]),
+        promotes_inputs=['v', 'alpha', 'M', 're', 'rho', 'cg'])
+
+    prob.model.connect('wing.mesh', 'aero.wing.def_mesh')
+    prob.model.connect('wing.mesh', 'aero.aero_states.wing_def_mesh')
+    prob.model.connect('wing.t_over_c', 'aero.wing_perf.t_over_c')
+
+    prob.setup()
+
+    return prob
+
+
+class Test(unittest.TestCase):
+
+    def test(self):
+        alphas = np.array([4., -2., 4., 6., -2.])
+        Machs = np.array([0.84, 0.84, 0.7, 0.84, 0.6])
+        rhos = np.array([0.38, 0.38, 0.38, 0.38, 0.5])
+
+        prob = get_problem()
+        results = run_aero_conditions(prob, {'alpha' : alphas, 'M' : Machs, 'rho' : rhos})
+
+        # Compare against analyzing each condition on its own
+        for i in range(len(alphas)):
+            ref_prob = get_problem()
+            ref_prob['alpha'] = alphas[i]
+            ref_prob['M'] = Machs[i]
+            ref_prob['rho'] = rhos[i]
+            ref_prob.run_model()
+
+            assert_rel_error(self, results['CL'][i], ref_prob['aero.CL'][0], 1e-10)
+            assert_rel_error(self, results['CD'][i], ref_prob['aero.CD'][0], 1e-10)
+            assert_rel_error(self, results['CM'][i], ref_prob['aero.CM'], 1e-10)
+
+        # Only one factorization is needed for each distinct alpha
+        lu_cache = prob.model.aero.aero_states.solve_matrix.lu_cache
+        self.assertEqual(lu_cache.misses, 3)
+        self.assertEqual(lu_cache.hits, 2)
+
+        # The vortex rings are only cached for the batched run
+        mtx_assy = prob.model.aero.aero_states.mtx_assy
+        self.assertFalse(mtx_assy.options['cache_rings'])
+        self.assertEqual(mtx_assy.ring_cache, {})
+
+    def test_scalar_conditions(self):
+        prob = get_problem()
+        results = run_aero_conditions(prob, {'alpha' : [0., 2., 4.], 'M' : 0.7})
+
+        self.assertEqual(results['CL'].shape, (3,))
+        self.assertEqual(results['CM'].shape, (3, 3))
+        self.assertTrue(np.all(np.diff(results['CL']) > 0.))
+
+    def test_sweep(self):
+        conditions = condition_grid({'alpha' : [-2., 0., 4.], 'M' : [0.6, 0.84]})
+        conditions['rho'] = 0.38
+
+        self.assertEqual(len(conditions['alpha']), 6)
+        np.testing.assert_equal(conditions['alpha'], [-2., 0., 4., -2., 0., 4.])
+
+        ref_results = run_aero_conditions(get_problem(), conditions)
+
+        chunks = []
+        filename = os.path.join(tempfile.mkdtemp(), 'sweep.dat')
+        results = sweep_aero_conditions(get_problem, conditions, num_procs=2, chunk_size=2,
+            filename=filename, callback=lambda indices, results: chunks.append(indices))
+
+        for name in ['CL', 'CD', 'CM']:
+            assert_rel_error(self, results[name], ref_results[name], 1e-10)
+
+        # The chunks keep equal angles of attack together
+        self.assertEqual(len(chunks), 3)
+        for indices in chunks:
+            self.assertEqual(len(set(conditions['alpha'][indices])), 1)
+
+        # Each condition has a row with its conditions and results
+        with open(filename) as f:
+            self.assertEqual(f.readline().split(), ['#', 'alpha', 'M', 'rho', 'CL', 'CD',
+                'CMx', 'CMy', 'CMz'])
+        data = np.loadtxt(filename)
+        self.assertEqual(data.shape, (6, 8))
+        for row in data:
+            i = np.where((conditions['alpha'] == row[0]) & (conditions['M'] == row[1]))[0][0]
+            assert_rel_error(self, row[3], results['CL'][i], 1e-10)
+            assert_rel_error(self, row[5:], results['CM'][i], 1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
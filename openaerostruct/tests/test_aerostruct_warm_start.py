@@ -0,0 +1,206 @@
+from __future__ import division, print_function
+from openmdao.utils.assert_utils import assert_rel_error
+import unittest
+import numpy as np
+
+from openaerostruct.geometry.utils import generate_mesh
+
+from openaerostruct.integration.aerostruct_groups import AerostructGeometry, AerostructPoint
+from openaerostruct.integration.warm_start import WarmStartNonlinearBlockGS, \
+    check_warm_start_support
+
+from openmdao.api import IndepVarComp, Problem, Group, ExecComp, NewtonSolver, ScipyIterativeSolver, LinearBlockGS, NonlinearBlockGS, DirectSolver, LinearBlockGS, PetscKSP, ScipyOptimizeDriver
+
+
+class Test(unittest.TestCase):
+
+    def test(self):
+        # Create a dictionary to store options about the surface
+        mesh_dict = {'num_y' : 5,
+                     'num_x' : 2,
+                     'wing_type' : 'CRM',
+                     'symmetry' : True,
+                     'num_twist_cp' : 5}
+
+        mesh, twist_cp = generate_mesh(mesh_dict)
+
+        surf_dict = {
+                    # Wing definition
+                    'name' : 'wing',        # name of the surface
+                    'type' : 'aerostruct',
+                    'symmetry' : True,     # if true, model one half of wing
+                                            # reflected across the plane y = 0
+                    'S_ref_type' : 'wetted', # how we compute the wing area,
+                                             # can be 'wetted' or 'projected'
+                    'fem_model_type' : 'tube',
+
+                    'thickness_cp' : np.array([.1, .2, .3]),
+
+                    'twist_cp' : twist_cp,
+                    'mesh' : mesh,
+
+                    # Aerodynamic performance of the lifting surface at
+                    # an angle of attack of 0 (alpha=0).
+                    # These CL0 and CD0 values are added to the CL and CD
+                    # obtained from aerodynamic analysis of the surface to get
+                    # the total CL and CD.
+                    # These CL0 and CD0 values do not vary wrt alpha.
+                    'CL0' : 0.0,            # CL of the surface at alpha=0
+                    'CD0' : 0.015,            # CD of the surface at alpha=0
+
+                    # Airfoil properties for viscous drag calculation
+                    'k_lam' : 0.05,         # percentage of chord with laminar
+                                            # flow, used for viscous drag
+                    't_over_c_cp' : np.array([0.15]),      # thickness over chord ratio (NACA0015)
+                    'c_max_t' : .303,       # chordwise location of maximum (NACA0015)
+                                            # thickness
+                    'with_viscous' : True,
+                    'with_wave' : False,     # if true, compute wave drag
+
+                    # Structural values are based on aluminum 7075
+                    'E' : 70.e9,            # [Pa] Young's modulus of the spar
+                    'G' : 30.e9,            # [Pa] shear modulus of the spar
+                    'yield' : 500.e6 / 2.5, # [Pa] yield stress divided by 2.5 for limiting case
+                    'mrho' : 3.e3,          # [kg/m^3] material density
+                    'fem_origin' : 0.35,    # normalized chordwise location of the spar
+                    'wing_weight_ratio' : 2.,
+                    'struct_weight_relief' : False,    # True to add the weight of the structure to the loads on the structure
+                    'distributed_fuel_weight' : False,
+                    # Constraints
+                    'exact_failure_constraint' : False, # if false, use KS function
+                    }
+
+        surfaces = [surf_dict]
+
+        # Create the problem and assign the model group
+        prob = Problem()
+
+        # Add problem information as an independent variables component
+        indep_var_comp = IndepVarComp()
+        indep_var_comp.add_output('v', val=248.136, units='m/s')
+        indep_var_comp.add_output('alpha', val=5., units='deg')
+        indep_var_comp.add_output('M', val=0.84)
+        indep_var_comp.add_output('re', val=1.e6, units='1/m')
+        indep_var_comp.add_output('rho', val=0.38, units='kg/m**3')
+        indep_var_comp.add_output('CT', val=9.80665 * 17.e-6, units='1/s')
+        indep_var_comp.add_output('R', val=11.165e6, units='m')
+        indep_var_comp.add_output('W0', val=0.4 * 3e5,  units='kg')
+        indep_var_comp.add_output('a', val=295.4, units='m/s')
+        indep_var_comp.add_output('load_factor', val=1.)
+        indep_var_comp.add_output('empty_cg', val=np.zeros((3)), units='m')
+
+        prob.model.add_subsystem('prob_vars',
+             indep_var_comp,
+             promotes=['*'])
+
+        # Loop over each surface in the surfaces list
+        for surface in surfaces:
+
+            # Get the surface name and create a group to contain components
+            # only for this surface
+            name = surface['name']
+
+            aerostruct_group = AerostructGeometry(surface=surface)
+
+            # Add tmp_group to the problem with the name of the surface.
+            prob.model.add_subsystem(name, aerostruct_group)
+
+        prob.model.connect('load_factor', name + '.load_factor')
+
+        # Add a point that warm starts its coupled solves, and one that does
+        # not to compare to
+        for i, warm_start in enumerate([True, False]):
+
+            point_name = 'AS_point_{}'.format(i)
+            # Connect the parameters within the model for each aero point
+
+            # Create the aero point group and add it to the model
+            AS_point = AerostructPoint(surfaces=surfaces, warm_start=warm_start)
+
+            prob.model.add_subsystem(point_name, AS_point)
+
+            # Connect flow properties to the analysis point
+            prob.model.connect('v', point_name + '.v')
+            prob.model.connect('alpha', point_name + '.alpha')
+            prob.model.connect('M', point_name + '.M')
+            prob.model.connect('re', point_name + '.re')
+            prob.model.connect('rho', point_name + '.rho')
+            prob.model.connect('CT', point_name + '.CT')
+            prob.model.connect('R', point_name + '.R')
+            prob.model.connect('W0', point_name + '.W0')
+            prob.model.connect('a', point_name + '.a')
+            prob.model.connect('empty_cg', point_name + '.empty_cg')
+            prob.model.connect('load_factor', point_name + '.load_factor')
+
+            for surface in surfaces:
+
+                com_name = point_name + '.' + name + '_perf'
+                prob.model.connect(name + '.K', point_name + '.coupled.' + name + '.K')
+                prob.model.connect(name + '.nodes', point_name + '.coupled.' + name + '.nodes')
+
+                # Connect aerodyamic mesh to coupled group mesh
+                prob.model.connect(name + '.mesh', point_name + '.coupled.' + name + '.mesh')
+
+                # Connect performance calculation variables
+                prob.model.connect(name + '.radius', com_name + '.radius')
+                prob.model.connect(name + '.thickness', com_name + '.thickness')
+                prob.model.connect(name + '.nodes', com_name + '.nodes')
+                prob.model.connect(name + '.cg_location', point_name + '.' + 'total_perf.' + name + '_cg_location')
+                prob.model.connect(name + '.structural_weight', point_name + '.' + 'total_perf.' + name + '_structural_weight')
+                prob.model.connect(name + '.t_over_c', com_name + '.t_over_c')
+
+        # Set up the problem
+        prob.setup()
+
+        prob.run_model()
+
+        solver = prob.model.AS_point_0.coupled.nonlinear_solver
+        cold_solver = prob.model.AS_point_1.coupled.nonlinear_solver
+        store = solver.store
+
+        assert_rel_error(self, prob['AS_point_0.fuelburn'][0], 276558.2150236781, 1e-4)
+        self.assertEqual((store.hits, store.near_hits, store.misses), (0, 0, 1))
+        self.assertEqual(len(store), 1)
+
+        # Go to a different angle of attack and back close to the first one.
+        # The warm-started point starts from the state stored at alpha = 5,
+        # while the other starts from its state at alpha = 8.
+        for alpha in [8., 5.1]:
+            prob['alpha'] = alpha
+            prob.run_model()
+
+            assert_rel_error(self, prob['AS_point_0.fuelburn'], prob['AS_point_1.fuelburn'], 1e-6)
+            assert_rel_error(self, prob['AS_point_0.CL'], prob['AS_point_1.CL'], 1e-6)
+
+        self.assertEqual(store.near_hits, 2)
+        self.assertEqual(store.iterations[-1][0], True)
+        self.assertLess(store.iterations[-1][1], cold_solver._iter_count)
+
+        # Solving the same inputs again starts from their converged state
+        prob.run_model()
+
+        self.assertEqual(store.hits, 1)
+        self.assertLessEqual(store.iterations[-1][1], 1)
+        self.assertGreater(store.iterations_saved, 0)
+
+    def test_openmdao_support(self):
+        # The warm start relies on OpenMDAO internals, which are checked in
+        # setup, so this fails loudly on versions that do not have them
+        prob = Problem()
+        prob.model.add_subsystem('comp', ExecComp('y = 2. * x'))
+        prob.model.nonlinear_solver = WarmStartNonlinearBlockGS()
+        prob.setup()
+        prob.run_model()
+
+        self.assertEqual(len(prob.model.nonlinear_solver.store), 1)
+
+        class OldGroup(object):
+            pathname = 'coupled'
+
+        with self.assertRaises(RuntimeError) as cm:
+            check_warm_start_support(prob.model.nonlinear_solver, OldGroup())
+        self.assertIn('_conn_global_abs_in2out', str(cm.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+from __future__ import division, print_function
+from openmdao.utils.assert_utils import assert_rel_error
+import unittest
+from functools import partial
+import numpy as np
+
+from openaerostruct.geometry.utils import generate_mesh
+from openaerostruct.geometry.geometry_group import Geometry
+from openaerostruct.aerodynamics.aero_groups import AeroPoint
+from openaerostruct.integration.multipoint import MultipointBuilder
+
+from openmdao.api import IndepVarComp, Problem
+
+
+def get_problem(mode):
+    # Create a dictionary to store options about the surface
+    mesh_dict = {'num_y' : 7,
+                 'num_x' : 2,
+                 'wing_type' : 'CRM',
+                 'symmetry' : True,
+                 'num_twist_cp' : 5}
+
+    mesh, twist_cp = generate_mesh(mesh_dict)
+
+    surf_dict = {
+                # Wing definition
+                'name' : 'wing',        # name of the surface
+                'symmetry' : True,     # if true, model one half of wing
+                                        # reflected across the plane y = 0
+                'S_ref_type' : 'wetted', # how we compute the wing area,
+                                         # can be 'wetted' or 'projected'
+                'fem_model_type' : 'tube',
+
+                'twist_cp' : twist_cp,
+                'mesh' : mesh,
+
+                'CL0' : 0.0,            # CL of the surface at alpha=0
+                'CD0' : 0.015,            # CD of the surface at alpha=0
+
+                # Airfoil properties for viscous drag calculation
+                'k_lam' : 0.05,         # percentage of chord with laminar
+                                        # flow, used for viscous drag
+                't_over_c_cp' : np.array([0.15]),      # thickness over chord ratio (NACA0015)
+                'c_max_t' : .303,       # chordwise location of maximum (NACA0015)
+                                        # thickness
+                'with_viscous' : True,  # if true, compute viscous drag
+                'with_wave' : False,     # if true, compute wave drag
+                }
+
+    surfaces = [surf_dict]
+
+    n_points = 3
+
+    # Create the problem and the model group
+    prob = Problem()
+
+    indep_var_comp = IndepVarComp()
+    indep_var_comp.add_output('v', val=248.136, units='m/s')
+    indep_var_comp.add_output('alpha', val=np.array([2., 4., 6.]), units='deg')
+    indep_var_comp.add_output('M', val=np.array([0.7, 0.8, 0.84]))
+    indep_var_comp.add_output('re', val=1.e6, units='1/m')
+    indep_var_comp.add_output('rho', val=0.38, units='kg/m**3')
+    indep_var_comp.add_output('cg', val=np.zeros((3)), units='m')
+
+    prob.model.add_subsystem('prob_vars',
+        indep_var_comp,
+        promotes=['*'])
+
+    # The geometry is shared by all the points
+    prob.model.add_subsystem('wing', Geometry(surface=surf_dict))
+
+    points = MultipointBuilder(prob.model, partial(AeroPoint, surfaces=surfaces), n_points,
+        outputs=['CL', 'CD'], mode=mode, point_name='aero_point_{}')
+
+    # Connect flow properties to the analysis points
+    points.connect('v', 'v')
+    points.connect('alpha', 'alpha', src_indices=lambda i: [i])
+    points.connect('M', 'M', src_indices=lambda i: [i])
+    points.connect('re', 're')
+    points.connect('rho', 'rho')
+    points.connect('cg', 'cg')
+
+    points.connect('wing.mesh', 'wing.def_mesh')
+    points.connect('wing.mesh', 'aero_states.wing_def_mesh')
+    points.connect('wing.t_over_c', 'wing_perf.t_over_c')
+
+    prob.model.add_design_var('wing.twist_cp', lower=-5, upper=8)
+    prob.model.add_design_var('alpha', lower=-15, upper=15)
+    prob.model.add_objective(points.get_path(2, 'CD'))
+    for i in range(n_points):
+        prob.model.add_constraint(points.get_path(i, 'wing_perf.CL'), equals=0.5)
+
+    prob.setup()
+
+    return prob, points
+
+
+class Test(unittest.TestCase):
+
+    def test(self):
+        results = {}
+        for mode in ['parallel', 'pool']:
+            prob, points = get_problem(mode)
+            prob.run_model()
+
+            self.assertEqual(points.mode, mode)
+
+            results[mode] = {
+                'CL' : [prob[points.get_path(i, 'CL')] for i in range(3)],
+                'wing_perf.CL' : [prob[points.get_path(i, 'wing_perf.CL')] for i in range(3)],
+                'CD' : [prob[points.get_path(i, 'CD')] for i in range(3)],
+                'totals' : list(prob.compute_totals().values()),
+            }
+
+            if mode == 'pool':
+                points.group.close()
+
+        # The points ran at different conditions
+        self.assertLess(results['pool']['CL'][0], results['pool']['CL'][1])
+
+        for name in ['CL', 'wing_perf.CL', 'CD', 'totals']:
+            for value, pool_value in zip(results['parallel'][name], results['pool'][name]):
+                assert_rel_error(self, pool_value, value, 1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
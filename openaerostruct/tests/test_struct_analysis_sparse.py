@@ -0,0 +1,91 @@
+from __future__ import division, print_function
+from openmdao.utils.assert_utils import assert_rel_error
+import unittest
+import numpy as np
+
+from openaerostruct.geometry.utils import generate_mesh
+from openaerostruct.structures.struct_groups import SpatialBeamAlone
+
+from openmdao.api import IndepVarComp, Problem
+
+
+class Test(unittest.TestCase):
+
+    def test(self):
+
+        # Create a dictionary to store options about the surface
+        mesh_dict = {'num_y' : 7,
+                     'wing_type' : 'CRM',
+                     'symmetry' : True,
+                     'num_twist_cp' : 5}
+
+        mesh, twist_cp = generate_mesh(mesh_dict)
+
+        surf_dict = {
+                    # Wing definition
+                    'name' : 'wing',        # name of the surface
+                    'type' : 'structural',
+                    'symmetry' : True,     # if true, model one half of wing
+                                            # reflected across the plane y = 0
+                    'fem_model_type' : 'tube',
+
+                    'mesh' : mesh,
+
+                    # Structural values are based on aluminum 7075
+                    'E' : 70.e9,            # [Pa] Young's modulus of the spar
+                    'G' : 30.e9,            # [Pa] shear modulus of the spar
+                    'yield' : 500.e6 / 2.5, # [Pa] yield stress divided by 2.5 for limiting case
+                    'mrho' : 3.e3,          # [kg/m^3] material density
+                    'fem_origin' : 0.35,    # normalized chordwise location of the spar
+                    't_over_c_cp' : np.array([0.15]),      # maximum airfoil thickness
+                    'thickness_cp' : np.ones((3)) * .1,
+                    'wing_weight_ratio' : 2.,
+                    'struct_weight_relief' : False,    # True to add the weight of the structure to the loads on the structure
+                    'distributed_fuel_weight' : False,
+                    'exact_failure_constraint' : False,
+                    }
+
+        ny = surf_dict['mesh'].shape[1]
+
+        # Run the same analysis with the dense and the sparse FEM
+        probs = []
+        for sparse_fem in [False, True]:
+            surface = dict(surf_dict, sparse_fem=sparse_fem)
+
+            prob = Problem()
+
+            indep_var_comp = IndepVarComp()
+            indep_var_comp.add_output('loads', val=np.ones((ny, 6)) * 2e5, units='N')
+            indep_var_comp.add_output('load_factor', val=1.)
+
+            struct_group = SpatialBeamAlone(surface=surface)
+
+            # Add indep_vars to the structural group
+            struct_group.add_subsystem('indep_vars',
+                 indep_var_comp,
+                 promotes=['*'])
+
+            prob.model.add_subsystem(surface['name'], struct_group)
+
+            prob.setup()
+
+            prob.run_model()
+
+            probs.append(prob)
+
+        dense, sparse = probs
+
+        assert_rel_error(self, sparse['wing.disp'], dense['wing.disp'], 1e-10)
+        assert_rel_error(self, sparse['wing.vonmises'], dense['wing.vonmises'], 1e-10)
+
+        of = ['wing.failure', 'wing.disp']
+        wrt = ['wing.thickness_cp', 'wing.loads']
+        dense_totals = dense.compute_totals(of=of, wrt=wrt)
+        sparse_totals = sparse.compute_totals(of=of, wrt=wrt)
+
+        for key in dense_totals:
+            assert_rel_error(self, sparse_totals[key], dense_totals[key], 1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
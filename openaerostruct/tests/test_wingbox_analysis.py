@@ -112,7 +112,7 @@ class Test(unittest.TestCase):
         prob.model.add_objective('wing.structural_weight', scaler=1e-5)
 
         # Set up the problem
-        prob.setup(force_alloc_complex=False)
+        prob.setup(force_alloc_complex=True)
 
         prob.run_model()
         data = prob.check_partials(compact_print=True, out_stream=None, method='fd')
@@ -8,7 +8,7 @@ from openaerostruct.geometry.utils import generate_mesh
 
 from openaerostruct.integration.aerostruct_groups import AerostructGeometry, AerostructPoint
 
-from openmdao.api import IndepVarComp, Problem, Group, ScipyOptimizeDriver, pyOptSparseDriver, SqliteRecorder, ExecComp
+from openmdao.api import IndepVarComp, Problem, Group, ScipyOptimizeDriver, SqliteRecorder, ExecComp
 from openmdao.utils.assert_utils import assert_check_partials
 from openaerostruct.structures.wingbox_fuel_vol_delta import WingboxFuelVolDelta
 
@@ -244,7 +244,7 @@ class Test(unittest.TestCase):
         #=======================================================================================
 
         # Set up the problem
-        prob.setup()
+        prob.setup(force_alloc_complex=True)
 
         # from openmdao.api import view_model
         # view_model(prob)
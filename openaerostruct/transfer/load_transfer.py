@@ -1,16 +1,10 @@
 from __future__ import division, print_function
 import numpy as np
-from scipy.sparse import coo_matrix, hstack, identity
 
 from openmdao.api import ExplicitComponent
 
-data_type = complex
+from openaerostruct.utils.vector_algebra import skew_rows, skew_cols, skew_comps, skew_signs
 
-def _skew(vector):
-    out = np.array([[0, -vector[2], vector[1]],\
-                    [vector[2], 0, -vector[0]],\
-                    [-vector[1], vector[0], 0]])
-    return out
 
 class LoadTransfer(ExplicitComponent):
     """
@@ -72,165 +66,47 @@ class LoadTransfer(ExplicitComponent):
         # The first 3 indices are N and the last 3 are N*m.
 
 
-        # Below we create each individual partial derivative
-
-        # --------------------------------dloadsA__dsec_forces-------------------------------------
-        # this derivative is linear
-        rowsA=np.zeros((3*(ny-1)*(nx-1)*2))
-        colsA=np.zeros((3*(ny-1)*(nx-1)*2))
-        for x_idx in range(nx-1):
-            offset = x_idx*(3*(ny-1))
-            for col_idx in range(3*(ny-1)):
-                rowsA[2*offset+col_idx*2] = col_idx
-                rowsA[2*offset+col_idx*2+1] = col_idx+3
-                colsA[2*offset+col_idx*2] = offset+col_idx
-                colsA[2*offset+col_idx*2+1] = offset+col_idx
-        dloadsA__dsec_forces = coo_matrix((0.5*np.ones(len(rowsA)), (rowsA, colsA)), shape=(3*(ny), 3*(ny-1)*(nx-1)))
-        #self.declare_partials(of='loadsA', wrt='sec_forces', rows=rowsA, cols=colsA, val=0.5)
-
-        # --------------------------------dloadsB__dsec_forces-------------------------------------
-        #dloadsB__dmoment
-        rowsA=np.zeros((3*(ny-1)*2))
-        colsA=np.zeros((3*(ny-1)*2))
-        data=0.5*np.ones((3*(ny-1)*2))
-        for col_idx in range(3*(ny-1)):
-            rowsA[col_idx*2] = col_idx
-            rowsA[col_idx*2+1] = col_idx+3
-            colsA[col_idx*2] = col_idx
-            colsA[col_idx*2+1] = col_idx
-        self.dloadsB__dmoment = coo_matrix((data, (rowsA, colsA)), shape=(3*ny,3*(ny-1)))
-
-        # dmoment__dsec_forces
-        diff = np.ones((nx-1, ny-1, 3))
-        rows = np.zeros((9*(ny-1)*(nx-1)))
-        cols = np.zeros((9*(ny-1)*(nx-1)))
-        data = np.ones((9*(ny-1)*(nx-1)))
-        tmp_row = np.array([0,0,0,1,1,1,2,2,2])
-        tmp_col = np.array([0,1,2,0,1,2,0,1,2])
-        # setup rows and cols
-        for nxitr in range(nx-1):
-            for nyitr in range(ny-1):
-                index = 9*(nyitr+(ny-1)*nxitr)
-                rows[index:index+9] = tmp_row+nyitr*3.
-                cols[index:index+9] = tmp_col+nyitr*3.+3*(ny-1)*nxitr
-                data[index:index+9] = -_skew(diff[nxitr,nyitr,:]).flatten()
-        dmoment__dsec_forces = coo_matrix((data, (rows,cols)), shape=(3*(ny-1), 3*(ny-1)*(nx-1)))
-
-        # dloadsB__dsec_forces
-        dloadsB__dsec_forces = self.dloadsB__dmoment * dmoment__dsec_forces
-        dloadsB__dsec_forces = dloadsB__dsec_forces.tocoo() # force the system to be a coo_matrix
-        #self.declare_partials(of='loadsB', wrt='sec_forces', rows=dloadsB__dsec_forces.row, cols=dloadsB__dsec_forces.col)
-
-        # --------------------------------dloadsB__ddef_mesh-------------------------------------
-        # setup sparce partials for dloadsB__ddef_mesh where:
-        # dloadsB__ddef_mesh = dloadsB__dmoment * dmoment__ddiff * ddiff__ddef_mesh
-
-        # dloadsB__dmoment
-        rows = np.zeros((3*(ny-1)*2))
-        cols = np.zeros((3*(ny-1)*2))
-        data = np.ones((3*(ny-1)*2))
-        tmp_row = np.array([0,3])
-        tmp_col = np.array([0,0])
-        for i in range(3*(ny-1)):
-            rows[i*2:(1+i)*2] = i+tmp_row
-            cols[i*2:(1+i)*2] = i+tmp_col
-        self.dloadsB__dmoment = 0.5*coo_matrix((data, (rows,cols)), shape=(3*ny, 3*(ny-1)))
-
-        # dmoment__ddiff
-        # this will need to be recalculated in def_partials b/c it's a function of sec_forces
-        rows = np.zeros((9*(ny-1)*(nx-1)))
-        cols = np.zeros((9*(ny-1)*(nx-1)))
-        data = np.zeros((9*(ny-1)*(nx-1)))
-        tmp_row = np.array([0,0,0,1,1,1,2,2,2])
-        tmp_col = np.array([0,1,2,0,1,2,0,1,2])
-        tmp_sec_forces = np.ones((nx-1,ny-1,3))
-        # setup rows and cols
-        for nxitr in range(nx-1):
-            for nyitr in range(ny-1):
-                index = 9*(nyitr+(ny-1)*nxitr)
-                rows[index:index+9] = tmp_row+nyitr*3.
-                cols[index:index+9] = tmp_col+nyitr*3.+3*(ny-1)*nxitr
-                data[index:index+9] = -_skew(tmp_sec_forces[nxitr,nyitr,:]).flatten()
-        dmoment__ddiff = coo_matrix((data, (rows,cols)), shape=(3*(ny-1), 3*(ny-1)*(nx-1)))
-
-        # ddiff__ds_pts
-        tmp_ddiff__ds_pts = np.zeros((3*(ny-1)*(nx-1),3*(ny-1)))
-        for xiter in range(nx-1):
-            tmp_ddiff__ds_pts[xiter*3*(ny-1):(1+xiter)*3*(ny-1),0:3*(ny-1)] = np.eye((3*(ny-1)))
-        ddiff__ds_pts = coo_matrix(tmp_ddiff__ds_pts)
-
-        # ds_pts__ddef_mesh
-        tmp_ds_pts__ddef_mesh = np.zeros((3*(ny-1),3*(ny)*(nx)))
-        block = np.zeros((3*(ny-1),3*ny))
-        block[:,0:-3] = np.eye((3*(ny-1)))
-        block[:,3:] = block[:,3:] + np.eye((3*(ny-1)))
-        tmp_ds_pts__ddef_mesh[:,0:3*ny] = 0.5*(1-w2)*block
-        tmp_ds_pts__ddef_mesh[:,3*ny*(nx-1):] = tmp_ds_pts__ddef_mesh[:,3*ny*(nx-1):] + 0.5 * w2 * block
-        ds_pts__ddef_mesh = coo_matrix(tmp_ds_pts__ddef_mesh)
-
-        # ddiff__da_pts
-        ddiff__da_pts = identity((3*(ny-1)*(nx-1)))
-
-        # da_pts__ddef_mesh
-        tmp_da_pts__ddef_mesh = np.zeros((3*(ny-1)*(nx-1),3*ny*nx))
-        block2 = np.zeros((3*(ny-1),6*ny))
-        block2[:,:-3*ny] = 0.5 * (1-w1) * block
-        block2[:,3*ny:] = 0.5 * w1 * block
-        down = 3*(ny-1)
-        over = 3*ny
-        for xiter in range(nx-1):
-            tmp_da_pts__ddef_mesh[xiter*down:xiter*down+3*(ny-1),over*xiter:over*xiter+6*ny] = block2
-        da_pts__ddef_mesh = coo_matrix(tmp_da_pts__ddef_mesh)
-
-        # to shorten future calculation times we calculate two other partials
-        # ddiff__ddef_mesh
-        self.ddiff__ddef_mesh = ddiff__da_pts * da_pts__ddef_mesh - ddiff__ds_pts * ds_pts__ddef_mesh
-        self.ddiff__ddef_mesh = self.ddiff__ddef_mesh.tocoo()
-
-        # dloadsB__ddef_mesh
-        dloadsB__ddef_mesh = self.dloadsB__dmoment * dmoment__ddiff * self.ddiff__ddef_mesh
-        #dloadsB__ddef_mesh = dloadsB__dmoment * dmoment__ddiff * ddiff__ddef_mesh
-        dloadsB__ddef_mesh = dloadsB__ddef_mesh.tocoo()
-        rows = dloadsB__ddef_mesh.row
-        cols = dloadsB__ddef_mesh.col
-        #self.declare_partials(of='loadsB', wrt='def_mesh', rows=rows, cols=cols)
-
-        #---------------------------------dloads__ddef_mesh
-        #dloads__dloadsA
-        blk = np.array([0,1,2])
-        rows = np.zeros((ny*3))
-        data = np.ones((ny*3))
-        cols = np.linspace(0,ny*3-1, ny*3)
-        for yiter in range(ny):
-            rows[yiter*3:(1+yiter)*3] = blk+6*yiter
-        dloads__dloadsA = coo_matrix((data, (rows, cols)), shape=(ny*6, ny*3))
-
-        #dloads__dloadsB
-        rows = rows + 3
-        self.dloads__dloadsB = coo_matrix((data, (rows, cols)), shape=(ny*6, ny*3))
-
-        dloads__ddef_mesh = self.dloads__dloadsB * dloadsB__ddef_mesh # + self.dloads__dloadsA * dloadsA__ddef_mesh but this last term is zero
-        dloads__ddef_mesh = dloads__ddef_mesh.tocoo()
-        rows = dloads__ddef_mesh.row
-        cols = dloads__ddef_mesh.col
-        self.declare_partials(of='loads', wrt='def_mesh', rows=rows, cols=cols)
-
-
-        #---------------------------------dloads__dsec_forces------------------------------------
-        dloads__dsec_forces = dloads__dloadsA * dloadsA__dsec_forces + self.dloads__dloadsB * dloadsB__dsec_forces
-        dloads__dsec_forces = dloads__dsec_forces.tocoo()
-        rows = dloads__dsec_forces.row
-        cols = dloads__dsec_forces.col
-        self.declare_partials(of='loads', wrt='sec_forces', rows=rows, cols=cols)
-
+        # Below we create the sparsity patterns of the partials. Each panel
+        # force and moment about the FEM element is split evenly between the
+        # two nodes of the element, so every entry is repeated for the two
+        # nodes (j = k and j = k + 1 for the panels of element k).
+        # The moments are diff x sec_forces, so their derivatives are skew
+        # matrices and we only keep the six off-diagonal entries.
+        i, k, dj = np.meshgrid(np.arange(nx - 1), np.arange(ny - 1), np.arange(2), indexing='ij')
+        i = i[..., np.newaxis]
+        k = k[..., np.newaxis]
+        dj = dj[..., np.newaxis]
+
+        xyz = np.arange(3)
+        panel_cols = 3 * ((ny - 1) * i + k)
+
+        # --------------------------------dloads__dsec_forces-------------------------------------
+        rows = np.concatenate([6 * (k + dj) + xyz, 6 * (k + dj) + 3 + skew_rows], axis=-1)
+        cols = np.concatenate([panel_cols + xyz, panel_cols + skew_cols], axis=-1)
+        self.declare_partials(of='loads', wrt='sec_forces', rows=rows.flatten(), cols=cols.flatten())
+
+        # --------------------------------dloads__ddef_mesh-------------------------------------
+        # diff depends on the mesh points of chordwise row p, and on the
+        # spanwise points k and k + 1 (dk = 0, 1) bounding the element.
+        # The same (row, col) pair shows up for two neighboring elements, so
+        # we keep the inverse map to sum the duplicates in compute_partials.
+        p, k, dj, dk = np.meshgrid(np.arange(nx), np.arange(ny - 1), np.arange(2), np.arange(2),
+            indexing='ij')
+        p = p[..., np.newaxis]
+        k = k[..., np.newaxis]
+        dj = dj[..., np.newaxis]
+        dk = dk[..., np.newaxis]
+
+        rows = 6 * (k + dj) + 3 + skew_rows
+        cols = 3 * (ny * p + k + dk) + skew_cols
+
+        mesh_size = nx * ny * 3
+        keys, self.mesh_inverse = np.unique((rows * mesh_size + cols).flatten(), return_inverse=True)
+        self.declare_partials(of='loads', wrt='def_mesh', rows=keys // mesh_size, cols=keys % mesh_size)
 
         # -------------------------------- Check Partial Options-------------------------------------
         self.set_check_partial_options('*', method='cs', step=1e-40)
 
-
-        #---------------------------------- dloads__dloadsA__dsec_forces
-        self.dloads__dloadsA__dsec_forces = dloads__dloadsA * dloadsA__dsec_forces
-
     def compute(self, inputs, outputs):
         mesh = inputs['def_mesh'] #[nx, ny, 3]
         sec_forces = inputs['sec_forces']
@@ -251,13 +127,9 @@ class LoadTransfer(ExplicitComponent):
         # and the FEM elements
         # diff [nx-1, ny-1, 3]
         diff = a_pts - s_pts
-        dtype = float
-        if self.under_complex_step:
-            dtype = complex
 
-        moment = np.zeros((self.ny - 1, 3), dtype=dtype)
-        for ind in range(self.nx-1):
-            moment = moment + np.cross(diff[ind, :, :], sec_forces[ind, :, :], axis=1)
+        # Sum the moments of all chordwise panels of each strip
+        moment = np.sum(np.cross(diff, sec_forces), axis=0)
 
         outputs['loads'][:] = 0.
 
@@ -287,8 +159,6 @@ class LoadTransfer(ExplicitComponent):
         ny = self.ny
         nx = self.nx
 
-        # -------------------------------dloadsB__dsec_forces--------------------------------------
-        # dmoment__dsec_forces
         # Compute the aerodynamic centers at the quarter-chord point of each panel
         a_pts = 0.5 * (1-self.w1) * mesh[:-1, :-1, :] + \
                 0.5 *   self.w1   * mesh[1:, :-1, :] + \
@@ -302,51 +172,26 @@ class LoadTransfer(ExplicitComponent):
         # Find the moment arm between the aerodynamic centers of each panel
         # and the FEM elements
         diff = a_pts - s_pts
-        rows = np.zeros((9*(ny-1)*(nx-1)))
-        cols = np.zeros((9*(ny-1)*(nx-1)))
-        data = np.zeros((9*(ny-1)*(nx-1)))
-        tmp_row = np.array([0,0,0,1,1,1,2,2,2])
-        tmp_col = np.array([0,1,2,0,1,2,0,1,2])
-        # setup rows and cols
-        for nxitr in range(nx-1):
-            for nyitr in range(ny-1):
-                index = 9*(nyitr+(ny-1)*nxitr)
-                rows[index:index+9] = tmp_row+nyitr*3.
-                cols[index:index+9] = tmp_col+nyitr*3.+3*(ny-1)*nxitr
-                data[index:index+9] = _skew(diff[nxitr,nyitr,:]).flatten()
-        dmoment__dsec_forces = coo_matrix((data, (rows,cols)), shape=(3*(ny-1), 3*(ny-1)*(nx-1)))
-
-        dloadsB__dsec_forces = self.dloadsB__dmoment * dmoment__dsec_forces
-        dloadsB__dsec_forces = dloadsB__dsec_forces.tocoo()
-        #J['loadsB','sec_forces'] = dloadsB__dsec_forces.data
-
-        # --------------------------------dloadsB__ddef_mesh-------------------------------------
-        # dmoment__ddiff must to be calulated each time b/c it's a function of sec_forces
-        rows = np.zeros((9*(ny-1)*(nx-1)))
-        cols = np.zeros((9*(ny-1)*(nx-1)))
-        data = np.zeros((9*(ny-1)*(nx-1)))
-        tmp_row = np.array([0,0,0,1,1,1,2,2,2])
-        tmp_col = np.array([0,1,2,0,1,2,0,1,2])
-        # setup rows and cols
-        for nxitr in range(nx-1):
-            for nyitr in range(ny-1):
-                index = 9*(nyitr+(ny-1)*nxitr)
-                rows[index:index+9] = tmp_row+nyitr*3.
-                cols[index:index+9] = tmp_col+nyitr*3.+3*(ny-1)*nxitr
-                data[index:index+9] = -_skew(sec_forces[nxitr,nyitr,:]).flatten()
-        dmoment__ddiff = coo_matrix((data, (rows,cols)), shape=(3*(ny-1), 3*(ny-1)*(nx-1)))
-
-
-        # multiply the matrix with those previous calculated in setup
-        dloadsB__ddef_mesh = self.dloadsB__dmoment * dmoment__ddiff * self.ddiff__ddef_mesh
-        dloadsB__ddef_mesh = dloadsB__ddef_mesh.tocoo()
-        #J['loadsB','def_mesh'] = dloadsB__ddef_mesh.data
-
-        dloads__ddef_mesh = self.dloads__dloadsB * dloadsB__ddef_mesh
-        dloads__ddef_mesh = dloads__ddef_mesh.tocoo()
-        J['loads','def_mesh'] = dloads__ddef_mesh.data
-
-
-        dloads__dsec_forces = self.dloads__dloadsA__dsec_forces + self.dloads__dloadsB * dloadsB__dsec_forces
-        dloads__dsec_forces = dloads__dsec_forces.tocoo()
-        J['loads','sec_forces'] = dloads__dsec_forces.data
+
+        # -------------------------------dloads__dsec_forces--------------------------------------
+        # The forces are directly split between the nodes while the moments
+        # have derivatives skew(diff)
+        data = np.empty((nx - 1, ny - 1, 2, 9), dtype=diff.dtype)
+        data[..., :3] = 0.5
+        data[..., 3:] = 0.5 * skew_signs * diff[:, :, np.newaxis, skew_comps]
+        J['loads', 'sec_forces'] = data.real.flatten()
+
+        # --------------------------------dloads__ddef_mesh-------------------------------------
+        # The moments have derivatives -skew(sec_forces) wrt diff, so we
+        # combine the sec_forces with the weights of each chordwise row of
+        # the mesh in a_pts and s_pts
+        weighted_forces = np.zeros((nx, ny - 1, 3), dtype=diff.dtype)
+        weighted_forces[:-1] += (1 - self.w1) * sec_forces
+        weighted_forces[1:] += self.w1 * sec_forces
+        sec_forces_sum = np.sum(sec_forces, axis=0)
+        weighted_forces[0] -= (1 - self.w2) * sec_forces_sum
+        weighted_forces[-1] -= self.w2 * sec_forces_sum
+
+        data = -0.25 * skew_signs * weighted_forces[:, :, np.newaxis, np.newaxis, skew_comps]
+        data = np.broadcast_to(data, (nx, ny - 1, 2, 2, 6))
+        J['loads', 'def_mesh'] = np.bincount(self.mesh_inverse, weights=data.real.flatten())
@@ -30,5 +30,27 @@ class Test(unittest.TestCase):
 
         run_test(self, group, complex_flag=True, compact_print=False)
 
+    def test_multiple_chordwise(self):
+        # Use a mesh with more than one chordwise panel, so the moments of
+        # several panels are summed for each element
+        surfaces = get_default_surfaces()
+        surface = dict(surfaces[0], mesh=surfaces[1]['mesh'])
+        group = Group()
+
+        comp = LoadTransfer(surface=surface)
+
+        indep_var_comp = IndepVarComp()
+
+        nx = surface['mesh'].shape[0]
+        ny = surface['mesh'].shape[1]
+
+        indep_var_comp.add_output('def_mesh', val=np.random.random((nx, ny, 3)), units='m')
+        indep_var_comp.add_output('sec_forces', val=np.random.random((nx-1, ny-1, 3)), units='N')
+
+        group.add_subsystem('indep_var_comp', indep_var_comp, promotes=['*'])
+        group.add_subsystem('load_transfer', comp, promotes=['*'])
+
+        run_test(self, group, complex_flag=True, method='cs')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,215 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+
+def array_fingerprint(*arrays):
+    """
+    Get a cheap fingerprint of the contents of a set of arrays.
+
+    This is used by components that cache expensive intermediate results,
+    such as matrix factorizations or partial derivatives, so they can tell
+    whether their inputs have changed since the cached results were computed.
+    Hashing the raw bytes is linear in the size of the arrays, which is much
+    cheaper than recomputing the results themselves.
+
+    Parameters
+    ----------
+    *arrays : numpy arrays
+        The arrays to fingerprint. Their shapes and dtypes are included, so
+        a real and complex array with the same values do not match.
+
+    Returns
+    -------
+    fingerprint : bytes
+        The digest of the arrays' contents.
+    """
+    sha = hashlib.sha1()
+    for array in arrays:
+        array = np.asarray(array)
+        sha.update(str((array.dtype.str, array.shape)).encode())
+        sha.update(np.ascontiguousarray(array).reshape(-1).view(np.uint8))
+    return sha.digest()
+
+
+class FactorizationCache(object):
+    """
+    Keep the factorization of the most recently factored matrix so it can be
+    reused as long as the matrix does not change.
+
+    Implicit components that solve linear systems, such as `SolveMatrix` and
+    `FEM`, factor their matrix in `solve_nonlinear` and then again in
+    `linearize`, usually at the same inputs. With this cache, the second
+    factorization is replaced by a fingerprint of the matrix.
+
+    Parameters
+    ----------
+    factorize : callable
+        Function that factors a matrix, such as `scipy.linalg.lu_factor`.
+
+    Attributes
+    ----------
+    hits : int
+        Number of requests served by the cached factorization.
+    misses : int
+        Number of requests that required a new factorization.
+    """
+
+    def __init__(self, factorize):
+        self.factorize = factorize
+        self.fingerprint = None
+        self.factorization = None
+        self.hits = 0
+        self.misses = 0
+
+    def factor(self, mtx, *args):
+        """
+        Get the factorization of mtx, computing it only if mtx differs from
+        the last matrix that was factored. Any additional arrays are passed
+        on to the factorize function and are also compared.
+        """
+        fingerprint = array_fingerprint(mtx, *args)
+
+        if fingerprint == self.fingerprint:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.factorization = self.factorize(mtx, *args)
+            self.fingerprint = fingerprint
+
+        return self.factorization
+
+
+class SparsityCache(object):
+    """
+    Process-wide cache of the rows and cols arrays of sparse partials.
+
+    Many components build large index arrays for their sparsity patterns
+    in setup, and those only depend on the mesh sizes and a few options.
+    Repeated setups of the same problem (e.g. in sweeps or multipoint
+    models) can then share the arrays instead of rebuilding them.
+
+    The in-memory cache is bounded to `max_bytes`, evicting the least
+    recently used patterns first. Some patterns are O(n^2) in the number of
+    panels, such as those of `VLMMtxRHSComp` and `EvalVelocities`, so
+    patterns larger than the bound are never kept in memory at all, and the
+    component that requested them holds the only reference to them.
+
+    If a cache directory is given, the arrays are also stored there as
+    .npz files so later processes can load them instead of computing them.
+    The directory defaults to the OAS_SPARSITY_CACHE_DIR environment
+    variable, if set.
+
+    Parameters
+    ----------
+    cache_dir : str or None
+        Directory for the on-disk cache; if None, only the in-memory cache
+        is used.
+    max_bytes : int
+        Maximum total size of the arrays kept in memory.
+
+    Attributes
+    ----------
+    hits : int
+        Number of requests served by the in-memory or on-disk cache.
+    misses : int
+        Number of requests that required computing the arrays.
+    nbytes : int
+        Total size of the arrays kept in memory.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=64 * 2**20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.clear()
+
+    def clear(self):
+        """
+        Empty the in-memory cache and reset the counters.
+        """
+        self._arrays = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, comp, key, compute):
+        """
+        Get the arrays for a component's sparsity pattern, computing them
+        only if they are not in the cache yet.
+
+        Parameters
+        ----------
+        comp : System
+            Component the arrays are for; its class is part of the key.
+        key : tuple
+            Everything else the arrays depend on, such as nx, ny, symmetry,
+            and num_eval_points.
+        compute : callable
+            Function with no arguments that returns the tuple of arrays.
+
+        Returns
+        -------
+        arrays : tuple of numpy arrays
+            The cached arrays. These are read-only since they are shared.
+        """
+        key = ('{}.{}'.format(type(comp).__module__, type(comp).__name__),) + tuple(key)
+
+        if key in self._arrays:
+            self.hits += 1
+
+            # Move the arrays to the most recently used end
+            arrays = self._arrays.pop(key)
+            self._arrays[key] = arrays
+            return arrays
+
+        arrays = None
+        filename = None
+        if self.cache_dir is not None:
+            digest = hashlib.sha1(repr(key).encode()).hexdigest()
+            filename = os.path.join(self.cache_dir, 'sparsity_{}.npz'.format(digest))
+
+            if os.path.exists(filename):
+                with np.load(filename, allow_pickle=False) as data:
+                    arrays = tuple(data['arr_{}'.format(i)] for i in range(len(data.files)))
+
+        if arrays is None:
+            self.misses += 1
+            arrays = tuple(np.asarray(array) for array in compute())
+
+            if filename is not None:
+                try:
+                    os.makedirs(self.cache_dir)
+                except OSError:
+                    # It already exists, possibly made by another process
+                    pass
+
+                # Write to a temporary file first so other processes never
+                # read a partially written file
+                tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+                with open(tmp_filename, 'wb') as f:
+                    np.savez(f, *arrays)
+                try:
+                    os.rename(tmp_filename, filename)
+                except OSError:
+                    os.remove(tmp_filename)
+        else:
+            self.hits += 1
+
+        for array in arrays:
+            array.flags.writeable = False
+
+        nbytes = sum(array.nbytes for array in arrays)
+        if nbytes <= self.max_bytes:
+            while self.nbytes + nbytes > self.max_bytes:
+                _, evicted = self._arrays.popitem(last=False)
+                self.nbytes -= sum(array.nbytes for array in evicted)
+
+            self._arrays[key] = arrays
+            self.nbytes += nbytes
+
+        return arrays
+
+
+sparsity_cache = SparsityCache(os.environ.get('OAS_SPARSITY_CACHE_DIR'))
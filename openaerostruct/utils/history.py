@@ -0,0 +1,263 @@
+""" Columnar export of the driver cases of an optimization recording.
+
+Usage is `export_history __name__` for a user-named database, which writes
+the history to the directory `<name>_history`, or
+`export_history __name__ __directory__`.
+
+The plotting scripts accept the exported directory in place of the
+database, e.g. `plot_wing aerostruct_history`.
+
+"""
+
+from __future__ import division, print_function
+import json
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+import numpy as np
+
+from openmdao.recorders.sqlite_reader import SqliteCaseReader
+
+
+_MANIFEST_NAME = 'history.json'
+_METADATA_NAME = 'system_metadata.pkl'
+
+
+def export_history(db_name, path=None):
+    """
+    Convert the driver cases of a `SqliteRecorder` database into a columnar
+    store.
+
+    Each recorded output is written to its own .npy file, holding the values
+    of the output for all the iterations stacked along the first axis. The
+    reader can then map the file into memory, so getting e.g. the von Mises
+    stresses of every iteration is a single read without decoding any case.
+    The database is read once, one case at a time.
+
+    Parameters
+    ----------
+    db_name : str
+        Path of the database.
+    path : str or None
+        Directory to write the history to; defaults to the name of the
+        database with '_history' in place of its extension.
+
+    Returns
+    -------
+    path : str
+        Directory the history was written to.
+    """
+    from openaerostruct.utils.lazy_cases import list_driver_cases, get_driver_case
+
+    if path is None:
+        path = os.path.splitext(db_name)[0] + '_history'
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    cr = SqliteCaseReader(db_name)
+    case_ids = list_driver_cases(cr)
+    if not case_ids:
+        raise ValueError("'{}' has no driver cases to export.".format(db_name))
+
+    # The first case sets the variables and their shapes
+    first_case = get_driver_case(cr, case_ids[0])
+    names = list(first_case.outputs.keys())
+    objectives = list(get_driver_case(cr, case_ids[-1]).get_objectives().keys())
+
+    columns = OrderedDict()
+    variables = OrderedDict()
+    for k, name in enumerate(names):
+        value = np.asarray(first_case.outputs[name])
+        file_name = 'var_{}.npy'.format(k)
+
+        dtype = np.complex128 if np.iscomplexobj(value) else np.float64
+        column = np.lib.format.open_memmap(os.path.join(path, file_name), mode='w+',
+            dtype=dtype, shape=(len(case_ids),) + value.shape)
+        column[:] = np.nan
+
+        columns[name] = column
+        variables[name] = {'file' : file_name, 'shape' : list(value.shape)}
+
+    for i, case_id in enumerate(case_ids):
+        case = first_case if i == 0 else get_driver_case(cr, case_id)
+        outputs = case.outputs
+
+        for name, column in columns.items():
+            try:
+                value = outputs[name]
+            except KeyError:
+                continue
+
+            if np.shape(value) != column.shape[1:]:
+                raise ValueError("The shape of '{}' changes from {} to {} in case '{}'.".format(
+                    name, column.shape[1:], np.shape(value), case_id))
+            column[i] = value
+
+    for column in columns.values():
+        column.flush()
+    del columns
+
+    with open(os.path.join(path, _METADATA_NAME), 'wb') as f:
+        pickle.dump(cr.system_metadata, f, protocol=2)
+
+    manifest = {
+        'case_ids' : case_ids,
+        'objectives' : objectives,
+        'variables' : variables,
+    }
+    with open(os.path.join(path, _MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+    return path
+
+
+class HistoryReader(object):
+    """
+    Reader of a history exported by `export_history`.
+
+    Indexing the reader with the promoted name of an output gives the
+    read-only, memory-mapped array of its values for all the iterations,
+    stacked along the first axis. The reader also has the `list_cases` and
+    `get_case` methods and `system_metadata` attribute of the OpenMDAO
+    case reader used by the plotting scripts, so they can read a history
+    in place of the database.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the history.
+
+    Attributes
+    ----------
+    case_ids : list of str
+        Iteration coordinates of the cases, in the order they were recorded.
+    system_metadata : dict
+        Metadata of the systems of the model, as recorded in the database.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(os.path.join(path, _MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+
+        self.case_ids = manifest['case_ids']
+        self.objectives = manifest['objectives']
+        self._variables = OrderedDict(
+            (name, manifest['variables'][name]['file']) for name in manifest['variables'])
+        self._columns = {}
+
+        with open(os.path.join(path, _METADATA_NAME), 'rb') as f:
+            self.system_metadata = pickle.load(f)
+
+    def __len__(self):
+        return len(self.case_ids)
+
+    def __contains__(self, name):
+        return name in self._variables
+
+    def __getitem__(self, name):
+        if name not in self._columns:
+            if name not in self._variables:
+                raise KeyError(name)
+            self._columns[name] = np.load(os.path.join(self.path, self._variables[name]),
+                mmap_mode='r')
+        return self._columns[name]
+
+    def list_variables(self):
+        """
+        Get the promoted names of the exported outputs.
+        """
+        return list(self._variables)
+
+    def list_cases(self, source=None, recurse=True):
+        """
+        Get the iteration coordinates of the cases; only driver cases are
+        exported, so the arguments are ignored.
+        """
+        return list(self.case_ids)
+
+    def get_case(self, case_id):
+        """
+        Get the case with the given iteration coordinate or index.
+        """
+        if isinstance(case_id, int):
+            index = range(len(self.case_ids))[case_id]
+        else:
+            index = self.case_ids.index(case_id)
+        return HistoryCase(self, index)
+
+
+class _HistoryOutputs(Mapping):
+    """
+    Outputs of one case of a history, read from the memory-mapped columns.
+    """
+
+    def __init__(self, reader, index):
+        self._reader = reader
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._reader[name][self._index]
+
+    def __iter__(self):
+        return iter(self._reader.list_variables())
+
+    def __len__(self):
+        return len(self._reader.list_variables())
+
+
+class HistoryCase(object):
+    """
+    One case of a history, with the `outputs` and `get_objectives` of an
+    OpenMDAO case.
+
+    Attributes
+    ----------
+    iteration_coordinate : str
+        Iteration coordinate of the case.
+    outputs : Mapping
+        Values of the outputs of the case, by promoted name.
+    """
+
+    def __init__(self, reader, index):
+        self._reader = reader
+        self.iteration_coordinate = reader.case_ids[index]
+        self.outputs = _HistoryOutputs(reader, index)
+
+    def get_objectives(self):
+        """
+        Get the values of the objectives of the case. Unlike the values from
+        the database, they are not scaled.
+        """
+        return OrderedDict((name, self.outputs[name]) for name in self._reader.objectives
+                           if name in self._reader)
+
+
+def open_case_reader(filename):
+    """
+    Open a recording, either a database or a history exported from one.
+    """
+    if os.path.isdir(filename):
+        return HistoryReader(filename)
+    return SqliteCaseReader(filename)
+
+
+def export_main(args=sys.argv):
+    if len(args) < 2:
+        print('Usage: export_history <database> [<directory>]')
+        return
+
+    path = export_history(args[1], args[2] if len(args) > 2 else None)
+    print('History written to', path)
+
+
+if __name__ == '__main__':
+    export_main()
@@ -0,0 +1,276 @@
+from __future__ import print_function, division
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+
+
+class ClusterTree(object):
+    """
+    Binary tree of clusters of points, built by recursively splitting each
+    cluster in half along the longest side of its bounding box.
+
+    Parameters
+    ----------
+    points[num_points, 3] : numpy array
+        Coordinates of all the points.
+    indices : numpy array or None
+        Indices of the points in this cluster; all the points if None.
+    leaf_size : int
+        Clusters with at most this many points are not split further.
+
+    Attributes
+    ----------
+    indices : numpy array
+        Indices of the points in this cluster.
+    lower, upper : numpy arrays
+        Opposite corners of the bounding box of the cluster.
+    children : list of ClusterTree
+        The two halves of the cluster, or an empty list for a leaf.
+    """
+
+    def __init__(self, points, indices=None, leaf_size=32):
+        if indices is None:
+            indices = np.arange(len(points))
+
+        self.indices = indices
+
+        cluster_points = points[indices]
+        self.lower = np.min(cluster_points, axis=0)
+        self.upper = np.max(cluster_points, axis=0)
+
+        self.children = []
+        if len(indices) > leaf_size:
+            axis = np.argmax(self.upper - self.lower)
+            order = np.argsort(cluster_points[:, axis], kind='mergesort')
+            half = len(indices) // 2
+
+            self.children = [
+                ClusterTree(points, indices[order[:half]], leaf_size),
+                ClusterTree(points, indices[order[half:]], leaf_size),
+            ]
+
+    @property
+    def diameter(self):
+        return np.linalg.norm(self.upper - self.lower)
+
+    def distance(self, other):
+        """
+        Get the distance between the bounding boxes of two clusters.
+        """
+        gaps = np.maximum(0., np.maximum(self.lower - other.upper, other.lower - self.upper))
+        return np.linalg.norm(gaps)
+
+    def leaves(self):
+        """
+        Get the leaf clusters below this one.
+        """
+        if not self.children:
+            return [self]
+        return [leaf for child in self.children for leaf in child.leaves()]
+
+
+def compute_aca(get_row, get_col, shape, tol, max_rank, dtype=float):
+    """
+    Approximate a matrix block as the product U.dot(V) using adaptive cross
+    approximation (ACA) with partial pivoting, which only evaluates the
+    rows and columns of the block that it pivots on.
+
+    Parameters
+    ----------
+    get_row : callable
+        Function that returns row i of the block.
+    get_col : callable
+        Function that returns column j of the block.
+    shape : tuple
+        Shape of the block.
+    tol : float
+        Relative tolerance on the Frobenius norm of the approximation error,
+        as estimated from the size of the last cross added.
+    max_rank : int
+        Maximum rank of the approximation.
+    dtype : numpy dtype
+        Type of the entries of the block.
+
+    Returns
+    -------
+    U[m, rank], V[rank, n] : numpy arrays or None
+        Factors of the approximation, or None if the tolerance could not be
+        reached with max_rank crosses.
+    """
+    m, n = shape
+
+    U = np.zeros((m, max_rank), dtype=dtype)
+    V = np.zeros((max_rank, n), dtype=dtype)
+
+    used_rows = np.zeros(m, bool)
+    norm2 = 0.
+    rank = 0
+    i = 0
+
+    while rank < max_rank:
+        used_rows[i] = True
+
+        # Residual of the pivot row
+        row = get_row(i) - U[i, :rank].dot(V[:rank])
+        j = np.argmax(np.abs(row))
+
+        if row[j] != 0.:
+            U[:, rank] = get_col(j) - U[:, :rank].dot(V[:rank, j])
+            V[rank] = row / row[j]
+
+            # Update the squared Frobenius norm of U.dot(V) with the new cross
+            u = U[:, rank]
+            v = V[rank]
+            cross_norm2 = (u.dot(u) * v.dot(v)).real
+            norm2 += cross_norm2 + 2 * np.sum(U[:, :rank].T.dot(u) * V[:rank].dot(v)).real
+            rank += 1
+
+            if cross_norm2 <= tol**2 * norm2:
+                return U[:, :rank], V[:rank]
+
+            # Pivot on the row with the largest entry in the new column
+            u_abs = np.abs(u)
+            u_abs[used_rows] = -1.
+            i = np.argmax(u_abs)
+        else:
+            # The pivot row is already reproduced exactly, so try the next
+            # row that has not been used yet
+            unused_rows = np.where(~used_rows)[0]
+            if len(unused_rows) == 0:
+                return U[:, :rank], V[:rank]
+            i = unused_rows[0]
+
+        if np.all(used_rows):
+            return U[:, :rank], V[:rank]
+
+    return None
+
+
+class HMatrix(object):
+    """
+    Hierarchical matrix approximation of a dense matrix whose rows and
+    columns are both associated with the same set of points, such as the
+    AIC matrix of the VLM.
+
+    The matrix is either given as an assembled array, or as a function that
+    evaluates any block of it, such as `AICBlocks`. In the latter case, only
+    the near-field blocks and the rows and columns that ACA pivots on are
+    ever evaluated, so the full matrix is never assembled.
+
+    The points are split into a cluster tree and the matrix into blocks
+    between pairs of clusters. Blocks between well-separated clusters, for
+    which min(diameters) <= eta * distance, are smooth far-field
+    interactions and are stored as low-rank factors obtained with ACA; the
+    remaining near-field blocks between leaf clusters are kept dense.
+
+    The dense diagonal blocks of the leaf clusters are also LU-factored to
+    give a block-Jacobi preconditioner for iterative solvers.
+
+    Parameters
+    ----------
+    mtx[n, n] : numpy array or callable
+        The matrix to approximate, or a function get_block(rows, cols) that
+        returns its block with the given row and col indices.
+    points[n, 3] : numpy array
+        Coordinates of the point associated with each row and column.
+    leaf_size : int
+        Maximum number of points in the leaf clusters.
+    tol : float
+        Relative tolerance of the low-rank approximation of each block.
+    eta : float
+        Admissibility parameter; larger values compress more blocks.
+
+    Attributes
+    ----------
+    dense_blocks : list
+        Tuples of (row indices, col indices, block) of the near-field blocks.
+    low_rank_blocks : list
+        Tuples of (row indices, col indices, U, V) of the far-field blocks.
+    """
+
+    def __init__(self, mtx, points, leaf_size=32, tol=1e-8, eta=1.):
+        if callable(mtx):
+            get_block = mtx
+        else:
+            get_block = lambda rows, cols: mtx[np.ix_(rows, cols)]
+
+        self.shape = (len(points), len(points))
+
+        self.dense_blocks = []
+        self.low_rank_blocks = []
+
+        tree = ClusterTree(np.real(points), leaf_size=leaf_size)
+        leaves = tree.leaves()
+
+        self.leaf_factors = []
+        for leaf in leaves:
+            block = get_block(leaf.indices, leaf.indices)
+            self.leaf_factors.append((leaf.indices, lu_factor(block)))
+
+        self.dtype = block.dtype
+
+        self._add_blocks(get_block, tree, tree, tol, eta)
+
+    def _add_blocks(self, get_block, row_cluster, col_cluster, tol, eta):
+        rows = row_cluster.indices
+        cols = col_cluster.indices
+
+        diameter = min(row_cluster.diameter, col_cluster.diameter)
+        if diameter <= eta * row_cluster.distance(col_cluster):
+            # Above this rank, the factors take more memory than the block
+            max_rank = len(rows) * len(cols) // (len(rows) + len(cols))
+
+            factors = compute_aca(
+                lambda i: get_block(rows[i:i+1], cols)[0],
+                lambda j: get_block(rows, cols[j:j+1])[:, 0],
+                (len(rows), len(cols)), tol, max_rank, self.dtype)
+
+            if factors is not None:
+                self.low_rank_blocks.append((rows, cols) + factors)
+                return
+
+        if row_cluster.children or col_cluster.children:
+            for row_child in row_cluster.children or [row_cluster]:
+                for col_child in col_cluster.children or [col_cluster]:
+                    self._add_blocks(get_block, row_child, col_child, tol, eta)
+        else:
+            self.dense_blocks.append((rows, cols, get_block(rows, cols)))
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the dense and low-rank blocks.
+        """
+        return sum(block.nbytes for rows, cols, block in self.dense_blocks) + \
+            sum(U.nbytes + V.nbytes for rows, cols, U, V in self.low_rank_blocks)
+
+    def dot(self, x):
+        """
+        Multiply the matrix by the vector x.
+        """
+        y = np.zeros(self.shape[0], dtype=np.result_type(self.dtype, x.dtype))
+        for rows, cols, block in self.dense_blocks:
+            y[rows] += block.dot(x[cols])
+        for rows, cols, U, V in self.low_rank_blocks:
+            y[rows] += U.dot(V.dot(x[cols]))
+        return y
+
+    def tdot(self, x):
+        """
+        Multiply the transpose of the matrix by the vector x.
+        """
+        y = np.zeros(self.shape[1], dtype=np.result_type(self.dtype, x.dtype))
+        for rows, cols, block in self.dense_blocks:
+            y[cols] += block.T.dot(x[rows])
+        for rows, cols, U, V in self.low_rank_blocks:
+            y[cols] += V.T.dot(U.T.dot(x[rows]))
+        return y
+
+    def precondition(self, x, trans=0):
+        """
+        Apply the block-Jacobi preconditioner, or its transpose if trans
+        is 1, to the vector x.
+        """
+        y = np.zeros(self.shape[0], dtype=np.result_type(self.dtype, x.dtype))
+        for indices, lu in self.leaf_factors:
+            y[indices] = lu_solve(lu, x[indices], trans=trans)
+        return y
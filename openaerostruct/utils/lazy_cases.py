@@ -0,0 +1,156 @@
+from __future__ import print_function, division
+from collections import OrderedDict
+
+import numpy as np
+
+from openaerostruct.utils.history import HistoryReader
+
+
+def list_driver_cases(case_reader):
+    """
+    Get the iteration coordinates of the driver cases of a database, in the
+    order they were recorded.
+    """
+    # OpenMDAO 2.5 replaced the tables of cases of the reader with methods
+    # of the reader itself
+    if hasattr(case_reader, 'driver_cases'):
+        return list(case_reader.driver_cases.list_cases())
+    return list(case_reader.list_cases('driver', recurse=False))
+
+
+def get_driver_case(case_reader, case_id):
+    """
+    Read a single driver case, given its iteration coordinate, from a
+    database.
+    """
+    if hasattr(case_reader, 'driver_cases'):
+        return case_reader.driver_cases.get_case(case_id)
+    return case_reader.get_case(case_id)
+
+
+class LazyCaseLoader(object):
+    """
+    Sequence of the processed driver cases of a case recorder database,
+    which reads and processes each case only when it is first requested.
+
+    The plotting scripts show one iteration at a time, so instead of loading
+    every case of a long optimization history up front, the cases are read
+    from the database one at a time as the slider reaches them. The most
+    recently used processed cases are kept in an LRU cache, so stepping back
+    and forth through nearby iterations does not read them again.
+
+    Parameters
+    ----------
+    case_reader : SqliteCaseReader
+        Reader of the database.
+    process_case : callable
+        Function that takes a driver case and returns the data to keep for
+        it, e.g. the mirrored and recentered meshes of the surfaces.
+    cache_size : int
+        Maximum number of processed cases to keep.
+
+    Attributes
+    ----------
+    case_ids : list of str
+        Iteration coordinates of the driver cases, in the order they were
+        recorded.
+    hits : int
+        Number of requests served from the cache.
+    misses : int
+        Number of requests that read a case from the database.
+    """
+
+    def __init__(self, case_reader, process_case, cache_size=20):
+        self.case_reader = case_reader
+        self.process_case = process_case
+        self.cache_size = cache_size
+
+        self.case_ids = list_driver_cases(case_reader)
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.case_ids)
+
+    def get_case(self, index):
+        """
+        Read the unprocessed case at index from the database.
+        """
+        return get_driver_case(self.case_reader, self.case_ids[index])
+
+    def __getitem__(self, index):
+        case_id = self.case_ids[index]
+
+        if case_id in self._cache:
+            self.hits += 1
+            # Move the case to the end, so the cases are ordered from least
+            # to most recently used
+            data = self._cache.pop(case_id)
+            self._cache[case_id] = data
+            return data
+
+        self.misses += 1
+        data = self.process_case(get_driver_case(self.case_reader, case_id))
+
+        self._cache[case_id] = data
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return data
+
+
+def get_scalar_index(case_reader, scalars, case_ids=None):
+    """
+    Read a few scalars, such as the objective, CL, and structural weight,
+    for every driver case of a database.
+
+    Only the requested values of each case are kept, so the index of a long
+    optimization history is small and can be built before any of the
+    meshes are needed. For a history exported by `export_history`, the
+    values are summed from its columns without reading the cases.
+
+    Parameters
+    ----------
+    case_reader : SqliteCaseReader or HistoryReader
+        Reader of the database or history.
+    scalars : dict
+        Names of the entries of the index mapped to lists of the outputs
+        that are summed to get them, e.g. the structural weights of all the
+        surfaces. An entry is NaN for the cases missing any of its outputs.
+    case_ids : list of str or None
+        Iteration coordinates of the cases to index; all the driver cases
+        if None.
+
+    Returns
+    -------
+    index : OrderedDict
+        Arrays of the values of each entry over the cases.
+    """
+    if case_ids is None:
+        case_ids = list_driver_cases(case_reader)
+
+    index = OrderedDict((key, np.full(len(case_ids), np.nan)) for key in scalars)
+
+    if isinstance(case_reader, HistoryReader):
+        rows = dict((case_id, i) for i, case_id in enumerate(case_reader.case_ids))
+        rows = [rows[case_id] for case_id in case_ids]
+
+        for key, output_names in scalars.items():
+            if all(name in case_reader for name in output_names):
+                values = np.zeros(len(rows))
+                for name in output_names:
+                    column = case_reader[name]
+                    values += np.sum(column.reshape(len(column), -1)[rows], axis=1)
+                index[key] = values
+        return index
+
+    for i, case_id in enumerate(case_ids):
+        outputs = get_driver_case(case_reader, case_id).outputs
+        for key, output_names in scalars.items():
+            try:
+                index[key][i] = np.sum([np.sum(outputs[name]) for name in output_names])
+            except KeyError:
+                pass
+
+    return index
@@ -1,6 +1,7 @@
 """ Script to plot results from aero, struct, or aerostruct optimization.
 
-Usage is `plot_wing __name__` for user-named database.
+Usage is `plot_wing __name__` for user-named database, or for a history
+exported from it with `export_history`.
 
 You can select a certain zoom factor for the 3d view by adding a number as a
 last keyword.
@@ -8,11 +9,20 @@ The larger the number, the closer the view. Floats or ints are accepted.
 
 Ex: `plot_wing aero.db 1` a wider view than `plot_wing aero.db 5`.
 
+To save a video of the history without opening the viewer, add `--video`,
+e.g. `plot_wing aero.db --video`.
+
 """
 
 
 from __future__ import division, print_function
+import multiprocessing
+import os
+import shutil
+import subprocess
 import sys
+import tempfile
+import traceback
 major_python_version = sys.version_info[0]
 
 if major_python_version == 2:
@@ -22,9 +32,13 @@ else:
     import tkinter as Tk
     from tkinter import font as tkFont
 
+from collections import OrderedDict
 from six import iteritems
 import numpy as np
-from openmdao.recorders.sqlite_reader import SqliteCaseReader
+
+from openaerostruct.utils.history import open_case_reader, HistoryReader
+from openaerostruct.utils.lazy_cases import LazyCaseLoader, get_scalar_index, \
+    list_driver_cases
 
 try:
     import matplotlib
@@ -35,10 +49,11 @@ try:
     from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg,\
         NavigationToolbar2Tk
     import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
     from mpl_toolkits.mplot3d import Axes3D
     from matplotlib import cm
     import matplotlib.animation as manimation
-    import sqlitedict
 except:
     print()
     print("Correct plotting modules not available; please consult import list")
@@ -48,8 +63,21 @@ except:
 # User-set parameters
 #####################
 
+class _Setting(object):
+    """
+    Fixed value of a viewer option, standing in for the Tk variable of its
+    checkbox in a headless display.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
 class Display(object):
-    def __init__(self, args):
+    def __init__(self, args, headless=False, show_def_mesh=False, exaggerate_def=False):
 
         self.db_name = args[1]
 
@@ -58,21 +86,34 @@ class Display(object):
         except:
             self.zoom_scale = 2.8
 
-        self.root = Tk.Tk()
-        self.root.wm_title("Viewer")
+        # A headless display draws off screen with the Agg backend, without
+        # the GUI, e.g. in the processes rendering the frames of a video. Its
+        # deformed mesh options are fixed instead of set by checkboxes.
+        self.headless = headless
 
-        self.f = plt.figure(dpi=100, figsize=(12, 6), facecolor='white')
-        self.canvas = FigureCanvasTkAgg(self.f, master=self.root)
-        self.canvas.get_tk_widget().pack(side=Tk.TOP, fill=Tk.BOTH, expand=1)
+        if headless:
+            self.f = Figure(dpi=100, figsize=(12, 6), facecolor='white')
+            self.canvas = FigureCanvasAgg(self.f)
 
-        self.options_frame = Tk.Frame(self.root)
-        self.options_frame.pack()
+            self.show_def_mesh = _Setting(show_def_mesh)
+            self.ex_def = _Setting(exaggerate_def)
+        else:
+            self.root = Tk.Tk()
+            self.root.wm_title("Viewer")
+
+            self.f = plt.figure(dpi=100, figsize=(12, 6), facecolor='white')
+            self.canvas = FigureCanvasTkAgg(self.f, master=self.root)
+            self.canvas.get_tk_widget().pack(side=Tk.TOP, fill=Tk.BOTH, expand=1)
+
+            self.options_frame = Tk.Frame(self.root)
+            self.options_frame.pack()
+
+            toolbar = NavigationToolbar2Tk(self.canvas, self.root)
+            toolbar.update()
+            self.canvas._tkcanvas.pack(side=Tk.TOP, fill=Tk.BOTH, expand=1)
 
-        toolbar = NavigationToolbar2Tk(self.canvas, self.root)
-        toolbar.update()
-        self.canvas._tkcanvas.pack(side=Tk.TOP, fill=Tk.BOTH, expand=1)
         self.ax = plt.subplot2grid((4, 8), (0, 0), rowspan=4,
-                                   colspan=4, projection='3d')
+                                   colspan=4, projection='3d', fig=self.f)
 
         self.num_iters = 0
         self.show_wing = True
@@ -81,24 +122,30 @@ class Display(object):
         self.old_n = 0
         self.aerostruct = False
 
+        # Number of processed cases kept in memory
+        self.cache_size = 20
+
         self.load_db()
 
         if self.show_wing and not self.show_tube:
-            self.ax2 = plt.subplot2grid((4, 8), (0, 4), rowspan=2, colspan=4)
-            self.ax3 = plt.subplot2grid((4, 8), (2, 4), rowspan=2, colspan=4)
+            self.ax2 = plt.subplot2grid((4, 8), (0, 4), rowspan=2, colspan=4, fig=self.f)
+            self.ax3 = plt.subplot2grid((4, 8), (2, 4), rowspan=2, colspan=4, fig=self.f)
         if self.show_tube and not self.show_wing:
-            self.ax4 = plt.subplot2grid((4, 8), (0, 4), rowspan=2, colspan=4)
-            self.ax5 = plt.subplot2grid((4, 8), (2, 4), rowspan=2, colspan=4)
+            self.ax4 = plt.subplot2grid((4, 8), (0, 4), rowspan=2, colspan=4, fig=self.f)
+            self.ax5 = plt.subplot2grid((4, 8), (2, 4), rowspan=2, colspan=4, fig=self.f)
         if self.show_wing and self.show_tube:
-            self.ax2 = plt.subplot2grid((4, 8), (0, 4), colspan=4)
-            self.ax3 = plt.subplot2grid((4, 8), (1, 4), colspan=4)
-            self.ax4 = plt.subplot2grid((4, 8), (2, 4), colspan=4)
-            self.ax5 = plt.subplot2grid((4, 8), (3, 4), colspan=4)
+            self.ax2 = plt.subplot2grid((4, 8), (0, 4), colspan=4, fig=self.f)
+            self.ax3 = plt.subplot2grid((4, 8), (1, 4), colspan=4, fig=self.f)
+            self.ax4 = plt.subplot2grid((4, 8), (2, 4), colspan=4, fig=self.f)
+            self.ax5 = plt.subplot2grid((4, 8), (3, 4), colspan=4, fig=self.f)
 
     def load_db(self):
-        cr = self.case_reader = SqliteCaseReader(self.db_name)
-        cr.load_cases()
-        last_case = cr.driver_cases.get_case(-1)
+        cr = self.case_reader = open_case_reader(self.db_name)
+
+        # Only the cases shown by the slider are read from the database, as
+        # they are shown
+        self.cases = LazyCaseLoader(cr, self.process_case, cache_size=self.cache_size)
+        last_case = self.cases.get_case(-1)
 
         names = []
         for key in cr.system_metadata.keys():
@@ -118,26 +165,6 @@ class Display(object):
         else:
             self.opt = False
 
-        self.twist = []
-        self.mesh = []
-        self.def_mesh = []
-        self.radius = []
-        self.thickness = []
-        sec_forces = []
-        normals = []
-        widths = []
-        self.lift = []
-        self.lift_ell = []
-        self.vonmises = []
-        alpha = []
-        rho = []
-        v = []
-        self.CL = []
-        self.AR = []
-        self.S_ref = []
-        self.obj = []
-        self.cg = []
-
         pt_names = []
         for key in last_case.outputs:
             # Aerostructural
@@ -149,240 +176,223 @@ class Display(object):
 
         if pt_names:
             self.pt_names = pt_names = list(set(pt_names))
-            pt_name = pt_names[0]
+            self.pt_name = pt_names[0]
         self.names = names
-        n_names = len(names)
 
-        # loop to pull data out of case reader and organize it into arrays
-        for i, case in enumerate(cr.get_cases()):
+        # The surfaces are taken to be symmetric if the meshes of the last
+        # case are on one side of the plane y = 0
+        self.symmetry = True
+        for name in names:
+            mesh = last_case.outputs[name+'.mesh']
+            if not (np.all(mesh[:, :, 1] >= -1e-8) or np.all(mesh[:, :, 1] <= 1e-8)):
+                self.symmetry = False
 
-            if self.opt:
-                self.obj.append(case.outputs[self.obj_key])
+        # The limits of the side plots are widened as more cases are read
+        self.raw_limits = {}
 
-            # Loop through each of the surfaces
-            for name in names:
+        # Processing the last case finds out what can be shown
+        self.cases[-1]
 
-                # Check if this is an aerostructual case; treat differently
-                # due to the way the problem is organized
-                if not self.aerostruct:
+        self.fem_origin_dict = {}
+        self.yield_stress_dict = {}
 
-                    # A mesh exists for all types of cases
-                    self.mesh.append(case.outputs[name+'.mesh'])
+        if self.show_tube:
+            for name in names:
+                surface = cr.system_metadata[name]['component_options']['surface']
+                self.yield_stress_dict[name + '_yield_stress'] = surface['yield']
+                self.fem_origin_dict[name + '_fem_origin'] = surface['fem_origin']
 
-                    try:
-                        self.radius.append(case.outputs[name+'.radius'])
-                        self.thickness.append(case.outputs[name+'.thickness'])
-                        self.vonmises.append(
-                            np.max(case.outputs[name+'.vonmises'], axis=1))
-                        self.show_tube = True
-                    except:
-                        self.show_tube = False
-                    try:
-                        self.def_mesh.append(case.outputs[name+'.mesh'])
-                        normals.append(case.outputs[pt_name + '.' + name + '.normals'])
-                        widths.append(case.outputs[pt_name + '.' + name + '.widths'])
-                        sec_forces.append(case.outputs[pt_name + '.aero_states.' + name + '_sec_forces'])
-                        self.CL.append(case.outputs[pt_name + '.' + name + '_perf.CL1'])
-                        self.S_ref.append(case.outputs[pt_name + '.' + name + '.S_ref'])
-                        self.show_wing = True
+        if self.opt:
+            self.num_iters = max(len(self.cases) - 1, 1)
+        else:
+            self.num_iters = 1
 
-                    except:
-                        self.show_wing = False
-                else:
-                    self.show_wing, self.show_tube = True, True
+        # Index the scalars of each iteration without keeping their meshes
+        scalars = OrderedDict()
+        if self.opt:
+            scalars['obj'] = [self.obj_key]
+        if pt_names:
+            scalars['CL'] = [self.pt_name + '.CL']
+        scalars['weight'] = [name + '.structural_weight' for name in names]
+        self.index = get_scalar_index(cr, scalars, self.cases.case_ids)
+        if self.opt:
+            self.obj = self.index['obj']
 
-                    self.mesh.append(case.outputs[name+'.mesh'])
-                    self.radius.append(case.outputs[name+'.radius'])
-                    self.thickness.append(case.outputs[name+'.thickness'])
+    def process_case(self, case):
+        """
+        Get the meshes and spanwise distributions of the surfaces for one
+        case, mirrored if the surfaces are symmetric and recentered for
+        better viewing.
+        """
+        names = self.names
+        n_names = len(names)
+        pt_name = getattr(self, 'pt_name', None)
+
+        data = {
+            'mesh' : [],
+            'def_mesh' : [],
+            'radius' : [],
+            'thickness' : [],
+            'vonmises' : [],
+            'twist' : [],
+            'lift' : [],
+            'lift_ell' : [],
+        }
+        sec_forces = []
+        normals = []
+        widths = []
 
-                    vm_var_name = '{pt_name}.{surf_name}_perf.vonmises'.format(pt_name=pt_name, surf_name=name)
-                    self.vonmises.append(np.max(case.outputs[vm_var_name], axis=1))
+        # Loop through each of the surfaces
+        for name in names:
 
-                    def_mesh_var_name = '{pt_name}.coupled.{surf_name}.def_mesh'.format(pt_name=pt_name, surf_name=name)
-                    self.def_mesh.append(case.outputs[def_mesh_var_name])
+            # Check if this is an aerostructual case; treat differently
+            # due to the way the problem is organized
+            if not self.aerostruct:
 
-                    normals_var_name = '{pt_name}.coupled.{surf_name}.normals'.format(pt_name=pt_name, surf_name=name)
-                    normals.append(case.outputs[normals_var_name])
+                # A mesh exists for all types of cases
+                data['mesh'].append(case.outputs[name+'.mesh'])
 
-                    widths_var_name = '{pt_name}.coupled.{surf_name}.widths'.format(pt_name=pt_name, surf_name=name)
-                    widths.append(case.outputs[widths_var_name])
-                    sec_forces.append(case.outputs[pt_name+'.coupled.aero_states.' + name + '_sec_forces'])
+                try:
+                    data['radius'].append(case.outputs[name+'.radius'])
+                    data['thickness'].append(case.outputs[name+'.thickness'])
+                    data['vonmises'].append(
+                        np.max(case.outputs[name+'.vonmises'], axis=1))
+                    self.show_tube = True
+                except:
+                    self.show_tube = False
+                try:
+                    data['def_mesh'].append(case.outputs[name+'.mesh'])
+                    normals.append(case.outputs[pt_name + '.' + name + '.normals'])
+                    widths.append(case.outputs[pt_name + '.' + name + '.widths'])
+                    sec_forces.append(case.outputs[pt_name + '.aero_states.' + name + '_sec_forces'])
+                    self.show_wing = True
 
-                    cl_var_name = '{pt_name}.{surf_name}_perf.CL1'.format(pt_name=pt_name, surf_name=name)
-                    self.CL.append(case.outputs[cl_var_name])
+                except:
+                    self.show_wing = False
+            else:
+                self.show_wing, self.show_tube = True, True
 
-                    S_ref_var_name = '{pt_name}.coupled.{surf_name}.aero_geom.S_ref'.format(pt_name=pt_name, surf_name=name)
-                    self.S_ref.append(case.outputs[S_ref_var_name])
+                data['mesh'].append(case.outputs[name+'.mesh'])
+                data['radius'].append(case.outputs[name+'.radius'])
+                data['thickness'].append(case.outputs[name+'.thickness'])
 
-                # Not the best solution for now, but this will ensure
-                # that this plots correctly even if twist isn't a desvar
-                try:
-                    if self.aerostruct: # twist is handled differently for aero and aerostruct
-                        self.twist.append(case.outputs[name+'.geometry.twist'])
-                    else:
-                        self.twist.append(case.outputs[name+'.twist'])
-                except:
-                    ny = self.mesh[0].shape[1]
-                    self.twist.append(np.atleast_2d(np.zeros(ny)))
+                vm_var_name = '{pt_name}.{surf_name}_perf.vonmises'.format(pt_name=pt_name, surf_name=name)
+                data['vonmises'].append(np.max(case.outputs[vm_var_name], axis=1))
 
-            if self.show_wing:
-                alpha.append(case.outputs['alpha'] * np.pi / 180.)
-                rho.append(case.outputs['rho'])
-                v.append(case.outputs['v'])
-                if self.show_tube:
-                    self.cg.append(case.outputs['{pt_name}.cg'.format(pt_name=pt_name)])
-                else:
-                    self.cg.append(case.outputs['cg'])
+                def_mesh_var_name = '{pt_name}.coupled.{surf_name}.def_mesh'.format(pt_name=pt_name, surf_name=name)
+                data['def_mesh'].append(case.outputs[def_mesh_var_name])
 
-        self.fem_origin_dict = {}
-        self.yield_stress_dict = {}
+                normals_var_name = '{pt_name}.coupled.{surf_name}.normals'.format(pt_name=pt_name, surf_name=name)
+                normals.append(case.outputs[normals_var_name])
 
-        if self.show_tube:
-            for name in names:
-                surface = cr.system_metadata[name]['component_options']['surface']
-                self.yield_stress_dict[name + '_yield_stress'] = surface['yield']
-                self.fem_origin_dict[name + '_fem_origin'] = surface['fem_origin']
+                widths_var_name = '{pt_name}.coupled.{surf_name}.widths'.format(pt_name=pt_name, surf_name=name)
+                widths.append(case.outputs[widths_var_name])
+                sec_forces.append(case.outputs[pt_name+'.coupled.aero_states.' + name + '_sec_forces'])
 
-        if self.opt:
-            self.num_iters = np.max([int(len(self.mesh) / n_names) - 1, 1])
-        else:
-            self.num_iters = 1
+            # Not the best solution for now, but this will ensure
+            # that this plots correctly even if twist isn't a desvar
+            try:
+                if self.aerostruct: # twist is handled differently for aero and aerostruct
+                    data['twist'].append(case.outputs[name+'.geometry.twist'])
+                else:
+                    data['twist'].append(case.outputs[name+'.twist'])
+            except:
+                ny = data['mesh'][-1].shape[1]
+                data['twist'].append(np.atleast_2d(np.zeros(ny)))
 
-        symm_count = 0
-        for mesh in self.mesh:
-            if np.all(mesh[:, :, 1] >= -1e-8) or np.all(mesh[:, :, 1] <= 1e-8):
-                symm_count += 1
-        if symm_count == len(self.mesh):
-            self.symmetry = True
-        else:
-            self.symmetry = False
+        if self.show_wing:
+            alpha = case.outputs['alpha'] * np.pi / 180.
+            rho = case.outputs['rho']
+            v = case.outputs['v']
+            if self.show_tube:
+                data['cg'] = case.outputs['{pt_name}.cg'.format(pt_name=pt_name)].copy()
+            else:
+                data['cg'] = case.outputs['cg'].copy()
 
         if self.symmetry:
+            for j in range(n_names):
+                mesh = data['mesh'][j]
+                mirror_mesh = mesh.copy()
+                mirror_mesh[:, :, 1] *= -1.
+                mirror_mesh = mirror_mesh[:, ::-1, :][:, 1:, :]
+                data['mesh'][j] = np.hstack((mesh, mirror_mesh))
 
-            new_mesh = []
-            if self.show_tube:
-                new_r = []
-                new_thickness = []
-                new_vonmises = []
-            if self.show_wing:
-                new_twist = []
-                new_sec_forces = []
-                new_def_mesh = []
-                new_widths = []
-                new_normals = []
-            for i in range(self.num_iters):
-                for j, name in enumerate(names):
-                    mirror_mesh = self.mesh[i*n_names+j].copy()
+                if self.show_tube:
+                    thickness = data['thickness'][j]
+                    data['thickness'][j] = np.hstack((thickness[0], thickness[0][::-1]))
+                    r = data['radius'][j]
+                    data['radius'][j] = np.hstack((r, r[::-1]))
+                    vonmises = data['vonmises'][j]
+                    data['vonmises'][j] = np.hstack((vonmises, vonmises[::-1]))
+
+                if self.show_wing:
+                    def_mesh = data['def_mesh'][j]
+                    mirror_mesh = def_mesh.copy()
                     mirror_mesh[:, :, 1] *= -1.
                     mirror_mesh = mirror_mesh[:, ::-1, :][:, 1:, :]
-                    new_mesh.append(np.hstack((self.mesh[i*n_names+j], mirror_mesh)))
-
-                    if self.show_tube:
-                        thickness = self.thickness[i*n_names+j]
-                        new_thickness.append(np.hstack((thickness[0], thickness[0][::-1])))
-                        r = self.radius[i*n_names+j]
-                        new_r.append(np.hstack((r, r[::-1])))
-                        vonmises = self.vonmises[i*n_names+j]
-                        new_vonmises.append(np.hstack((vonmises, vonmises[::-1])))
-
-                    if self.show_wing:
-                        mirror_mesh = self.def_mesh[i*n_names+j].copy()
-                        mirror_mesh[:, :, 1] *= -1.
-                        mirror_mesh = mirror_mesh[:, ::-1, :][:, 1:, :]
-                        new_def_mesh.append(np.hstack((self.def_mesh[i*n_names+j], mirror_mesh)))
-
-                        mirror_normals = normals[i*n_names+j].copy()
-                        mirror_normals = mirror_normals[:, ::-1, :][:, 1:, :]
-                        new_normals.append(np.hstack((normals[i*n_names+j], mirror_normals)))
-
-                        mirror_forces = sec_forces[i*n_names+j].copy()
-                        mirror_forces = mirror_forces[:, ::-1, :]
-                        new_sec_forces.append(np.hstack((sec_forces[i*n_names+j], mirror_forces)))
-
-                        new_widths.append(np.hstack((widths[i*n_names+j], widths[i*n_names+j][::-1])))
-                        twist = self.twist[i*n_names+j]
-                        new_twist.append(np.hstack((twist[0], twist[0][::-1][1:])))
-
-            self.mesh = new_mesh
-            if self.show_tube:
-                self.thickness = new_thickness
-                self.radius = new_r
-                self.vonmises = new_vonmises
-            if self.show_wing:
-                self.def_mesh = new_def_mesh
-                self.twist = new_twist
-                widths = new_widths
-                normals = new_normals
-                sec_forces = new_sec_forces
+                    data['def_mesh'][j] = np.hstack((def_mesh, mirror_mesh))
 
-        if self.show_wing:
-            for i in range(self.num_iters):
-                for j, name in enumerate(names):
-                    m_vals = self.mesh[i*n_names+j].copy()
-                    cvec = m_vals[0, :, :] - m_vals[-1, :, :]
-                    chords = np.sqrt(np.sum(cvec**2, axis=1))
-                    chords = 0.5 * (chords[1:] + chords[:-1])
-                    a = alpha[i]
-                    cosa = np.cos(a)
-                    sina = np.sin(a)
+                    mirror_normals = normals[j].copy()
+                    mirror_normals = mirror_normals[:, ::-1, :][:, 1:, :]
+                    normals[j] = np.hstack((normals[j], mirror_normals))
+
+                    mirror_forces = sec_forces[j].copy()
+                    mirror_forces = mirror_forces[:, ::-1, :]
+                    sec_forces[j] = np.hstack((sec_forces[j], mirror_forces))
 
-                    forces = np.sum(sec_forces[i*n_names+j], axis=0)
+                    widths[j] = np.hstack((widths[j], widths[j][::-1]))
+                    twist = data['twist'][j]
+                    data['twist'][j] = np.hstack((twist[0], twist[0][::-1][1:]))
 
-                    lift = (-forces[:, 0] * sina + forces[:, 2] * cosa) / \
-                        widths[i*n_names+j]/0.5/rho[i]/v[i]**2
+        if self.show_wing:
+            for j in range(n_names):
+                m_vals = data['mesh'][j].copy()
+                cosa = np.cos(alpha)
+                sina = np.sin(alpha)
 
-                    span = (m_vals[0, :, 1] / (m_vals[0, -1, 1] - m_vals[0, 0, 1]))
-                    span = span - (span[0] + .5)
+                forces = np.sum(sec_forces[j], axis=0)
 
-                    lift_area = np.sum(lift * (span[1:] - span[:-1]))
+                lift = (-forces[:, 0] * sina + forces[:, 2] * cosa) / \
+                    widths[j]/0.5/rho/v**2
 
-                    lift_ell = 4 * lift_area / np.pi * np.sqrt(1 - (2*span)**2)
+                span = (m_vals[0, :, 1] / (m_vals[0, -1, 1] - m_vals[0, 0, 1]))
+                span = span - (span[0] + .5)
 
-                    self.lift.append(lift)
-                    self.lift_ell.append(lift_ell)
+                lift_area = np.sum(lift * (span[1:] - span[:-1]))
 
-                    wingspan = np.abs(m_vals[0, -1, 1] - m_vals[0, 0, 1])
-                    self.AR.append(wingspan**2 / self.S_ref[i*n_names+j])
+                lift_ell = 4 * lift_area / np.pi * np.sqrt(1 - (2*span)**2)
 
-            # recenter def_mesh points for better viewing
-            for i in range(self.num_iters):
-                center = np.zeros((3))
-                for j in range(n_names):
-                    center += np.mean(self.def_mesh[i*n_names+j], axis=(0,1))
-                for j in range(n_names):
-                    self.def_mesh[i*n_names+j] -= center / n_names
-                self.cg[i] -= center / n_names
+                data['lift'].append(lift)
+                data['lift_ell'].append(lift_ell)
 
-        # recenter mesh points for better viewing
-        for i in range(self.num_iters):
+            # recenter def_mesh points for better viewing
             center = np.zeros((3))
             for j in range(n_names):
-                center += np.mean(self.mesh[i*n_names+j], axis=(0,1))
+                center += np.mean(data['def_mesh'][j], axis=(0,1))
             for j in range(n_names):
-                self.mesh[i*n_names+j] -= center / n_names
+                data['def_mesh'][j] = data['def_mesh'][j] - center / n_names
+            data['cg'] -= center / n_names
 
+        # recenter mesh points for better viewing
+        center = np.zeros((3))
+        for j in range(n_names):
+            center += np.mean(data['mesh'][j], axis=(0,1))
+        for j in range(n_names):
+            data['mesh'][j] = data['mesh'][j] - center / n_names
+
+        limits = []
         if self.show_wing:
-            self.min_twist, self.max_twist = self.get_list_limits(self.twist)
-            diff = (self.max_twist - self.min_twist) * 0.05
-            self.min_twist -= diff
-            self.max_twist += diff
-            self.min_l, self.max_l = self.get_list_limits(self.lift)
-            self.min_le, self.max_le = self.get_list_limits(self.lift_ell)
-            self.min_l, self.max_l = min(self.min_l, self.min_le), max(self.max_l, self.max_le)
-            diff = (self.max_l - self.min_l) * 0.05
-            self.min_l -= diff
-            self.max_l += diff
+            limits.append(('twist', data['twist']))
+            limits.append(('l', data['lift'] + data['lift_ell']))
         if self.show_tube:
-            self.min_t, self.max_t = self.get_list_limits(self.thickness)
-            diff = (self.max_t - self.min_t) * 0.05
-            self.min_t -= diff
-            self.max_t += diff
-            self.min_vm, self.max_vm = self.get_list_limits(self.vonmises)
-            diff = (self.max_vm - self.min_vm) * 0.05
-            self.min_vm -= diff
-            self.max_vm += diff
+            limits.append(('t', data['thickness']))
+            limits.append(('vm', data['vonmises']))
+        self.update_limits(limits)
+
+        return data
 
     def plot_sides(self):
+        data = self.cases[self.curr_pos]
 
         if self.show_wing:
 
@@ -426,28 +436,28 @@ class Display(object):
             self.ax5.text(0.075, 1.1, 'failure limit',
                 transform=self.ax5.transAxes, color='r')
 
-        n_names = len(self.names)
         for j, name in enumerate(self.names):
-            m_vals = self.mesh[self.curr_pos*n_names+j].copy()
+            m_vals = data['mesh'][j].copy()
             span = m_vals[0, -1, 1] - m_vals[0, 0, 1]
             rel_span = (m_vals[0, :, 1] - m_vals[0, 0, 1]) * 2 / span - 1
             span_diff = ((m_vals[0, :-1, 1] + m_vals[0, 1:, 1]) / 2 - m_vals[0, 0, 1]) * 2 / span - 1
 
             if self.show_wing:
-                t_vals = self.twist[self.curr_pos*n_names+j].squeeze()
-                l_vals = self.lift[self.curr_pos*n_names+j]
-                le_vals = self.lift_ell[self.curr_pos*n_names+j]
+                t_vals = data['twist'][j].squeeze()
+                l_vals = data['lift'][j]
+                le_vals = data['lift_ell'][j]
                 self.ax2.plot(rel_span, t_vals, lw=2, c='b')
                 self.ax3.plot(rel_span, le_vals, '--', lw=2, c='g')
                 self.ax3.plot(span_diff, l_vals, lw=2, c='b')
 
             if self.show_tube:
-                thick_vals = self.thickness[self.curr_pos*n_names+j]
-                vm_vals = self.vonmises[self.curr_pos*n_names+j]
+                thick_vals = data['thickness'][j]
+                vm_vals = data['vonmises'][j]
                 self.ax4.plot(span_diff, thick_vals, lw=2, c='b')
                 self.ax5.plot(span_diff, vm_vals, lw=2, c='b')
 
     def plot_wing(self):
+        data = self.cases[self.curr_pos]
 
         n_names = len(self.names)
         self.ax.cla()
@@ -456,12 +466,12 @@ class Display(object):
         dist = self.ax.dist
 
         for j, name in enumerate(self.names):
-            mesh0 = self.mesh[self.curr_pos*n_names+j].copy()
+            mesh0 = data['mesh'][j].copy()
 
             self.ax.set_axis_off()
 
             if self.show_wing:
-                def_mesh0 = self.def_mesh[self.curr_pos*n_names+j]
+                def_mesh0 = data['def_mesh'][j]
                 x = mesh0[:, :, 0]
                 y = mesh0[:, :, 1]
                 z = mesh0[:, :, 2]
@@ -472,7 +482,8 @@ class Display(object):
                         y_def = def_mesh0[:, :, 1]
                         z_def = def_mesh0[:, :, 2]
 
-                        self.c2.grid(row=0, column=3, padx=5, sticky=Tk.W)
+                        if not self.headless:
+                            self.c2.grid(row=0, column=3, padx=5, sticky=Tk.W)
                         if self.ex_def.get():
                             z_def = (z_def - z) * 10 + z_def
                             def_mesh0 = (def_mesh0 - mesh0) * 30 + def_mesh0
@@ -482,17 +493,18 @@ class Display(object):
                         self.ax.plot_wireframe(x, y, z, rstride=1, cstride=1, color='k', alpha=.3)
                     else:
                         self.ax.plot_wireframe(x, y, z, rstride=1, cstride=1, color='k')
-                        self.c2.grid_forget()
+                        if not self.headless:
+                            self.c2.grid_forget()
                 except:
                     self.ax.plot_wireframe(x, y, z, rstride=1, cstride=1, color='k')
 
-                cg = self.cg[self.curr_pos]
+                cg = data['cg']
                 # self.ax.scatter(cg[0], cg[1], cg[2], s=100, color='r')
 
             if self.show_tube:
                 # Get the array of radii and thickness values for the FEM system
-                r0 = self.radius[self.curr_pos*n_names+j]
-                t0 = self.thickness[self.curr_pos*n_names+j]
+                r0 = data['radius'][j]
+                t0 = data['thickness'][j]
 
                 # Create a normalized array of values for the colormap
                 colors = t0
@@ -551,7 +563,7 @@ class Display(object):
 
         lim = 0.
         for j in range(n_names):
-            ma = np.max(self.mesh[self.curr_pos*n_names+j], axis=(0,1,2))
+            ma = np.max(data['mesh'][j], axis=(0,1,2))
             if ma > lim:
                 lim = ma
         lim /= float(self.zoom_scale)
@@ -568,31 +580,13 @@ class Display(object):
         self.ax.dist = dist
 
     def save_video(self):
-        FFMpegWriter = manimation.writers['ffmpeg']
-        options = dict(title='Movie', artist='Matplotlib')
-        writer = FFMpegWriter(fps=5, options=options, bitrate=3000)
+        # The deformed mesh checkboxes only exist if both the wing and the
+        # tube are shown
+        show_def_mesh = self.show_wing and self.show_tube and bool(self.show_def_mesh.get())
+        exaggerate_def = show_def_mesh and bool(self.ex_def.get())
 
-        with writer.saving(self.f, "movie.mp4", 100):
-            self.curr_pos = 0
-            self.update_graphs()
-            self.f.canvas.draw()
-            plt.draw()
-            for i in range(10):
-                writer.grab_frame()
-
-            for i in range(self.num_iters):
-                self.curr_pos = i
-                self.update_graphs()
-                self.f.canvas.draw()
-                plt.draw()
-                writer.grab_frame()
-
-            self.curr_pos = self.num_iters
-            self.update_graphs()
-            self.f.canvas.draw()
-            plt.draw()
-            for i in range(20):
-                writer.grab_frame()
+        render_video(self.db_name, "movie.mp4", zoom_scale=self.zoom_scale,
+                     show_def_mesh=show_def_mesh, exaggerate_def=exaggerate_def)
 
     def update_graphs(self, e=None):
         if e is not None:
@@ -604,13 +598,12 @@ class Display(object):
         self.canvas.draw()
 
     def check_length(self):
-        # Load the current sqlitedict
-        db = sqlitedict.SqliteDict(self.db_name, 'iterations')
-        cr = self.case_reader = SqliteCaseReader(self.db_name)
+        # Reopen the recording to see the cases added since it was loaded
+        cr = self.case_reader = open_case_reader(self.db_name)
 
         # Get the number of current iterations
         # Minus one because OpenMDAO uses 1-indexing
-        self.num_iters = int(cr.driver_cases.list_cases()[-1].split('|')[-1])
+        self.num_iters = int(list_driver_cases(cr)[-1].split('|')[-1])
 
     def get_list_limits(self, input_list):
         list_min = 1.e20
@@ -625,18 +618,42 @@ class Display(object):
 
         return list_min, list_max
 
+    def render_frame(self, filename):
+        """
+        Draw the current iteration and save it as an image.
+        """
+        self.plot_wing()
+        self.plot_sides()
+        self.f.savefig(filename, dpi=100, facecolor='white')
+
+    def update_limits(self, limits):
+        """
+        Widen the limits of the side plots to fit the distributions of a
+        newly read case, given as a list of (name, list of arrays).
+        """
+        for key, input_list in limits:
+            list_min, list_max = self.get_list_limits(input_list)
+            if key in self.raw_limits:
+                list_min = min(list_min, self.raw_limits[key][0])
+                list_max = max(list_max, self.raw_limits[key][1])
+            self.raw_limits[key] = (list_min, list_max)
+
+            diff = (list_max - list_min) * 0.05
+            setattr(self, 'min_' + key, list_min - diff)
+            setattr(self, 'max_' + key, list_max + diff)
 
     def auto_ref(self):
         """
         Automatically refreshes the history file, which is
         useful if examining a running optimization.
         """
-        if self.var_ref.get():
+        # An exported history never grows, so there is nothing to refresh
+        if self.var_ref.get() and not isinstance(self.case_reader, HistoryReader):
             self.root.after(500, self.auto_ref)
             self.check_length()
             self.update_graphs()
 
-            # Check if the sqlitedict file has change and if so, fully
+            # Check if the recording has changed and if so, fully
             # load in the new file.
             if self.num_iters > self.old_n:
                 self.load_db()
@@ -716,6 +733,8 @@ class Display(object):
             command=self.auto_ref,
             font=font)
         c11.grid(row=0, column=4, sticky=Tk.W, pady=6)
+        if isinstance(self.case_reader, HistoryReader):
+            c11.config(state=Tk.DISABLED)
 
         button = Tk.Button(
             self.options_frame,
@@ -740,7 +759,169 @@ class Display(object):
 
         self.auto_ref()
 
+# Display of a process rendering the frames of a video, and the traceback
+# of the error raised creating it, if any
+_render_display = None
+_render_error = None
+
+
+def _init_render_worker(db_name, zoom_scale, show_def_mesh, exaggerate_def):
+    global _render_display, _render_error
+
+    # Raising here would make the pool start new processes forever, so the
+    # error is raised by the tasks instead
+    try:
+        _render_display = Display([None, db_name, zoom_scale], headless=True,
+                                  show_def_mesh=show_def_mesh, exaggerate_def=exaggerate_def)
+    except Exception:
+        _render_error = traceback.format_exc()
+
+
+def _render_task(args):
+    """
+    Either read a set of iterations to get the limits of the side plots
+    over them, or render them as images with the given limits.
+    """
+    command, iterations, limits, frame_dir = args
+
+    if _render_error is not None:
+        raise RuntimeError('Creating the display of a render process failed:\n' +
+                           _render_error)
+    disp = _render_display
+
+    if command == 'limits':
+        for i in iterations:
+            disp.cases[i]
+        return disp.raw_limits
+
+    # The limits only widen, so all the frames get the same ones
+    disp.update_limits([(key, [np.array(limit)]) for key, limit in limits.items()])
+    for i in iterations:
+        disp.curr_pos = i
+        disp.render_frame(os.path.join(frame_dir, 'iter_{:05d}.png'.format(i)))
+    return iterations
+
+
+def _same_scalars(index, i, j):
+    """
+    Check if iterations i and j have the same indexed scalars, at least one
+    of which is known.
+    """
+    values_i = np.array([values[i] for values in index.values()])
+    values_j = np.array([values[j] for values in index.values()])
+
+    known = ~np.isnan(values_i)
+    return bool(np.any(known)) and np.array_equal(np.isnan(values_j), ~known) and \
+        np.array_equal(values_i[known], values_j[known])
+
+
+def render_video(db_name, filename='movie.mp4', num_procs=None, skip_unchanged=False,
+                 zoom_scale=2.8, fps=5, bitrate=3000, show_def_mesh=False, exaggerate_def=False):
+    """
+    Save a video of the iterations of a recording, as shown by the viewer.
+
+    The frames are rendered off screen by a pool of processes, each drawing
+    its share of the iterations with the Agg backend, and then joined into
+    the video by ffmpeg. Each iteration is rendered once, even though the
+    first and last iterations are held for several frames. The limits of
+    the side plots are found over all the iterations first, so the frames
+    rendered by different processes match.
+
+    Parameters
+    ----------
+    db_name : str
+        Path of the database, or of a history exported from it with
+        `export_history`, which each process opens much faster.
+    filename : str
+        Path of the video.
+    num_procs : int or None
+        Number of processes; defaults to the number of cores.
+    skip_unchanged : bool
+        If True, iterations with the same objective, CL, and structural
+        weight as the one before them, such as repeated evaluations of the
+        same design, are left out of the video.
+    zoom_scale : float
+        Zoom factor of the 3d view.
+    fps : int
+        Frames per second of the video.
+    bitrate : int
+        Bitrate of the video in kbit/s.
+    show_def_mesh : bool
+        If True, the deformed mesh is drawn, as with the viewer's "Show
+        deformed mesh" checkbox.
+    exaggerate_def : bool
+        If True, the deformations are exaggerated, as with the viewer's
+        "Exaggerate deformations" checkbox.
+    """
+    global _render_display
+
+    disp = Display([None, db_name, zoom_scale], headless=True,
+                   show_def_mesh=show_def_mesh, exaggerate_def=exaggerate_def)
+
+    last = min(disp.num_iters, len(disp.cases) - 1)
+    iterations = list(range(last + 1))
+    if skip_unchanged:
+        iterations = [i for i in iterations
+                      if i == 0 or not _same_scalars(disp.index, i, i - 1)]
+
+    if num_procs is None:
+        num_procs = multiprocessing.cpu_count()
+    num_procs = max(min(num_procs, len(iterations)), 1)
+
+    # Contiguous chunks of iterations, several for each process to balance
+    # the load
+    num_chunks = min(4 * num_procs, len(iterations))
+    chunks = [[int(i) for i in chunk] for chunk in np.array_split(iterations, num_chunks)]
+
+    frame_dir = tempfile.mkdtemp()
+    pool = None
+    try:
+        if num_procs == 1:
+            _render_display = disp
+            run = lambda tasks: [_render_task(task) for task in tasks]
+        else:
+            pool = multiprocessing.Pool(num_procs, initializer=_init_render_worker,
+                initargs=(db_name, zoom_scale, show_def_mesh, exaggerate_def))
+            run = lambda tasks: pool.map(_render_task, tasks)
+
+        limits = {}
+        for chunk_limits in run([('limits', chunk, None, None) for chunk in chunks]):
+            for key, (list_min, list_max) in chunk_limits.items():
+                if key in limits:
+                    list_min = min(list_min, limits[key][0])
+                    list_max = max(list_max, limits[key][1])
+                limits[key] = (list_min, list_max)
+
+        run([('render', chunk, limits, frame_dir) for chunk in chunks])
+
+        # Hold the first and last iterations, as the viewer's videos do
+        frames = [iterations[0]] * 10 + iterations + [iterations[-1]] * 20
+        for k, i in enumerate(frames):
+            src = os.path.join(frame_dir, 'iter_{:05d}.png'.format(i))
+            dst = os.path.join(frame_dir, 'frame_{:05d}.png'.format(k))
+            try:
+                os.link(src, dst)
+            except (AttributeError, OSError):
+                shutil.copyfile(src, dst)
+
+        subprocess.check_call([matplotlib.rcParams['animation.ffmpeg_path'], '-y',
+            '-loglevel', 'error', '-framerate', str(fps),
+            '-i', os.path.join(frame_dir, 'frame_%05d.png'),
+            '-vcodec', matplotlib.rcParams['animation.codec'], '-pix_fmt', 'yuv420p',
+            '-b:v', '{}k'.format(bitrate), filename])
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        shutil.rmtree(frame_dir)
+
+
 def disp_plot(args=sys.argv):
+    if '--video' in args:
+        zoom_scale = [arg for arg in args[2:] if arg != '--video']
+        render_video(args[1], zoom_scale=zoom_scale[0] if zoom_scale else 2.8)
+        return
+
     disp = Display(args)
     disp.draw_GUI()
     plt.tight_layout()
@@ -16,9 +16,13 @@ else:
     import tkinter as Tk
     from tkinter import font as tkFont
 
+from collections import OrderedDict
 from six import iteritems
 import numpy as np
-from openmdao.recorders.sqlite_reader import SqliteCaseReader
+
+from openaerostruct.utils.history import open_case_reader, HistoryReader
+from openaerostruct.utils.lazy_cases import LazyCaseLoader, get_scalar_index, \
+    list_driver_cases
 
 try:
     import matplotlib
@@ -32,7 +36,6 @@ try:
     from mpl_toolkits.mplot3d import Axes3D
     from matplotlib import cm
     import matplotlib.animation as manimation
-    import sqlitedict
 except:
     print()
     print("Correct plotting modules not available; please consult import list")
@@ -80,6 +83,9 @@ class Display(object):
         self.old_n = 0
         self.aerostruct = False
 
+        # Number of processed cases kept in memory
+        self.cache_size = 20
+
         self.load_db()
 
         if self.show_wing and not self.show_tube:
@@ -96,9 +102,12 @@ class Display(object):
             self.ax6 = plt.subplot2grid((5, 8), (2, 4), colspan=4)
 
     def load_db(self):
-        cr = self.case_reader = SqliteCaseReader(self.db_name)
-        cr.load_cases()
-        last_case = cr.driver_cases.get_case(-1)
+        cr = self.case_reader = open_case_reader(self.db_name)
+
+        # Only the cases shown by the slider are read from the database, as
+        # they are shown
+        self.cases = LazyCaseLoader(cr, self.process_case, cache_size=self.cache_size)
+        last_case = self.cases.get_case(-1)
 
         names = []
         for key in cr.system_metadata.keys():
@@ -118,37 +127,6 @@ class Display(object):
         else:
             self.opt = False
 
-        self.twist = []
-        self.mesh = []
-        self.def_mesh = []
-        self.def_mesh_maneuver = []
-        self.radius = []
-        self.spar_thickness = []
-        self.skin_thickness = []
-        self.t_over_c = []
-        sec_forces = []
-        sec_forces_maneuver = []
-        normals = []
-        normals_maneuver = []
-        widths = []
-        widths_maneuver = []
-        self.lift = []
-        self.lift_ell = []
-        self.lift_maneuver = []
-        self.lift_ell_maneuver = []
-        self.vonmises = []
-        alpha = []
-        alpha_maneuver = []
-        rho = []
-        rho_maneuver = []
-        v = []
-        self.CL = []
-        self.AR = []
-        self.S_ref = []
-        self.obj = []
-        self.struct_weights = []
-        self.cg = []
-
         # find the names of all surfaces
         pt_names = []
         for key in last_case.outputs:
@@ -162,318 +140,285 @@ class Display(object):
 
         if pt_names:
             self.pt_names = pt_names = list(set(pt_names))
-            pt_name = pt_names[0]
+            self.pt_name = pt_names[0]
         self.names = names
-        n_names = len(names)
 
-        # loop to pull data out of case reader and organize it into arrays
-        for i, case in enumerate(cr.get_cases()):
+        # The surfaces are taken to be symmetric if the meshes of the last
+        # case are on one side of the plane y = 0
+        self.symmetry = True
+        for name in names:
+            mesh = last_case.outputs[name+'.mesh']
+            if not (np.all(mesh[:, :, 1] >= -1e-8) or np.all(mesh[:, :, 1] <= 1e-8)):
+                self.symmetry = False
 
-            if self.opt:
-                self.obj.append(case.outputs[self.obj_key])
+        # The limits of the side plots are widened as more cases are read
+        self.raw_limits = {}
 
-            # Loop through each of the surfaces
-            for name in names:
+        # Processing the last case finds out what can be shown
+        self.cases[-1]
 
-                # Check if this is an aerostructual case; treat differently
-                # due to the way the problem is organized
-                if not self.aerostruct:
-
-                    # A mesh exists for all types of cases
-                    self.mesh.append(case.outputs[name+'.mesh'])
-
-                    try:
-                        self.radius.append(case.outputs[name+'.radius'])
-                        self.thickness.append(case.outputs[name+'.thickness'])
-                        self.vonmises.append(
-                            np.max(case.outputs[name+'.vonmises'], axis=1))
-                        self.show_tube = True
-                    except:
-                        self.show_tube = False
-                    try:
-                        self.def_mesh.append(case.outputs[name+'.mesh'])
-                        normals.append(case.outputs[pt_name + '.' + name + '.normals'])
-                        widths.append(case.outputs[pt_name + '.' + name + '.widths'])
-                        sec_forces.append(case.outputs[pt_name + '.aero_states.' + name + '_sec_forces'])
-                        self.CL.append(case.outputs[pt_name + '.' + name + '_perf.CL1'])
-                        self.S_ref.append(case.outputs[pt_name + '.' + name + '.S_ref'])
-                        self.show_wing = True
-
-                    except:
-                        self.show_wing = False
-                else:
-                    self.show_wing, self.show_tube = True, True
-
-                    self.mesh.append(case.outputs[name+'.mesh'])
-                    self.radius.append(case.outputs[name+'.skin_thickness'])
-                    self.skin_thickness.append(case.outputs[name+'.skin_thickness'])
-                    self.spar_thickness.append(case.outputs[name+'.spar_thickness'])
-                    self.t_over_c.append(case.outputs[name+'.t_over_c'])
-                    self.struct_weights.append(case.outputs[name+'.structural_weight'])
+        self.fem_origin_dict = {}
+        self.yield_stress_dict = {}
 
+        if self.show_tube:
+            for name in names:
+                surface = cr.system_metadata[name]['component_options']['surface']
+                self.yield_stress_dict[name + '_yield_stress'] = surface['yield']
 
-                    vm_var_name = '{pt_name}.{surf_name}_perf.vonmises'.format(pt_name=pt_names[1], surf_name=name)
-                    self.vonmises.append(np.max(case.outputs[vm_var_name], axis=1))
+                # self.fem_origin_dict[name + '_fem_origin'] = surface['fem_origin']
 
-                    def_mesh_var_name = '{pt_name}.coupled.{surf_name}.def_mesh'.format(pt_name=pt_name, surf_name=name)
-                    self.def_mesh.append(case.outputs[def_mesh_var_name])
+                self.fem_origin_dict[name + '_fem_origin'] = (surface['data_x_upper'][0].real *(surface['data_y_upper'][0].real-surface['data_y_lower'][0].real) + \
+                surface['data_x_upper'][-1].real*(surface['data_y_upper'][-1].real-surface['data_y_lower'][-1].real)) / \
+                ( (surface['data_y_upper'][0].real-surface['data_y_lower'][0].real) + (surface['data_y_upper'][-1].real-surface['data_y_lower'][-1].real))
 
-                    def_mesh_var_name = '{pt_name}.coupled.{surf_name}.def_mesh'.format(pt_name=pt_names[1], surf_name=name)
-                    self.def_mesh_maneuver.append(case.outputs[def_mesh_var_name])
+                le_te_coords = np.array([surface['data_x_upper'][0].real, surface['data_x_upper'][-1].real, surface['wing_weight_ratio']])
 
-                    normals_var_name = '{pt_name}.coupled.{surf_name}.normals'.format(pt_name=pt_name, surf_name=name)
-                    normals.append(case.outputs[normals_var_name])
+                np.save(str('temp_' + name + '_le_te'), le_te_coords)
 
-                    normals_var_name = '{pt_name}.coupled.{surf_name}.normals'.format(pt_name=pt_names[1], surf_name=name)
-                    normals_maneuver.append(case.outputs[normals_var_name])
+        if self.opt:
+            self.num_iters = max(len(self.cases) - 1, 1)
+        else:
+            self.num_iters = 1
 
-                    widths_var_name = '{pt_name}.coupled.{surf_name}.widths'.format(pt_name=pt_name, surf_name=name)
-                    widths.append(case.outputs[widths_var_name])
+        # Index the objective, lift coefficient, and structural weight of
+        # every iteration; these are all that is read from the other cases
+        scalars = OrderedDict()
+        if self.opt:
+            scalars['obj'] = [self.obj_key]
+        if pt_names:
+            scalars['CL'] = [self.pt_name + '.CL']
+        scalars['weight'] = [name + '.structural_weight' for name in names]
+        self.index = get_scalar_index(cr, scalars, self.cases.case_ids)
+        if self.opt:
+            self.obj = self.index['obj']
+        self.struct_weights = self.index['weight']
 
-                    widths_var_name = '{pt_name}.coupled.{surf_name}.widths'.format(pt_name=pt_names[1], surf_name=name)
-                    widths_maneuver.append(case.outputs[widths_var_name])
+    def process_case(self, case):
+        """
+        Get the meshes and spanwise distributions of the surfaces at the
+        cruise and maneuver points for one case, mirrored if the surfaces
+        are symmetric and recentered for better viewing.
+        """
+        names = self.names
+        n_names = len(names)
+        pt_name = getattr(self, 'pt_name', None)
+
+        data = {
+            'mesh' : [],
+            'def_mesh' : [],
+            'def_mesh_maneuver' : [],
+            'radius' : [],
+            'spar_thickness' : [],
+            'skin_thickness' : [],
+            't_over_c' : [],
+            'vonmises' : [],
+            'twist' : [],
+            'lift' : [],
+            'lift_ell' : [],
+            'lift_maneuver' : [],
+            'lift_ell_maneuver' : [],
+        }
+        sec_forces = []
+        sec_forces_maneuver = []
+        normals = []
+        normals_maneuver = []
+        widths = []
+        widths_maneuver = []
 
-                    sec_forces.append(case.outputs[pt_name+'.coupled.aero_states.' + name + '_sec_forces'])
-                    sec_forces_maneuver.append(case.outputs[pt_names[1]+'.coupled.aero_states.' + name + '_sec_forces'])
+        # Loop through each of the surfaces
+        for name in names:
 
-                    cl_var_name = '{pt_name}.{surf_name}_perf.CL1'.format(pt_name=pt_name, surf_name=name)
-                    self.CL.append(case.outputs[cl_var_name])
+            # Check if this is an aerostructual case; treat differently
+            # due to the way the problem is organized
+            if not self.aerostruct:
 
-                    S_ref_var_name = '{pt_name}.coupled.{surf_name}.aero_geom.S_ref'.format(pt_name=pt_name, surf_name=name)
-                    self.S_ref.append(case.outputs[S_ref_var_name])
+                # A mesh exists for all types of cases
+                data['mesh'].append(case.outputs[name+'.mesh'])
 
-                # Not the best solution for now, but this will ensure
-                # that this plots correctly even if twist isn't a desvar
                 try:
-                    if self.aerostruct: # twist is handled differently for aero and aerostruct
-                        self.twist.append(case.outputs[name+'.geometry.twist'])
-                    else:
-                        self.twist.append(case.outputs[name+'.twist'])
+                    data['radius'].append(case.outputs[name+'.radius'])
+                    data['thickness'].append(case.outputs[name+'.thickness'])
+                    data['vonmises'].append(
+                        np.max(case.outputs[name+'.vonmises'], axis=1))
+                    self.show_tube = True
                 except:
-                    ny = self.mesh[0].shape[1]
-                    self.twist.append(np.atleast_2d(np.zeros(ny)))
+                    self.show_tube = False
+                try:
+                    data['def_mesh'].append(case.outputs[name+'.mesh'])
+                    normals.append(case.outputs[pt_name + '.' + name + '.normals'])
+                    widths.append(case.outputs[pt_name + '.' + name + '.widths'])
+                    sec_forces.append(case.outputs[pt_name + '.aero_states.' + name + '_sec_forces'])
+                    self.show_wing = True
 
-            if self.show_wing:
-                alpha.append(case.outputs['alpha'] * np.pi / 180.)
-                alpha_maneuver.append(case.outputs['alpha_maneuver'] * np.pi / 180.)
-                rho.append(case.outputs['rho'])
-                rho_maneuver.append(case.outputs['rho'])
-                v.append(case.outputs['v'])
-                if self.show_tube:
-                    self.cg.append(case.outputs['{pt_name}.cg'.format(pt_name=pt_name)])
-                else:
-                    self.cg.append(case.outputs['cg'])
+                except:
+                    self.show_wing = False
+            else:
+                self.show_wing, self.show_tube = True, True
+                pt_names = self.pt_names
 
-        self.fem_origin_dict = {}
-        self.yield_stress_dict = {}
+                data['mesh'].append(case.outputs[name+'.mesh'])
+                data['radius'].append(case.outputs[name+'.skin_thickness'])
+                data['skin_thickness'].append(case.outputs[name+'.skin_thickness'])
+                data['spar_thickness'].append(case.outputs[name+'.spar_thickness'])
+                data['t_over_c'].append(case.outputs[name+'.t_over_c'])
 
-        if self.show_tube:
-            for name in names:
-                surface = cr.system_metadata[name]['component_options']['surface']
-                self.yield_stress_dict[name + '_yield_stress'] = surface['yield']
 
-                # self.fem_origin_dict[name + '_fem_origin'] = surface['fem_origin']
+                vm_var_name = '{pt_name}.{surf_name}_perf.vonmises'.format(pt_name=pt_names[1], surf_name=name)
+                data['vonmises'].append(np.max(case.outputs[vm_var_name], axis=1))
 
-                self.fem_origin_dict[name + '_fem_origin'] = (surface['data_x_upper'][0].real *(surface['data_y_upper'][0].real-surface['data_y_lower'][0].real) + \
-                surface['data_x_upper'][-1].real*(surface['data_y_upper'][-1].real-surface['data_y_lower'][-1].real)) / \
-                ( (surface['data_y_upper'][0].real-surface['data_y_lower'][0].real) + (surface['data_y_upper'][-1].real-surface['data_y_lower'][-1].real))
+                def_mesh_var_name = '{pt_name}.coupled.{surf_name}.def_mesh'.format(pt_name=pt_name, surf_name=name)
+                data['def_mesh'].append(case.outputs[def_mesh_var_name])
 
-                le_te_coords = np.array([surface['data_x_upper'][0].real, surface['data_x_upper'][-1].real, surface['wing_weight_ratio']])
+                def_mesh_var_name = '{pt_name}.coupled.{surf_name}.def_mesh'.format(pt_name=pt_names[1], surf_name=name)
+                data['def_mesh_maneuver'].append(case.outputs[def_mesh_var_name])
 
-                np.save(str('temp_' + name + '_le_te'), le_te_coords)
+                normals_var_name = '{pt_name}.coupled.{surf_name}.normals'.format(pt_name=pt_name, surf_name=name)
+                normals.append(case.outputs[normals_var_name])
 
-        if self.opt:
-            self.num_iters = np.max([int(len(self.mesh) / n_names) - 1, 1])
-        else:
-            self.num_iters = 1
+                normals_var_name = '{pt_name}.coupled.{surf_name}.normals'.format(pt_name=pt_names[1], surf_name=name)
+                normals_maneuver.append(case.outputs[normals_var_name])
 
-        symm_count = 0
-        for mesh in self.mesh:
-            if np.all(mesh[:, :, 1] >= -1e-8) or np.all(mesh[:, :, 1] <= 1e-8):
-                symm_count += 1
-        if symm_count == len(self.mesh):
-            self.symmetry = True
-        else:
-            self.symmetry = False
+                widths_var_name = '{pt_name}.coupled.{surf_name}.widths'.format(pt_name=pt_name, surf_name=name)
+                widths.append(case.outputs[widths_var_name])
 
-        if self.symmetry:
+                widths_var_name = '{pt_name}.coupled.{surf_name}.widths'.format(pt_name=pt_names[1], surf_name=name)
+                widths_maneuver.append(case.outputs[widths_var_name])
+
+                sec_forces.append(case.outputs[pt_name+'.coupled.aero_states.' + name + '_sec_forces'])
+                sec_forces_maneuver.append(case.outputs[pt_names[1]+'.coupled.aero_states.' + name + '_sec_forces'])
+
+            # Not the best solution for now, but this will ensure
+            # that this plots correctly even if twist isn't a desvar
+            try:
+                if self.aerostruct: # twist is handled differently for aero and aerostruct
+                    data['twist'].append(case.outputs[name+'.geometry.twist'])
+                else:
+                    data['twist'].append(case.outputs[name+'.twist'])
+            except:
+                ny = data['mesh'][-1].shape[1]
+                data['twist'].append(np.atleast_2d(np.zeros(ny)))
 
-            new_mesh = []
+        if self.show_wing:
+            alpha = case.outputs['alpha'] * np.pi / 180.
+            alpha_maneuver = case.outputs['alpha_maneuver'] * np.pi / 180.
+            rho = case.outputs['rho']
+            rho_maneuver = case.outputs['rho']
+            v = case.outputs['v']
             if self.show_tube:
-                new_r = []
-                new_skinthickness = []
-                new_sparthickness = []
-                new_toverc = []
-                new_vonmises = []
-            if self.show_wing:
-                new_twist = []
-                new_sec_forces = []
-                new_sec_forces_maneuver = []
-                new_def_mesh = []
-                new_def_mesh_maneuver = []
-                new_widths = []
-                new_widths_maneuver = []
-                new_normals = []
-                new_normals_maneuver = []
+                data['cg'] = case.outputs['{pt_name}.cg'.format(pt_name=pt_name)].copy()
+            else:
+                data['cg'] = case.outputs['cg'].copy()
 
-            for i in range(self.num_iters):
-                for j, name in enumerate(names):
-                    mirror_mesh = self.mesh[i*n_names+j].copy()
-                    mirror_mesh[:, :, 1] *= -1.
-                    mirror_mesh = mirror_mesh[:, ::-1, :][:, 1:, :]
-                    new_mesh.append(np.hstack((self.mesh[i*n_names+j], mirror_mesh)))
-
-                    if self.show_tube:
-                        sparthickness = self.spar_thickness[i*n_names+j]
-                        new_sparthickness.append(np.hstack((sparthickness[0], sparthickness[0][::-1])))
-                        skinthickness = self.skin_thickness[i*n_names+j]
-                        new_skinthickness.append(np.hstack((skinthickness[0], skinthickness[0][::-1])))
-                        toverc = self.t_over_c[i*n_names+j]
-                        new_toverc.append(np.hstack((toverc[0], toverc[0][::-1])))
-                        r = self.radius[i*n_names+j]
-                        new_r.append(np.hstack((r, r[::-1])))
-                        vonmises = self.vonmises[i*n_names+j]
-                        new_vonmises.append(np.hstack((vonmises, vonmises[::-1])))
-
-                    if self.show_wing:
-                        mirror_mesh = self.def_mesh[i*n_names+j].copy()
+        if self.symmetry:
+            for j in range(n_names):
+                mesh = data['mesh'][j]
+                mirror_mesh = mesh.copy()
+                mirror_mesh[:, :, 1] *= -1.
+                mirror_mesh = mirror_mesh[:, ::-1, :][:, 1:, :]
+                data['mesh'][j] = np.hstack((mesh, mirror_mesh))
+
+                if self.show_tube:
+                    for key in ['spar_thickness', 'skin_thickness', 't_over_c']:
+                        values = data[key][j]
+                        data[key][j] = np.hstack((values[0], values[0][::-1]))
+                    r = data['radius'][j]
+                    data['radius'][j] = np.hstack((r, r[::-1]))
+                    vonmises = data['vonmises'][j]
+                    data['vonmises'][j] = np.hstack((vonmises, vonmises[::-1]))
+
+                if self.show_wing:
+                    for key in ['def_mesh', 'def_mesh_maneuver']:
+                        def_mesh = data[key][j]
+                        mirror_mesh = def_mesh.copy()
                         mirror_mesh[:, :, 1] *= -1.
                         mirror_mesh = mirror_mesh[:, ::-1, :][:, 1:, :]
-                        new_def_mesh.append(np.hstack((self.def_mesh[i*n_names+j], mirror_mesh)))
+                        data[key][j] = np.hstack((def_mesh, mirror_mesh))
 
-                        mirror_normals = normals[i*n_names+j].copy()
+                    for point_normals in [normals, normals_maneuver]:
+                        mirror_normals = point_normals[j].copy()
                         mirror_normals = mirror_normals[:, ::-1, :][:, 1:, :]
-                        new_normals.append(np.hstack((normals[i*n_names+j], mirror_normals)))
+                        point_normals[j] = np.hstack((point_normals[j], mirror_normals))
 
-                        mirror_forces = sec_forces[i*n_names+j].copy()
+                    for point_forces in [sec_forces, sec_forces_maneuver]:
+                        mirror_forces = point_forces[j].copy()
                         mirror_forces = mirror_forces[:, ::-1, :]
-                        new_sec_forces.append(np.hstack((sec_forces[i*n_names+j], mirror_forces)))
-
-                        mirror_mesh_maneuver = self.def_mesh_maneuver[i*n_names+j].copy()
-                        mirror_mesh_maneuver[:, :, 1] *= -1.
-                        mirror_mesh_maneuver = mirror_mesh_maneuver[:, ::-1, :][:, 1:, :]
-                        new_def_mesh_maneuver.append(np.hstack((self.def_mesh_maneuver[i*n_names+j], mirror_mesh_maneuver)))
-
-                        mirror_normals_maneuver = normals_maneuver[i*n_names+j].copy()
-                        mirror_normals_maneuver = mirror_normals_maneuver[:, ::-1, :][:, 1:, :]
-                        new_normals_maneuver.append(np.hstack((normals_maneuver[i*n_names+j], mirror_normals_maneuver)))
-
-                        mirror_forces_maneuver = sec_forces_maneuver[i*n_names+j].copy()
-                        mirror_forces_maneuver = mirror_forces_maneuver[:, ::-1, :]
-                        new_sec_forces_maneuver.append(np.hstack((sec_forces_maneuver[i*n_names+j], mirror_forces_maneuver)))
-
-                        new_widths.append(np.hstack((widths[i*n_names+j], widths[i*n_names+j][::-1])))
-                        new_widths_maneuver.append(np.hstack((widths_maneuver[i*n_names+j], widths_maneuver[i*n_names+j][::-1])))
-                        twist = self.twist[i*n_names+j]
-                        new_twist.append(np.hstack((twist[0], twist[0][::-1][1:])))
+                        point_forces[j] = np.hstack((point_forces[j], mirror_forces))
 
-            self.mesh = new_mesh
-            if self.show_tube:
-                self.skin_thickness = new_skinthickness
-                self.spar_thickness = new_sparthickness
-                self.t_over_c = new_toverc
-                self.radius = new_r
-                self.vonmises = new_vonmises
-            if self.show_wing:
-                self.def_mesh = new_def_mesh
-                self.twist = new_twist
-                widths = new_widths
-                widths_maneuver = new_widths_maneuver
-                normals = new_normals
-                sec_forces = new_sec_forces
-                sec_forces_maneuver = new_sec_forces_maneuver
+                    widths[j] = np.hstack((widths[j], widths[j][::-1]))
+                    widths_maneuver[j] = np.hstack((widths_maneuver[j], widths_maneuver[j][::-1]))
+                    twist = data['twist'][j]
+                    data['twist'][j] = np.hstack((twist[0], twist[0][::-1][1:]))
 
         if self.show_wing:
-            for i in range(self.num_iters):
-                for j, name in enumerate(names):
-                    m_vals = self.mesh[i*n_names+j].copy()
-                    cvec = m_vals[0, :, :] - m_vals[-1, :, :]
-                    chords = np.sqrt(np.sum(cvec**2, axis=1))
-                    chords = 0.5 * (chords[1:] + chords[:-1])
-                    a = alpha[i]
-                    cosa = np.cos(a)
-                    sina = np.sin(a)
-
-                    forces = np.sum(sec_forces[i*n_names+j], axis=0)
+            for j in range(n_names):
+                m_vals = data['mesh'][j].copy()
+                cosa = np.cos(alpha)
+                sina = np.sin(alpha)
 
-                    lift = (-forces[:, 0] * sina + forces[:, 2] * cosa) / \
-                        widths[i*n_names+j]/0.5/rho[i][0]/v[i][0]**2
-                    a_maneuver = alpha_maneuver[i]
-                    cosa_maneuver = np.cos(a_maneuver)
-                    sina_maneuver = np.sin(a_maneuver)
-                    forces_maneuver = np.sum(sec_forces_maneuver[i*n_names+j], axis=0)
-                    lift_maneuver= (-forces_maneuver[:, 0] * sina_maneuver + forces_maneuver[:, 2] * cosa_maneuver) / \
-                        widths_maneuver[i*n_names+j]/0.5/rho_maneuver[i][1]/v[i][1]**2
+                forces = np.sum(sec_forces[j], axis=0)
 
-                    span = (m_vals[0, :, 1] / (m_vals[0, -1, 1] - m_vals[0, 0, 1]))
-                    span = span - (span[0] + .5)
+                lift = (-forces[:, 0] * sina + forces[:, 2] * cosa) / \
+                    widths[j]/0.5/rho[0]/v[0]**2
+                cosa_maneuver = np.cos(alpha_maneuver)
+                sina_maneuver = np.sin(alpha_maneuver)
+                forces_maneuver = np.sum(sec_forces_maneuver[j], axis=0)
+                lift_maneuver= (-forces_maneuver[:, 0] * sina_maneuver + forces_maneuver[:, 2] * cosa_maneuver) / \
+                    widths_maneuver[j]/0.5/rho_maneuver[1]/v[1]**2
 
-                    lift_area = np.sum(lift * (span[1:] - span[:-1]))
+                span = (m_vals[0, :, 1] / (m_vals[0, -1, 1] - m_vals[0, 0, 1]))
+                span = span - (span[0] + .5)
 
-                    lift_ell = 4 * lift_area / np.pi * np.sqrt(1 - (2*span)**2)
+                lift_area = np.sum(lift * (span[1:] - span[:-1]))
 
-                    normalize_factor = max(lift_ell) / 4 * np.pi
-                    lift_ell = lift_ell / normalize_factor
-                    lift = lift / normalize_factor
+                lift_ell = 4 * lift_area / np.pi * np.sqrt(1 - (2*span)**2)
 
-                    lift_area_maneuver = np.sum(lift_maneuver * (span[1:] - span[:-1]))
+                normalize_factor = max(lift_ell) / 4 * np.pi
+                lift_ell = lift_ell / normalize_factor
+                lift = lift / normalize_factor
 
-                    lift_ell_maneuver = 4 * lift_area_maneuver / np.pi * np.sqrt(1 - (2*span)**2)
+                lift_area_maneuver = np.sum(lift_maneuver * (span[1:] - span[:-1]))
 
-                    normalize_factor = max(lift_ell_maneuver) / 4 * np.pi
-                    lift_ell_maneuver = lift_ell_maneuver / normalize_factor
-                    lift_maneuver = lift_maneuver / normalize_factor
+                lift_ell_maneuver = 4 * lift_area_maneuver / np.pi * np.sqrt(1 - (2*span)**2)
 
-                    self.lift.append(lift)
-                    self.lift_ell.append(lift_ell)
-                    self.lift_maneuver.append(lift_maneuver)
-                    self.lift_ell_maneuver.append(lift_ell_maneuver)
+                normalize_factor = max(lift_ell_maneuver) / 4 * np.pi
+                lift_ell_maneuver = lift_ell_maneuver / normalize_factor
+                lift_maneuver = lift_maneuver / normalize_factor
 
-                    wingspan = np.abs(m_vals[0, -1, 1] - m_vals[0, 0, 1])
-                    self.AR.append(wingspan**2 / self.S_ref[i*n_names+j])
+                data['lift'].append(lift)
+                data['lift_ell'].append(lift_ell)
+                data['lift_maneuver'].append(lift_maneuver)
+                data['lift_ell_maneuver'].append(lift_ell_maneuver)
 
             # recenter def_mesh points for better viewing
-            for i in range(self.num_iters):
-                center = np.zeros((3))
-                for j in range(n_names):
-                    center += np.mean(self.def_mesh[i*n_names+j], axis=(0,1))
-                for j in range(n_names):
-                    self.def_mesh[i*n_names+j] -= center / n_names
-                self.cg[i] -= center / n_names
-
-        # recenter mesh points for better viewing
-        for i in range(self.num_iters):
             center = np.zeros((3))
             for j in range(n_names):
-                center += np.mean(self.mesh[i*n_names+j], axis=(0,1))
+                center += np.mean(data['def_mesh'][j], axis=(0,1))
             for j in range(n_names):
-                self.mesh[i*n_names+j] -= center / n_names
+                data['def_mesh'][j] = data['def_mesh'][j] - center / n_names
+            data['cg'] -= center / n_names
+
+        # recenter mesh points for better viewing
+        center = np.zeros((3))
+        for j in range(n_names):
+            center += np.mean(data['mesh'][j], axis=(0,1))
+        for j in range(n_names):
+            data['mesh'][j] = data['mesh'][j] - center / n_names
 
+        limits = []
         if self.show_wing:
-            self.min_twist, self.max_twist = self.get_list_limits(self.twist)
-            diff = (self.max_twist - self.min_twist) * 0.05
-            self.min_twist -= diff
-            self.max_twist += diff
-            self.min_l, self.max_l = self.get_list_limits(self.lift)
-            self.min_le, self.max_le = self.get_list_limits(self.lift_ell)
-            self.min_l_maneuver, self.max_l_maneuver = self.get_list_limits(self.lift_maneuver)
-            self.min_le_maneuver, self.max_le_maneuver = self.get_list_limits(self.lift_ell_maneuver)
-            self.min_l, self.max_l = min(self.min_l, self.min_le, self.min_l_maneuver, self.min_le_maneuver), max(self.max_l, self.max_le, self.max_l_maneuver, self.max_le_maneuver)
-            diff = (self.max_l - self.min_l) * 0.05
-            self.min_l -= diff
-            self.max_l += diff
+            limits.append(('twist', data['twist']))
+            limits.append(('l', data['lift'] + data['lift_ell'] + data['lift_maneuver'] +
+                data['lift_ell_maneuver']))
         if self.show_tube:
-            self.min_t, self.max_t = self.get_list_limits(self.skin_thickness)
-            self.min_toc, self.max_toc = self.get_list_limits(self.t_over_c)
-            diff = (self.max_t - self.min_t) * 0.05
-            self.min_t -= diff
-            self.max_t += diff
-            self.min_vm, self.max_vm = self.get_list_limits(self.vonmises)
-            diff = (self.max_vm - self.min_vm) * 0.05
-            self.min_vm -= diff
-            self.max_vm += diff
+            limits.append(('t', data['skin_thickness']))
+            limits.append(('toc', data['t_over_c']))
+            limits.append(('vm', data['vonmises']))
+        self.update_limits(limits)
+
+        return data
 
     def plot_sides(self):
+        data = self.cases[self.curr_pos]
 
         if self.show_wing:
 
@@ -529,19 +474,18 @@ class Display(object):
             self.ax5.text(0.15, 1.05, 'failure limit',
                 transform=self.ax5.transAxes, color='r')
 
-        n_names = len(self.names)
         for j, name in enumerate(self.names):
-            m_vals = self.mesh[self.curr_pos*n_names+j].copy()
+            m_vals = data['mesh'][j].copy()
             span = m_vals[0, -1, 1] - m_vals[0, 0, 1]
             rel_span = (m_vals[0, :, 1] - m_vals[0, 0, 1]) * 2 / span - 1
             span_diff = ((m_vals[0, :-1, 1] + m_vals[0, 1:, 1]) / 2 - m_vals[0, 0, 1]) * 2 / span - 1
 
             if self.show_wing:
-                t_vals = self.twist[self.curr_pos*n_names+j]
-                l_vals = self.lift[self.curr_pos*n_names+j]
-                l_maneuver_vals = self.lift_maneuver[self.curr_pos*n_names+j]
-                le_vals = self.lift_ell[self.curr_pos*n_names+j]
-                le_vals_maneuver = self.lift_ell_maneuver[self.curr_pos*n_names+j]
+                t_vals = data['twist'][j]
+                l_vals = data['lift'][j]
+                l_maneuver_vals = data['lift_maneuver'][j]
+                le_vals = data['lift_ell'][j]
+                le_vals_maneuver = data['lift_ell_maneuver'][j]
 
                 self.ax2.plot(rel_span, t_vals, lw=2, c='k')
                 self.ax3.plot(rel_span, le_vals, '--', lw=2, c='k', alpha = 0.8)
@@ -550,10 +494,10 @@ class Display(object):
                 # self.ax3.plot(rel_span, le_vals_maneuver, '--', lw=2, c='k')
 
             if self.show_tube:
-                skinthick = self.skin_thickness[self.curr_pos*n_names+j]
-                sparthick = self.spar_thickness[self.curr_pos*n_names+j]
-                toverc = self.t_over_c[self.curr_pos*n_names+j]
-                vm_vals = self.vonmises[self.curr_pos*n_names+j]
+                skinthick = data['skin_thickness'][j]
+                sparthick = data['spar_thickness'][j]
+                toverc = data['t_over_c'][j]
+                vm_vals = data['vonmises'][j]
 
                 self.ax4.plot(span_diff, skinthick, lw=2, c=my_blue)
                 self.ax4.text(0.05, 0.8, 'skin',
@@ -570,6 +514,7 @@ class Display(object):
                 self.ax6.set_xticklabels([])
 
     def plot_wing(self):
+        data = self.cases[self.curr_pos]
 
         n_names = len(self.names)
         self.ax.cla()
@@ -591,12 +536,12 @@ class Display(object):
             except:
                 print('temp_le_te.npy file not found')
 
-            mesh0 = self.mesh[self.curr_pos*n_names+j].copy()
+            mesh0 = data['mesh'][j].copy()
 
             self.ax.set_axis_off()
 
             if self.show_wing:
-                def_mesh0 = self.def_mesh[self.curr_pos*n_names+j]
+                def_mesh0 = data['def_mesh'][j]
                 x = mesh0[:, :, 0]
                 y = mesh0[:, :, 1]
                 z = mesh0[:, :, 2]
@@ -609,7 +554,7 @@ class Display(object):
                 mesh1[0,:,:] = mesh1[0,:,:] + le_te[0] * chord_vec
                 mesh1[1,:,:] = mesh1[1,:,:] - (1 - le_te[1]) * chord_vec
 
-                current_t_over_c = self.t_over_c[self.curr_pos*n_names+j]
+                current_t_over_c = data['t_over_c'][j]
 
                 half_len_toverc = int(len(current_t_over_c) / 2)
                 tovercarray = np.zeros((len(current_t_over_c)+1))
@@ -684,7 +629,7 @@ class Display(object):
                     self.ax.plot_surface(x_box3, y_box3, z_box3, rstride=1, cstride=1, color='k', alpha=0.25) # wingbox viz
                     self.ax.plot_surface(x_box4, y_box4, z_box4, rstride=1, cstride=1, color='k', alpha=0.25) # wingbox viz
 
-                cg = self.cg[self.curr_pos]
+                cg = data['cg']
                 # self.ax.scatter(cg[0], cg[1], cg[2], s=100, color='r')
 
             # if self.show_tube:
@@ -749,7 +694,7 @@ class Display(object):
 
         lim = 0.
         for j in range(n_names):
-            ma = np.max(self.mesh[self.curr_pos*n_names+j], axis=(0,1,2))
+            ma = np.max(data['mesh'][j], axis=(0,1,2))
             if ma > lim:
                 lim = ma
         lim /= float(self.zoom_scale)
@@ -811,12 +756,12 @@ class Display(object):
         self.canvas.draw()
 
     def check_length(self):
-        # Load the current sqlitedict
-        db = sqlitedict.SqliteDict(self.db_name, 'iterations')
+        # Reopen the recording to see the cases added since it was loaded
+        cr = self.case_reader = open_case_reader(self.db_name)
 
         # Get the number of current iterations
         # Minus one because OpenMDAO uses 1-indexing
-        self.num_iters = int(db.keys()[-1].split('|')[-1])
+        self.num_iters = int(list_driver_cases(cr)[-1].split('|')[-1])
 
     def get_list_limits(self, input_list):
         list_min = 1.e20
@@ -831,18 +776,35 @@ class Display(object):
 
         return list_min, list_max
 
+    def update_limits(self, limits):
+        """
+        Widen the limits of the side plots to fit the distributions of a
+        newly read case, given as a list of (name, list of arrays).
+        """
+        for key, input_list in limits:
+            list_min, list_max = self.get_list_limits(input_list)
+            if key in self.raw_limits:
+                list_min = min(list_min, self.raw_limits[key][0])
+                list_max = max(list_max, self.raw_limits[key][1])
+            self.raw_limits[key] = (list_min, list_max)
+
+            diff = (list_max - list_min) * 0.05
+            setattr(self, 'min_' + key, list_min - diff)
+            setattr(self, 'max_' + key, list_max + diff)
+
 
     def auto_ref(self):
         """
         Automatically refreshes the history file, which is
         useful if examining a running optimization.
         """
-        if self.var_ref.get():
+        # An exported history never grows, so there is nothing to refresh
+        if self.var_ref.get() and not isinstance(self.case_reader, HistoryReader):
             self.root.after(500, self.auto_ref)
             self.check_length()
             self.update_graphs()
 
-            # Check if the sqlitedict file has change and if so, fully
+            # Check if the recording has changed and if so, fully
             # load in the new file.
             if self.num_iters > self.old_n:
                 self.load_db()
@@ -922,6 +884,8 @@ class Display(object):
             command=self.auto_ref,
             font=font)
         c11.grid(row=0, column=4, sticky=Tk.W, pady=6)
+        if isinstance(self.case_reader, HistoryReader):
+            c11.config(state=Tk.DISABLED)
 
         button = Tk.Button(
             self.options_frame,
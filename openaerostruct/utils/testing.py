@@ -1,4 +1,5 @@
-from openmdao.api import Problem, Group, IndepVarComp, view_model
+from openmdao.api import Problem, Group, IndepVarComp, ExecComp, ScipyOptimizeDriver, \
+    SqliteRecorder, view_model
 
 from six import iteritems
 from numpy.testing import assert_almost_equal
@@ -147,3 +148,93 @@ def get_default_surfaces():
     surfaces = [wing_dict, tail_dict]
 
     return surfaces
+
+def record_cases(db_name):
+    """
+    Record the driver cases of a small constrained optimization, with the
+    design variable 'x' and the outputs 'f' and 'g', to test the tools
+    that read recordings.
+    """
+    prob = Problem()
+    prob.model.add_subsystem('des_vars', IndepVarComp('x', val=np.array([3., -2.])),
+        promotes=['*'])
+    prob.model.add_subsystem('obj', ExecComp('f = (x[0] - 1.)**2 + (x[1] + 0.5)**2',
+        x=np.zeros(2)), promotes=['*'])
+    prob.model.add_subsystem('con', ExecComp('g = x[0] + x[1]', x=np.zeros(2)),
+        promotes=['*'])
+
+    prob.model.add_design_var('x', lower=-10., upper=10.)
+    prob.model.add_objective('f')
+    prob.model.add_constraint('g', lower=1.)
+
+    prob.driver = ScipyOptimizeDriver(disp=False)
+    prob.driver.add_recorder(SqliteRecorder(db_name))
+    prob.driver.recording_options['includes'] = ['*']
+
+    prob.setup()
+    prob.run_driver()
+    prob.cleanup()
+
+def run_wing_tail_aero_point():
+    """
+    Run the VLM analysis of a wing and a tail far enough behind it for the
+    AIC matrix to have low-rank far-field blocks, to test the hierarchical
+    matrix on the actual AIC matrix. The AeroPoint is named 'aero_point'.
+    """
+    from openaerostruct.geometry.geometry_group import Geometry
+    from openaerostruct.aerodynamics.aero_groups import AeroPoint
+
+    surfaces = get_default_surfaces()
+
+    mesh_dict = {'num_y' : 61,
+                 'num_x' : 5,
+                 'wing_type' : 'CRM',
+                 'symmetry' : True,
+                 'num_twist_cp' : 5}
+
+    mesh, twist_cp = generate_mesh(mesh_dict)
+    wing_dict = dict(surfaces[0], mesh=mesh, twist_cp=twist_cp)
+
+    mesh_dict = {'num_y' : 31,
+                 'num_x' : 5,
+                 'wing_type' : 'rect',
+                 'symmetry' : True,
+                 'span' : 20.,
+                 'root_chord' : 5.}
+
+    mesh = generate_mesh(mesh_dict)
+    mesh[:, :, 0] += 50.
+    mesh[:, :, 2] += 3.
+    tail_dict = dict(wing_dict, name='tail', mesh=mesh, twist_cp=np.zeros(2))
+
+    surfaces = [wing_dict, tail_dict]
+
+    prob = Problem()
+
+    indep_var_comp = IndepVarComp()
+    indep_var_comp.add_output('v', val=248.136, units='m/s')
+    indep_var_comp.add_output('alpha', val=5., units='deg')
+    indep_var_comp.add_output('M', val=0.84)
+    indep_var_comp.add_output('re', val=1.e6, units='1/m')
+    indep_var_comp.add_output('rho', val=0.38, units='kg/m**3')
+    indep_var_comp.add_output('cg', val=np.zeros((3)), units='m')
+
+    prob.model.add_subsystem('prob_vars', indep_var_comp, promotes=['*'])
+
+    for surface in surfaces:
+        prob.model.add_subsystem(surface['name'], Geometry(surface=surface))
+
+    prob.model.add_subsystem('aero_point', AeroPoint(surfaces=surfaces),
+        promotes_inputs=['v', 'alpha', 'M', 're', 'rho', 'cg'])
+
+    for surface in surfaces:
+        name = surface['name']
+
+        prob.model.connect(name + '.mesh', 'aero_point.' + name + '.def_mesh')
+        prob.model.connect(name + '.mesh', 'aero_point.aero_states.' + name + '_def_mesh')
+        prob.model.connect(name + '.t_over_c', 'aero_point.' + name + '_perf.' + 't_over_c')
+
+    prob.setup()
+    prob.run_model()
+
+    return prob
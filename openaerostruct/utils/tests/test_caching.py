@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from openmdao.api import Problem
+
+from openaerostruct.aerodynamics.eval_mtx import EvalVelMtx
+from openaerostruct.utils.caching import SparsityCache, sparsity_cache
+from openaerostruct.utils.testing import get_default_surfaces
+
+
+class Test(unittest.TestCase):
+
+    def test_sparsity_cache(self):
+        cache = SparsityCache()
+        comp = EvalVelMtx(surfaces=get_default_surfaces(), num_eval_points=2, eval_name='pts')
+
+        calls = []
+        def compute():
+            calls.append(1)
+            return np.arange(5), np.arange(3)
+
+        rows, cols = cache.get(comp, (2, 3), compute)
+        rows2, cols2 = cache.get(comp, (2, 3), compute)
+        cache.get(comp, (2, 4), compute)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertIs(rows, rows2)
+
+        # The arrays are shared, so they must not be modified
+        self.assertFalse(rows.flags.writeable)
+
+    def test_sparsity_cache_bound(self):
+        comp = EvalVelMtx(surfaces=get_default_surfaces(), num_eval_points=2, eval_name='pts')
+        compute = lambda: (np.arange(100), np.arange(100))
+
+        # Room for two patterns of 1600 bytes
+        cache = SparsityCache(max_bytes=3200)
+        cache.get(comp, (1,), compute)
+        cache.get(comp, (2,), compute)
+        cache.get(comp, (1,), compute)
+        cache.get(comp, (3,), compute)
+        self.assertEqual(cache.nbytes, 3200)
+
+        # The least recently used pattern was evicted
+        cache.get(comp, (1,), compute)
+        cache.get(comp, (3,), compute)
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+        cache.get(comp, (2,), compute)
+        self.assertEqual((cache.hits, cache.misses), (3, 4))
+
+        # Patterns larger than the bound are not kept at all
+        cache.get(comp, (4,), lambda: (np.arange(1000),))
+        cache.get(comp, (4,), lambda: (np.arange(1000),))
+        self.assertEqual((cache.hits, cache.misses), (3, 6))
+        self.assertLessEqual(cache.nbytes, 3200)
+
+    def test_sparsity_cache_dir(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            comp = EvalVelMtx(surfaces=get_default_surfaces(), num_eval_points=2, eval_name='pts')
+            compute = lambda: (np.arange(5), np.arange(3) * 2)
+
+            rows, cols = SparsityCache(cache_dir).get(comp, (2, 3), compute)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            # A new cache, as in another process, loads the arrays from disk
+            cache = SparsityCache(cache_dir)
+            loaded_rows, loaded_cols = cache.get(comp, (2, 3), None)
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+            np.testing.assert_array_equal(loaded_rows, rows)
+            np.testing.assert_array_equal(loaded_cols, cols)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_repeated_setup(self):
+        surfaces = get_default_surfaces()
+
+        for i in range(2):
+            prob = Problem()
+            prob.model.add_subsystem('comp',
+                EvalVelMtx(surfaces=surfaces, num_eval_points=7, eval_name='pts'))
+
+            hits = sparsity_cache.hits
+            prob.setup()
+
+        # The second setup reuses the patterns of each surface
+        self.assertEqual(sparsity_cache.hits - hits, len(surfaces))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from openmdao.recorders.sqlite_reader import SqliteCaseReader
+
+from openaerostruct.utils.history import export_history, HistoryReader, open_case_reader
+from openaerostruct.utils.lazy_cases import get_scalar_index, list_driver_cases, \
+    get_driver_case
+from openaerostruct.utils.testing import record_cases
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.tempdir, 'cases.db')
+
+        record_cases(self.db_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_export(self):
+        path = export_history(self.db_name)
+        self.assertEqual(path, os.path.join(self.tempdir, 'cases_history'))
+
+        cr = SqliteCaseReader(self.db_name)
+        history = open_case_reader(path)
+        self.assertIsInstance(history, HistoryReader)
+
+        case_ids = list_driver_cases(cr)
+        self.assertEqual(list_driver_cases(history), case_ids)
+        self.assertEqual(sorted(history.list_variables()), ['f', 'g', 'x'])
+
+        # Each variable is a single memory-mapped array over the iterations
+        x = history['x']
+        self.assertIsInstance(x, np.memmap)
+        self.assertEqual(x.shape, (len(case_ids), 2))
+
+        for i, case_id in enumerate(case_ids):
+            outputs = get_driver_case(cr, case_id).outputs
+            np.testing.assert_array_equal(x[i], outputs['x'])
+            np.testing.assert_array_equal(get_driver_case(history, case_id).outputs['f'],
+                outputs['f'])
+
+        last_case = history.get_case(-1)
+        self.assertEqual(last_case.iteration_coordinate, case_ids[-1])
+        self.assertEqual(list(last_case.get_objectives().keys()), ['f'])
+        with self.assertRaises(KeyError):
+            last_case.outputs['h']
+
+        scalars = {'obj' : ['f'], 'sum' : ['f', 'g'], 'none' : ['h']}
+        index = get_scalar_index(cr, scalars)
+        history_index = get_scalar_index(history, scalars, case_ids[1:])
+        for key in ['obj', 'sum']:
+            np.testing.assert_allclose(history_index[key], index[key][1:])
+        self.assertTrue(np.all(np.isnan(history_index['none'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from openmdao.utils.assert_utils import assert_rel_error
+
+from openaerostruct.utils.hmatrix import ClusterTree, HMatrix, compute_aca
+
+
+def get_kernel_mtx(points):
+    """
+    Get a diagonally dominant matrix with a smooth 1/r far field.
+    """
+    dist = np.linalg.norm(points[:, np.newaxis, :] - points[np.newaxis, :, :], axis=-1)
+    np.fill_diagonal(dist, 1.)
+    mtx = 1. / dist
+    np.fill_diagonal(mtx, 0.)
+    np.fill_diagonal(mtx, 2 * np.sum(mtx, axis=1))
+    return mtx
+
+
+class Test(unittest.TestCase):
+
+    def test_cluster_tree(self):
+        np.random.seed(314)
+        points = np.random.random_sample((100, 3))
+
+        tree = ClusterTree(points, leaf_size=10)
+        leaves = tree.leaves()
+
+        # The leaves partition the points
+        indices = np.sort(np.concatenate([leaf.indices for leaf in leaves]))
+        np.testing.assert_array_equal(indices, np.arange(100))
+        self.assertTrue(all(len(leaf.indices) <= 10 for leaf in leaves))
+
+        far_tree = ClusterTree(points + 10.)
+        assert_rel_error(self, tree.distance(far_tree), np.linalg.norm(
+            np.min(points + 10., axis=0) - np.max(points, axis=0)), 1e-12)
+
+    def test_aca(self):
+        np.random.seed(314)
+        points1 = np.random.random_sample((40, 3))
+        points2 = np.random.random_sample((30, 3)) + 10.
+        block = 1. / np.linalg.norm(points1[:, np.newaxis] - points2[np.newaxis], axis=-1)
+
+        U, V = compute_aca(lambda i: block[i], lambda j: block[:, j], block.shape,
+            1e-8, 17)
+
+        self.assertLess(U.shape[1], 17)
+        assert_rel_error(self, U.dot(V), block, 1e-7)
+
+        # A random block is not low rank
+        block = np.random.random_sample((40, 30))
+        self.assertIsNone(compute_aca(lambda i: block[i], lambda j: block[:, j],
+            block.shape, 1e-8, 17))
+
+    def test_hmatrix(self):
+        np.random.seed(314)
+        points = np.vstack([
+            np.random.random_sample((150, 3)),
+            np.random.random_sample((150, 3)) + [10., 0., 0.],
+        ])
+        mtx = get_kernel_mtx(points)
+
+        hmatrix = HMatrix(mtx, points, leaf_size=20)
+
+        self.assertGreater(len(hmatrix.low_rank_blocks), 0)
+        self.assertLess(hmatrix.nbytes, mtx.nbytes)
+
+        x = np.random.random_sample(300)
+        assert_rel_error(self, hmatrix.dot(x), mtx.dot(x), 1e-7)
+        assert_rel_error(self, hmatrix.tdot(x), mtx.T.dot(x), 1e-7)
+
+        # The preconditioner inverts the diagonal blocks of the leaves
+        for trans, block_mtx in [(0, mtx), (1, mtx.T)]:
+            y = hmatrix.precondition(x, trans)
+            for indices, lu in hmatrix.leaf_factors:
+                assert_rel_error(self, block_mtx[np.ix_(indices, indices)].dot(y[indices]),
+                    x[indices], 1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
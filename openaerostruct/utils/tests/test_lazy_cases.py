@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from openmdao.recorders.sqlite_reader import SqliteCaseReader
+
+from openaerostruct.utils.lazy_cases import LazyCaseLoader, get_scalar_index, \
+    list_driver_cases, get_driver_case
+from openaerostruct.utils.testing import record_cases
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.tempdir, 'cases.db')
+
+        record_cases(self.db_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_loader(self):
+        cr = SqliteCaseReader(self.db_name)
+
+        processed = []
+        def process_case(case):
+            processed.append(1)
+            return case.outputs['x'].copy()
+
+        cases = LazyCaseLoader(cr, process_case, cache_size=2)
+        num_cases = len(cases)
+        self.assertGreater(num_cases, 3)
+
+        # Nothing is read until it is requested
+        self.assertEqual(len(processed), 0)
+
+        np.testing.assert_allclose(cases[-1], [1.25, -0.25], atol=1e-4)
+        cases[0]
+        cases[-1]
+        self.assertEqual((cases.hits, cases.misses), (1, 2))
+
+        # The least recently used case is dropped
+        cases[1]
+        cases[0]
+        self.assertEqual((cases.hits, cases.misses), (1, 4))
+        self.assertEqual(len(processed), 4)
+
+    def test_scalar_index(self):
+        cr = SqliteCaseReader(self.db_name)
+        case_ids = list_driver_cases(cr)
+
+        index = get_scalar_index(cr, {'obj' : ['f'], 'sum' : ['f', 'g'], 'none' : ['h']})
+
+        for i, case_id in enumerate(case_ids):
+            outputs = get_driver_case(cr, case_id).outputs
+            self.assertAlmostEqual(index['obj'][i], outputs['f'][0])
+            self.assertAlmostEqual(index['sum'][i], outputs['f'][0] + outputs['g'][0])
+        self.assertTrue(np.all(np.isnan(index['none'])))
+
+        index = get_scalar_index(cr, {'obj' : ['f']}, case_ids[-2:])
+        self.assertEqual(len(index['obj']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
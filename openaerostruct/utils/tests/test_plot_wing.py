@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import unittest
+from distutils.spawn import find_executable
+
+import numpy as np
+
+try:
+    import matplotlib
+except ImportError:
+    matplotlib = None
+
+
+@unittest.skipUnless(matplotlib, 'matplotlib is required to render the frames')
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        from openmdao.api import IndepVarComp, Problem, ScipyOptimizeDriver, SqliteRecorder
+
+        from openaerostruct.geometry.utils import generate_mesh
+        from openaerostruct.geometry.geometry_group import Geometry
+        from openaerostruct.aerodynamics.aero_groups import AeroPoint
+
+        self.tempdir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.tempdir, 'aero.db')
+
+        mesh_dict = {'num_y' : 5,
+                     'num_x' : 2,
+                     'wing_type' : 'CRM',
+                     'symmetry' : True,
+                     'num_twist_cp' : 3}
+
+        mesh, twist_cp = generate_mesh(mesh_dict)
+
+        surface = {
+                    'name' : 'wing',
+                    'symmetry' : True,
+                    'S_ref_type' : 'wetted',
+                    'fem_model_type' : 'tube',
+                    'twist_cp' : twist_cp,
+                    'mesh' : mesh,
+                    'CL0' : 0.0,
+                    'CD0' : 0.015,
+                    'k_lam' : 0.05,
+                    't_over_c_cp' : np.array([0.15]),
+                    'c_max_t' : .303,
+                    'with_viscous' : True,
+                    'with_wave' : False,
+                    }
+
+        prob = Problem()
+
+        indep_var_comp = IndepVarComp()
+        indep_var_comp.add_output('v', val=248.136, units='m/s')
+        indep_var_comp.add_output('alpha', val=5., units='deg')
+        indep_var_comp.add_output('M', val=0.84)
+        indep_var_comp.add_output('re', val=1.e6, units='1/m')
+        indep_var_comp.add_output('rho', val=0.38, units='kg/m**3')
+        indep_var_comp.add_output('cg', val=np.zeros((3)), units='m')
+        prob.model.add_subsystem('prob_vars', indep_var_comp, promotes=['*'])
+
+        prob.model.add_subsystem('wing', Geometry(surface=surface))
+        prob.model.add_subsystem('aero_point_0', AeroPoint(surfaces=[surface]),
+            promotes_inputs=['v', 'alpha', 'M', 're', 'rho', 'cg'])
+
+        prob.model.connect('wing.mesh', 'aero_point_0.wing.def_mesh')
+        prob.model.connect('wing.mesh', 'aero_point_0.aero_states.wing_def_mesh')
+        prob.model.connect('wing.t_over_c', 'aero_point_0.wing_perf.t_over_c')
+
+        prob.driver = ScipyOptimizeDriver(disp=False, maxiter=3)
+        prob.driver.add_recorder(SqliteRecorder(self.db_name))
+        prob.driver.recording_options['includes'] = ['*']
+
+        prob.model.add_design_var('wing.twist_cp', lower=-10., upper=15.)
+        prob.model.add_constraint('aero_point_0.wing_perf.CL', equals=0.5)
+        prob.model.add_objective('aero_point_0.wing_perf.CD', scaler=1e4)
+
+        prob.setup()
+        prob.run_driver()
+        prob.cleanup()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_headless(self):
+        from openaerostruct.utils.plot_wing import Display, _same_scalars
+
+        disp = Display([None, self.db_name], headless=True)
+        self.assertTrue(disp.show_wing)
+        self.assertFalse(disp.show_tube)
+
+        for i in range(disp.num_iters):
+            disp.curr_pos = i
+            filename = os.path.join(self.tempdir, 'iter_{}.png'.format(i))
+            disp.render_frame(filename)
+            self.assertGreater(os.path.getsize(filename), 0)
+
+        # The optimizer evaluates the initial design twice
+        self.assertTrue(_same_scalars(disp.index, 1, 0))
+        self.assertFalse(_same_scalars(disp.index, 2, 1))
+
+        # The deformed mesh is drawn over the undeformed one if requested, as
+        # with the viewer's checkbox
+        num_wireframes = len(disp.ax.collections)
+
+        disp = Display([None, self.db_name], headless=True, show_def_mesh=True,
+                       exaggerate_def=True)
+        disp.render_frame(os.path.join(self.tempdir, 'def_mesh.png'))
+        self.assertEqual(len(disp.ax.collections), 2 * num_wireframes)
+
+    def test_render_video(self):
+        from openaerostruct.utils.plot_wing import render_video
+
+        ffmpeg_path = matplotlib.rcParams['animation.ffmpeg_path']
+        if find_executable(ffmpeg_path) is None:
+            raise unittest.SkipTest('ffmpeg is required to save the video')
+
+        filename = os.path.join(self.tempdir, 'movie.mp4')
+        render_video(self.db_name, filename, num_procs=2, skip_unchanged=True,
+                     show_def_mesh=True)
+        self.assertGreater(os.path.getsize(filename), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
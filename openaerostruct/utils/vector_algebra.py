@@ -1,6 +1,14 @@
 import numpy as np
 
 
+# Indices of the off-diagonal entries of the skew (cross product) matrix of
+# a vector v, with skew(v)[skew_rows, skew_cols] = skew_signs * v[skew_comps]
+skew_rows = np.array([0, 0, 1, 1, 2, 2])
+skew_cols = np.array([1, 2, 0, 2, 0, 1])
+skew_comps = np.array([2, 1, 2, 0, 1, 0])
+skew_signs = np.array([-1., 1., 1., -1., -1., 1.])
+
+
 def get_array_indices(*shape):
     return np.arange(np.prod(shape)).reshape(shape)
 
@@ -87,6 +95,21 @@ def compute_cross_deriv2(array, deriv_array):
         compute_cross(array, deriv_array[..., 2]), np.array([0., 0., 1.]))
     return tmp_0 + tmp_1 + tmp_2
 
+def compute_skew(array):
+    """
+    Get the skew-symmetric matrices [a]_x such that [a]_x b = a x b, which
+    are also the derivatives of the cross product a x b with respect to b.
+
+    Parameters
+    ----------
+    array : numpy array[..., 3]
+        First argument in the cross product.
+        The cross product axis is the last one.
+    """
+    skew = np.zeros(array.shape + (3,), dtype=array.dtype)
+    skew[..., skew_rows, skew_cols] = skew_signs * array[..., skew_comps]
+    return skew
+
 def compute_norm(array):
     """
     Parameters